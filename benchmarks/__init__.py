@@ -0,0 +1,5 @@
+"""
+Benchmarks reproduzíveis do download, da conversão e do armazenamento
+
+Execute com ``python -m benchmarks.run --help``.
+"""
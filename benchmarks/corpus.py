@@ -0,0 +1,187 @@
+import os
+import json
+import random
+import struct
+from typing import Dict, List, Tuple
+
+# SOP classes dos tipos de arquivo gerados
+ENCAPSULATED_PDF_SOP_CLASS = '1.2.840.10008.5.1.4.1.1.104.1'
+MULTIFRAME_SOP_CLASS = '1.2.840.10008.5.1.4.1.1.7.2'
+EXPLICIT_VR_LITTLE_ENDIAN = '1.2.840.10008.1.2.1'
+
+# Tipos de arquivo e mistura padrão do corpus
+KIND_REPORT = 'report'
+KIND_MULTIFRAME = 'multiframe'
+DEFAULT_MIX = {KIND_REPORT: 0.8, KIND_MULTIFRAME: 0.2}
+
+# Nome do manifesto gravado na raiz do corpus
+MANIFEST_NAME = 'manifest.json'
+
+# VRs com tamanho de 4 bytes no VR explícito
+_LONG_VRS = (b'OB', b'OW', b'SQ', b'UN', b'UT')
+
+
+def _element(group: int, element: int, vr: bytes, value: bytes) -> bytes:
+    if len(value) % 2:
+        value += b' ' if vr in (b'CS', b'LO', b'SH', b'ST', b'IS', b'DS', b'PN') else b'\x00'
+    if vr in _LONG_VRS:
+        return struct.pack('<HH', group, element) + vr + b'\x00\x00' + struct.pack('<I', len(value)) + value
+    return struct.pack('<HH', group, element) + vr + struct.pack('<H', len(value)) + value
+
+
+def _part10(sop_class: str, sop_instance: str, dataset: bytes) -> bytes:
+    """
+    Monta um arquivo DICOM Part 10: preâmbulo, file meta e dataset
+    """
+    meta = (
+        _element(0x0002, 0x0001, b'OB', b'\x00\x01')
+        + _element(0x0002, 0x0002, b'UI', sop_class.encode())
+        + _element(0x0002, 0x0003, b'UI', sop_instance.encode())
+        + _element(0x0002, 0x0010, b'UI', EXPLICIT_VR_LITTLE_ENDIAN.encode())
+    )
+    meta = _element(0x0002, 0x0000, b'UL', struct.pack('<I', len(meta))) + meta
+    return b'\x00' * 128 + b'DICM' + meta + dataset
+
+
+def _payload(rng: random.Random, size: int) -> bytes:
+    """
+    Bytes pseudoaleatórios reproduzíveis; um bloco de 64 KiB é repetido
+    para que corpora grandes sejam gerados rapidamente
+    """
+    block = rng.getrandbits(8 * 65536).to_bytes(65536, 'little')
+    repeats, remainder = divmod(size, len(block))
+    return block * repeats + block[:remainder]
+
+
+def build_report(rng: random.Random, sop_instance: str, pdf_size: int) -> bytes:
+    """
+    Laudo: Encapsulated PDF com um documento de aproximadamente ``pdf_size`` bytes
+    """
+    header = b'%%PDF-1.4\n1 0 obj\n<< /Length %d >>\nstream\n'
+    trailer = b'\nendstream\nendobj\n%%EOF\n'
+    body = _payload(rng, max(0, pdf_size - len(header) - len(trailer)))
+    document = header % len(body) + body + trailer
+
+    dataset = (
+        _element(0x0008, 0x0016, b'UI', ENCAPSULATED_PDF_SOP_CLASS.encode())
+        + _element(0x0008, 0x0018, b'UI', sop_instance.encode())
+        + _element(0x0008, 0x0060, b'CS', b'DOC')
+        + _element(0x0010, 0x0010, b'PN', b'BENCHMARK^REPORT')
+        + _element(0x0042, 0x0010, b'ST', b'Laudo')
+        + _element(0x0042, 0x0011, b'OB', document)
+        + _element(0x0042, 0x0012, b'LO', b'application/pdf')
+    )
+    return _part10(ENCAPSULATED_PDF_SOP_CLASS, sop_instance, dataset)
+
+
+def build_multiframe(rng: random.Random, sop_instance: str, frames: int, rows: int, columns: int) -> bytes:
+    """
+    Imagem multiframe de 8 bits em escala de cinza, com ``frames`` quadros
+    """
+    dataset = (
+        _element(0x0008, 0x0016, b'UI', MULTIFRAME_SOP_CLASS.encode())
+        + _element(0x0008, 0x0018, b'UI', sop_instance.encode())
+        + _element(0x0008, 0x0060, b'CS', b'OT')
+        + _element(0x0010, 0x0010, b'PN', b'BENCHMARK^MULTIFRAME')
+        + _element(0x0028, 0x0002, b'US', struct.pack('<H', 1))
+        + _element(0x0028, 0x0004, b'CS', b'MONOCHROME2')
+        + _element(0x0028, 0x0008, b'IS', str(frames).encode())
+        + _element(0x0028, 0x0010, b'US', struct.pack('<H', rows))
+        + _element(0x0028, 0x0011, b'US', struct.pack('<H', columns))
+        + _element(0x0028, 0x0100, b'US', struct.pack('<H', 8))
+        + _element(0x0028, 0x0101, b'US', struct.pack('<H', 8))
+        + _element(0x0028, 0x0102, b'US', struct.pack('<H', 7))
+        + _element(0x0028, 0x0103, b'US', struct.pack('<H', 0))
+        + _element(0x7FE0, 0x0010, b'OB', _payload(rng, frames * rows * columns))
+    )
+    return _part10(MULTIFRAME_SOP_CLASS, sop_instance, dataset)
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    """
+    Lê a mistura do corpus no formato ``report=0.8,multiframe=0.2``
+
+    Raises:
+        ValueError: Se um tipo for desconhecido ou os pesos forem inválidos
+    """
+    mix = {}
+    for item in value.split(','):
+        kind, _, weight = item.partition('=')
+        kind = kind.strip()
+        if kind not in DEFAULT_MIX:
+            raise ValueError(f"Tipo de arquivo desconhecido: {kind}")
+        mix[kind] = float(weight)
+
+    if not mix or sum(mix.values()) <= 0 or any(weight < 0 for weight in mix.values()):
+        raise ValueError(f"Mistura inválida: {value}")
+    return mix
+
+
+def generate_corpus(directory: str, count: int, mix: Dict[str, float] = None, seed: int = 0,
+                    report_size: int = 64 * 1024, frames: int = 32, rows: int = 512,
+                    columns: int = 512) -> List[Tuple[str, str]]:
+    """
+    Gera um corpus sintético e reproduzível de arquivos DICOM
+
+    Os tipos são sorteados com os pesos de ``mix`` a partir de ``seed``,
+    de forma que a mesma combinação de parâmetros gera sempre o mesmo
+    corpus. Os parâmetros e o tamanho de cada arquivo ficam em
+    ``manifest.json``.
+
+    Args:
+        directory (str): Diretório do corpus (o "servidor" remoto)
+        count (int): Número de arquivos
+        mix (Dict[str, float], opcional): Peso de cada tipo (``report``, ``multiframe``)
+        seed (int, opcional): Semente do sorteio e do conteúdo
+        report_size (int, opcional): Tamanho aproximado do PDF de cada laudo
+        frames (int, opcional): Quadros de cada arquivo multiframe
+        rows (int, opcional): Linhas de cada quadro
+        columns (int, opcional): Colunas de cada quadro
+
+    Returns:
+        List[Tuple[str, str]]: Tuplas (filepath relativo, accession_no), como as
+        retornadas pela consulta a ``public.study``
+    """
+    mix = mix or DEFAULT_MIX
+    rng = random.Random(seed)
+    kinds = sorted(mix)
+    weights = [mix[kind] for kind in kinds]
+
+    os.makedirs(directory, exist_ok=True)
+    studies = []
+    files = []
+
+    for number in range(count):
+        kind = rng.choices(kinds, weights)[0]
+        accession_no = f'BENCH{number:07d}'
+        sop_instance = f'2.25.{seed}.{number + 1}'
+        filepath = os.path.join(kind, f'{accession_no}.dcm')
+
+        if kind == KIND_REPORT:
+            content = build_report(rng, sop_instance, report_size)
+        else:
+            content = build_multiframe(rng, sop_instance, frames, rows, columns)
+
+        full_path = os.path.join(directory, filepath)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, 'wb') as file:
+            file.write(content)
+
+        studies.append((filepath, accession_no))
+        files.append({'filepath': filepath, 'kind': kind, 'bytes': len(content)})
+
+    manifest = {
+        'count': count,
+        'mix': mix,
+        'seed': seed,
+        'report_size': report_size,
+        'frames': frames,
+        'rows': rows,
+        'columns': columns,
+        'bytes': sum(item['bytes'] for item in files),
+        'files': files,
+    }
+    with open(os.path.join(directory, MANIFEST_NAME), 'w', encoding='utf-8') as file:
+        json.dump(manifest, file, indent=2)
+
+    return studies
@@ -0,0 +1,85 @@
+"""
+Conversor falso usado pelos benchmarks no lugar do dcm2pdf
+
+Aceita a mesma linha de comando (``[-v] entrada.dcm saida.pdf``), lê o
+DICOM inteiro, simula o custo da conversão proporcional ao tamanho do
+arquivo e grava um PDF pequeno. Não depende do pacote, para poder ser
+executado diretamente como executável.
+"""
+import os
+import sys
+import time
+import argparse
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Conversor DICOM -> PDF falso para benchmarks")
+    parser.add_argument('-v', action='store_true', help="Ignorado (compatibilidade com dcm2pdf)")
+    parser.add_argument('--seconds-per-mib', type=float, default=0.0,
+                        help="Tempo simulado de conversão por MiB de entrada")
+    parser.add_argument('--fixed-seconds', type=float, default=0.0,
+                        help="Tempo simulado fixo por arquivo")
+    parser.add_argument('--output-ratio', type=float, default=0.1,
+                        help="Tamanho do PDF em relação ao DICOM")
+    parser.add_argument('dcm_filepath')
+    parser.add_argument('pdf_filepath')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    size = 0
+    with open(args.dcm_filepath, 'rb') as dcm_file:
+        header = dcm_file.read(132)
+        if len(header) < 132 or header[128:] != b'DICM':
+            print(f"Arquivo DICOM inválido: {args.dcm_filepath}", file=sys.stderr)
+            return 1
+        size = len(header)
+        for chunk in iter(lambda: dcm_file.read(1024 * 1024), b''):
+            size += len(chunk)
+
+    delay = args.fixed_seconds + args.seconds_per_mib * size / (1024 * 1024)
+    if delay > 0:
+        time.sleep(delay)
+
+    body = b'0' * int(size * args.output_ratio)
+    with open(args.pdf_filepath, 'wb') as pdf_file:
+        pdf_file.write(b'%%PDF-1.4\n1 0 obj\n<< /Length %d >>\nstream\n' % len(body))
+        pdf_file.write(body)
+        pdf_file.write(b'\nendstream\nendobj\n%%EOF\n')
+    return 0
+
+
+def write_wrapper(directory: str, seconds_per_mib: float = 0.0, fixed_seconds: float = 0.0,
+                  output_ratio: float = 0.1) -> str:
+    """
+    Cria um executável que chama este conversor com os parâmetros informados
+
+    O caminho retornado pode ser usado como ``[dcm] executable_path``.
+
+    Returns:
+        str: Caminho do executável criado
+    """
+    os.makedirs(directory, exist_ok=True)
+    script = os.path.abspath(__file__)
+    options = (
+        f'--seconds-per-mib {seconds_per_mib} --fixed-seconds {fixed_seconds} '
+        f'--output-ratio {output_ratio}'
+    )
+
+    if os.name == 'nt':
+        path = os.path.join(directory, 'fake_dcm2pdf.bat')
+        content = f'@"{sys.executable}" "{script}" {options} %*\r\n'
+    else:
+        path = os.path.join(directory, 'fake_dcm2pdf')
+        content = f'#!/bin/sh\nexec "{sys.executable}" "{script}" {options} "$@"\n'
+
+    with open(path, 'w', encoding='utf-8') as wrapper:
+        wrapper.write(content)
+    os.chmod(path, 0o755)
+    return path
+
+
+if __name__ == '__main__':
+    sys.exit(main())
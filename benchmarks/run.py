@@ -0,0 +1,443 @@
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import subprocess
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from configparser import ConfigParser
+from contextlib import ExitStack, redirect_stdout
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from benchmarks.corpus import DEFAULT_MIX, MANIFEST_NAME, generate_corpus, parse_mix
+from benchmarks.fake_converter import write_wrapper
+from benchmarks.stubs import BenchmarkDownloader, mock_storage
+from convert_dcm2pdf.core.config_manager import ConfigManager
+from convert_dcm2pdf.core.dcm_converter import DCMConverter
+from convert_dcm2pdf.core.pipeline import DCMPipeline
+from convert_dcm2pdf.utils.metrics import metrics
+
+# Versão do formato do arquivo de resultados
+RESULTS_SCHEMA = 1
+
+PHASE_DOWNLOAD = 'download'
+PHASE_CONVERT = 'convert'
+PHASE_PIPELINE = 'pipeline'
+PHASES = (PHASE_DOWNLOAD, PHASE_CONVERT, PHASE_PIPELINE)
+
+# Métricas comparadas entre execuções e o sentido de uma piora
+_HIGHER_IS_BETTER = ('files_per_second',)
+_LOWER_IS_BETTER = ('latency_p50', 'latency_p99', 'peak_rss_bytes')
+
+# Diferença mínima de latência considerada, abaixo da qual a variação é ruído
+_MIN_LATENCY_DELTA = 0.001
+
+
+def _peak_rss(who: str = 'self') -> Optional[int]:
+    """
+    Pico de memória residente, em bytes, do processo ou de seus filhos
+    """
+    if resource is None:
+        return None
+    target = resource.RUSAGE_SELF if who == 'self' else resource.RUSAGE_CHILDREN
+    peak = resource.getrusage(target).ru_maxrss
+    # Linux informa KiB; macOS, bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _write_config(path: str, settings: dict, download_directory: str, pdf_directory: str):
+    """
+    Grava o config.ini usado por uma fase
+    """
+    config = ConfigParser()
+    if settings['database']:
+        config.read(settings['config_path'])
+        database = dict(config['postgresql']) if config.has_section('postgresql') else {}
+        config = ConfigParser()
+        config['postgresql'] = database
+    else:
+        config['postgresql'] = {}
+
+    config['postgresql'].update({
+        'storage_mode': settings['storage_mode'],
+        'batch_size': str(settings['batch_size']),
+    })
+    config['dcm'] = {
+        'executable_path': settings['executable_path'],
+        'workers': str(settings['convert_workers']),
+        'incremental': 'false',
+        'backend': settings['backend'],
+        'encapsulated_fast_path': str(settings['fast_path']).lower(),
+    }
+    config['ssh'] = {'workers': str(settings['download_workers'])}
+    config['pipeline'] = {'queue_size': str(settings['queue_size'])}
+    config['paths'] = {
+        'download_directory': download_directory,
+        'pdf_directory': pdf_directory,
+        'log_directory': os.path.join(settings['workdir'], 'logs'),
+    }
+
+    with open(path, 'w', encoding='utf-8') as file:
+        config.write(file)
+
+
+def _prepare_phase(phase: str, settings: dict) -> ConfigManager:
+    """
+    Limpa os diretórios de saída da fase e cria seu gerenciador de configurações
+    """
+    workdir = settings['workdir']
+    phase_directory = os.path.join(workdir, PHASE_PIPELINE if phase == PHASE_PIPELINE else 'staged')
+    download_directory = os.path.join(phase_directory, 'downloads')
+    pdf_directory = os.path.join(phase_directory, 'pdfs')
+
+    # A conversão consome o que a fase de download deixou
+    directories = [pdf_directory] if phase == PHASE_CONVERT else [download_directory, pdf_directory]
+    for directory in directories:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    config_path = os.path.join(workdir, f'{phase}.ini')
+    _write_config(config_path, settings, download_directory, pdf_directory)
+    return ConfigManager(config_path)
+
+
+def run_phase(phase: str, settings: dict) -> dict:
+    """
+    Executa uma fase do benchmark e mede vazão, latências e memória
+
+    Args:
+        phase (str): ``download``, ``convert`` ou ``pipeline``
+        settings (dict): Parâmetros do benchmark (ver ``run_benchmark``)
+
+    Returns:
+        dict: Duração, arquivos, erros, vazão, pico de memória e métricas por estágio
+    """
+    config_manager = _prepare_phase(phase, settings)
+    studies = [tuple(study) for study in settings['studies']]
+
+    def downloader():
+        return BenchmarkDownloader(
+            config_manager, settings['corpus_directory'], studies,
+            settings['sftp_latency'], settings['sftp_bandwidth']
+        )
+
+    with ExitStack() as stack:
+        recorder = None
+        if not settings['database']:
+            recorder = stack.enter_context(mock_storage(settings['db_latency'], settings['db_bandwidth']))
+        stack.enter_context(redirect_stdout(io.StringIO()))
+
+        metrics.reset()
+        start = time.perf_counter()
+
+        if phase == PHASE_DOWNLOAD:
+            downloaded = downloader().download_dcm_files(limit=len(studies))
+            files, errors = len(downloaded), len(studies) - len(downloaded)
+        elif phase == PHASE_CONVERT:
+            converted, failed = DCMConverter(config_manager).convert_all_dcm_files(force=True)
+            files, errors = len(converted), len(failed)
+        elif phase == PHASE_PIPELINE:
+            pipeline = DCMPipeline(config_manager, downloader(), DCMConverter(config_manager))
+            converted, failed = pipeline.run(limit=None, force=True)
+            files, errors = len(converted), len(failed)
+        else:
+            raise ValueError(f"Fase desconhecida: {phase}")
+
+        seconds = time.perf_counter() - start
+
+    return {
+        'seconds': round(seconds, 3),
+        'files': files,
+        'errors': errors,
+        'files_per_second': round(files / seconds, 3) if seconds > 0 else 0.0,
+        'peak_rss_bytes': _peak_rss('self'),
+        'children_peak_rss_bytes': _peak_rss('children'),
+        'stages': metrics.summary()['stages'],
+        'storage': recorder.summary() if recorder else None,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _environment() -> dict:
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'commit': _git_commit(),
+    }
+
+
+def run_benchmark(workdir: str, files: int = 100, mix: Dict[str, float] = None, seed: int = 0,
+                  report_size: int = 64 * 1024, frames: int = 32, rows: int = 512, columns: int = 512,
+                  phases: Iterable[str] = (PHASE_DOWNLOAD, PHASE_CONVERT),
+                  download_workers: int = 4, convert_workers: int = 4, queue_size: int = 8,
+                  storage_mode: str = 'text', batch_size: int = 1, backend: str = 'external',
+                  fast_path: bool = True, convert_seconds_per_mib: float = 0.0,
+                  convert_fixed_seconds: float = 0.0, sftp_latency: float = 0.0,
+                  sftp_bandwidth: float = 0.0, db_latency: float = 0.0, db_bandwidth: float = 0.0,
+                  database: bool = False, config_path: Optional[str] = None,
+                  isolate: bool = True) -> dict:
+    """
+    Gera o corpus e executa as fases do benchmark
+
+    Por padrão cada fase roda em um processo novo, de forma que o pico de
+    memória medido é o da própria fase. O corpus é gerado uma única vez por
+    diretório de trabalho e parâmetros.
+
+    Args:
+        workdir (str): Diretório de trabalho (corpus, downloads, PDFs)
+        files (int, opcional): Arquivos do corpus
+        mix (Dict[str, float], opcional): Peso de cada tipo de arquivo
+        seed (int, opcional): Semente do corpus
+        report_size (int, opcional): Tamanho do PDF de cada laudo
+        frames, rows, columns (int, opcional): Dimensões dos arquivos multiframe
+        phases (Iterable[str], opcional): Fases a executar, em ordem
+        download_workers (int, opcional): Downloads simultâneos
+        convert_workers (int, opcional): Conversões simultâneas
+        queue_size (int, opcional): Capacidade das filas do pipeline
+        storage_mode (str, opcional): ``text`` ou ``binary``
+        batch_size (int, opcional): PDFs por lote de INSERT
+        backend (str, opcional): Backend de conversão (``[dcm] backend``)
+        fast_path (bool, opcional): Extrai PDFs encapsulados sem o conversor
+        convert_seconds_per_mib (float, opcional): Custo simulado da conversão por MiB
+        convert_fixed_seconds (float, opcional): Custo simulado fixo por conversão
+        sftp_latency, db_latency (float, opcional): Segundos por operação remota
+        sftp_bandwidth, db_bandwidth (float, opcional): Bytes por segundo. 0 = sem limite.
+        database (bool, opcional): Usa o PostgreSQL de ``config_path`` em vez do banco simulado
+        config_path (str, opcional): config.ini com a seção ``[postgresql]``
+        isolate (bool, opcional): Executa cada fase em um processo separado
+
+    Returns:
+        dict: Resultados, no formato gravado em JSON
+    """
+    mix = mix or DEFAULT_MIX
+    phases = list(phases)
+    for phase in phases:
+        if phase not in PHASES:
+            raise ValueError(f"Fase desconhecida: {phase}")
+    if PHASE_CONVERT in phases and PHASE_DOWNLOAD not in phases[:phases.index(PHASE_CONVERT)]:
+        raise ValueError("A fase convert requer a fase download antes dela")
+
+    workdir = os.path.abspath(workdir)
+    parameters = {
+        'files': files, 'mix': mix, 'seed': seed, 'report_size': report_size,
+        'frames': frames, 'rows': rows, 'columns': columns,
+        'download_workers': download_workers, 'convert_workers': convert_workers,
+        'queue_size': queue_size, 'storage_mode': storage_mode, 'batch_size': batch_size,
+        'backend': backend, 'fast_path': fast_path,
+        'convert_seconds_per_mib': convert_seconds_per_mib,
+        'convert_fixed_seconds': convert_fixed_seconds,
+        'sftp_latency': sftp_latency, 'sftp_bandwidth': sftp_bandwidth,
+        'db_latency': db_latency, 'db_bandwidth': db_bandwidth,
+        'database': database,
+    }
+
+    corpus_directory = os.path.join(workdir, 'corpus')
+    shutil.rmtree(corpus_directory, ignore_errors=True)
+    studies = generate_corpus(
+        corpus_directory, files, mix, seed, report_size, frames, rows, columns
+    )
+    with open(os.path.join(corpus_directory, MANIFEST_NAME), encoding='utf-8') as file:
+        manifest = json.load(file)
+
+    kinds = {}
+    for item in manifest['files']:
+        kinds[item['kind']] = kinds.get(item['kind'], 0) + 1
+
+    settings = dict(
+        parameters,
+        workdir=workdir,
+        corpus_directory=corpus_directory,
+        studies=studies,
+        config_path=config_path,
+        executable_path=write_wrapper(
+            os.path.join(workdir, 'bin'), convert_seconds_per_mib, convert_fixed_seconds
+        ),
+    )
+
+    results = {}
+    for phase in phases:
+        if isolate:
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                results[phase] = executor.submit(run_phase, phase, settings).result()
+        else:
+            results[phase] = run_phase(phase, settings)
+
+    return {
+        'schema': RESULTS_SCHEMA,
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'environment': _environment(),
+        'parameters': parameters,
+        'isolated': isolate,
+        'corpus': {'files': manifest['count'], 'bytes': manifest['bytes'], 'kinds': kinds},
+        'phases': results,
+    }
+
+
+def compare_results(baseline: dict, current: dict, threshold: float = 0.10) -> List[str]:
+    """
+    Lista as pioras de ``current`` em relação a ``baseline`` acima de ``threshold``
+
+    São comparados, por fase e por estágio, a vazão (arquivos/s), as
+    latências p50/p99 e o pico de memória.
+
+    Args:
+        baseline (dict): Resultados de referência
+        current (dict): Resultados a avaliar
+        threshold (float, opcional): Variação relativa tolerada. Padrão 10%.
+
+    Returns:
+        List[str]: Descrição de cada regressão encontrada
+    """
+    regressions = []
+
+    def check(label: str, old: dict, new: dict):
+        for key in _HIGHER_IS_BETTER + _LOWER_IS_BETTER:
+            before, after = old.get(key), new.get(key)
+            if not before or after is None:
+                continue
+            if key.startswith('latency') and after - before < _MIN_LATENCY_DELTA:
+                continue
+            change = (after - before) / before
+            if key in _HIGHER_IS_BETTER:
+                change = -change
+            if change > threshold:
+                regressions.append(f"{label} {key}: {before} -> {after} ({change:+.1%} pior)")
+
+    for phase, new in current.get('phases', {}).items():
+        old = baseline.get('phases', {}).get(phase)
+        if old is None:
+            continue
+        check(phase, old, new)
+        for stage, new_stage in new.get('stages', {}).items():
+            old_stage = old.get('stages', {}).get(stage)
+            if old_stage is not None:
+                check(f"{phase}/{stage}", old_stage, new_stage)
+
+    return regressions
+
+
+def _format_report(results: dict) -> str:
+    lines = [
+        f"Corpus: {results['corpus']['files']} arquivos, {results['corpus']['bytes']} bytes "
+        f"{results['corpus']['kinds']}"
+    ]
+    for phase, values in results['phases'].items():
+        rss = values['peak_rss_bytes']
+        lines.append(
+            f"{phase}: {values['files']} arquivos, {values['errors']} erros em {values['seconds']:.3f}s "
+            f"({values['files_per_second']:.2f} arquivos/s"
+            + (f", pico RSS {rss / (1024 * 1024):.1f} MiB)" if rss else ")")
+        )
+        for stage, stage_values in values['stages'].items():
+            lines.append(
+                f"  {stage}: {stage_values['files_per_second']:.2f} arquivos/s, "
+                f"p50 {stage_values['latency_p50']:.4f}s, p99 {stage_values['latency_p99']:.4f}s"
+            )
+    return '\n'.join(lines)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark reproduzível do download, da conversão e do armazenamento"
+    )
+    corpus = parser.add_argument_group("corpus")
+    corpus.add_argument('--files', type=int, default=100, help="Arquivos do corpus (padrão: 100)")
+    corpus.add_argument('--mix', type=parse_mix, default=DEFAULT_MIX,
+                        help="Pesos dos tipos, ex.: report=0.8,multiframe=0.2")
+    corpus.add_argument('--seed', type=int, default=0, help="Semente do corpus (padrão: 0)")
+    corpus.add_argument('--report-size', type=int, default=64 * 1024, help="Bytes do PDF de cada laudo")
+    corpus.add_argument('--frames', type=int, default=32, help="Quadros de cada multiframe")
+    corpus.add_argument('--rows', type=int, default=512, help="Linhas de cada quadro")
+    corpus.add_argument('--columns', type=int, default=512, help="Colunas de cada quadro")
+
+    run = parser.add_argument_group("execução")
+    run.add_argument('--phases', default='download,convert',
+                     help="Fases, em ordem: download, convert, pipeline (padrão: download,convert)")
+    run.add_argument('--download-workers', type=int, default=4)
+    run.add_argument('--convert-workers', type=int, default=4)
+    run.add_argument('--queue-size', type=int, default=8)
+    run.add_argument('--storage-mode', choices=('text', 'binary'), default='text')
+    run.add_argument('--batch-size', type=int, default=1)
+    run.add_argument('--backend', default='external', help="Valor de [dcm] backend")
+    run.add_argument('--no-fast-path', dest='fast_path', action='store_false',
+                     help="Converte PDFs encapsulados pelo backend em vez de extraí-los")
+    run.add_argument('--convert-seconds-per-mib', type=float, default=0.0)
+    run.add_argument('--convert-fixed-seconds', type=float, default=0.0)
+    run.add_argument('--sftp-latency', type=float, default=0.0, help="Segundos por operação SFTP")
+    run.add_argument('--sftp-bandwidth', type=float, default=0.0, help="Bytes/s do SFTP (0 = sem limite)")
+    run.add_argument('--db-latency', type=float, default=0.0, help="Segundos por comando no banco simulado")
+    run.add_argument('--db-bandwidth', type=float, default=0.0, help="Bytes/s do banco simulado (0 = sem limite)")
+    run.add_argument('--database', action='store_true',
+                     help="Grava no PostgreSQL de --config em vez do banco simulado")
+    run.add_argument('--config', dest='config_path', default=None, help="config.ini com [postgresql]")
+    run.add_argument('--no-isolate', dest='isolate', action='store_false',
+                     help="Executa as fases no processo atual (o pico de memória passa a ser acumulado)")
+    run.add_argument('--workdir', default=None, help="Diretório de trabalho (padrão: temporário)")
+
+    output = parser.add_argument_group("resultados")
+    output.add_argument('--output', default=None, help="Arquivo JSON de resultados")
+    output.add_argument('--compare', default=None, help="Resultados de referência para comparação")
+    output.add_argument('--threshold', type=float, default=0.10,
+                        help="Piora relativa tolerada na comparação (padrão: 0.10)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    options = vars(args).copy()
+    for key in ('workdir', 'output', 'compare', 'threshold'):
+        options.pop(key)
+    options['phases'] = [phase.strip() for phase in args.phases.split(',') if phase.strip()]
+
+    with ExitStack() as stack:
+        workdir = args.workdir or stack.enter_context(tempfile.TemporaryDirectory(prefix='dcm2pdf-bench-'))
+        results = run_benchmark(workdir, **options)
+
+    print(_format_report(results))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=2)
+            file.write('\n')
+        print(f"Resultados gravados em {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as file:
+            baseline = json.load(file)
+        if baseline.get('parameters') != results['parameters']:
+            print("Aviso: os parâmetros diferem dos resultados de referência")
+        regressions = compare_results(baseline, results, args.threshold)
+        for regression in regressions:
+            print(f"Regressão: {regression}")
+        if regressions:
+            return 1
+        print("Nenhuma regressão acima do limite")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
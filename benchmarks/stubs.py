@@ -0,0 +1,285 @@
+import io
+import os
+import time
+import shutil
+import threading
+from contextlib import ExitStack, contextmanager
+from typing import Iterator, List, Optional, Tuple
+from unittest import mock
+from convert_dcm2pdf.core.dcm_downloader import DCMDownloader
+
+
+def _simulate(latency: float, bandwidth: float, nbytes: int):
+    """
+    Espera o tempo de uma operação remota: latência fixa mais transferência
+    """
+    delay = latency + (nbytes / bandwidth if bandwidth > 0 else 0.0)
+    if delay > 0:
+        time.sleep(delay)
+
+
+class _LocalRemoteFile(io.FileIO):
+    """
+    Arquivo "remoto" aberto por ``LocalSFTPClient.open``
+    """
+    MAX_REQUEST_SIZE = 32768
+
+    def __init__(self, path: str, bandwidth: float = 0.0):
+        super().__init__(path, 'rb')
+        self.bandwidth = bandwidth
+
+    def prefetch(self, file_size=None, max_concurrent_requests=None):
+        pass
+
+    def read(self, size: int = -1) -> bytes:
+        data = super().read(size)
+        _simulate(0, self.bandwidth, len(data))
+        return data
+
+
+class LocalSFTPClient:
+    """
+    Canal SFTP que lê de um diretório local, com latência e banda simuladas
+    """
+    def __init__(self, latency: float = 0.0, bandwidth: float = 0.0):
+        self.latency = latency
+        self.bandwidth = bandwidth
+
+    def stat(self, path: str) -> os.stat_result:
+        _simulate(self.latency, 0, 0)
+        return os.stat(path)
+
+    def get(self, remotepath: str, localpath: str, callback=None):
+        _simulate(self.latency, self.bandwidth, os.path.getsize(remotepath))
+        shutil.copyfile(remotepath, localpath)
+
+    def open(self, path: str, mode: str = 'rb') -> _LocalRemoteFile:
+        _simulate(self.latency, 0, 0)
+        return _LocalRemoteFile(path, self.bandwidth)
+
+    def close(self):
+        pass
+
+
+class LocalSSHClient:
+    """
+    Conexão SSH falsa cujos canais SFTP leem do disco local
+    """
+    def __init__(self, latency: float = 0.0, bandwidth: float = 0.0):
+        self.latency = latency
+        self.bandwidth = bandwidth
+
+    def open_sftp(self) -> LocalSFTPClient:
+        _simulate(self.latency, 0, 0)
+        return LocalSFTPClient(self.latency, self.bandwidth)
+
+    def get_transport(self) -> 'LocalSSHClient':
+        return self
+
+    def is_active(self) -> bool:
+        return True
+
+    def close(self):
+        pass
+
+
+class BenchmarkDownloader(DCMDownloader):
+    """
+    Downloader que baixa um corpus local em vez de consultar o banco e o PACS
+
+    Toda a lógica de download (pool de canais, threads, orçamento, métricas)
+    é a do ``DCMDownloader``; apenas a conexão SSH, a listagem de estudos e
+    o caminho remoto são substituídos.
+    """
+    def __init__(self, config_manager, corpus_directory: str, studies: List[Tuple[str, str]],
+                 latency: float = 0.0, bandwidth: float = 0.0):
+        super().__init__(config_manager)
+        self.corpus_directory = corpus_directory
+        self.studies = studies
+        self.latency = latency
+        self.bandwidth = bandwidth
+
+    def _connect_ssh(self) -> LocalSSHClient:
+        return LocalSSHClient(self.latency, self.bandwidth)
+
+    def _get_dcm_files_to_download(self, limit: int = 10) -> List[Tuple[str, str]]:
+        return self.studies[:limit] if limit is not None else list(self.studies)
+
+    def _iter_dcm_files_to_download(self, limit: Optional[int] = None) -> Iterator[Tuple[str, str]]:
+        return iter(self._get_dcm_files_to_download(limit))
+
+    def _remote_path(self, remote_filepath: str) -> str:
+        return os.path.join(self.corpus_directory, remote_filepath)
+
+
+class StorageRecorder:
+    """
+    Totais de comandos e bytes recebidos pelo banco simulado
+    """
+    def __init__(self, latency: float = 0.0, bandwidth: float = 0.0):
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.statements = 0
+        self.bytes = 0
+        self._lock = threading.Lock()
+
+    def record(self, nbytes: int):
+        _simulate(self.latency, self.bandwidth, nbytes)
+        with self._lock:
+            self.statements += 1
+            self.bytes += nbytes
+
+    def summary(self) -> dict:
+        return {'statements': self.statements, 'bytes': self.bytes}
+
+
+def _size(value) -> int:
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode('utf-8'))
+    if isinstance(value, (list, tuple)):
+        return sum(_size(item) for item in value)
+    return len(str(value))
+
+
+class _MockConnection:
+    encoding = 'UTF8'
+    closed = False
+
+    def __init__(self, recorder: StorageRecorder):
+        self._recorder = recorder
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def lobject(self, oid: int = 0, mode: str = 'wb'):
+        return _MockLargeObject(self._recorder)
+
+
+class _MockLargeObject:
+    oid = 1
+
+    def __init__(self, recorder: StorageRecorder):
+        self._recorder = recorder
+
+    def write(self, chunk: bytes) -> int:
+        self._recorder.record(len(chunk))
+        return len(chunk)
+
+    def close(self):
+        pass
+
+
+class _MockCursor:
+    rowcount = 1
+
+    def __init__(self, connection: _MockConnection, recorder: StorageRecorder):
+        self.connection = connection
+        self._recorder = recorder
+
+    def mogrify(self, template, args) -> bytes:
+        parts = [value if isinstance(value, bytes) else str(value).encode('utf-8') for value in args]
+        return b'(' + b','.join(parts) + b')'
+
+    def execute(self, query, params=None):
+        self._recorder.record(_size(query) + _size(params or ()))
+
+    def copy_expert(self, query, fileobj, size=8192):
+        for chunk in iter(lambda: fileobj.read(size), b''):
+            self._recorder.record(len(chunk))
+
+    def fetchone(self):
+        return (1,)
+
+    def fetchall(self):
+        return []
+
+    def close(self):
+        pass
+
+
+class MockPostgreSQLConnector:
+    """
+    Substituto do ``PostgreSQLConnector`` que não grava nada
+
+    Cada comando espera a latência e o tempo de transferência configurados
+    no ``StorageRecorder`` e é contabilizado nele.
+    """
+    recorder = StorageRecorder()
+
+    def __init__(self, config=None, pooled: bool = False):
+        self.connection = _MockConnection(self.recorder)
+        self.cursor = _MockCursor(self.connection, self.recorder)
+
+    def connect(self):
+        return self.connection
+
+    def execute_query(self, query, params=None):
+        self.cursor.execute(query, params)
+        return []
+
+    def fetch_all(self, query, params=None):
+        return self.execute_query(query, params)
+
+    def stream_query(self, query, params=None, itersize=None):
+        return iter(self.execute_query(query, params))
+
+    def execute_insert(self, query, params=None):
+        self.cursor.execute(query, params)
+        return 1
+
+    def execute(self, query, params=None):
+        self.cursor.execute(query, params)
+        return 1
+
+    def write_large_object(self, fileobj, chunk_size=1024 * 1024):
+        lobject = self.connection.lobject(0, 'wb')
+        for chunk in iter(lambda: fileobj.read(chunk_size), b''):
+            lobject.write(chunk)
+        return lobject.oid
+
+    def copy_from_stream(self, query, fileobj, chunk_size=1024 * 1024):
+        self.cursor.copy_expert(query, fileobj, size=chunk_size)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+# Módulos que importam o conector diretamente
+_CONNECTOR_TARGETS = (
+    'convert_dcm2pdf.core.dcm_converter.PostgreSQLConnector',
+    'convert_dcm2pdf.database.batch_writer.PostgreSQLConnector',
+    'convert_dcm2pdf.database.pdf_stream.PostgreSQLConnector',
+    'convert_dcm2pdf.database.pdf_references.PostgreSQLConnector',
+)
+
+
+@contextmanager
+def mock_storage(latency: float = 0.0, bandwidth: float = 0.0) -> Iterator[StorageRecorder]:
+    """
+    Substitui o banco de dados por ``MockPostgreSQLConnector`` durante o bloco ``with``
+
+    Args:
+        latency (float, opcional): Segundos por comando
+        bandwidth (float, opcional): Bytes por segundo. 0 = sem limite.
+
+    Yields:
+        StorageRecorder: Totais de comandos e bytes recebidos
+    """
+    recorder = StorageRecorder(latency, bandwidth)
+    connector = type('MockPostgreSQLConnector', (MockPostgreSQLConnector,), {'recorder': recorder})
+
+    with ExitStack() as stack:
+        for target in _CONNECTOR_TARGETS:
+            stack.enter_context(mock.patch(target, connector))
+        yield recorder
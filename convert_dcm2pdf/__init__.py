@@ -2,6 +2,9 @@ from .database.connect import PostgreSQLConnector
 from .core.config_manager import ConfigManager
 from .core.dcm_downloader import DCMDownloader
 from .core.dcm_converter import DCMConverter
+from .core.pipeline import DCMPipeline
+from .core.distributed_worker import DistributedWorker
+from .core.async_pipeline import AsyncDCMPipeline
 from .utils.logging_config import setup_logging
 from .utils.exceptions import DicomConverterError
 
@@ -12,6 +15,9 @@ __all__ = [
     'ConfigManager',
     'DCMDownloader',
     'DCMConverter',
+    'DCMPipeline',
+    'DistributedWorker',
+    'AsyncDCMPipeline',
     'setup_logging',
     'DicomConverterError'
 ]
\ No newline at end of file
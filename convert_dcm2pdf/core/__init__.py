@@ -1,9 +1,17 @@
 from .config_manager import ConfigManager
 from .dcm_downloader import DCMDownloader
 from .dcm_converter import DCMConverter
+from .pipeline import DCMPipeline
+from .distributed_worker import DistributedWorker
+from .async_pipeline import AsyncDCMDownloader, AsyncDCMConverter, AsyncDCMPipeline
 
 __all__ = [
     'ConfigManager',
     'DCMDownloader', 
-    'DCMConverter'
+    'DCMConverter',
+    'DCMPipeline',
+    'DistributedWorker',
+    'AsyncDCMDownloader',
+    'AsyncDCMConverter',
+    'AsyncDCMPipeline'
 ]
\ No newline at end of file
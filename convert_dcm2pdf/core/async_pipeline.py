@@ -0,0 +1,703 @@
+import os
+import asyncio
+import shlex
+import logging
+import functools
+from contextlib import ExitStack
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import AsyncIterator, List, Optional, Tuple
+from convert_dcm2pdf.core.dcm_downloader import (
+    PARTIAL_SUFFIX, TRANSFER_CHUNK_SIZE, DCMDownloader
+)
+from convert_dcm2pdf.core.dcm_converter import DCMConverter
+from convert_dcm2pdf.core.backends import EncapsulatedPDFBackend
+from convert_dcm2pdf.database.batch_writer import PDFBatchWriter
+from convert_dcm2pdf.utils.exceptions import (
+    ConversionError, DownloadError, UnsupportedConversionError
+)
+from convert_dcm2pdf.utils.metrics import metrics, report_run, start_run
+
+# Cliente SSH assíncrono opcional; sem ele os downloads usam o paramiko em threads
+try:
+    import asyncssh
+except ImportError:  # pragma: no cover - depende do ambiente
+    asyncssh = None
+
+# Quedas de conexão do cliente assíncrono: a sessão é reaberta e o download retomado
+_NATIVE_CONNECTION_ERRORS = (ConnectionError, EOFError, asyncio.TimeoutError)
+if asyncssh is not None:
+    _NATIVE_CONNECTION_ERRORS += (asyncssh.DisconnectError, asyncssh.ChannelOpenError)
+
+# Erros após os quais o download é tentado novamente
+_NATIVE_RETRYABLE_ERRORS = _NATIVE_CONNECTION_ERRORS + (DownloadError,)
+
+
+class _AsyncComponent:
+    """
+    Base dos componentes assíncronos: executa chamadas bloqueantes fora do
+    loop de eventos
+    """
+    def __init__(self, executor: Optional[Executor] = None):
+        self._executor = executor
+
+    async def _run(self, function, *args):
+        """
+        Executa uma função bloqueante no executor, sem bloquear o loop
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(function, *args))
+
+
+class _NativeSession:
+    """
+    Conexão ``asyncssh`` e cliente SFTP compartilhados pelos downloads
+
+    A conexão é aberta no primeiro uso e reaberta, uma única vez, depois
+    que um download a encontra caída.
+    """
+    def __init__(self, connect):
+        """
+        Args:
+            connect (Callable): Corrotina que abre a conexão SSH
+        """
+        self._connect = connect
+        self._lock = asyncio.Lock()
+        self.connection = None
+        self.sftp = None
+
+    async def get(self):
+        """
+        Conexão e cliente SFTP atuais, conectando se preciso
+        """
+        async with self._lock:
+            if self.sftp is None:
+                connection = await self._connect()
+                try:
+                    self.sftp = await connection.start_sftp_client()
+                except BaseException:
+                    connection.close()
+                    raise
+                self.connection = connection
+            return self.connection, self.sftp
+
+    async def reset(self, sftp):
+        """
+        Descarta a conexão que falhou; ignorado se outro download já a reabriu
+        """
+        async with self._lock:
+            if sftp is self.sftp:
+                await self._close_locked()
+
+    async def _close_locked(self):
+        sftp, connection = self.sftp, self.connection
+        self.sftp = self.connection = None
+        if sftp is not None:
+            sftp.exit()
+        if connection is not None:
+            connection.close()
+            try:
+                await connection.wait_closed()
+            except Exception:
+                pass
+
+    async def close(self):
+        """
+        Encerra a conexão
+        """
+        async with self._lock:
+            await self._close_locked()
+
+
+class AsyncDCMDownloader(_AsyncComponent):
+    """
+    Download assíncrono de arquivos DICOM
+
+    Com ``asyncssh`` instalado, os arquivos são baixados por um cliente
+    SFTP assíncrono, sem uma thread por transferência, que confere a chave
+    do servidor com o ``known_hosts`` (ver ``_native_known_hosts``). Sem
+    ele, sem o ``known_hosts`` ou com a deduplicação ativa (que depende do
+    hash calculado no servidor pelo paramiko), os downloads do
+    ``DCMDownloader`` rodam no executor. Em
+    ambos os casos no máximo ``concurrency`` downloads ficam em andamento.
+    """
+    def __init__(self, config_manager, downloader: Optional[DCMDownloader] = None,
+                 concurrency: Optional[int] = None, executor: Optional[Executor] = None):
+        """
+        Inicializa o downloader
+
+        Args:
+            config_manager (ConfigManager): Gerenciador de configurações
+            downloader (DCMDownloader, opcional): Downloader síncrono que
+                fornece configuração, listagem e fila de trabalho
+            concurrency (int, opcional): Downloads simultâneos. Padrão: chave
+                ``workers`` da seção ``[ssh]``.
+            executor (Executor, opcional): Executor das chamadas bloqueantes.
+                Padrão: executor padrão do loop.
+        """
+        super().__init__(executor)
+        self.logger = logging.getLogger(__name__)
+        self.downloader = downloader or DCMDownloader(config_manager)
+        self.concurrency = self.downloader._resolve_workers(concurrency)
+
+    def _native_connect_options(self) -> dict:
+        """
+        Compressão, janela e tamanho de pacote da seção ``[ssh]`` para o asyncssh
+        """
+        downloader = self.downloader
+        options = {'compression_algs': ['zlib@openssh.com', 'zlib'] if downloader._compress else ['none']}
+        if downloader._window_size:
+            options['window'] = downloader._window_size
+        if downloader._max_packet_size:
+            options['max_pktsize'] = downloader._max_packet_size
+        return options
+
+    def _native_known_hosts(self) -> Optional[str]:
+        """
+        Arquivo ``known_hosts`` com que o cliente assíncrono confere a chave
+        do servidor, ou None se os downloads devem usar o paramiko
+
+        O cliente assíncrono recusa servidores cuja chave não confere com o
+        arquivo. Sem o arquivo (em que o paramiko aceitaria e registraria a
+        chave de um servidor novo), sem ``asyncssh`` ou com a deduplicação
+        ativa, os downloads seguem pelo ``DCMDownloader``.
+        """
+        if asyncssh is None or self.downloader._cache is not None:
+            return None
+
+        known_hosts = self.downloader._known_hosts_path()
+        if not os.path.isfile(known_hosts):
+            self.logger.warning(
+                f"{known_hosts} não encontrado; downloads pelo paramiko, sem o cliente assíncrono"
+            )
+            return None
+        return known_hosts
+
+    def _native_get_options(self) -> dict:
+        """
+        Tamanho e concorrência dos pedidos de leitura para o ``get`` do asyncssh
+        """
+        downloader = self.downloader
+        options = {}
+        if downloader._request_size:
+            options['block_size'] = downloader._request_size
+        if downloader._max_concurrent_requests:
+            options['max_requests'] = downloader._max_concurrent_requests
+        return options
+
+    async def _resume_native(self, sftp, full_remote_path: str, partial_filepath: str, offset: int):
+        """
+        Continua uma transferência interrompida a partir de ``offset``
+        """
+        async with sftp.open(full_remote_path, 'rb') as remote_file:
+            with open(partial_filepath, 'ab') as local_file:
+                while True:
+                    chunk = await remote_file.read(TRANSFER_CHUNK_SIZE, offset)
+                    if not chunk:
+                        break
+                    await self._run(local_file.write, chunk)
+                    offset += len(chunk)
+
+    async def _remote_sha256_native(self, connection, full_remote_path: str) -> Optional[str]:
+        """
+        Calcula o SHA-256 de um arquivo no próprio servidor, com os mesmos
+        comandos de ``DCMDownloader._remote_sha256``
+
+        Returns:
+            Optional[str]: Hash em hexadecimal ou None se não foi possível calcular
+        """
+        downloader = self.downloader
+        for command in downloader._remote_hash_candidates():
+            try:
+                result = await connection.run(command.format(path=shlex.quote(full_remote_path)), check=False)
+                sha256, try_next = downloader._remote_hash_result(
+                    command, result.exit_status, str(result.stdout or '')
+                )
+            except Exception as e:
+                self.logger.debug(f"Hash remoto indisponível para {full_remote_path}: {e}")
+                return None
+            if not try_next:
+                return sha256
+        return None
+
+    async def _download_native(self, sftp, full_remote_path: str, local_filepath: str,
+                               expected_sha256: Optional[str]):
+        """
+        Uma tentativa de download, retomando o arquivo ``.part`` se existir
+        """
+        downloader = self.downloader
+        partial_filepath = local_filepath + PARTIAL_SUFFIX
+
+        remote_stat = await sftp.stat(full_remote_path)
+        remote_size = remote_stat.size
+        offset = await self._run(
+            downloader._partial_offset, partial_filepath, remote_size, getattr(remote_stat, 'mtime', None)
+        )
+
+        with metrics.timer('download') as measurement:
+            if offset:
+                await self._resume_native(sftp, full_remote_path, partial_filepath, offset)
+            else:
+                await sftp.get(full_remote_path, partial_filepath, **self._native_get_options())
+            measurement['bytes'] = os.path.getsize(partial_filepath) - offset
+
+        await self._run(
+            downloader._finish_download, partial_filepath, local_filepath, remote_size, expected_sha256
+        )
+
+    async def _fetch_native(self, session: _NativeSession, remote_filepath: str,
+                            accession_no: str) -> Optional[str]:
+        """
+        Baixa um arquivo pelo cliente SFTP assíncrono, isolando erros
+
+        Como no ``DCMDownloader``, o conteúdo vai para um arquivo ``.part``,
+        retomado se já existir, e só recebe o nome final depois de conferido
+        com o tamanho remoto e, com ``[ssh] verify_checksum``, com o SHA-256
+        calculado no servidor. Transferências incompletas e quedas de
+        conexão são tentadas novamente com backoff (``[ssh] retries``); após
+        uma queda a sessão é reaberta e o download continua de onde parou.
+        """
+        downloader = self.downloader
+        full_remote_path = downloader._remote_path(remote_filepath)
+        local_filepath = downloader._local_path(accession_no)
+        expected_sha256 = None
+        checksum_pending = downloader._verify_checksum
+        attempt = 0
+
+        try:
+            while True:
+                sftp = None
+                try:
+                    connection, sftp = await session.get()
+                    if checksum_pending:
+                        expected_sha256 = await self._remote_sha256_native(connection, full_remote_path)
+                        checksum_pending = False
+                    await self._download_native(sftp, full_remote_path, local_filepath, expected_sha256)
+                    break
+                except _NATIVE_RETRYABLE_ERRORS as e:
+                    if not isinstance(e, DownloadError):
+                        await session.reset(sftp)
+                    if attempt >= downloader._retries:
+                        raise
+                    delay = downloader._retry_delay(attempt)
+                    attempt += 1
+                    self.logger.warning(
+                        f"Falha ao baixar {remote_filepath}: {e}. "
+                        f"Tentativa {attempt} de {downloader._retries} em {delay:.1f}s"
+                    )
+                    await asyncio.sleep(delay)
+
+            self.logger.info(f"Arquivo baixado: {local_filepath}")
+        except Exception as e:
+            self.logger.error(f"Erro ao baixar {remote_filepath}: {e}")
+            await self._run(self.downloader._report_to_queue, accession_no, e)
+            return None
+
+        await self._run(self.downloader._report_to_queue, accession_no)
+        return local_filepath
+
+    async def iter_download_dcm_files(self, limit: Optional[int] = 10) -> AsyncIterator[str]:
+        """
+        Baixa arquivos DICOM entregando cada caminho assim que o download termina
+
+        Como em ``DCMDownloader.iter_download_dcm_files``, novos downloads só
+        começam à medida que o consumidor avança.
+
+        Args:
+            limit (int, opcional): Limite de arquivos. Padrão 10; None
+                percorre todos os estudos pendentes.
+
+        Yields:
+            str: Caminho local de cada arquivo baixado, em ordem de conclusão
+        """
+        with self.downloader._download_session():
+            known_hosts = self._native_known_hosts()
+            if known_hosts is not None:
+                session = _NativeSession(functools.partial(
+                    asyncssh.connect,
+                    self.downloader.ssh_host,
+                    username=self.downloader.ssh_user,
+                    password=self.downloader.ssh_password,
+                    known_hosts=known_hosts,
+                    **self._native_connect_options()
+                ))
+                try:
+                    fetch = functools.partial(self._fetch_native, session)
+                    async for local_filepath in self._bounded(limit, fetch):
+                        yield local_filepath
+                finally:
+                    await session.close()
+            else:
+                pool = await self._run(self.downloader._create_channel_pool)
+                try:
+                    async def fetch(remote_filepath, accession_no):
+                        return await self._run(
+                            self.downloader._download_with_pool, pool, remote_filepath, accession_no
+                        )
+
+                    async for local_filepath in self._bounded(limit, fetch):
+                        yield local_filepath
+                finally:
+                    pool.close()
+                    pool.ssh.close()
+
+    async def _bounded(self, limit: Optional[int], fetch) -> AsyncIterator[str]:
+        """
+        Mantém no máximo ``concurrency`` downloads em andamento
+        """
+        pending_files = self.downloader._iter_dcm_files_to_download(limit)
+        in_flight = set()
+
+        async def submit_next() -> bool:
+            item = await self._run(next, pending_files, None)
+            if item is None:
+                return False
+            in_flight.add(asyncio.ensure_future(fetch(*item)))
+            return True
+
+        try:
+            for _ in range(self.concurrency):
+                if not await submit_next():
+                    break
+
+            while in_flight:
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    in_flight.discard(task)
+                    local_filepath = task.result()
+                    if local_filepath:
+                        yield local_filepath
+                    await submit_next()
+        finally:
+            for task in in_flight:
+                task.cancel()
+            await self._run(pending_files.close)
+
+    async def download_dcm_files(self, limit: Optional[int] = 10) -> List[str]:
+        """
+        Realiza download de arquivos DICOM
+
+        Args:
+            limit (int, opcional): Limite de arquivos. Padrão 10.
+
+        Returns:
+            List[str]: Caminhos dos arquivos baixados, em ordem de conclusão
+        """
+        return [local_filepath async for local_filepath in self.iter_download_dcm_files(limit)]
+
+
+class AsyncDCMConverter(_AsyncComponent):
+    """
+    Conversão e armazenamento assíncronos de arquivos DICOM
+
+    Com o backend ``external``, o conversor roda como subprocesso
+    assíncrono (``asyncio.create_subprocess_exec``) e o armazenamento
+    usa as conexões do pool do PostgreSQL no executor, limitado a
+    ``storage_concurrency`` gravações simultâneas. Os demais backends, e a
+    deduplicação por conteúdo, usam o ``DCMConverter`` no executor.
+    """
+    def __init__(self, config_manager, converter: Optional[DCMConverter] = None,
+                 concurrency: Optional[int] = None, storage_concurrency: Optional[int] = None,
+                 executor: Optional[Executor] = None):
+        """
+        Inicializa o conversor
+
+        Args:
+            config_manager (ConfigManager): Gerenciador de configurações
+            converter (DCMConverter, opcional): Conversor síncrono que fornece
+                configuração, índice, cache e armazenamento
+            concurrency (int, opcional): Conversões simultâneas. Padrão: chave
+                ``workers`` da seção ``[dcm]``.
+            storage_concurrency (int, opcional): Gravações simultâneas no
+                banco. Padrão: ``[postgresql] pool_max_size``.
+            executor (Executor, opcional): Executor das chamadas bloqueantes.
+                Padrão: executor padrão do loop.
+        """
+        super().__init__(executor)
+        self.logger = logging.getLogger(__name__)
+        self.config = config_manager
+        self.converter = converter or DCMConverter(config_manager)
+        self.concurrency = self.converter._resolve_workers(concurrency)
+
+        if storage_concurrency is None:
+            storage_concurrency = (self.converter.db_config or {}).get('pool_max_size', 10)
+        self.storage_concurrency = max(1, int(storage_concurrency))
+
+        backend = str(self.config.get('dcm', 'backend', 'external')).strip().lower()
+        self._native_subprocess = backend == 'external'
+        self._fast_path = self.config.get_bool('dcm', 'encapsulated_fast_path', True)
+
+        self._convert_semaphore = None
+        self._storage_semaphore = None
+
+    def _semaphores(self) -> Tuple[asyncio.Semaphore, asyncio.Semaphore]:
+        """
+        Cria os semáforos no loop em execução, no primeiro uso
+        """
+        if self._convert_semaphore is None:
+            self._convert_semaphore = asyncio.Semaphore(self.concurrency)
+            self._storage_semaphore = asyncio.Semaphore(self.storage_concurrency)
+        return self._convert_semaphore, self._storage_semaphore
+
+    async def _convert_dcm_to_pdf(self, dcm_filepath: str) -> str:
+        """
+        Converte um arquivo com o executável externo em um subprocesso assíncrono
+
+        Returns:
+            str: Caminho do PDF gerado
+
+        Raises:
+            ConversionError: Se a conversão falhar
+        """
+        pdf_filepath = self.converter._pdf_path(dcm_filepath)
+
+        if self._fast_path:
+            try:
+                await self._run(EncapsulatedPDFBackend().convert, dcm_filepath, pdf_filepath)
+                return pdf_filepath
+            except UnsupportedConversionError:
+                pass
+
+        with metrics.timer('convert', os.path.getsize(dcm_filepath)):
+            process = await asyncio.create_subprocess_exec(
+                self.converter.dcm_executable, '-v', dcm_filepath, pdf_filepath,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+            _, stderr = await process.communicate()
+            if process.returncode != 0:
+                message = stderr.decode('utf-8', errors='replace')
+                self.logger.error(f"Erro na conversão: {message}")
+                raise ConversionError(f"Falha na conversão: {message}")
+
+        self.logger.info(f"Conversão de {dcm_filepath} para PDF concluída")
+        return pdf_filepath
+
+    async def process_dcm_file(self, dcm_filepath: str) -> Optional[str]:
+        """
+        Converte um arquivo DICOM e salva o PDF resultante no banco de dados
+
+        Args:
+            dcm_filepath (str): Caminho do arquivo DICOM
+
+        Returns:
+            Optional[str]: Caminho do PDF gerado ou None se nada foi gerado
+        """
+        convert_semaphore, storage_semaphore = self._semaphores()
+
+        if not self._native_subprocess or self.converter._cache is not None:
+            async with convert_semaphore:
+                return await self._run(self.converter._process_dcm_file, dcm_filepath)
+
+        async with convert_semaphore:
+            pdf_path = await self._convert_dcm_to_pdf(dcm_filepath)
+
+        async with storage_semaphore:
+            await self._run(self.converter._store_pdf, pdf_path, dcm_filepath)
+
+        return pdf_path
+
+    async def _enter_conversion_context(self, stack: ExitStack, force: bool) -> Optional[PDFBatchWriter]:
+        """
+        Ativa, no executor, o índice incremental, o cache de conteúdo, o
+        backend e a gravação em lote do conversor, registrando-os em ``stack``
+
+        Abrir o índice e o cache (SQLite) e descarregar o lote ao sair são
+        chamadas bloqueantes; ``stack`` deve ser fechada com ``self._run``.
+
+        Returns:
+            Optional[PDFBatchWriter]: Gravador em lote ou None se desativado
+        """
+        converter = self.converter
+        for context in (converter._incremental_index(force), converter._content_cache(),
+                        converter._conversion_backend()):
+            await self._run(stack.enter_context, context)
+        return await self._run(stack.enter_context, converter._batch_storage())
+
+    async def convert_all_dcm_files(self, force: bool = False) -> Tuple[List[str], List[str]]:
+        """
+        Converte todos os arquivos DCM no diretório de download, concorrentemente
+
+        Como em ``DCMConverter.convert_all_dcm_files``, os arquivos são
+        consumidos conforme a varredura do diretório avança: um conjunto fixo
+        de tarefas (conversões mais gravações simultâneas) busca o próximo
+        arquivo no executor assim que termina o anterior.
+
+        Args:
+            force (bool, opcional): Converte todos os arquivos, ignorando o
+                índice incremental. Padrão False.
+
+        Returns:
+            Tuple[List[str], List[str]]: Lista de PDFs gerados e lista de arquivos com erro
+        """
+        converter = self.converter
+        start_run(self.config)
+
+        converted_pdfs, error_files, pdf_sources = [], [], {}
+        total = skipped = 0
+        scan_lock = asyncio.Lock()
+
+        def next_file(dcm_files) -> Optional[str]:
+            # Ignorar arquivos já processados em execuções anteriores
+            nonlocal skipped
+            for dcm_filepath in dcm_files:
+                if converter._should_convert(dcm_filepath):
+                    return dcm_filepath
+                skipped += 1
+            return None
+
+        async def worker(dcm_files):
+            nonlocal total
+            while True:
+                # A varredura é um gerador: uma tarefa de cada vez avança nela
+                async with scan_lock:
+                    dcm_filepath = await self._run(next_file, dcm_files)
+                if dcm_filepath is None:
+                    return
+                total += 1
+                try:
+                    result = await self.process_dcm_file(dcm_filepath)
+                except Exception as e:
+                    result = e
+                _record_result(dcm_filepath, result, converted_pdfs, error_files, pdf_sources)
+
+        stack = ExitStack()
+        try:
+            writer = await self._enter_conversion_context(stack, force)
+            dcm_files = await self._run(converter._iter_dcm_files)
+            await asyncio.gather(
+                *(worker(dcm_files) for _ in range(self.concurrency + self.storage_concurrency))
+            )
+        finally:
+            await self._run(stack.close)
+
+        converter._apply_storage_failures(writer, converted_pdfs, error_files, pdf_sources)
+
+        if not total:
+            print(f"Arquivos já convertidos ignorados: {skipped}" if skipped else "Nenhum arquivo encontrado")
+            return [], []
+
+        report_run(self.config, total, len(converted_pdfs), len(error_files), skipped=skipped)
+
+        return converted_pdfs, error_files
+
+
+def _record_result(dcm_filepath: str, result, converted_pdfs: List[str],
+                   error_files: List[str], pdf_sources: dict):
+    """
+    Registra o resultado (PDF gerado ou exceção) do processamento de um arquivo
+    """
+    if isinstance(result, BaseException):
+        error_files.append(dcm_filepath)
+        print(f"Erro ao processar {os.path.basename(dcm_filepath)}: {result}")
+    elif result:
+        converted_pdfs.append(result)
+        pdf_sources[result] = dcm_filepath
+        print(f"Convertido com sucesso: {os.path.basename(dcm_filepath)}")
+
+
+class AsyncDCMPipeline:
+    """
+    Pipeline assíncrono de download, conversão e armazenamento
+
+    Equivalente a ``DCMPipeline`` para quem já roda um loop de eventos:
+    downloads, conversões e gravações se sobrepõem no mesmo loop, cada um
+    com seu limite de concorrência. Enquanto as conversões estão no
+    limite, novos downloads não são iniciados.
+    """
+    def __init__(self, config_manager, downloader: Optional[DCMDownloader] = None,
+                 converter: Optional[DCMConverter] = None):
+        """
+        Inicializa o pipeline
+
+        Args:
+            config_manager (ConfigManager): Gerenciador de configurações
+            downloader (DCMDownloader, opcional): Downloader a ser utilizado
+            converter (DCMConverter, opcional): Conversor a ser utilizado
+        """
+        self.logger = logging.getLogger(__name__)
+        self.config = config_manager
+        self.downloader = downloader or DCMDownloader(config_manager)
+        self.converter = converter or DCMConverter(config_manager)
+
+    async def run(self, limit: Optional[int] = 10, download_concurrency: Optional[int] = None,
+                  convert_concurrency: Optional[int] = None, storage_concurrency: Optional[int] = None,
+                  force: bool = False) -> Tuple[List[str], List[str]]:
+        """
+        Executa o pipeline completo até esgotar os arquivos a baixar
+
+        Args:
+            limit (int, opcional): Limite de arquivos a baixar. Padrão 10;
+                None processa todos os estudos pendentes.
+            download_concurrency (int, opcional): Downloads simultâneos.
+                Padrão: chave ``workers`` da seção ``[ssh]``.
+            convert_concurrency (int, opcional): Conversões simultâneas.
+                Padrão: chave ``workers`` da seção ``[dcm]``.
+            storage_concurrency (int, opcional): Gravações simultâneas.
+                Padrão: ``[postgresql] pool_max_size``.
+            force (bool, opcional): Converte todos os arquivos, ignorando o
+                índice incremental. Padrão False.
+
+        Returns:
+            Tuple[List[str], List[str]]: Lista de PDFs armazenados e lista de arquivos com erro
+        """
+        converter = self.converter
+        start_run(self.config)
+        download_concurrency = self.downloader._resolve_workers(download_concurrency)
+        convert_concurrency = converter._resolve_workers(convert_concurrency)
+
+        if storage_concurrency is None:
+            storage_concurrency = (converter.db_config or {}).get('pool_max_size', 10)
+        storage_concurrency = max(1, int(storage_concurrency))
+
+        # Chamadas bloqueantes (banco, paramiko, backends em processo) têm
+        # threads próprias, dimensionadas pelos limites de concorrência
+        executor = ThreadPoolExecutor(
+            max_workers=download_concurrency + convert_concurrency + storage_concurrency + 1
+        )
+        async_downloader = AsyncDCMDownloader(
+            self.config, self.downloader, download_concurrency, executor
+        )
+        async_converter = AsyncDCMConverter(
+            self.config, converter, convert_concurrency, storage_concurrency, executor
+        )
+
+        converted_pdfs, error_files, pdf_sources = [], [], {}
+        in_flight = set()
+        admission = asyncio.Semaphore(convert_concurrency)
+
+        async def process(dcm_filepath):
+            try:
+                result = await async_converter.process_dcm_file(dcm_filepath)
+            except Exception as e:
+                result = e
+            finally:
+                admission.release()
+            _record_result(dcm_filepath, result, converted_pdfs, error_files, pdf_sources)
+
+        stack = ExitStack()
+        try:
+            try:
+                writer = await async_converter._enter_conversion_context(stack, force)
+                async for dcm_filepath in async_downloader.iter_download_dcm_files(limit):
+                    if not await async_converter._run(converter._should_convert, dcm_filepath):
+                        self.logger.info(f"Arquivo já convertido ignorado: {dcm_filepath}")
+                        continue
+
+                    # Com as conversões no limite, o próximo download espera
+                    await admission.acquire()
+                    task = asyncio.ensure_future(process(dcm_filepath))
+                    in_flight.add(task)
+                    task.add_done_callback(in_flight.discard)
+            finally:
+                await asyncio.gather(*in_flight)
+                await async_converter._run(stack.close)
+        finally:
+            executor.shutdown(wait=False)
+
+        converter._apply_storage_failures(writer, converted_pdfs, error_files, pdf_sources)
+
+        report_run(
+            self.config, len(converted_pdfs) + len(error_files), len(converted_pdfs), len(error_files)
+        )
+
+        return converted_pdfs, error_files
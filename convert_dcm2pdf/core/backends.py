@@ -0,0 +1,464 @@
+import os
+import sys
+import json
+import queue
+import shlex
+import logging
+import threading
+import subprocess
+from abc import ABC, abstractmethod
+from typing import List, Optional
+from convert_dcm2pdf.utils.exceptions import ConversionError, UnsupportedConversionError
+from convert_dcm2pdf.utils.dicom_header import extract_encapsulated_pdf
+
+# Dependências opcionais do backend em processo
+try:
+    import pydicom
+except ImportError:  # pragma: no cover - depende do ambiente
+    pydicom = None
+
+if pydicom is not None:
+    try:
+        # pydicom >= 3: pixel_array já entrega imagens YBR convertidas para RGB
+        from pydicom.pixels import apply_color_lut
+        convert_color_space = None
+    except ImportError:  # pragma: no cover - depende da versão
+        from pydicom.pixel_data_handlers.util import apply_color_lut, convert_color_space
+
+try:
+    import numpy
+    from PIL import Image
+except ImportError:  # pragma: no cover - depende do ambiente
+    numpy = None
+    Image = None
+
+# MIME type de documentos PDF encapsulados em DICOM
+PDF_MIME_TYPE = 'application/pdf'
+
+# Comando padrão dos processos conversores persistentes
+DEFAULT_WORKER_COMMAND = [sys.executable, '-m', 'convert_dcm2pdf.core.batch_worker']
+
+
+class ConverterBackend(ABC):
+    """
+    Interface dos backends de conversão de DICOM para PDF
+    """
+    name = 'base'
+
+    @abstractmethod
+    def convert(self, dcm_filepath: str, pdf_filepath: str):
+        """
+        Converte um arquivo DICOM em PDF
+
+        Args:
+            dcm_filepath (str): Caminho do arquivo DICOM
+            pdf_filepath (str): Caminho do PDF a ser gerado
+
+        Raises:
+            UnsupportedConversionError: Se o backend não trata este arquivo
+            ConversionError: Se a conversão falhar
+        """
+
+    def close(self):
+        """
+        Libera recursos mantidos pelo backend
+        """
+        pass
+
+
+class ExternalExecutableBackend(ConverterBackend):
+    """
+    Backend que executa o conversor externo configurado em ``[dcm] executable_path``
+    """
+    name = 'external'
+
+    def __init__(self, executable_path: str):
+        """
+        Inicializa o backend
+
+        Args:
+            executable_path (str): Caminho do executável de conversão
+        """
+        self.logger = logging.getLogger(__name__)
+        self.executable_path = executable_path
+
+    def convert(self, dcm_filepath: str, pdf_filepath: str):
+        """
+        Converte o arquivo executando o conversor externo
+        """
+        if not self.executable_path:
+            raise UnsupportedConversionError("Executável de conversão não configurado")
+
+        try:
+            subprocess.run(
+                [self.executable_path, '-v', dcm_filepath, pdf_filepath],
+                capture_output=True,
+                text=True,
+                check=True
+            )
+        except subprocess.CalledProcessError as e:
+            self.logger.error(f"Erro na conversão: {e.stderr}")
+            raise ConversionError(f"Falha na conversão: {e.stderr}")
+        except OSError as e:
+            self.logger.error(f"Erro ao executar conversor: {e}")
+            raise ConversionError(f"Falha ao executar conversor: {e}")
+
+
+class EncapsulatedPDFBackend(ConverterBackend):
+    """
+    Backend que extrai o PDF de instâncias Encapsulated PDF
+
+    Identifica a SOP class lendo apenas o cabeçalho do arquivo e copia o
+    documento embutido em blocos, sem renderização e sem carregar o
+    restante do dataset. Demais SOP classes são recusadas com
+    ``UnsupportedConversionError``.
+    """
+    name = 'encapsulated'
+
+    def convert(self, dcm_filepath: str, pdf_filepath: str):
+        """
+        Copia o PDF encapsulado para ``pdf_filepath``
+        """
+        try:
+            with open(pdf_filepath, 'wb') as pdf_file:
+                extract_encapsulated_pdf(dcm_filepath, pdf_file)
+        except Exception:
+            if os.path.exists(pdf_filepath):
+                os.remove(pdf_filepath)
+            raise
+
+
+class InProcessBackend(ConverterBackend):
+    """
+    Backend que converte no próprio processo, sem criar subprocessos
+
+    Documentos PDF encapsulados são extraídos diretamente do DICOM; imagens
+    são renderizadas a partir dos pixels, uma página por frame. Requer
+    ``pydicom``; a renderização de imagens requer também ``numpy`` e ``Pillow``.
+    """
+    name = 'inprocess'
+
+    def __init__(self):
+        """
+        Inicializa o backend
+        """
+        self.logger = logging.getLogger(__name__)
+
+    @staticmethod
+    def available() -> bool:
+        """
+        Indica se as dependências mínimas do backend estão instaladas
+        """
+        return pydicom is not None
+
+    def convert(self, dcm_filepath: str, pdf_filepath: str):
+        """
+        Converte o arquivo extraindo o PDF encapsulado ou renderizando os pixels
+        """
+        if pydicom is None:
+            raise UnsupportedConversionError("pydicom não está instalado")
+
+        try:
+            dataset = pydicom.dcmread(dcm_filepath)
+        except Exception as e:
+            raise ConversionError(f"Falha ao ler {dcm_filepath}: {e}")
+
+        if 'EncapsulatedDocument' in dataset:
+            self._write_encapsulated_pdf(dataset, pdf_filepath)
+        elif 'PixelData' in dataset:
+            self._render_pixels(dataset, pdf_filepath)
+        else:
+            raise UnsupportedConversionError(f"{dcm_filepath} não contém documento nem imagem")
+
+    def _write_encapsulated_pdf(self, dataset, pdf_filepath: str):
+        """
+        Grava o documento PDF encapsulado no DICOM
+        """
+        mime_type = str(dataset.get('MIMETypeOfEncapsulatedDocument', PDF_MIME_TYPE)).strip()
+        if mime_type != PDF_MIME_TYPE:
+            raise UnsupportedConversionError(f"Documento encapsulado não é PDF: {mime_type}")
+
+        document = bytes(dataset.EncapsulatedDocument)
+        # O valor pode ter um byte nulo de preenchimento para tamanho par
+        if document.endswith(b'\x00') and b'%%EOF' in document[-16:]:
+            document = document.rstrip(b'\x00')
+
+        with open(pdf_filepath, 'wb') as pdf_file:
+            pdf_file.write(document)
+
+    def _render_pixels(self, dataset, pdf_filepath: str):
+        """
+        Renderiza os frames de imagem do DICOM como páginas de um PDF
+
+        Imagens ``MONOCHROME1`` (zero é branco) são invertidas, ``PALETTE
+        COLOR`` passa pela tabela de cores e ``YBR_*`` é convertida para RGB.
+        """
+        if numpy is None or Image is None:
+            raise UnsupportedConversionError("numpy e Pillow são necessários para renderizar imagens")
+
+        try:
+            pixels = dataset.pixel_array
+        except Exception as e:
+            raise UnsupportedConversionError(f"Não foi possível decodificar os pixels: {e}")
+
+        photometric = str(dataset.get('PhotometricInterpretation', 'MONOCHROME2')).strip().upper()
+        if photometric == 'PALETTE COLOR':
+            pixels = apply_color_lut(pixels, dataset)
+        elif photometric.startswith('YBR') and convert_color_space is not None:
+            pixels = convert_color_space(pixels, photometric, 'RGB')
+
+        frames = int(dataset.get('NumberOfFrames', 1) or 1)
+        if frames == 1:
+            pixels = pixels[numpy.newaxis, ...]
+
+        invert = photometric == 'MONOCHROME1'
+        pages = [self._to_image(frame, invert) for frame in pixels]
+        pages[0].save(pdf_filepath, 'PDF', save_all=True, append_images=pages[1:])
+
+    @staticmethod
+    def _to_image(frame, invert: bool = False):
+        """
+        Converte um frame (tons de cinza ou RGB) em imagem de 8 bits
+        """
+        if frame.dtype != numpy.uint8:
+            frame = frame.astype(numpy.float64)
+            low, high = frame.min(), frame.max()
+            scale = 255.0 / (high - low) if high > low else 0.0
+            frame = ((frame - low) * scale).astype(numpy.uint8)
+
+        if invert:
+            frame = 255 - frame
+
+        # O modo (L ou RGB) é deduzido do formato do array
+        return Image.fromarray(frame)
+
+
+class _WorkerProcess:
+    """
+    Processo conversor persistente que atende o protocolo de ``batch_worker``
+
+    O processo é iniciado no primeiro trabalho e reiniciado após
+    ``max_jobs`` trabalhos ou quando termina inesperadamente.
+    """
+    def __init__(self, command: List[str], max_jobs: int, timeout: float):
+        self.logger = logging.getLogger(__name__)
+        self.command = command
+        self.max_jobs = max_jobs
+        self.timeout = timeout
+        self.process = None
+        self.jobs = 0
+
+    def _start(self):
+        self.process = subprocess.Popen(
+            self.command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            bufsize=1
+        )
+        self.jobs = 0
+        self.logger.debug(f"Processo conversor iniciado (pid {self.process.pid})")
+
+    def run(self, dcm_filepath: str, pdf_filepath: str):
+        """
+        Envia um trabalho ao processo e aguarda a resposta
+        """
+        if self.process is None or self.process.poll() is not None or self.jobs >= self.max_jobs:
+            self.stop()
+            self._start()
+
+        self.jobs += 1
+        job = {'id': self.jobs, 'input': dcm_filepath, 'output': pdf_filepath}
+
+        # Um processo travado é encerrado para não bloquear a execução
+        timer = threading.Timer(self.timeout, self.process.kill) if self.timeout else None
+        if timer:
+            timer.start()
+        try:
+            self.process.stdin.write(json.dumps(job) + '\n')
+            self.process.stdin.flush()
+            line = self.process.stdout.readline()
+        except (OSError, ValueError):
+            line = ''
+        finally:
+            if timer:
+                timer.cancel()
+
+        if not line:
+            self.stop()
+            raise ConversionError(f"Processo conversor encerrado durante {dcm_filepath}")
+
+        try:
+            reply = json.loads(line)
+        except ValueError:
+            # Resposta ilegível: as próximas sairiam defasadas dos pedidos
+            self.process.kill()
+            self.stop()
+            raise ConversionError(f"Resposta inválida do processo conversor para {dcm_filepath}: {line!r}")
+
+        if reply.get('status') == 'unsupported':
+            raise UnsupportedConversionError(reply.get('error', ''))
+        if reply.get('status') != 'ok':
+            raise ConversionError(f"Falha na conversão: {reply.get('error', '')}")
+
+    def stop(self):
+        """
+        Encerra o processo, se estiver ativo
+        """
+        if self.process is None:
+            return
+
+        process, self.process = self.process, None
+        try:
+            process.stdin.close()
+        except OSError:
+            pass
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+
+
+class WorkerPoolBackend(ConverterBackend):
+    """
+    Backend que distribui conversões entre processos conversores persistentes
+
+    O custo de iniciar o conversor (interpretador, importações, bibliotecas)
+    é pago uma vez por processo, e não por arquivo. Cada processo atende
+    muitos trabalhos pela entrada e saída padrão (ver ``batch_worker``).
+    """
+    name = 'workers'
+
+    def __init__(self, command: Optional[List[str]] = None, size: int = 1,
+                 max_jobs: int = 500, timeout: float = 600):
+        """
+        Inicializa o pool; os processos só são iniciados no primeiro uso
+
+        Args:
+            command (List[str], opcional): Comando dos processos conversores.
+                Padrão ``python -m convert_dcm2pdf.core.batch_worker``.
+            size (int, opcional): Número de processos. Padrão 1.
+            max_jobs (int, opcional): Trabalhos por processo antes de
+                reiniciá-lo. Padrão 500.
+            timeout (float, opcional): Segundos de espera por conversão antes
+                de encerrar o processo; 0 desativa. Padrão 600.
+        """
+        self.command = command or DEFAULT_WORKER_COMMAND
+        self._workers = [_WorkerProcess(self.command, max(1, max_jobs), timeout) for _ in range(max(1, size))]
+        self._idle = queue.LifoQueue()
+        for worker in self._workers:
+            self._idle.put(worker)
+
+    def convert(self, dcm_filepath: str, pdf_filepath: str):
+        """
+        Converte o arquivo no próximo processo livre
+        """
+        worker = self._idle.get()
+        try:
+            worker.run(dcm_filepath, pdf_filepath)
+        finally:
+            self._idle.put(worker)
+
+    def close(self):
+        for worker in self._workers:
+            worker.stop()
+
+
+class FallbackBackend(ConverterBackend):
+    """
+    Backend que tenta uma sequência de backends, passando ao próximo quando
+    o anterior não trata o arquivo
+    """
+    name = 'auto'
+
+    def __init__(self, backends: List[ConverterBackend]):
+        """
+        Inicializa o backend
+
+        Args:
+            backends (List[ConverterBackend]): Backends em ordem de preferência
+        """
+        self.logger = logging.getLogger(__name__)
+        self.backends = backends
+
+    def convert(self, dcm_filepath: str, pdf_filepath: str):
+        """
+        Converte com o primeiro backend que aceitar o arquivo
+        """
+        reasons = []
+        for backend in self.backends:
+            try:
+                backend.convert(dcm_filepath, pdf_filepath)
+                return
+            except UnsupportedConversionError as e:
+                self.logger.debug(f"Backend {backend.name} não trata {dcm_filepath}: {e}")
+                reasons.append(f"{backend.name}: {e}")
+
+        raise ConversionError(f"Nenhum backend converteu {dcm_filepath} ({'; '.join(reasons)})")
+
+    def close(self):
+        for backend in self.backends:
+            backend.close()
+
+
+def create_backend(config_manager, executable_path: Optional[str]) -> ConverterBackend:
+    """
+    Cria o backend de conversão configurado em ``[dcm] backend``
+
+    ``external`` usa apenas o executável configurado, ``inprocess`` apenas
+    o backend em processo e ``auto`` tenta o backend em processo e recorre
+    ao executável externo para o que ele não tratar. ``workers`` mantém
+    processos conversores persistentes durante a execução e também recorre
+    ao executável externo. Com
+    ``[dcm] encapsulated_fast_path`` ativo (padrão), instâncias Encapsulated
+    PDF são extraídas diretamente, antes do backend configurado.
+
+    Args:
+        config_manager (ConfigManager): Gerenciador de configurações
+        executable_path (str, opcional): Caminho do executável externo
+
+    Returns:
+        ConverterBackend: Backend de conversão
+    """
+    name = str(config_manager.get('dcm', 'backend', 'external')).strip().lower()
+    external = ExternalExecutableBackend(executable_path)
+
+    if name == 'inprocess':
+        backend = InProcessBackend()
+    elif name == 'workers' and not config_manager.get('dcm', 'worker_command', None) \
+            and not InProcessBackend.available():
+        # Sem pydicom, o batch_worker recusa todo arquivo e cada um acabaria
+        # no executável externo depois de passar pelo pool
+        logging.getLogger(__name__).warning(
+            "pydicom não está instalado; usando apenas o conversor externo em vez de 'workers'"
+        )
+        backend = external
+    elif name == 'workers':
+        command = config_manager.get('dcm', 'worker_command', None)
+        pool = WorkerPoolBackend(
+            shlex.split(command) if command else None,
+            size=config_manager.get_int(
+                'dcm', 'worker_processes', config_manager.get_int('dcm', 'workers', 1)
+            ),
+            max_jobs=config_manager.get_int('dcm', 'worker_max_jobs', 500),
+            timeout=config_manager.get_int('dcm', 'worker_timeout', 600)
+        )
+        backend = FallbackBackend([pool, external])
+    elif name == 'auto' and InProcessBackend.available():
+        backend = FallbackBackend([InProcessBackend(), external])
+    else:
+        if name == 'auto':
+            logging.getLogger(__name__).warning(
+                "pydicom não está instalado; usando apenas o conversor externo"
+            )
+        elif name != 'external':
+            logging.getLogger(__name__).warning(f"Backend desconhecido '{name}', usando 'external'")
+        backend = external
+
+    # PDFs encapsulados são extraídos sem passar pelo backend configurado
+    if config_manager.get_bool('dcm', 'encapsulated_fast_path', True):
+        backend = FallbackBackend([EncapsulatedPDFBackend(), backend])
+
+    return backend
@@ -0,0 +1,70 @@
+"""
+Processo conversor de longa duração
+
+Lê trabalhos de conversão da entrada padrão, um JSON por linha, e
+responde um JSON por linha na saída padrão::
+
+    {"id": 1, "input": "/downloads/A1.dcm", "output": "/pdfs/A1.pdf"}
+    {"id": 1, "status": "ok"}
+
+``status`` é ``ok``, ``unsupported`` (o arquivo deve ir para outro
+backend) ou ``error``, com a mensagem em ``error``. O processo termina
+quando a entrada padrão é fechada. Conversores externos que implementem
+o mesmo protocolo podem ser usados no lugar deste módulo por meio da
+chave ``[dcm] worker_command``.
+
+Uso::
+
+    python -m convert_dcm2pdf.core.batch_worker
+"""
+import os
+import sys
+import json
+from typing import TextIO
+from convert_dcm2pdf.core.backends import ConverterBackend, InProcessBackend
+from convert_dcm2pdf.utils.exceptions import UnsupportedConversionError
+
+
+def serve(backend: ConverterBackend, requests: TextIO, replies: TextIO):
+    """
+    Atende trabalhos de conversão até o fim da entrada
+
+    Args:
+        backend (ConverterBackend): Backend usado nas conversões
+        requests (TextIO): Fluxo de trabalhos
+        replies (TextIO): Fluxo de respostas
+    """
+    for line in requests:
+        if not line.strip():
+            continue
+
+        job = json.loads(line)
+        reply = {'id': job.get('id')}
+        try:
+            backend.convert(job['input'], job['output'])
+            reply['status'] = 'ok'
+        except UnsupportedConversionError as e:
+            reply.update(status='unsupported', error=str(e))
+        except Exception as e:
+            reply.update(status='error', error=str(e))
+
+        replies.write(json.dumps(reply) + '\n')
+        replies.flush()
+
+
+def main():
+    # A saída padrão é reservada ao protocolo; o que o backend escrever nela
+    # (inclusive bibliotecas nativas) vai para stderr
+    sys.stdout.flush()
+    replies = os.fdopen(os.dup(1), 'w')
+    os.dup2(2, 1)
+
+    backend = InProcessBackend()
+    try:
+        serve(backend, sys.stdin, replies)
+    finally:
+        backend.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,5 @@
 import os
-from typing import Dict, Any
+from typing import Dict, Any, List
 from configparser import ConfigParser
 from dotenv import load_dotenv
 
@@ -54,17 +54,97 @@ class ConfigManager:
             return self.config.get(section, key)
         except:
             return default
+
+    def get_int(self, section: str, key: str, default: int = 0) -> int:
+        """
+        Obtém valor de configuração convertido para inteiro
+
+        Args:
+            section (str): Seção da configuração
+            key (str): Chave da configuração
+            default (int, opcional): Valor padrão se não encontrado ou inválido
+
+        Returns:
+            int: Valor da configuração
+        """
+        value = self.get(section, key, default)
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return default
+    
+    def get_float(self, section: str, key: str, default: float = 0.0) -> float:
+        """
+        Obtém valor de configuração convertido para número real
+
+        Args:
+            section (str): Seção da configuração
+            key (str): Chave da configuração
+            default (float, opcional): Valor padrão se não encontrado ou inválido
+
+        Returns:
+            float: Valor da configuração
+        """
+        value = self.get(section, key, default)
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return default
+    
+    def get_bool(self, section: str, key: str, default: bool = False) -> bool:
+        """
+        Obtém valor de configuração convertido para booleano
+
+        Aceita ``1/0``, ``true/false``, ``yes/no`` e ``on/off``.
+
+        Args:
+            section (str): Seção da configuração
+            key (str): Chave da configuração
+            default (bool, opcional): Valor padrão se não encontrado ou inválido
+
+        Returns:
+            bool: Valor da configuração
+        """
+        value = self.get(section, key, default)
+        if isinstance(value, bool):
+            return value
+
+        value = str(value).strip().lower()
+        if value in ('1', 'true', 'yes', 'on'):
+            return True
+        if value in ('0', 'false', 'no', 'off'):
+            return False
+        return default
+
+    def get_list(self, section: str, key: str) -> List[str]:
+        """
+        Obtém valor de configuração separado por vírgulas como lista
+
+        Args:
+            section (str): Seção da configuração
+            key (str): Chave da configuração
+
+        Returns:
+            List[str]: Itens não vazios, sem espaços nas pontas
+        """
+        value = self.get(section, key, '') or ''
+        return [item.strip() for item in str(value).split(',') if item.strip()]
     
-    def get_database_config(self) -> Dict[str, str]:
+    def get_database_config(self) -> Dict[str, Any]:
         """
         Obtém configurações de banco de dados
 
         Returns:
-            Dict[str, str]: Configurações de conexão com banco de dados
+            Dict[str, Any]: Configurações de conexão com banco de dados; os
+            parâmetros do pool e do streaming já convertidos para número
         """
         return {
             'host': self.get('postgresql', 'host', 'localhost'),
             'database': self.get('postgresql', 'database', 'irg'),
             'user': self.get('postgresql', 'user', 'postgres'),
             'password': self.get('postgresql', 'password', ''),
+            'pool_min_size': self.get_int('postgresql', 'pool_min_size', 1),
+            'pool_max_size': self.get_int('postgresql', 'pool_max_size', 10),
+            'pool_health_check_interval': self.get_float('postgresql', 'pool_health_check_interval', 30.0),
+            'stream_itersize': self.get_int('postgresql', 'stream_itersize', 2000),
         }
\ No newline at end of file
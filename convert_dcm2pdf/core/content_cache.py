@@ -0,0 +1,291 @@
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Set
+
+# Tamanho dos blocos lidos ao calcular o hash de um arquivo
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def sha256_file(path: str, chunk_size: int = HASH_CHUNK_SIZE) -> str:
+    """
+    Calcula o SHA-256 de um arquivo lendo-o em blocos
+
+    Args:
+        path (str): Caminho do arquivo
+        chunk_size (int, opcional): Tamanho dos blocos lidos
+
+    Returns:
+        str: Hash em hexadecimal
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ContentCache:
+    """
+    Cache endereçado por conteúdo de arquivos DICOM e PDFs gerados
+
+    Relaciona o SHA-256 de cada DICOM a uma cópia local do arquivo e ao PDF
+    já armazenado para ele, permitindo que o mesmo estudo recebido com
+    outro número de acesso não seja baixado, convertido nem gravado de novo.
+    O cache é compartilhado entre downloader e conversor por meio de um
+    banco SQLite local.
+    """
+    def __init__(self, cache_path: str):
+        """
+        Abre (ou cria) o cache
+
+        Args:
+            cache_path (str): Caminho do arquivo SQLite do cache
+        """
+        self.logger = logging.getLogger(__name__)
+        self.cache_path = cache_path
+
+        directory = os.path.dirname(os.path.abspath(cache_path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        # Lock de cada conteúdo em processamento e quantos o aguardam ou detêm
+        self._content_locks: Dict[str, list] = {}
+        # Conteúdos cujo PDF está em um lote ainda não gravado
+        self._pending: Set[str] = set()
+        self._connection = sqlite3.connect(cache_path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                sha256 TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_files_size ON files (size);
+            CREATE TABLE IF NOT EXISTS contents (
+                sha256 TEXT PRIMARY KEY,
+                dcm_path TEXT,
+                pdf_path TEXT,
+                pdf_filename TEXT,
+                stored_at REAL
+            );
+            """
+        )
+        self._connection.commit()
+
+    def hash_file(self, path: str) -> str:
+        """
+        Obtém o SHA-256 de um arquivo local, reaproveitando o valor já calculado
+        enquanto tamanho e data de modificação não mudarem
+
+        Args:
+            path (str): Caminho do arquivo
+
+        Returns:
+            str: Hash em hexadecimal
+        """
+        key = os.path.abspath(path)
+        stat = os.stat(path)
+
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT sha256, size, mtime_ns FROM files WHERE path = ?", (key,)
+            ).fetchone()
+
+        if row and row[1:] == (stat.st_size, stat.st_mtime_ns):
+            return row[0]
+
+        sha256 = sha256_file(path)
+        self.record_dicom(sha256, path)
+        return sha256
+
+    def record_dicom(self, sha256: str, path: str):
+        """
+        Registra uma cópia local de um DICOM com o hash informado
+
+        Args:
+            sha256 (str): Hash do conteúdo
+            path (str): Caminho local do arquivo
+        """
+        key = os.path.abspath(path)
+        stat = os.stat(path)
+
+        with self._lock:
+            self._connection.execute(
+                """
+                INSERT INTO files (path, sha256, size, mtime_ns) VALUES (?, ?, ?, ?)
+                ON CONFLICT(path) DO UPDATE SET
+                    sha256 = excluded.sha256,
+                    size = excluded.size,
+                    mtime_ns = excluded.mtime_ns
+                """,
+                (key, sha256, stat.st_size, stat.st_mtime_ns)
+            )
+            self._connection.execute(
+                """
+                INSERT INTO contents (sha256, dcm_path) VALUES (?, ?)
+                ON CONFLICT(sha256) DO UPDATE SET dcm_path = excluded.dcm_path
+                """,
+                (sha256, key)
+            )
+            self._connection.commit()
+
+    def record_pdf(self, sha256: str, pdf_path: str):
+        """
+        Registra o PDF armazenado para um DICOM
+
+        Args:
+            sha256 (str): Hash do DICOM de origem
+            pdf_path (str): Caminho do PDF gerado
+        """
+        with self._lock:
+            self._connection.execute(
+                """
+                INSERT INTO contents (sha256, pdf_path, pdf_filename, stored_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT(sha256) DO UPDATE SET
+                    pdf_path = excluded.pdf_path,
+                    pdf_filename = excluded.pdf_filename,
+                    stored_at = excluded.stored_at
+                """,
+                (sha256, pdf_path, os.path.basename(pdf_path), time.time())
+            )
+            self._connection.commit()
+            self._pending.discard(sha256)
+
+    def mark_pending(self, sha256: str):
+        """
+        Registra que o PDF de um conteúdo aguarda a gravação do lote
+
+        Até ``record_pdf`` (lote gravado) ou ``clear_pending`` (lote
+        rejeitado), ``is_pending`` indica que é preciso descarregar o lote
+        antes de consultar o conteúdo.
+
+        Args:
+            sha256 (str): Hash do DICOM de origem
+        """
+        with self._lock:
+            self._pending.add(sha256)
+
+    def clear_pending(self, sha256: str):
+        """
+        Descarta a marcação de ``mark_pending``
+
+        Args:
+            sha256 (str): Hash do DICOM de origem
+        """
+        with self._lock:
+            self._pending.discard(sha256)
+
+    def is_pending(self, sha256: str) -> bool:
+        """
+        Indica se o PDF de um conteúdo aguarda a gravação do lote
+
+        Args:
+            sha256 (str): Hash do DICOM de origem
+        """
+        with self._lock:
+            return sha256 in self._pending
+
+    def has_size(self, size: int) -> bool:
+        """
+        Indica se algum DICOM já registrado tem o tamanho informado
+
+        Conteúdos de tamanho diferente não podem ser iguais; o downloader
+        só pede o hash remoto de arquivos com algum candidato a duplicado.
+
+        Args:
+            size (int): Tamanho em bytes
+        """
+        with self._lock:
+            row = self._connection.execute("SELECT 1 FROM files WHERE size = ? LIMIT 1", (size,)).fetchone()
+        return row is not None
+
+    def lookup(self, sha256: str) -> Optional[Dict[str, Optional[str]]]:
+        """
+        Busca o que já se conhece de um conteúdo
+
+        Args:
+            sha256 (str): Hash do DICOM
+
+        Returns:
+            Optional[Dict[str, Optional[str]]]: Chaves ``dcm_path`` (cópia local
+            existente ou None), ``pdf_path`` e ``pdf_filename`` (PDF já
+            armazenado ou None), ou None se o conteúdo é desconhecido
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT dcm_path, pdf_path, pdf_filename FROM contents WHERE sha256 = ?",
+                (sha256,)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        dcm_path, pdf_path, pdf_filename = row
+        if dcm_path and not os.path.exists(dcm_path):
+            dcm_path = None
+
+        return {'dcm_path': dcm_path, 'pdf_path': pdf_path, 'pdf_filename': pdf_filename}
+
+    @contextmanager
+    def content_lock(self, sha256: str) -> Iterator[None]:
+        """
+        Serializa o processamento de arquivos com o mesmo conteúdo
+
+        O lock de um conteúdo é descartado quando o último a usá-lo sai,
+        para que processos longos (``--watch``, workers) não acumulem um
+        lock por arquivo já visto.
+
+        Args:
+            sha256 (str): Hash do conteúdo
+        """
+        with self._lock:
+            entry = self._content_locks.get(sha256)
+            if entry is None:
+                entry = self._content_locks[sha256] = [threading.Lock(), 0]
+            entry[1] += 1
+
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._content_locks[sha256]
+
+    def close(self):
+        """
+        Fecha o cache
+        """
+        with self._lock:
+            self._connection.close()
+
+
+def open_content_cache(config_manager, download_directory: str) -> Optional[ContentCache]:
+    """
+    Abre o cache de conteúdo se a deduplicação estiver ativa
+
+    Usa as chaves ``enabled`` e ``cache_path`` da seção ``[dedup]``; o
+    caminho padrão é ``.content_cache.sqlite3`` no diretório de download.
+
+    Args:
+        config_manager (ConfigManager): Gerenciador de configurações
+        download_directory (str): Diretório de download dos DICOMs
+
+    Returns:
+        Optional[ContentCache]: Cache aberto ou None se desativado
+    """
+    if not config_manager.get_bool('dedup', 'enabled', False):
+        return None
+
+    cache_path = config_manager.get('dedup', 'cache_path', None) or os.path.join(
+        download_directory, '.content_cache.sqlite3'
+    )
+    return ContentCache(cache_path)
@@ -1,10 +1,28 @@
 import os
 import base64
+import time
 import logging
-import subprocess
-from typing import List, Optional, Tuple
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from convert_dcm2pdf.database.connect import PostgreSQLConnector
-from convert_dcm2pdf.utils.exceptions import ConversionError
+from convert_dcm2pdf.database.batch_writer import PDFBatchWriter
+from convert_dcm2pdf.database.pdf_references import insert_pdf_reference
+from convert_dcm2pdf.database.pdf_stream import STREAM_CHUNK_SIZE, stream_pdf_to_database
+from convert_dcm2pdf.core.processed_index import ProcessedFileIndex
+from convert_dcm2pdf.core.content_cache import ContentCache, open_content_cache
+from convert_dcm2pdf.core.header_index import open_header_index
+from convert_dcm2pdf.core.backends import ConverterBackend, create_backend
+from convert_dcm2pdf.utils.priority import PriorityPolicy
+from convert_dcm2pdf.utils.exceptions import ConversionError, DatabaseError
+from convert_dcm2pdf.utils.metrics import metrics, report_run, start_run
+from convert_dcm2pdf.utils.file_watcher import WATCH_BACKEND_AUTO, create_watcher
+from convert_dcm2pdf.utils.paths import ensure_parent, get_shard_depth, iter_files, shard_path
+
+# Modos de armazenamento do conteúdo dos PDFs em pdf_storage
+STORAGE_MODE_TEXT = 'text'
+STORAGE_MODE_BINARY = 'binary'
 
 class DCMConverter:
     """
@@ -27,11 +45,63 @@ class DCMConverter:
         
         # Configurações de banco de dados
         self.db_config = self.config.get_database_config()
+
+        # Gravador em lote ativo durante uma execução (ver _batch_storage)
+        self._batch_writer = None
+
+        # Índice de arquivos já processados, ativo durante uma execução
+        # incremental (ver _incremental_index)
+        self._index = None
+        self._force = False
+        self._pdf_sources = {}
+
+        # Cache de conteúdo para deduplicação, ativo durante uma execução
+        # (ver _content_cache)
+        self._cache = None
+
+        # Níveis do layout particionado de [paths] shard_depth, lido no primeiro uso
+        self._shard_depth = None
+
+        # Modo de armazenamento, lido da configuração no primeiro uso
+        self._storage_mode = None
+        self._large_object_threshold = None
+        self._stream_threshold = 16 * 1024 * 1024
+        self._stream_chunk_size = STREAM_CHUNK_SIZE
+
+        # Chamado com (dicom, pdf) quando um arquivo termina de ser
+        # armazenado; usado pelo pipeline para liberar intermediários
+        self._on_stored = None
+
+        # Chamado com (dicom, pdf) quando o lote rejeita o PDF de um arquivo
+        self._on_store_failed = None
+
+        # Backend de conversão, criado no primeiro uso (ver _get_backend)
+        self._backend = None
+        self._backend_lock = threading.Lock()
+
+        # Sinaliza o fim do modo de observação (ver watch)
+        self._watch_stop = threading.Event()
         
         # Criar diretórios se não existirem
         os.makedirs(self.download_directory, exist_ok=True)
         os.makedirs(self.pdf_directory, exist_ok=True)
 
+    def _pdf_path(self, dcm_filepath: str) -> str:
+        """
+        Caminho do PDF gerado a partir de um DICOM
+
+        Com ``[paths] shard_depth`` o PDF fica no mesmo subdiretório
+        particionado que o DICOM teria, criado se preciso.
+        """
+        if self._shard_depth is None:
+            self._shard_depth = get_shard_depth(self.config)
+
+        pdf_filename = os.path.basename(dcm_filepath).replace('.dcm', '.pdf')
+        pdf_filepath = shard_path(self.pdf_directory, pdf_filename, self._shard_depth)
+        if self._shard_depth:
+            ensure_parent(pdf_filepath)
+        return pdf_filepath
+
     def _convert_dcm_to_pdf(self, dcm_filepath: str) -> Optional[str]:
         """
         Converte arquivo DICOM para PDF
@@ -42,29 +112,43 @@ class DCMConverter:
         Returns:
             Optional[str]: Caminho do arquivo PDF gerado ou None se falhar
         """
+        pdf_filepath = self._pdf_path(dcm_filepath)
+
+        with metrics.timer('convert') as measurement:
+            self._get_backend().convert(dcm_filepath, pdf_filepath)
+            measurement['bytes'] = os.path.getsize(dcm_filepath)
+
+        self.logger.info(f"Conversão de {dcm_filepath} para PDF concluída")
+        return pdf_filepath
+
+    def _get_backend(self) -> ConverterBackend:
+        """
+        Obtém o backend de conversão configurado em ``[dcm] backend``
+
+        Returns:
+            ConverterBackend: Backend de conversão
+        """
+        with self._backend_lock:
+            if self._backend is None:
+                self._backend = create_backend(self.config, self.dcm_executable)
+            return self._backend
+
+    @contextmanager
+    def _conversion_backend(self) -> Iterator[None]:
+        """
+        Mantém o backend de conversão ativo durante o bloco ``with``
+
+        O backend continua sendo criado no primeiro uso; seus recursos (como
+        processos conversores persistentes) são compartilhados por todos os
+        arquivos do bloco e liberados ao final.
+        """
         try:
-            # Nome do arquivo PDF
-            pdf_filename = os.path.basename(dcm_filepath).replace('.dcm', '.pdf')
-            pdf_filepath = os.path.join(self.pdf_directory, pdf_filename)
-            
-            # Comando de conversão
-            command = f"{self.dcm_executable} -v {dcm_filepath} {pdf_filepath}"
-            
-            # Executar conversão
-            result = subprocess.run(
-                command, 
-                shell=True, 
-                capture_output=True, 
-                text=True, 
-                check=True
-            )
-            
-            self.logger.info(f"Conversão de {dcm_filepath} para PDF concluída")
-            return pdf_filepath
-        
-        except subprocess.CalledProcessError as e:
-            self.logger.error(f"Erro na conversão: {e.stderr}")
-            raise ConversionError(f"Falha na conversão: {e.stderr}")
+            yield
+        finally:
+            with self._backend_lock:
+                backend, self._backend = self._backend, None
+            if backend is not None:
+                backend.close()
 
     def _read_pdf_as_base64(self, pdf_path: str) -> str:
         """
@@ -76,64 +160,705 @@ class DCMConverter:
         Returns:
             str: Conteúdo do PDF em base64
         """
-        with open(pdf_path, 'rb') as pdf_file:
-            return base64.b64encode(pdf_file.read()).decode('utf-8')
+        with metrics.timer('read_pdf') as measurement, open(pdf_path, 'rb') as pdf_file:
+            content = pdf_file.read()
+            measurement['bytes'] = len(content)
+            return base64.b64encode(content).decode('utf-8')
+
+    def _read_pdf_bytes(self, pdf_path: str) -> bytes:
+        """
+        Lê arquivo PDF sem codificação
+
+        Args:
+            pdf_path (str): Caminho do arquivo PDF
+
+        Returns:
+            bytes: Conteúdo binário do PDF
+        """
+        with metrics.timer('read_pdf') as measurement, open(pdf_path, 'rb') as pdf_file:
+            content = pdf_file.read()
+            measurement['bytes'] = len(content)
+            return content
+
+    def _get_storage_mode(self) -> str:
+        """
+        Determina como o conteúdo dos PDFs é gravado em ``pdf_storage``
+
+        ``text`` grava o PDF em base64 na coluna ``file_content``; ``binary``
+        grava os bytes na coluna BYTEA ``file_data`` ou, para arquivos
+        maiores que ``large_object_threshold``, como large object
+        referenciado por ``file_oid``.
+
+        Returns:
+            str: ``text`` ou ``binary``
+        """
+        if self._storage_mode is None:
+            mode = str(self.config.get('postgresql', 'storage_mode', STORAGE_MODE_TEXT)).strip().lower()
+            if mode not in (STORAGE_MODE_TEXT, STORAGE_MODE_BINARY):
+                self.logger.warning(f"Modo de armazenamento desconhecido '{mode}', usando '{STORAGE_MODE_TEXT}'")
+                mode = STORAGE_MODE_TEXT
+
+            self._large_object_threshold = self.config.get_int(
+                'postgresql', 'large_object_threshold', 64 * 1024 * 1024
+            )
+            self._stream_threshold = self.config.get_int(
+                'postgresql', 'stream_threshold', 16 * 1024 * 1024
+            )
+            self._stream_chunk_size = self.config.get_int(
+                'postgresql', 'stream_chunk_size', STREAM_CHUNK_SIZE
+            )
+            self._storage_mode = mode
+        return self._storage_mode
+
+    def _use_large_object(self, pdf_path: str) -> bool:
+        """
+        Indica se o PDF deve ser gravado como large object
+
+        Args:
+            pdf_path (str): Caminho do arquivo PDF
+
+        Returns:
+            bool: True no modo binário para arquivos acima do limite configurado
+        """
+        if self._get_storage_mode() != STORAGE_MODE_BINARY or self._large_object_threshold <= 0:
+            return False
+        return os.path.getsize(pdf_path) > self._large_object_threshold
+
+    def _use_streaming(self, pdf_path: str) -> bool:
+        """
+        Indica se o PDF deve ser enviado em blocos via COPY, sem ser lido inteiro
+
+        Args:
+            pdf_path (str): Caminho do arquivo PDF
+
+        Returns:
+            bool: True para arquivos acima de ``[postgresql] stream_threshold``
+        """
+        self._get_storage_mode()
+        if self._stream_threshold <= 0:
+            return False
+        return os.path.getsize(pdf_path) > self._stream_threshold
+
+    def _resolve_workers(self, workers: Optional[int] = None) -> int:
+        """
+        Determina o número de workers de conversão
+
+        Args:
+            workers (int, opcional): Número de workers informado pelo chamador.
+                Se omitido, usa a chave ``workers`` da seção ``[dcm]``.
+
+        Returns:
+            int: Número de workers (mínimo 1)
+        """
+        if workers is None:
+            workers = self.config.get_int('dcm', 'workers', 1)
+        return max(1, int(workers))
+
+    @contextmanager
+    def _incremental_index(self, force: bool = False,
+                           required: bool = False) -> Iterator[Optional[ProcessedFileIndex]]:
+        """
+        Ativa o índice de arquivos processados durante o bloco ``with``
+
+        O índice só é usado quando a chave ``incremental`` da seção ``[dcm]``
+        está ativa. Seu caminho vem de ``[dcm] index_path`` (padrão:
+        ``.processed_index.sqlite3`` no diretório de download).
+
+        Args:
+            force (bool, opcional): Converte todos os arquivos ignorando o
+                índice, que continua sendo atualizado, e o cache de conteúdo
+                (ver ``_reuse_stored_pdf``). Padrão False.
+            required (bool, opcional): Usa o índice mesmo com ``incremental``
+                desligado. Padrão False.
+
+        Yields:
+            Optional[ProcessedFileIndex]: Índice ativo ou None se desativado
+        """
+        self._force = force
+
+        if not required and not self.config.get_bool('dcm', 'incremental', False):
+            try:
+                yield None
+            finally:
+                self._force = False
+            return
+
+        index_path = self.config.get('dcm', 'index_path', None) or os.path.join(
+            self.download_directory, '.processed_index.sqlite3'
+        )
+        index = ProcessedFileIndex(index_path)
+        self._index = index
+
+        try:
+            yield index
+        finally:
+            self._index = None
+            self._force = False
+            self._pdf_sources = {}
+            index.close()
+
+    @contextmanager
+    def _content_cache(self) -> Iterator[Optional[ContentCache]]:
+        """
+        Ativa a deduplicação por conteúdo durante o bloco ``with``
+
+        Yields:
+            Optional[ContentCache]: Cache ativo ou None se ``[dedup] enabled``
+            estiver desligado
+        """
+        cache = open_content_cache(self.config, self.download_directory)
+        if cache is None:
+            yield None
+            return
+
+        self._cache = cache
+        try:
+            yield cache
+        finally:
+            self._cache = None
+            cache.close()
+
+    def _reuse_stored_pdf(self, dcm_filepath: str, sha256: Optional[str] = None) -> Optional[str]:
+        """
+        Registra um DICOM duplicado como referência ao PDF já armazenado
+
+        Args:
+            dcm_filepath (str): Caminho do arquivo DICOM
+            sha256 (str, opcional): Hash já calculado do arquivo
+
+        Se o PDF armazenado é o do próprio arquivo (nova execução sobre um
+        arquivo já armazenado), nenhuma referência é gravada.
+
+        Returns:
+            Optional[str]: Caminho do PDF reaproveitado ou None se o conteúdo
+            ainda não foi convertido (ou a deduplicação está desligada ou a
+            execução é forçada)
+        """
+        if self._cache is None or self._force:
+            return None
+
+        sha256 = sha256 or self._cache.hash_file(dcm_filepath)
+        entry = self._cache.lookup(sha256)
+        if not entry or not entry['pdf_filename']:
+            return None
+
+        pdf_filename = os.path.basename(dcm_filepath).replace('.dcm', '.pdf')
+        if pdf_filename == entry['pdf_filename']:
+            self.logger.info(f"{dcm_filepath} já foi convertido e armazenado, conversão ignorada")
+        else:
+            insert_pdf_reference(self.db_config, pdf_filename, sha256, entry['pdf_filename'])
+            self.logger.info(
+                f"{dcm_filepath} é duplicado de {entry['pdf_filename']}, conversão ignorada"
+            )
+
+        self._mark_processed(dcm_filepath, entry['pdf_path'], reused=True)
+        return entry['pdf_path']
+
+    def _should_convert(self, dcm_filepath: str) -> bool:
+        """
+        Indica se o arquivo precisa ser convertido nesta execução
+
+        Args:
+            dcm_filepath (str): Caminho do arquivo DICOM
+
+        Returns:
+            bool: False apenas se o índice registra o arquivo como já armazenado
+        """
+        if self._index is None or self._force:
+            return True
+        return not self._index.is_processed(dcm_filepath)
+
+    def _mark_processed(self, dcm_filepath: Optional[str], pdf_path: str, reused: bool = False):
+        """
+        Registra no índice (e no cache de conteúdo) um arquivo cujo PDF foi armazenado
+
+        Args:
+            dcm_filepath (str, opcional): Caminho do arquivo DICOM de origem
+            pdf_path (str): Caminho do PDF armazenado
+            reused (bool, opcional): True se o PDF pertence a outro DICOM
+                (deduplicação) e não foi gerado para este arquivo
+        """
+        if not dcm_filepath:
+            return
+
+        try:
+            if self._cache is not None:
+                self._cache.record_pdf(self._cache.hash_file(dcm_filepath), pdf_path)
+            if self._index is not None:
+                self._index.mark_processed(dcm_filepath, pdf_path)
+        except Exception as e:
+            self.logger.warning(f"Não foi possível registrar {dcm_filepath} no índice: {e}")
+
+        if self._on_stored is not None:
+            self._on_stored(dcm_filepath, None if reused else pdf_path)
+
+    def _on_batch_stored(self, pdf_path: str):
+        """
+        Chamado pelo gravador em lote para cada PDF confirmado no banco
+        """
+        self._mark_processed(self._pdf_sources.pop(pdf_path, None), pdf_path)
+
+    def _on_batch_failed(self, pdf_path: str, error: Exception):
+        """
+        Chamado pelo gravador em lote para cada PDF que não pôde ser gravado
+        """
+        dcm_filepath = self._pdf_sources.pop(pdf_path, None)
+        if dcm_filepath and self._cache is not None:
+            try:
+                self._cache.clear_pending(self._cache.hash_file(dcm_filepath))
+            except OSError as e:
+                self.logger.warning(f"Não foi possível liberar {dcm_filepath} no cache: {e}")
+        if dcm_filepath and self._on_store_failed is not None:
+            self._on_store_failed(dcm_filepath, pdf_path)
+
+    @contextmanager
+    def _batch_storage(self, batch_size: Optional[int] = None) -> Iterator[Optional[PDFBatchWriter]]:
+        """
+        Ativa a gravação em lote dos PDFs durante o bloco ``with``
+
+        Args:
+            batch_size (int, opcional): PDFs por lote. Padrão: chave
+                ``batch_size`` da seção ``[postgresql]``; valores menores
+                ou iguais a 1 mantêm a gravação individual.
+
+        Yields:
+            Optional[PDFBatchWriter]: Gravador ativo ou None se desativado
+        """
+        if batch_size is None:
+            batch_size = self.config.get_int('postgresql', 'batch_size', 1)
+
+        if batch_size <= 1:
+            yield None
+            return
+
+        column = 'file_data' if self._get_storage_mode() == STORAGE_MODE_BINARY else 'file_content'
+        writer = PDFBatchWriter(
+            self.db_config,
+            column=column,
+            max_rows=batch_size,
+            max_bytes=self.config.get_int('postgresql', 'batch_max_bytes', 32 * 1024 * 1024),
+            max_seconds=self.config.get_int('postgresql', 'batch_max_seconds', 5),
+            on_failure=self._on_batch_failed,
+            on_success=self._on_batch_stored
+        )
+        self._batch_writer = writer
+
+        try:
+            yield writer
+        finally:
+            self._batch_writer = None
+            writer.close()
+
+    def _apply_storage_failures(self, writer: Optional[PDFBatchWriter], converted_pdfs: List[str],
+                                error_files: List[str], pdf_sources: Dict[str, str]):
+        """
+        Move para a lista de erros os arquivos cujo PDF não foi gravado pelo lote
+
+        Args:
+            writer (PDFBatchWriter, opcional): Gravador utilizado na execução
+            converted_pdfs (List[str]): PDFs considerados convertidos
+            error_files (List[str]): Arquivos DICOM com erro
+            pdf_sources (Dict[str, str]): Mapa de PDF para o DICOM de origem
+        """
+        if writer is None:
+            return
+
+        for pdf_path, error in writer.failures:
+            if pdf_path in converted_pdfs:
+                converted_pdfs.remove(pdf_path)
+            dcm_filepath = pdf_sources.get(pdf_path, pdf_path)
+            error_files.append(dcm_filepath)
+            print(f"Erro ao processar {os.path.basename(dcm_filepath)}: {error}")
+
+    def _store_pdf(self, pdf_path: str, dcm_filepath: Optional[str] = None):
+        """
+        Lê o PDF gerado e o salva no banco de dados
+
+        Com a gravação em lote ativa, o PDF é apenas enfileirado no lote.
+        Large objects e PDFs acima de ``[postgresql] stream_threshold`` são
+        sempre gravados individualmente, lidos do disco em blocos. Com o índice
+        incremental ativo, o DICOM de origem é registrado assim que o PDF
+        é confirmado no banco.
+
+        Args:
+            pdf_path (str): Caminho do arquivo PDF
+            dcm_filepath (str, opcional): Caminho do arquivo DICOM de origem
+        """
+        filename = os.path.basename(pdf_path)
+        binary = self._get_storage_mode() == STORAGE_MODE_BINARY
+
+        if binary and self._use_large_object(pdf_path):
+            self._save_pdf_as_large_object(filename, pdf_path)
+
+        elif self._use_streaming(pdf_path):
+            with metrics.timer('store', os.path.getsize(pdf_path)):
+                stream_pdf_to_database(
+                    self.db_config, filename, pdf_path,
+                    column='file_data' if binary else 'file_content',
+                    chunk_size=self._stream_chunk_size
+                )
+
+        elif self._batch_writer is not None:
+            content = self._read_pdf_bytes(pdf_path) if binary else self._read_pdf_as_base64(pdf_path)
+            self._pdf_sources[pdf_path] = dcm_filepath
+            self._batch_writer.add(filename, content, key=pdf_path)
+            return
+
+        elif binary:
+            self._save_pdf_binary_to_database(filename, self._read_pdf_bytes(pdf_path))
+
+        else:
+            # Converter PDF para base64
+            pdf_base64 = self._read_pdf_as_base64(pdf_path)
+
+            # Salvar no banco de dados
+            self._save_pdf_to_database(filename, pdf_base64)
+
+        self._mark_processed(dcm_filepath, pdf_path)
+
+    def _process_dcm_file(self, dcm_filepath: str) -> Optional[str]:
+        """
+        Converte um arquivo DICOM e salva o PDF resultante no banco de dados
+
+        Args:
+            dcm_filepath (str): Caminho do arquivo DICOM
+
+        Com a deduplicação ativa, arquivos cujo conteúdo já foi convertido
+        não são convertidos de novo: apenas referenciam o PDF armazenado.
+        Com a gravação em lote, o conteúdo fica pendente no cache até o lote
+        ser gravado; um duplicado que chega antes disso descarrega o lote
+        para então reaproveitar o PDF.
+
+        Returns:
+            Optional[str]: Caminho do PDF gerado ou None se nada foi gerado
+        """
+        if self._cache is None:
+            return self._convert_and_store(dcm_filepath)
+
+        sha256 = self._cache.hash_file(dcm_filepath)
+        with self._cache.content_lock(sha256):
+            writer = self._batch_writer
+            if writer is not None and self._cache.is_pending(sha256):
+                writer.flush()
+
+            pdf_path = self._reuse_stored_pdf(dcm_filepath, sha256)
+            if pdf_path:
+                return pdf_path
+
+            if writer is None:
+                return self._convert_and_store(dcm_filepath)
+
+            # Marcado antes de entrar no lote: o descarregamento pode ocorrer
+            # em outra thread assim que o PDF é adicionado
+            self._cache.mark_pending(sha256)
+            pdf_path = None
+            try:
+                pdf_path = self._convert_and_store(dcm_filepath)
+            finally:
+                if pdf_path not in self._pdf_sources:
+                    self._cache.clear_pending(sha256)
+            return pdf_path
 
-    def convert_all_dcm_files(self) -> Tuple[List[str], List[str]]:
+    def _convert_and_store(self, dcm_filepath: str) -> Optional[str]:
+        """
+        Converte um arquivo DICOM e salva o PDF resultante
+
+        Args:
+            dcm_filepath (str): Caminho do arquivo DICOM
+
+        Returns:
+            Optional[str]: Caminho do PDF gerado ou None se nada foi gerado
+        """
+        # Converter DCM para PDF
+        pdf_path = self._convert_dcm_to_pdf(dcm_filepath)
+
+        if pdf_path:
+            self._store_pdf(pdf_path, dcm_filepath)
+
+        return pdf_path
+
+    def _iter_dcm_files(self) -> Iterator[str]:
+        """
+        Percorre os arquivos DICOM do diretório de download a converter
+
+        Sem índice de cabeçalhos nem prioridade, os arquivos são entregues à
+        medida que ``os.scandir`` os encontra, inclusive nos subdiretórios
+        do layout particionado (``[paths] shard_depth``), sem montar a
+        listagem completa antes da primeira conversão.
+
+        Com ``[dcm] header_index`` ativo, a listagem vem do índice de
+        cabeçalhos, atualizado apenas com arquivos novos ou alterados, e
+        pode ser filtrada por ``[dcm] modalities`` e ``[dcm] sop_classes``
+        sem abrir os arquivos. Com ``[priority] enabled``, os arquivos saem
+        pelo prazo mais próximo, o que exige conhecer todos antes.
+
+        Yields:
+            str: Caminhos dos arquivos, na ordem de conversão
+        """
+        priority = PriorityPolicy.from_config(self.config)
+        index = open_header_index(self.config, self.download_directory)
+
+        if index is None:
+            if priority is None:
+                yield from iter_files(self.download_directory, '.dcm')
+            else:
+                yield from sorted(iter_files(self.download_directory, '.dcm'), key=priority.file_deadline)
+            return
+
+        try:
+            index.refresh(self.download_directory)
+            records = list(index.records(
+                self.download_directory,
+                modalities=self.config.get_list('dcm', 'modalities'),
+                sop_classes=self.config.get_list('dcm', 'sop_classes')
+            ))
+        finally:
+            index.close()
+
+        if priority is not None:
+            records.sort(key=lambda record: priority.deadline(
+                priority.classify(record.modality, record.study_date), record.mtime_ns / 1e9
+            ))
+        for record in records:
+            yield record.path
+
+    def convert_all_dcm_files(self, workers: Optional[int] = None,
+                              force: bool = False) -> Tuple[List[str], List[str]]:
         """
         Converte todos os arquivos DCM no diretório de download para PDF
         e salva no banco de dados
 
+        Com mais de um worker, as conversões rodam em paralelo em um pool
+        limitado de threads; cada arquivo continua isolado dos demais em
+        caso de erro. Os arquivos são enviados ao pool conforme a varredura
+        do diretório avança, com no máximo o dobro de workers em espera, de
+        modo que a primeira conversão começa sem aguardar a listagem completa.
+
+        Com ``[priority] enabled``, os arquivos são enviados ao pool pelo
+        prazo mais próximo (ver ``PriorityPolicy``), e não na ordem do
+        diretório. Com ``[dcm] header_index``, a listagem e os filtros vêm
+        do índice de cabeçalhos (ver ``_iter_dcm_files``).
+
+        Com ``[dcm] incremental`` ativo, arquivos já convertidos e
+        armazenados em execuções anteriores (mesmo caminho, tamanho e data
+        de modificação) são ignorados.
+
+        Args:
+            workers (int, opcional): Número de conversões simultâneas.
+                Padrão: chave ``workers`` da seção ``[dcm]`` (ou 1).
+            force (bool, opcional): Converte todos os arquivos, ignorando o
+                índice incremental. Padrão False.
+
         Returns:
             Tuple[List[str], List[str]]: Lista de PDFs gerados e lista de arquivos com erro
         """
-        # Listar arquivos DCM no diretório
-        dcm_files = [
-            os.path.join(self.download_directory, f) 
-            for f in os.listdir(self.download_directory) 
-            if f.endswith('.dcm')
-        ]
+        start_run(self.config)
 
-        # Se não há arquivos, imprimir mensagem
-        if not dcm_files:
-            print("Nenhum arquivo encontrado")
+        with self._incremental_index(force), self._content_cache(), self._conversion_backend():
+            converted_pdfs, error_files, total, skipped = self._convert_files(
+                self._iter_dcm_files(), self._resolve_workers(workers)
+            )
+
+        # Se não há arquivos a converter, imprimir mensagem
+        if not total:
+            print(f"Arquivos já convertidos ignorados: {skipped}" if skipped else "Nenhum arquivo encontrado")
             return [], []
 
-        # Informar total de arquivos
-        print(f"Total de arquivos encontrados: {len(dcm_files)}")
+        # Resumo final, com o total de arquivos encontrados, exportado também como métricas
+        report_run(self.config, total, len(converted_pdfs), len(error_files), skipped=skipped)
+
+        return converted_pdfs, error_files
+
+    def stop_watching(self):
+        """
+        Encerra ``watch`` depois que as conversões em andamento terminam
+        """
+        self._watch_stop.set()
+
+    def _select_arrivals(self, dcm_files: List[str]) -> List[str]:
+        """
+        Aplica a arquivos recém-chegados os filtros de ``[dcm] modalities`` e
+        ``[dcm] sop_classes``, quando o índice de cabeçalhos está ativo
+        """
+        index = open_header_index(self.config, self.download_directory)
+        if index is None:
+            return dcm_files
+
+        modalities = {modality.upper() for modality in self.config.get_list('dcm', 'modalities')}
+        sop_classes = set(self.config.get_list('dcm', 'sop_classes'))
+        selected = []
+        try:
+            for dcm_filepath in dcm_files:
+                record = index.update(dcm_filepath)
+                if record is None:
+                    continue
+                if modalities and (record.modality or '').upper() not in modalities:
+                    continue
+                if sop_classes and record.sop_class_uid not in sop_classes:
+                    continue
+                selected.append(dcm_filepath)
+        finally:
+            index.close()
+        return selected
+
+    @staticmethod
+    def _file_state(path: str) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def watch(self, workers: Optional[int] = None) -> Tuple[int, int]:
+        """
+        Converte os arquivos DICOM à medida que chegam ao diretório de download
+
+        Roda até ``stop_watching()``. Ao iniciar, converte os arquivos que
+        chegaram enquanto o processo estava parado; depois, reage aos
+        eventos do sistema de arquivos (inotify, ou varreduras periódicas
+        onde não houver; ver ``[watch] backend``). Um arquivo só é convertido
+        depois de ``[watch] debounce`` segundos sem eventos e com tamanho e
+        data de modificação estáveis. Downloads em andamento (``.dcm.part``)
+        e entradas ocultas são ignorados; o download chega ao ser renomeado.
+
+        O índice de arquivos processados fica sempre ativo neste modo, mesmo
+        com ``[dcm] incremental`` desligado, para que reinícios e eventos
+        repetidos não convertam o mesmo arquivo duas vezes.
+
+        Args:
+            workers (int, opcional): Número de conversões simultâneas.
+                Padrão: chave ``workers`` da seção ``[dcm]`` (ou 1).
+
+        Returns:
+            Tuple[int, int]: Arquivos convertidos e arquivos com falha
+        """
+        backend = self.config.get('watch', 'backend', WATCH_BACKEND_AUTO)
+        debounce = max(0.0, self.config.get_float('watch', 'debounce', 2.0))
+        poll_interval = max(0.1, self.config.get_float('watch', 'poll_interval', 5.0))
+        workers = self._resolve_workers(workers)
+
+        converted = failed = 0
+        # Arquivo -> (momento do último evento, tamanho e data de modificação)
+        pending: Dict[str, Tuple[float, Optional[Tuple[int, int]]]] = {}
+
+        start_run(self.config)
+        self._watch_stop.clear()
 
+        # O observador é criado antes da conversão inicial para que nenhum
+        # arquivo que chegue durante ela se perca
+        with self._incremental_index(required=True), self._content_cache(), self._conversion_backend(), \
+                create_watcher(self.download_directory, '.dcm', backend, poll_interval) as watcher:
+            converted_pdfs, error_files, _, _ = self._convert_files(self._iter_dcm_files(), workers)
+            converted += len(converted_pdfs)
+            failed += len(error_files)
+            self.logger.info(f"Observando {self.download_directory} ({type(watcher).__name__})")
+
+            while not self._watch_stop.is_set():
+                now = time.monotonic()
+                timeout = 1.0
+                if pending:
+                    earliest = min(seen for seen, _ in pending.values())
+                    timeout = min(timeout, max(0.0, earliest + debounce - now))
+
+                for dcm_filepath in watcher.read(timeout):
+                    pending[dcm_filepath] = (time.monotonic(), self._file_state(dcm_filepath))
+
+                now = time.monotonic()
+                ready = []
+                for dcm_filepath, (seen, state) in list(pending.items()):
+                    if now - seen < debounce:
+                        continue
+                    current = self._file_state(dcm_filepath)
+                    if current is None:
+                        del pending[dcm_filepath]
+                    elif current != state:
+                        # Ainda sendo gravado: aguarda mais um intervalo
+                        pending[dcm_filepath] = (now, current)
+                    else:
+                        del pending[dcm_filepath]
+                        ready.append(dcm_filepath)
+
+                ready = self._select_arrivals(ready) if ready else []
+                if ready:
+                    converted_pdfs, error_files, _, _ = self._convert_files(ready, workers)
+                    converted += len(converted_pdfs)
+                    failed += len(error_files)
+
+        report_run(self.config, converted + failed, converted, failed)
+        return converted, failed
+
+    def _convert_files(self, dcm_files: Iterable[str], workers: int) -> Tuple[List[str], List[str], int, int]:
+        """
+        Converte e armazena arquivos DICOM em um pool limitado de threads
+
+        Os arquivos são consumidos de ``dcm_files`` à medida que há vaga no
+        pool (no máximo o dobro de ``workers`` em espera). Deve ser chamado
+        com o índice, o cache e o backend ativos.
+
+        Args:
+            dcm_files (Iterable[str]): Caminhos dos arquivos DICOM
+            workers (int): Número de conversões simultâneas
+
+        Returns:
+            Tuple[List[str], List[str], int, int]: PDFs gerados, arquivos com
+            erro, arquivos enviados à conversão e arquivos já convertidos ignorados
+        """
         converted_pdfs = []
         error_files = []
+        pdf_sources = {}
+        total = skipped = 0
+        dcm_files = iter(dcm_files)
 
-        for dcm_filepath in dcm_files:
-            try:
-                # Converter DCM para PDF
-                pdf_path = self._convert_dcm_to_pdf(dcm_filepath)
-                
-                if pdf_path:
-                    # Converter PDF para base64
-                    pdf_base64 = self._read_pdf_as_base64(pdf_path)
-                    
-                    # Salvar no banco de dados
-                    self._save_pdf_to_database(
-                        os.path.basename(pdf_path), 
-                        pdf_base64
-                    )
-                    
-                    converted_pdfs.append(pdf_path)
-                    print(f"Convertido com sucesso: {os.path.basename(dcm_filepath)}")
-            
-            except Exception as e:
-                error_files.append(dcm_filepath)
-                print(f"Erro ao processar {os.path.basename(dcm_filepath)}: {e}")
-        
-        # Resumo final
-        print(f"\nResumo:")
-        print(f"Total de arquivos processados: {len(dcm_files)}")
-        print(f"Convertidos com sucesso: {len(converted_pdfs)}")
-        print(f"Falhas na conversão: {len(error_files)}")
+        def next_file() -> Optional[str]:
+            # Ignorar arquivos já processados em execuções anteriores
+            nonlocal skipped
+            for dcm_filepath in dcm_files:
+                if self._should_convert(dcm_filepath):
+                    return dcm_filepath
+                skipped += 1
+            return None
 
-        return converted_pdfs, error_files
+        with self._batch_storage() as writer, ThreadPoolExecutor(max_workers=workers) as executor:
+            in_flight = {}
+
+            def submit_next() -> bool:
+                nonlocal total
+                dcm_filepath = next_file()
+                if dcm_filepath is None:
+                    return False
+                in_flight[executor.submit(self._process_dcm_file, dcm_filepath)] = dcm_filepath
+                total += 1
+                return True
+
+            for _ in range(2 * workers):
+                if not submit_next():
+                    break
+
+            if in_flight:
+                self.logger.info(f"Convertendo arquivos com {workers} worker(s)")
+
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    dcm_filepath = in_flight.pop(future)
+                    try:
+                        pdf_path = future.result()
+
+                        if pdf_path:
+                            converted_pdfs.append(pdf_path)
+                            pdf_sources[pdf_path] = dcm_filepath
+                            print(f"Convertido com sucesso: {os.path.basename(dcm_filepath)}")
+
+                    except Exception as e:
+                        error_files.append(dcm_filepath)
+                        print(f"Erro ao processar {os.path.basename(dcm_filepath)}: {e}")
+
+                    submit_next()
+
+        # Falhas reportadas pelo lote só são conhecidas após o último descarregamento
+        self._apply_storage_failures(writer, converted_pdfs, error_files, pdf_sources)
+
+        return converted_pdfs, error_files, total, skipped
 
     def _save_pdf_to_database(self, filename: str, pdf_base64: str):
         """
@@ -142,21 +867,79 @@ class DCMConverter:
         Args:
             filename (str): Nome do arquivo PDF
             pdf_base64 (str): Conteúdo do PDF em base64
+
+        Raises:
+            DatabaseError: Se a inserção falhar
         """
+        if not self.db_config:
+            self.logger.error("Erro ao salvar PDF no banco: configuração do banco de dados não encontrada")
+            raise DatabaseError("Configuração do banco de dados não encontrada")
+
         try:
-            if not self.db_config:
-                raise ValueError("Configuração do banco de dados não encontrada")
-            
-            try:
-                with PostgreSQLConnector(self.db_config) as connector:
-                    query = """
-                    INSERT INTO pdf_storage (filename, file_content)
-                    VALUES (%s, %s)
-                    """
+            with PostgreSQLConnector(self.db_config, pooled=True) as connector:
+                query = """
+                INSERT INTO pdf_storage (filename, file_content)
+                VALUES (%s, %s)
+                """
+                with metrics.timer('store', len(pdf_base64)):
                     connector.execute_insert(query, (filename, pdf_base64))
-            except (Exception) as e:
-                self.logger.error(f"Erro ao inserir PDF no banco de dados: {e}")
-                
-        
         except Exception as e:
-            self.logger.error(f"Erro ao salvar PDF no banco: {e}")
\ No newline at end of file
+            self.logger.error(f"Erro ao inserir PDF no banco de dados: {e}")
+            raise DatabaseError(f"Falha ao salvar {filename}: {e}")
+
+    def _save_pdf_binary_to_database(self, filename: str, pdf_bytes: bytes):
+        """
+        Salva PDF convertido na coluna BYTEA ``file_data``
+
+        Args:
+            filename (str): Nome do arquivo PDF
+            pdf_bytes (bytes): Conteúdo binário do PDF
+
+        Raises:
+            DatabaseError: Se a inserção falhar
+        """
+        try:
+            with PostgreSQLConnector(self.db_config, pooled=True) as connector:
+                query = """
+                INSERT INTO pdf_storage (filename, file_data)
+                VALUES (%s, %s)
+                """
+                with metrics.timer('store', len(pdf_bytes)):
+                    connector.execute_insert(query, (filename, pdf_bytes))
+        except Exception as e:
+            self.logger.error(f"Erro ao inserir PDF no banco de dados: {e}")
+            raise DatabaseError(f"Falha ao salvar {filename}: {e}")
+
+    def _save_pdf_as_large_object(self, filename: str, pdf_path: str):
+        """
+        Salva PDF convertido como large object, copiando o arquivo em blocos
+
+        O large object e a linha de ``pdf_storage`` que o referencia são
+        gravados na mesma transação.
+
+        Args:
+            filename (str): Nome do arquivo PDF
+            pdf_path (str): Caminho do arquivo PDF
+
+        Raises:
+            DatabaseError: Se a gravação falhar
+        """
+        try:
+            with PostgreSQLConnector(self.db_config, pooled=True) as connector:
+                try:
+                    with metrics.timer('store', os.path.getsize(pdf_path)):
+                        with open(pdf_path, 'rb') as pdf_file:
+                            oid = connector.write_large_object(pdf_file, self._stream_chunk_size)
+
+                        connector.cursor.execute(
+                            "INSERT INTO pdf_storage (filename, file_oid) VALUES (%s, %s)",
+                            (filename, oid)
+                        )
+                        connector.connection.commit()
+                    self.logger.info(f"PDF {filename} gravado como large object {oid}")
+                except Exception:
+                    connector.connection.rollback()
+                    raise
+        except Exception as e:
+            self.logger.error(f"Erro ao inserir PDF no banco de dados: {e}")
+            raise DatabaseError(f"Falha ao salvar {filename}: {e}")
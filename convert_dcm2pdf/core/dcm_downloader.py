@@ -1,9 +1,187 @@
 import os
+import time
+import queue
+import shlex
+import random
+import shutil
+import socket
 import logging
+import threading
 import paramiko
-from typing import List, Tuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional, Tuple
 from convert_dcm2pdf.database.connect import PostgreSQLConnector
-from convert_dcm2pdf.utils.exceptions import DownloadError
+from convert_dcm2pdf.database.pdf_references import insert_pdf_reference
+from convert_dcm2pdf.database.work_queue import StudyWorkQueue
+from convert_dcm2pdf.core.content_cache import open_content_cache, sha256_file
+from convert_dcm2pdf.utils.paths import ensure_parent, get_shard_depth, shard_path
+from convert_dcm2pdf.utils.priority import PriorityPolicy
+from convert_dcm2pdf.utils.exceptions import DownloadError, IncompleteDownloadError
+from convert_dcm2pdf.utils.metrics import metrics
+
+# Sufixo dos arquivos em transferência; só o arquivo conferido recebe o nome final
+PARTIAL_SUFFIX = '.part'
+
+# Tamanho dos blocos lidos do canal e gravados no arquivo local
+TRANSFER_CHUNK_SIZE = 1024 * 1024
+
+# Erros de conexão, após os quais o canal SFTP é descartado
+_CONNECTION_ERRORS = (paramiko.SSHException, EOFError, ConnectionError, socket.timeout)
+
+# Erros após os quais o download é tentado novamente
+_RETRYABLE_ERRORS = _CONNECTION_ERRORS + (DownloadError,)
+
+# Comandos que calculam o SHA-256 no servidor, em ordem de preferência; todos
+# imprimem o hash como primeiro campo. O primeiro disponível é memorizado.
+REMOTE_SHA256_COMMANDS = (
+    'sha256sum -- {path}',               # GNU coreutils
+    'shasum -a 256 {path}',              # Perl (macOS, BSDs)
+    'sha256 -r {path}',                  # FreeBSD, NetBSD
+    'openssl dgst -sha256 -r {path}',
+)
+
+# Código de saída do shell para comando inexistente
+COMMAND_NOT_FOUND = 127
+
+class _SFTPChannelPool:
+    """
+    Pool de canais SFTP abertos sobre uma mesma conexão SSH
+
+    Cada canal é usado por uma única thread por vez; canais ociosos são
+    reaproveitados e novos canais são abertos sob demanda. Canais que
+    falham por erro de conexão são descartados e, se a conexão SSH caiu,
+    ela é reaberta no próximo empréstimo.
+    """
+    def __init__(self, ssh: paramiko.SSHClient, connect: Optional[Callable[[], paramiko.SSHClient]] = None,
+                 window_size: int = 0, max_packet_size: int = 0):
+        """
+        Inicializa o pool
+
+        Args:
+            ssh (paramiko.SSHClient): Cliente SSH conectado
+            connect (Callable, opcional): Abre uma nova conexão SSH quando a
+                atual cai. Sem ele, a conexão não é reaberta.
+            window_size (int, opcional): Janela SSH de cada canal, em bytes.
+                0 usa o padrão do paramiko (2 MiB).
+            max_packet_size (int, opcional): Tamanho máximo dos pacotes de
+                cada canal. 0 usa o padrão do paramiko (32 KiB).
+        """
+        self.logger = logging.getLogger(__name__)
+        self.ssh = ssh
+        self._connect = connect
+        self.window_size = window_size
+        self.max_packet_size = max_packet_size
+        self._idle = queue.LifoQueue()
+        self._channels = []
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def _transport_active(self) -> bool:
+        transport = self.ssh.get_transport()
+        return transport is not None and transport.is_active()
+
+    def _reconnect_if_needed(self):
+        """
+        Reabre a conexão SSH se ela caiu; deve ser chamado com o lock adquirido
+        """
+        if self._connect is None or self._transport_active():
+            return
+
+        self.logger.warning("Conexão SSH perdida, reconectando")
+        self._close_channels()
+        try:
+            self.ssh.close()
+        except Exception:
+            pass
+        self.ssh = self._connect()
+        self._generation += 1
+
+    @contextmanager
+    def channel(self) -> Iterator[paramiko.SFTPClient]:
+        """
+        Empresta um canal SFTP do pool
+
+        Yields:
+            paramiko.SFTPClient: Canal SFTP exclusivo enquanto emprestado
+        """
+        with self._lock:
+            self._reconnect_if_needed()
+            generation = self._generation
+            try:
+                sftp = self._idle.get_nowait()
+            except queue.Empty:
+                sftp = self._open_channel()
+                self._channels.append(sftp)
+
+        try:
+            yield sftp
+        except _CONNECTION_ERRORS:
+            self._discard(sftp)
+            raise
+        except BaseException:
+            self._release(sftp, generation)
+            raise
+        self._release(sftp, generation)
+
+    def _open_channel(self) -> paramiko.SFTPClient:
+        """
+        Abre um canal SFTP, com a janela e o tamanho de pacote configurados
+        """
+        if not self.window_size and not self.max_packet_size:
+            return self.ssh.open_sftp()
+
+        return paramiko.SFTPClient.from_transport(
+            self.ssh.get_transport(),
+            window_size=self.window_size or None,
+            max_packet_size=self.max_packet_size or None
+        )
+
+    def _release(self, sftp: paramiko.SFTPClient, generation: int):
+        with self._lock:
+            if generation == self._generation:
+                self._idle.put(sftp)
+                return
+        # Canal de uma conexão que já foi substituída
+        self._discard(sftp)
+
+    def _discard(self, sftp: paramiko.SFTPClient):
+        with self._lock:
+            if sftp in self._channels:
+                self._channels.remove(sftp)
+        try:
+            sftp.close()
+        except Exception:
+            pass
+
+    def _close_channels(self):
+        for sftp in self._channels:
+            try:
+                sftp.close()
+            except Exception:
+                pass
+        self._channels = []
+        self._idle = queue.LifoQueue()
+
+    def exec_command(self, command: str):
+        """
+        Executa um comando na conexão SSH atual, reconectando se preciso
+
+        Returns:
+            Tuple: ``stdin``, ``stdout`` e ``stderr`` do comando
+        """
+        with self._lock:
+            self._reconnect_if_needed()
+            ssh = self.ssh
+        return ssh.exec_command(command)
+
+    def close(self):
+        """
+        Fecha todos os canais abertos pelo pool
+        """
+        with self._lock:
+            self._close_channels()
+
 
 class DCMDownloader:
     """
@@ -30,6 +208,38 @@ class DCMDownloader:
         # Diretório de download
         self.download_directory = self.config.get('paths', 'download_directory', './downloads')
         os.makedirs(self.download_directory, exist_ok=True)
+        self._shard_depth = get_shard_depth(self.config)
+
+        # Cache de conteúdo para deduplicação, ativo durante um download
+        self._cache = None
+
+        # Fila de trabalho compartilhada, ativa durante um download
+        self._work_queue = None
+
+        # Política de prioridade da seção [priority], ativa durante um download
+        self._priority = None
+
+        # Orçamento de disco da execução (ver ResourceBudget), definido pelo pipeline
+        self._budget = None
+
+        # Novas tentativas de downloads interrompidos, lidas da seção [ssh]
+        # a cada execução (ver _download_session)
+        self._retries = 3
+        self._retry_backoff = 1.0
+        self._retry_backoff_max = 60.0
+        self._verify_checksum = False
+
+        # Comando de hash do servidor: None até ser descoberto, '' se nenhum existe
+        self._remote_hash_command = None
+
+        # Ajustes de transferência, lidos da seção [ssh] a cada execução
+        # (ver _load_transfer_settings)
+        self._compress = False
+        self._window_size = 0
+        self._max_packet_size = 0
+        self._request_size = 0
+        self._max_concurrent_requests = 0
+        self._prefetch = True
 
     def _connect_ssh(self) -> paramiko.SSHClient:
         """
@@ -44,21 +254,57 @@ class DCMDownloader:
         try:
             ssh = paramiko.SSHClient()
             ssh.load_system_host_keys()
+            if self.config.get('ssh', 'known_hosts', ''):
+                ssh.load_system_host_keys(self._known_hosts_path())
             ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
             ssh.connect(
                 self.ssh_host, 
                 username=self.ssh_user, 
-                password=self.ssh_password
+                password=self.ssh_password,
+                compress=self._compress
             )
             return ssh
         except Exception as e:
             self.logger.error(f"Erro de conexão SSH: {e}")
             raise DownloadError(f"Falha na conexão SSH: {e}")
 
+    def _study_query(self) -> Tuple[str, tuple]:
+        """
+        Consulta dos estudos a baixar em ``public.study``
+
+        Com a política de prioridade ativa, os estudos saem por classe
+        (urgentes primeiro) e, dentro da classe, dos mais recentes para os
+        mais antigos.
+
+        Returns:
+            Tuple[str, tuple]: Consulta, terminada em ``LIMIT %s``, e os
+            parâmetros que antecedem o limite
+        """
+        if self._priority is None:
+            return """
+                SELECT filepath, accession_no 
+                FROM public.study 
+                WHERE filepath IS NOT NULL 
+                LIMIT %s
+                """, ()
+
+        class_expression, params = self._priority.class_sql()
+        return f"""
+                SELECT filepath, accession_no
+                FROM public.study
+                WHERE filepath IS NOT NULL
+                ORDER BY {class_expression}, {self._priority.date_column} DESC NULLS LAST
+                LIMIT %s
+                """, params
+
     def _get_dcm_files_to_download(self, limit: int = 10) -> List[Tuple[str, str]]:
         """
         Busca lista de arquivos DICOM para download do banco de dados
 
+        Com a fila de trabalho ativa (``[queue] enabled``), os estudos são
+        reivindicados da fila compartilhada, sem repetir estudos já baixados
+        nem entregues a outro processo.
+
         Args:
             limit (int, opcional): Limite de arquivos para download. Padrão 10.
 
@@ -66,64 +312,601 @@ class DCMDownloader:
             List[Tuple[str, str]]: Lista de tuplas (filepath, accession_no)
         """
         try:
-            with PostgreSQLConnector(self.db_config) as connector:
-                query = """
-                SELECT filepath, accession_no 
-                FROM public.study 
-                WHERE filepath IS NOT NULL 
-                LIMIT %s
-                """
-                return connector.fetch_all(query, (limit,))
+            if self._work_queue is not None:
+                return self._work_queue.claim(limit)
+
+            with PostgreSQLConnector(self.db_config, pooled=True) as connector:
+                query, params = self._study_query()
+                return connector.fetch_all(query, params + (limit,))
         except Exception as e:
             self.logger.error(f"Erro ao buscar arquivos DICOM: {e}")
             return []
 
-    def download_dcm_files(self, limit: int = 10) -> List[str]:
+    def _iter_dcm_files_to_download(self, limit: Optional[int] = None) -> Iterator[Tuple[str, str]]:
+        """
+        Percorre os arquivos DICOM a baixar sem carregar a listagem inteira em memória
+
+        Sem fila de trabalho, a consulta usa um cursor no servidor e as
+        linhas chegam em blocos de ``[postgresql] stream_itersize``. Com a
+        fila ativa, os estudos são reivindicados em lotes à medida que a
+        iteração avança.
+
+        Args:
+            limit (int, opcional): Limite de arquivos. None percorre todos.
+
+        Yields:
+            Tuple[str, str]: Tuplas (filepath, accession_no)
+        """
+        try:
+            if self._work_queue is not None:
+                remaining = limit
+                while remaining is None or remaining > 0:
+                    batch_size = self._work_queue.refill_size
+                    if remaining is not None:
+                        batch_size = min(batch_size, remaining)
+
+                    claimed = self._work_queue.claim(batch_size)
+                    if not claimed:
+                        return
+                    if remaining is not None:
+                        remaining -= len(claimed)
+                    yield from claimed
+                return
+
+            with PostgreSQLConnector(self.db_config, pooled=True) as connector:
+                query, params = self._study_query()
+                yield from connector.stream_query(query, params + (limit,))
+        except Exception as e:
+            self.logger.error(f"Erro ao buscar arquivos DICOM: {e}")
+
+    def _report_to_queue(self, accession_no: str, error: Optional[Exception] = None):
+        """
+        Informa à fila de trabalho o resultado do download de um estudo
+
+        Args:
+            accession_no (str): Número de acesso do estudo
+            error (Exception, opcional): Erro ocorrido, se houver
+        """
+        if self._work_queue is None:
+            return
+
+        try:
+            if error is None:
+                self._work_queue.complete([accession_no])
+            else:
+                self._work_queue.fail(accession_no, str(error))
+        except Exception as e:
+            self.logger.error(f"Erro ao atualizar fila de trabalho para {accession_no}: {e}")
+
+    def _resolve_workers(self, workers: Optional[int] = None) -> int:
+        """
+        Determina o número de downloads simultâneos
+
+        Args:
+            workers (int, opcional): Número de workers informado pelo chamador.
+                Se omitido, usa a chave ``workers`` da seção ``[ssh]``.
+
+        Returns:
+            int: Número de workers (mínimo 1)
+        """
+        if workers is None:
+            workers = self.config.get_int('ssh', 'workers', 1)
+        return max(1, int(workers))
+
+    def _remote_path(self, remote_filepath: str) -> str:
+        """
+        Caminho completo do arquivo no PACS
+        """
+        return f'/union/pacs-data/archive/{remote_filepath}'
+
+    def _local_path(self, accession_no: str) -> str:
+        """
+        Caminho local em que o arquivo do estudo é salvo
+
+        Com ``[paths] shard_depth`` o arquivo fica em um subdiretório
+        particionado por prefixo de hash, criado se preciso.
+        """
+        local_filepath = shard_path(self.download_directory, f'{accession_no}.dcm', self._shard_depth)
+        if self._shard_depth:
+            ensure_parent(local_filepath)
+        return local_filepath
+
+    def _partial_offset(self, partial_filepath: str, remote_size: int,
+                        remote_mtime: Optional[float] = None) -> int:
+        """
+        Bytes já recebidos de uma transferência anterior, de onde o download continua
+
+        Um arquivo parcial maior que o remoto, ou um arquivo remoto modificado
+        depois da última gravação do parcial, indica que o conteúdo remoto
+        mudou; nesse caso o parcial é descartado e o download recomeça do zero.
+        """
+        if not os.path.exists(partial_filepath):
+            return 0
+
+        offset = os.path.getsize(partial_filepath)
+        changed = isinstance(remote_mtime, (int, float)) and remote_mtime > os.path.getmtime(partial_filepath)
+        if offset > remote_size or changed:
+            self.logger.info(f"Arquivo remoto mudou desde a transferência anterior; descartando {partial_filepath}")
+            os.remove(partial_filepath)
+            return 0
+        return offset
+
+    def _finish_download(self, partial_filepath: str, local_filepath: str, remote_size: int,
+                         expected_sha256: Optional[str] = None):
+        """
+        Confere o arquivo parcial com o remoto e o move para o nome final
+
+        Raises:
+            IncompleteDownloadError: Se o tamanho ou o SHA-256 não conferem.
+                Com hash divergente, o arquivo parcial é descartado.
+        """
+        local_size = os.path.getsize(partial_filepath)
+        if local_size != remote_size:
+            raise IncompleteDownloadError(
+                f"{os.path.basename(local_filepath)}: recebidos {local_size} de {remote_size} bytes"
+            )
+
+        if expected_sha256 and sha256_file(partial_filepath) != expected_sha256:
+            os.remove(partial_filepath)
+            raise IncompleteDownloadError(
+                f"{os.path.basename(local_filepath)}: SHA-256 não confere com o arquivo remoto"
+            )
+
+        os.replace(partial_filepath, local_filepath)
+
+    def _tuned_transfer(self) -> bool:
+        """
+        True se o tamanho dos pedidos, a concorrência ou o prefetch foram
+        ajustados na configuração
+        """
+        return bool(self._request_size or self._max_concurrent_requests or not self._prefetch)
+
+    def _stream_transfer(self, sftp: paramiko.SFTPClient, full_remote_path: str,
+                         partial_filepath: str, offset: int, remote_size: int):
+        """
+        Transfere o arquivo remoto a partir de ``offset`` com leituras em paralelo
+
+        Com prefetch, pedidos de leitura de ``request_size`` bytes são
+        enviados antes de as respostas chegarem, no máximo
+        ``max_concurrent_requests`` pendentes ao mesmo tempo. Assim a
+        latência do enlace não limita a vazão de arquivos grandes.
+        """
+        with sftp.open(full_remote_path, 'rb') as remote_file, \
+                open(partial_filepath, 'ab' if offset else 'wb') as local_file:
+            if self._request_size:
+                remote_file.MAX_REQUEST_SIZE = self._request_size
+            remote_file.seek(offset)
+            if self._prefetch:
+                remote_file.prefetch(remote_size, self._max_concurrent_requests or None)
+            for chunk in iter(lambda: remote_file.read(TRANSFER_CHUNK_SIZE), b''):
+                local_file.write(chunk)
+
+    def _download_file(self, sftp: paramiko.SFTPClient, remote_filepath: str, accession_no: str,
+                       expected_sha256: Optional[str] = None) -> str:
+        """
+        Baixa um único arquivo DICOM
+
+        O conteúdo é gravado em ``<accession_no>.dcm.part`` e só recebe o
+        nome final depois de conferido com o tamanho do arquivo remoto (e
+        com o SHA-256, quando informado). Se uma tentativa anterior deixou
+        um arquivo parcial, a transferência continua a partir dele.
+
+        Args:
+            sftp (paramiko.SFTPClient): Canal SFTP a ser utilizado
+            remote_filepath (str): Caminho relativo do arquivo no PACS
+            accession_no (str): Número de acesso do estudo
+            expected_sha256 (str, opcional): Hash esperado do conteúdo
+
+        Returns:
+            str: Caminho local do arquivo baixado
+
+        Raises:
+            IncompleteDownloadError: Se o arquivo recebido não confere com o remoto
+        """
+        # Caminho completo remoto
+        full_remote_path = self._remote_path(remote_filepath)
+
+        # Caminho local para salvar
+        local_filepath = self._local_path(accession_no)
+        partial_filepath = local_filepath + PARTIAL_SUFFIX
+
+        remote_stat = sftp.stat(full_remote_path)
+        remote_size = remote_stat.st_size
+        offset = self._partial_offset(partial_filepath, remote_size, getattr(remote_stat, 'st_mtime', None))
+
+        # Baixar arquivo
+        with metrics.timer('download') as measurement:
+            if offset:
+                self.logger.info(f"Retomando {remote_filepath} a partir do byte {offset}")
+            if offset or self._tuned_transfer():
+                self._stream_transfer(sftp, full_remote_path, partial_filepath, offset, remote_size)
+            else:
+                sftp.get(full_remote_path, partial_filepath)
+            measurement['bytes'] = os.path.getsize(partial_filepath) - offset
+
+        self._finish_download(partial_filepath, local_filepath, remote_size, expected_sha256)
+        self.logger.info(f"Arquivo baixado: {local_filepath}")
+
+        return local_filepath
+
+    def _retry_delay(self, attempt: int) -> float:
+        """
+        Espera antes da tentativa ``attempt`` + 1: backoff exponencial com
+        variação aleatória, para que downloads interrompidos juntos não
+        reconectem ao mesmo tempo
+        """
+        delay = min(self._retry_backoff * 2 ** attempt, self._retry_backoff_max)
+        return delay * random.uniform(0.5, 1.0)
+
+    def _download_with_retry(self, pool: _SFTPChannelPool, remote_filepath: str, accession_no: str,
+                             expected_sha256: Optional[str] = None) -> str:
+        """
+        Baixa um arquivo, tentando novamente após quedas de conexão e
+        transferências incompletas
+
+        Cada nova tentativa continua do ponto em que a anterior parou.
+
+        Args:
+            pool (_SFTPChannelPool): Pool de canais SFTP
+            remote_filepath (str): Caminho relativo do arquivo no PACS
+            accession_no (str): Número de acesso do estudo
+            expected_sha256 (str, opcional): Hash esperado do conteúdo
+
+        Returns:
+            str: Caminho local do arquivo baixado
+        """
+        attempt = 0
+        while True:
+            try:
+                with pool.channel() as sftp:
+                    return self._download_file(sftp, remote_filepath, accession_no, expected_sha256)
+            except _RETRYABLE_ERRORS as e:
+                if attempt >= self._retries:
+                    raise
+                delay = self._retry_delay(attempt)
+                attempt += 1
+                self.logger.warning(
+                    f"Falha ao baixar {remote_filepath}: {e}. "
+                    f"Tentativa {attempt} de {self._retries} em {delay:.1f}s"
+                )
+                time.sleep(delay)
+
+    def _remote_hash_candidates(self) -> List[str]:
+        """
+        Comandos de hash a tentar no servidor: o já descoberto ou todos
+        """
+        if self._remote_hash_command is None:
+            return list(REMOTE_SHA256_COMMANDS)
+        return [self._remote_hash_command] if self._remote_hash_command else []
+
+    def _remote_hash_result(self, command: str, exit_status: int, output: str) -> Tuple[Optional[str], bool]:
+        """
+        Interpreta a execução de um comando de hash no servidor
+
+        Memoriza o primeiro comando que funcionou e, se nenhum existe no
+        servidor, desativa o hash remoto para o restante da execução.
+
+        Returns:
+            Tuple[Optional[str], bool]: Hash em hexadecimal (ou None) e se o
+            próximo comando deve ser tentado
+        """
+        if exit_status == COMMAND_NOT_FOUND:
+            if command == REMOTE_SHA256_COMMANDS[-1] and self._remote_hash_command is None:
+                self._remote_hash_command = ''
+                self.logger.warning("Nenhum comando de SHA-256 disponível no servidor; hash remoto desativado")
+            return None, True
+
+        fields = output.split()
+        if exit_status == 0 and fields and len(fields[0]) == 64:
+            self._remote_hash_command = command
+            return fields[0].lower(), False
+        return None, False
+
+    def _remote_sha256(self, pool: _SFTPChannelPool, full_remote_path: str) -> Optional[str]:
+        """
+        Calcula o SHA-256 de um arquivo no próprio servidor, sem transferi-lo
+
+        O servidor lê o arquivo inteiro; por isso o hash remoto só é pedido
+        com ``verify_checksum`` ou quando a deduplicação tem um candidato
+        do mesmo tamanho. Os comandos de ``REMOTE_SHA256_COMMANDS`` são
+        tentados até um existir no servidor.
+
+        Args:
+            pool (_SFTPChannelPool): Pool com a conexão SSH
+            full_remote_path (str): Caminho completo do arquivo no servidor
+
+        Returns:
+            Optional[str]: Hash em hexadecimal ou None se não foi possível calcular
+        """
+        for command in self._remote_hash_candidates():
+            try:
+                _, stdout, _ = pool.exec_command(command.format(path=shlex.quote(full_remote_path)))
+                output = stdout.read().decode('utf-8', errors='replace')
+                sha256, try_next = self._remote_hash_result(command, stdout.channel.recv_exit_status(), output)
+            except Exception as e:
+                self.logger.debug(f"Hash remoto indisponível para {full_remote_path}: {e}")
+                return None
+            if not try_next:
+                return sha256
+        return None
+
+    def _download_deduplicated(self, pool: _SFTPChannelPool, remote_filepath: str,
+                               accession_no: str) -> Optional[str]:
+        """
+        Baixa um arquivo evitando transferir conteúdo já conhecido
+
+        Arquivos de tamanho nunca visto não podem ser duplicados: são
+        baixados direto, e o hash é calculado sobre a cópia local. Para os
+        demais, o hash é calculado no servidor. Se o mesmo conteúdo já
+        gerou um PDF armazenado, apenas uma referência a ele é registrada e
+        nada é baixado; se já existe uma cópia local, ela é reaproveitada
+        com um link. Caso contrário o arquivo é baixado normalmente.
+
+        Args:
+            pool (_SFTPChannelPool): Pool com a conexão SSH
+            remote_filepath (str): Caminho relativo do arquivo no PACS
+            accession_no (str): Número de acesso do estudo
+
+        Returns:
+            Optional[str]: Caminho local do arquivo, ou None se o estudo foi
+            resolvido por referência a um PDF já armazenado
+        """
+        local_filepath = self._local_path(accession_no)
+        full_remote_path = self._remote_path(remote_filepath)
+        with pool.channel() as sftp:
+            remote_size = sftp.stat(full_remote_path).st_size
+
+        sha256 = None
+        if self._cache.has_size(remote_size):
+            sha256 = self._remote_sha256(pool, full_remote_path)
+
+        if sha256 is None:
+            expected_sha256 = None
+            if self._verify_checksum:
+                expected_sha256 = self._remote_sha256(pool, full_remote_path)
+            local_filepath = self._download_with_retry(pool, remote_filepath, accession_no, expected_sha256)
+            self._cache.hash_file(local_filepath)
+            return local_filepath
+
+        with self._cache.content_lock(sha256):
+            entry = self._cache.lookup(sha256)
+
+            if entry and entry['pdf_filename']:
+                insert_pdf_reference(
+                    self.db_config, f'{accession_no}.pdf', sha256, entry['pdf_filename']
+                )
+                self.logger.info(
+                    f"{remote_filepath} é duplicado de {entry['pdf_filename']}, download ignorado"
+                )
+                return None
+
+            if entry and entry['dcm_path']:
+                if os.path.abspath(entry['dcm_path']) != os.path.abspath(local_filepath):
+                    if os.path.exists(local_filepath):
+                        os.remove(local_filepath)
+                    try:
+                        os.link(entry['dcm_path'], local_filepath)
+                    except OSError:
+                        shutil.copyfile(entry['dcm_path'], local_filepath)
+                self.logger.info(f"{remote_filepath} reaproveitado de {entry['dcm_path']}")
+            else:
+                expected_sha256 = sha256 if self._verify_checksum else None
+                self._download_with_retry(pool, remote_filepath, accession_no, expected_sha256)
+
+            self._cache.record_dicom(sha256, local_filepath)
+            return local_filepath
+
+    def _download_with_pool(self, pool: _SFTPChannelPool, remote_filepath: str, accession_no: str) -> Optional[str]:
+        """
+        Baixa um arquivo usando um canal emprestado do pool, isolando erros
+
+        Args:
+            pool (_SFTPChannelPool): Pool de canais SFTP
+            remote_filepath (str): Caminho relativo do arquivo no PACS
+            accession_no (str): Número de acesso do estudo
+
+        Returns:
+            Optional[str]: Caminho local do arquivo ou None em caso de erro
+        """
+        try:
+            self._reserve_disk(pool, remote_filepath, accession_no)
+            if self._cache is not None:
+                local_filepath = self._download_deduplicated(pool, remote_filepath, accession_no)
+            else:
+                expected_sha256 = None
+                if self._verify_checksum:
+                    expected_sha256 = self._remote_sha256(pool, self._remote_path(remote_filepath))
+                local_filepath = self._download_with_retry(
+                    pool, remote_filepath, accession_no, expected_sha256
+                )
+        except Exception as file_error:
+            self.logger.error(f"Erro ao baixar {remote_filepath}: {file_error}")
+            self._release_disk(accession_no)
+            self._report_to_queue(accession_no, file_error)
+            return None
+
+        if local_filepath is None:
+            self._release_disk(accession_no)
+
+        self._report_to_queue(accession_no)
+        return local_filepath
+
+    def _reserve_disk(self, pool: _SFTPChannelPool, remote_filepath: str, accession_no: str):
+        """
+        Reserva no orçamento de disco, quando ativo, o tamanho do arquivo a baixar
+
+        Bloqueia enquanto o orçamento estiver esgotado; a reserva é liberada
+        por quem consome o arquivo, depois de armazená-lo.
+        """
+        if self._budget is None:
+            return
+
+        with pool.channel() as sftp:
+            size = sftp.stat(self._remote_path(remote_filepath)).st_size or 0
+        self._budget.acquire(self._local_path(accession_no), disk=size)
+
+    def _release_disk(self, accession_no: str):
+        """
+        Libera a reserva de disco de um arquivo que não foi baixado
+        """
+        if self._budget is not None:
+            self._budget.release(self._local_path(accession_no))
+
+    def _load_transfer_settings(self):
+        """
+        Lê da seção ``[ssh]`` as novas tentativas (``retries``,
+        ``retry_backoff``, ``retry_backoff_max``), a conferência por hash
+        (``verify_checksum``) e os ajustes de transferência (``compress``,
+        ``window_size``, ``max_packet_size``, ``request_size``,
+        ``max_concurrent_requests``, ``prefetch``)
+        """
+        self._retries = max(0, self.config.get_int('ssh', 'retries', 3))
+        self._retry_backoff = max(0.0, self.config.get_float('ssh', 'retry_backoff', 1.0))
+        self._retry_backoff_max = max(0.0, self.config.get_float('ssh', 'retry_backoff_max', 60.0))
+        self._verify_checksum = self.config.get_bool('ssh', 'verify_checksum', False)
+
+        self._compress = self.config.get_bool('ssh', 'compress', False)
+        self._window_size = max(0, self.config.get_int('ssh', 'window_size', 0))
+        self._max_packet_size = max(0, self.config.get_int('ssh', 'max_packet_size', 0))
+        self._request_size = max(0, self.config.get_int('ssh', 'request_size', 0))
+        self._max_concurrent_requests = max(0, self.config.get_int('ssh', 'max_concurrent_requests', 0))
+        self._prefetch = self.config.get_bool('ssh', 'prefetch', True)
+
+    def _known_hosts_path(self) -> str:
+        """
+        Arquivo de chaves conhecidas dos servidores: ``[ssh] known_hosts``
+        ou, se não configurado, o ``~/.ssh/known_hosts`` do usuário
+
+        Returns:
+            str: Caminho do arquivo, que pode não existir
+        """
+        known_hosts = self.config.get('ssh', 'known_hosts', '') or os.path.join('~', '.ssh', 'known_hosts')
+        return os.path.expanduser(known_hosts)
+
+    def _create_channel_pool(self) -> _SFTPChannelPool:
+        """
+        Conecta ao servidor e cria o pool de canais com os ajustes de transferência
+        """
+        return _SFTPChannelPool(
+            self._connect_ssh(), self._connect_ssh, self._window_size, self._max_packet_size
+        )
+
+    @contextmanager
+    def _download_session(self) -> Iterator[None]:
+        """
+        Ativa, durante o bloco ``with``, o cache de conteúdo, a política de
+        prioridade e a fila de trabalho compartilhada, quando configurados,
+        e os ajustes de transferência da seção ``[ssh]``
+        """
+        self._load_transfer_settings()
+
+        self._cache = open_content_cache(self.config, self.download_directory)
+        self._priority = PriorityPolicy.from_config(self.config)
+        self._work_queue = StudyWorkQueue.from_config(self.config, self.db_config)
+
+        try:
+            yield
+        finally:
+            self._work_queue = None
+            self._priority = None
+            if self._cache is not None:
+                self._cache.close()
+                self._cache = None
+
+    @contextmanager
+    def _channel_pool(self) -> Iterator[_SFTPChannelPool]:
+        """
+        Abre a conexão SSH, um pool de canais SFTP sobre ela e, quando
+        ativos, o cache de conteúdo e a fila de trabalho compartilhada
+
+        Yields:
+            _SFTPChannelPool: Pool de canais SFTP, fechado ao final
+        """
+        with self._download_session():
+            pool = self._create_channel_pool()
+            try:
+                yield pool
+            finally:
+                pool.close()
+                pool.ssh.close()
+
+    def iter_download_dcm_files(self, limit: Optional[int] = 10, workers: Optional[int] = None) -> Iterator[str]:
+        """
+        Baixa arquivos DICOM entregando cada caminho assim que o download termina
+
+        No máximo ``workers`` downloads ficam em andamento: enquanto o
+        consumidor não pede o próximo arquivo, novos downloads não são
+        iniciados, o que permite limitar o uso de disco por quem consome.
+        A listagem de estudos também é lida sob demanda.
+
+        Args:
+            limit (int, opcional): Limite de arquivos. Padrão 10; None
+                percorre todos os estudos pendentes.
+            workers (int, opcional): Número de downloads simultâneos.
+                Padrão: chave ``workers`` da seção ``[ssh]`` (ou 1).
+
+        Yields:
+            str: Caminho local de cada arquivo baixado, em ordem de conclusão
+        """
+        workers = self._resolve_workers(workers)
+
+        with self._channel_pool() as pool:
+            pending_files = self._iter_dcm_files_to_download(limit)
+
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                in_flight = set()
+
+                def submit_next() -> bool:
+                    item = next(pending_files, None)
+                    if item is None:
+                        return False
+                    in_flight.add(executor.submit(self._download_with_pool, pool, *item))
+                    return True
+
+                for _ in range(workers):
+                    if not submit_next():
+                        break
+
+                while in_flight:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        in_flight.discard(future)
+                        local_filepath = future.result()
+                        if local_filepath:
+                            yield local_filepath
+                        submit_next()
+
+    def download_dcm_files(self, limit: int = 10, workers: Optional[int] = None) -> List[str]:
         """
         Realiza download de arquivos DICOM
 
+        Com mais de um worker, os arquivos são baixados em paralelo por
+        canais SFTP independentes abertos sobre a mesma conexão SSH.
+
         Args:
             limit (int, opcional): Limite de arquivos. Padrão 10.
+            workers (int, opcional): Número de downloads simultâneos.
+                Padrão: chave ``workers`` da seção ``[ssh]`` (ou 1).
 
         Returns:
             List[str]: Caminhos dos arquivos baixados
         """
-        ssh = self._connect_ssh()
+        workers = self._resolve_workers(workers)
         downloaded_files = []
 
-        try:
-            # Obter lista de arquivos para download
-            files_to_download = self._get_dcm_files_to_download(limit)
-            
-            # Iniciar transferência SFTP
-            sftp = ssh.open_sftp()
-
-            for remote_filepath, accession_no in files_to_download:
-                try:
-                    # Caminho completo remoto
-                    full_remote_path = f'/union/pacs-data/archive/{remote_filepath}'
-                    
-                    # Caminho local para salvar
-                    local_filepath = os.path.join(
-                        self.download_directory, 
-                        f'{accession_no}.dcm'
+        with self._channel_pool() as pool:
+            try:
+                # Obter lista de arquivos para download
+                files_to_download = self._get_dcm_files_to_download(limit)
+
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    results = executor.map(
+                        lambda item: self._download_with_pool(pool, *item),
+                        files_to_download
                     )
-                    
-                    # Baixar arquivo
-                    sftp.get(full_remote_path, local_filepath)
-                    downloaded_files.append(local_filepath)
-                    
-                    self.logger.info(f"Arquivo baixado: {local_filepath}")
-                
-                except Exception as file_error:
-                    self.logger.error(f"Erro ao baixar {remote_filepath}: {file_error}")
-            
-            sftp.close()
-        
-        except Exception as e:
-            self.logger.error(f"Erro durante download de DCM: {e}")
-        
-        finally:
-            ssh.close()
-        
-        return downloaded_files
\ No newline at end of file
+                    downloaded_files = [path for path in results if path]
+
+            except Exception as e:
+                self.logger.error(f"Erro durante download de DCM: {e}")
+
+        return downloaded_files
@@ -0,0 +1,207 @@
+import os
+import logging
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Dict, Optional, Tuple
+from convert_dcm2pdf.core.dcm_downloader import DCMDownloader
+from convert_dcm2pdf.core.dcm_converter import DCMConverter
+from convert_dcm2pdf.database.conversion_jobs import ConversionJob, ConversionJobQueue
+from convert_dcm2pdf.utils.exceptions import ConversionError
+from convert_dcm2pdf.utils.metrics import report_run, start_run
+
+
+class DistributedWorker:
+    """
+    Worker de conversão coordenado pela fila ``dicom_files`` do PostgreSQL
+
+    Vários workers, em máquinas diferentes, arrendam arquivos da mesma
+    fila. Cada arquivo arrendado é baixado, convertido e armazenado, e o
+    resultado é registrado em ``conversion_log``. Uma thread envia
+    batimentos periódicos que mantêm os arrendamentos válidos; se o worker
+    morrer, seus arquivos voltam para a fila quando o arrendamento vencer.
+    """
+    def __init__(self, config_manager, downloader: Optional[DCMDownloader] = None,
+                 converter: Optional[DCMConverter] = None, job_queue: Optional[ConversionJobQueue] = None):
+        """
+        Inicializa o worker
+
+        Args:
+            config_manager (ConfigManager): Gerenciador de configurações
+            downloader (DCMDownloader, opcional): Downloader a ser utilizado
+            converter (DCMConverter, opcional): Conversor a ser utilizado
+            job_queue (ConversionJobQueue, opcional): Fila de conversões.
+                Padrão: criada a partir da seção ``[distributed]``.
+        """
+        self.logger = logging.getLogger(__name__)
+        self.config = config_manager
+        self.downloader = downloader or DCMDownloader(config_manager)
+        self.converter = converter or DCMConverter(config_manager)
+        self.queue = job_queue or ConversionJobQueue.from_config(config_manager, self.downloader.db_config)
+
+        self.workers = self.converter._resolve_workers(config_manager.get_int('distributed', 'workers', 0) or None)
+        self.batch_size = config_manager.get_int('distributed', 'batch_size', 0) or self.workers
+        self.heartbeat_interval = max(
+            0.1, config_manager.get_float('distributed', 'heartbeat_interval', self.queue.lease_timeout / 3)
+        )
+        self.poll_interval = max(0.1, config_manager.get_float('distributed', 'poll_interval', 5.0))
+        self.cleanup = config_manager.get_bool('distributed', 'cleanup', False)
+
+        self._stop = threading.Event()
+
+    def stop(self):
+        """
+        Pede o encerramento: nenhum arquivo novo é arrendado e os que estão
+        em andamento terminam normalmente
+        """
+        self._stop.set()
+
+    def _heartbeat_loop(self, finished: threading.Event):
+        """
+        Envia batimentos até ``finished`` ser sinalizado
+        """
+        while not finished.wait(self.heartbeat_interval):
+            try:
+                self.queue.heartbeat()
+            except Exception as e:
+                self.logger.warning(f"Falha ao enviar batimento do worker {self.queue.worker_id}: {e}")
+
+    def _remove_local_files(self, *paths: Optional[str]):
+        """
+        Apaga o DICOM baixado e o PDF gerado depois de armazenados
+        """
+        for path in paths:
+            if not path:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                self.logger.warning(f"Não foi possível remover {path}: {e}")
+
+    def _process_job(self, pool, job: ConversionJob) -> str:
+        """
+        Baixa, converte e armazena um arquivo arrendado
+
+        Args:
+            pool (_SFTPChannelPool): Pool de canais SFTP
+            job (ConversionJob): Arquivo arrendado
+
+        Returns:
+            str: Caminho do PDF gerado
+
+        Raises:
+            ConversionError: Se nenhum PDF for gerado
+        """
+        accession_no = os.path.splitext(job.filename)[0]
+        dcm_filepath = self.downloader._download_with_retry(pool, job.filepath, accession_no)
+
+        pdf_path = self.converter._process_dcm_file(dcm_filepath)
+        if not pdf_path:
+            raise ConversionError(f"Nenhum PDF gerado para {job.filename}")
+
+        if self.cleanup:
+            # Com a deduplicação, o PDF pode ser o de outro arquivo, ainda em uso
+            own_pdf = pdf_path if pdf_path == self.converter._pdf_path(dcm_filepath) else None
+            self._remove_local_files(dcm_filepath, own_pdf)
+        return pdf_path
+
+    def _record_result(self, job: ConversionJob, future: Future) -> bool:
+        """
+        Registra na fila o resultado de um arquivo processado
+
+        Returns:
+            bool: True se o arquivo foi convertido
+        """
+        error = future.exception()
+        try:
+            if error is None:
+                self.queue.complete(job, future.result())
+                print(f"Convertido com sucesso: {job.filename}")
+            else:
+                self.queue.fail(job, str(error))
+                print(f"Erro ao processar {job.filename}: {error}")
+        except Exception as e:
+            # O arrendamento vence e outro worker reprocessa o arquivo
+            self.logger.error(f"Não foi possível registrar o resultado de {job.filename}: {e}")
+        return error is None
+
+    def _lease(self, limit: int):
+        """
+        Arrenda até ``limit`` arquivos; falhas de banco não encerram o worker
+        """
+        try:
+            return self.queue.lease(min(limit, self.batch_size))
+        except Exception as e:
+            self.logger.error(f"Erro ao arrendar arquivos: {e}")
+            return []
+
+    def run(self, max_jobs: Optional[int] = None, exit_when_idle: bool = False) -> Tuple[int, int]:
+        """
+        Processa arquivos da fila até ``stop()`` ser chamado
+
+        Args:
+            max_jobs (int, opcional): Encerra após processar este número de
+                arquivos. Padrão: sem limite.
+            exit_when_idle (bool, opcional): Encerra quando a fila estiver
+                vazia, em vez de aguardar novos arquivos. Padrão False.
+
+        Returns:
+            Tuple[int, int]: Arquivos convertidos e arquivos com falha
+        """
+        converted = failed = leased = 0
+        in_flight: Dict[Future, ConversionJob] = {}
+
+        start_run(self.config)
+        self.queue.register()
+        finished = threading.Event()
+        heartbeat = threading.Thread(
+            target=self._heartbeat_loop, args=(finished,), name='worker-heartbeat', daemon=True
+        )
+        heartbeat.start()
+        self.logger.info(f"Worker {self.queue.worker_id} iniciado com {self.workers} conversões simultâneas")
+
+        try:
+            with self.downloader._channel_pool() as pool, self.converter._content_cache(), \
+                    self.converter._conversion_backend(), \
+                    ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='worker') as executor:
+                while not self._stop.is_set():
+                    free = self.workers - len(in_flight)
+                    if max_jobs is not None:
+                        free = min(free, max_jobs - leased)
+
+                    jobs = self._lease(free) if free > 0 else []
+                    leased += len(jobs)
+                    for job in jobs:
+                        in_flight[executor.submit(self._process_job, pool, job)] = job
+
+                    if not in_flight:
+                        if exit_when_idle or (max_jobs is not None and leased >= max_jobs):
+                            break
+                        self._stop.wait(self.poll_interval)
+                        continue
+
+                    done, _ = wait(in_flight, timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        if self._record_result(in_flight.pop(future), future):
+                            converted += 1
+                        else:
+                            failed += 1
+
+                # Encerramento: os arquivos em andamento terminam e são registrados
+                for future in list(in_flight):
+                    if self._record_result(in_flight.pop(future), future):
+                        converted += 1
+                    else:
+                        failed += 1
+        finally:
+            finished.set()
+            heartbeat.join()
+            try:
+                self.queue.release(in_flight.values())
+                self.queue.unregister()
+            except Exception as e:
+                self.logger.error(f"Erro ao encerrar o worker {self.queue.worker_id}: {e}")
+
+        report_run(self.config, converted + failed, converted, failed)
+        return converted, failed
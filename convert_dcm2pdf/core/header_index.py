@@ -0,0 +1,300 @@
+import os
+import time
+import sqlite3
+import logging
+import threading
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+from convert_dcm2pdf.utils.dicom_header import read_header_fields
+from convert_dcm2pdf.utils.exceptions import DicomConverterError
+from convert_dcm2pdf.utils.paths import iter_entries
+
+# Registros gravados por transação durante uma varredura
+_WRITE_BATCH = 1000
+
+
+class HeaderRecord(NamedTuple):
+    """
+    Campos de cabeçalho indexados de um arquivo DICOM
+    """
+    path: str
+    size: int
+    mtime_ns: int
+    sop_class_uid: Optional[str]
+    transfer_syntax_uid: Optional[str]
+    modality: Optional[str]
+    patient_id: Optional[str]
+    study_uid: Optional[str]
+    accession_no: Optional[str]
+    study_date: Optional[str]
+    frames: Optional[int]
+    error: Optional[str]
+
+
+def _directory_range(directory: str) -> Tuple[str, str]:
+    """
+    Intervalo de chaves que contém os caminhos dentro de um diretório
+    """
+    prefix = os.path.join(os.path.abspath(directory), '')
+    return prefix, prefix + '\uffff'
+
+
+_COLUMNS = ', '.join(HeaderRecord._fields)
+_PLACEHOLDERS = ', '.join('?' for _ in HeaderRecord._fields)
+
+
+class DicomHeaderIndex:
+    """
+    Índice persistente dos cabeçalhos dos arquivos DICOM de um diretório
+
+    Cada arquivo é lido uma única vez, apenas até os campos indexados; o
+    registro vale enquanto tamanho e data de modificação não mudarem.
+    ``refresh`` compara o diretório com o índice usando só os metadados
+    retornados por ``os.scandir`` e lê apenas arquivos novos ou alterados,
+    de forma que revarreduras de diretórios grandes não abrem nenhum
+    arquivo. Arquivos que não puderam ser lidos ficam registrados com o
+    erro, para não serem relidos a cada varredura.
+    """
+    def __init__(self, index_path: str):
+        """
+        Abre (ou cria) o índice
+
+        Args:
+            index_path (str): Caminho do arquivo SQLite do índice
+        """
+        self.logger = logging.getLogger(__name__)
+        self.index_path = index_path
+
+        directory = os.path.dirname(os.path.abspath(index_path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(index_path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS dicom_headers (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                sop_class_uid TEXT,
+                transfer_syntax_uid TEXT,
+                modality TEXT,
+                patient_id TEXT,
+                study_uid TEXT,
+                accession_no TEXT,
+                study_date TEXT,
+                frames INTEGER,
+                error TEXT
+            )
+            """
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS idx_dicom_headers_modality ON dicom_headers (modality)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS idx_dicom_headers_sop_class ON dicom_headers (sop_class_uid)"
+        )
+        self._connection.commit()
+
+    @staticmethod
+    def _key(path: str) -> str:
+        """
+        Normaliza o caminho usado como chave
+        """
+        return os.path.abspath(path)
+
+    @staticmethod
+    def _parse(path: str, size: int, mtime_ns: int) -> HeaderRecord:
+        """
+        Lê o cabeçalho de um arquivo e monta seu registro
+        """
+        try:
+            fields = read_header_fields(path)
+            error = None
+        except (OSError, DicomConverterError) as e:
+            fields = {}
+            error = str(e) or type(e).__name__
+
+        return HeaderRecord(
+            path, size, mtime_ns,
+            fields.get('sop_class_uid'), fields.get('transfer_syntax_uid'), fields.get('modality'),
+            fields.get('patient_id'), fields.get('study_uid'), fields.get('accession_no'),
+            fields.get('study_date'), fields.get('frames'), error
+        )
+
+    def _write(self, records: List[HeaderRecord]):
+        with self._lock:
+            self._connection.executemany(
+                f"INSERT OR REPLACE INTO dicom_headers ({_COLUMNS}) VALUES ({_PLACEHOLDERS})",
+                records
+            )
+            self._connection.commit()
+
+    def _indexed_states(self, directory: str) -> Dict[str, Tuple[int, int]]:
+        """
+        Tamanho e data de modificação registrados para os arquivos de um diretório
+        e de seus subdiretórios
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT path, size, mtime_ns FROM dicom_headers WHERE path >= ? AND path < ?",
+                _directory_range(directory)
+            ).fetchall()
+        return {path: (size, mtime_ns) for path, size, mtime_ns in rows}
+
+    def refresh(self, directory: str, suffix: str = '.dcm') -> Tuple[int, int]:
+        """
+        Atualiza o índice com o conteúdo atual de um diretório e de seus
+        subdiretórios (layout particionado, ver ``utils.paths``)
+
+        Args:
+            directory (str): Diretório dos arquivos DICOM
+            suffix (str, opcional): Extensão dos arquivos indexados. Padrão ``.dcm``.
+
+        Returns:
+            Tuple[int, int]: Arquivos lidos (novos ou alterados) e registros
+            removidos de arquivos que não existem mais
+        """
+        started = time.perf_counter()
+        known = self._indexed_states(directory)
+        seen = set()
+        pending = []
+        parsed = 0
+
+        for entry in iter_entries(directory, suffix):
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+
+            path = self._key(entry.path)
+            seen.add(path)
+            if known.get(path) == (stat.st_size, stat.st_mtime_ns):
+                continue
+
+            pending.append(self._parse(path, stat.st_size, stat.st_mtime_ns))
+            parsed += 1
+            if len(pending) >= _WRITE_BATCH:
+                self._write(pending)
+                pending = []
+
+        if pending:
+            self._write(pending)
+
+        removed = [(path,) for path in known.keys() - seen]
+        if removed:
+            with self._lock:
+                self._connection.executemany("DELETE FROM dicom_headers WHERE path = ?", removed)
+                self._connection.commit()
+
+        self.logger.info(
+            f"Índice de cabeçalhos de {directory}: {len(seen)} arquivos, {parsed} lidos, "
+            f"{len(removed)} removidos em {time.perf_counter() - started:.2f}s"
+        )
+        return parsed, len(removed)
+
+    def update(self, path: str) -> Optional[HeaderRecord]:
+        """
+        Indexa um único arquivo, se ele for novo ou tiver mudado
+
+        Args:
+            path (str): Caminho do arquivo DICOM
+
+        Returns:
+            Optional[HeaderRecord]: Registro atual ou None se o arquivo não existe
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+
+        record = self.get(path)
+        if record is not None and (record.size, record.mtime_ns) == (stat.st_size, stat.st_mtime_ns):
+            return record
+
+        record = self._parse(self._key(path), stat.st_size, stat.st_mtime_ns)
+        self._write([record])
+        return record
+
+    def get(self, path: str) -> Optional[HeaderRecord]:
+        """
+        Registro de um arquivo, como gravado na última indexação
+
+        Args:
+            path (str): Caminho do arquivo DICOM
+
+        Returns:
+            Optional[HeaderRecord]: Registro ou None se o arquivo não foi indexado
+        """
+        with self._lock:
+            row = self._connection.execute(
+                f"SELECT {_COLUMNS} FROM dicom_headers WHERE path = ?", (self._key(path),)
+            ).fetchone()
+        return HeaderRecord(*row) if row else None
+
+    def records(self, directory: Optional[str] = None, modalities: Optional[List[str]] = None,
+                sop_classes: Optional[List[str]] = None) -> Iterator[HeaderRecord]:
+        """
+        Percorre os registros do índice, opcionalmente filtrados
+
+        Args:
+            directory (str, opcional): Apenas arquivos deste diretório e de
+                seus subdiretórios
+            modalities (List[str], opcional): Apenas estas modalidades
+            sop_classes (List[str], opcional): Apenas estas SOP classes
+
+        Yields:
+            HeaderRecord: Registros em ordem de caminho
+        """
+        conditions = []
+        params = []
+        if directory is not None:
+            conditions.append("path >= ? AND path < ?")
+            params += list(_directory_range(directory))
+        if modalities:
+            conditions.append(f"UPPER(modality) IN ({', '.join('?' for _ in modalities)})")
+            params += [modality.upper() for modality in modalities]
+        if sop_classes:
+            conditions.append(f"sop_class_uid IN ({', '.join('?' for _ in sop_classes)})")
+            params += list(sop_classes)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT {_COLUMNS} FROM dicom_headers {where} ORDER BY path", params
+            ).fetchall()
+
+        for row in rows:
+            yield HeaderRecord(*row)
+
+    def close(self):
+        """
+        Fecha o índice
+        """
+        with self._lock:
+            self._connection.close()
+
+
+def open_header_index(config_manager, download_directory: str) -> Optional[DicomHeaderIndex]:
+    """
+    Abre o índice de cabeçalhos se ele estiver ativo
+
+    Usa as chaves ``header_index`` e ``header_index_path`` da seção
+    ``[dcm]``; o caminho padrão é ``.header_index.sqlite3`` no diretório
+    de download.
+
+    Args:
+        config_manager (ConfigManager): Gerenciador de configurações
+        download_directory (str): Diretório de download dos DICOMs
+
+    Returns:
+        Optional[DicomHeaderIndex]: Índice aberto ou None se desativado
+    """
+    if not config_manager.get_bool('dcm', 'header_index', False):
+        return None
+
+    index_path = config_manager.get('dcm', 'header_index_path', None) or os.path.join(
+        download_directory, '.header_index.sqlite3'
+    )
+    return DicomHeaderIndex(index_path)
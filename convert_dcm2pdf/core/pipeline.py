@@ -0,0 +1,291 @@
+import os
+import math
+import logging
+import threading
+from typing import List, Optional, Tuple
+from convert_dcm2pdf.core.dcm_downloader import DCMDownloader
+from convert_dcm2pdf.core.dcm_converter import DCMConverter
+from convert_dcm2pdf.utils.priority import DeadlineQueue, PriorityPolicy
+from convert_dcm2pdf.core.resource_budget import ResourceBudget
+from convert_dcm2pdf.utils.metrics import report_run, start_run
+
+# Marcador de fim de fluxo entre os estágios
+_END = object()
+
+
+class DCMPipeline:
+    """
+    Pipeline contínuo de download, conversão e armazenamento de arquivos DICOM
+
+    Cada arquivo segue para a conversão assim que o download termina e cada
+    PDF segue para o banco assim que é gerado. Filas limitadas entre os
+    estágios controlam quantos arquivos ficam acumulados em disco e memória.
+
+    Com a seção ``[priority]`` ativa, as filas entregam primeiro o arquivo
+    de prazo mais próximo, de forma que estudos urgentes passam à frente
+    na conversão e no armazenamento.
+    """
+    def __init__(self, config_manager, downloader: Optional[DCMDownloader] = None,
+                 converter: Optional[DCMConverter] = None):
+        """
+        Inicializa o pipeline
+
+        Args:
+            config_manager (ConfigManager): Gerenciador de configurações
+            downloader (DCMDownloader, opcional): Downloader a ser utilizado
+            converter (DCMConverter, opcional): Conversor a ser utilizado
+        """
+        self.logger = logging.getLogger(__name__)
+        self.config = config_manager
+        self.downloader = downloader or DCMDownloader(config_manager)
+        self.converter = converter or DCMConverter(config_manager)
+
+        # Orçamento de recursos, limpeza de intermediários e política de
+        # prioridade, ativos durante run()
+        self._budget = None
+        self._cleanup = False
+        self._priority = None
+
+    def _deadline(self, dcm_filepath: str) -> float:
+        """
+        Prazo de um arquivo baixado; sem política de prioridade, a ordem é a de chegada
+        """
+        if self._priority is None:
+            return math.inf
+        return self._priority.file_deadline(dcm_filepath)
+
+    def _reserve_memory(self, dcm_filepath: str):
+        """
+        Reserva, no orçamento de memória, o tamanho do DICOM antes de convertê-lo
+        """
+        if self._budget is not None:
+            self._budget.acquire(dcm_filepath, memory=os.path.getsize(dcm_filepath))
+
+    def _release(self, dcm_filepath: str, resources: Optional[List[str]] = None):
+        """
+        Libera as reservas de um arquivo no orçamento, se ativo
+        """
+        if self._budget is not None:
+            self._budget.release(dcm_filepath, resources)
+
+    def _on_stored(self, dcm_filepath: str, pdf_path: Optional[str]):
+        """
+        Chamado pelo conversor quando um arquivo termina de ser armazenado
+
+        Com ``[pipeline] cleanup`` ativo, apaga o DICOM baixado e o PDF
+        gerado para ele; em seguida libera suas reservas no orçamento.
+        """
+        if self._cleanup:
+            for path in (dcm_filepath, pdf_path):
+                if not path:
+                    continue
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    self.logger.warning(f"Não foi possível remover {path}: {e}")
+
+        self._release(dcm_filepath)
+
+    def _on_store_failed(self, dcm_filepath: str, pdf_path: str):
+        """
+        Chamado pelo conversor quando o lote rejeita o PDF de um arquivo
+
+        Só libera as reservas: o DICOM e o PDF são mantidos em disco, pois
+        o estudo pode já ter sido marcado como concluído na fila de download.
+        """
+        self._release(dcm_filepath)
+
+    def _download_stage(self, convert_queue: DeadlineQueue, limit: Optional[int],
+                        workers: Optional[int], convert_workers: int, errors: list):
+        """
+        Estágio de download: publica cada arquivo baixado na fila de conversão
+        """
+        try:
+            for dcm_filepath in self.downloader.iter_download_dcm_files(limit, workers):
+                deadline = self._deadline(dcm_filepath)
+                convert_queue.put((dcm_filepath, deadline), deadline)
+        except Exception as e:
+            self.logger.error(f"Erro no estágio de download: {e}")
+            errors.append(e)
+        finally:
+            for _ in range(convert_workers):
+                convert_queue.put(_END)
+
+    def _convert_stage(self, convert_queue: DeadlineQueue, store_queue: DeadlineQueue,
+                       error_files: List[str], remaining: List[int], lock: threading.Lock):
+        """
+        Estágio de conversão: converte arquivos e publica os PDFs na fila de armazenamento
+        """
+        try:
+            while True:
+                item = convert_queue.get()
+                if item is _END:
+                    break
+                dcm_filepath, deadline = item
+
+                if not self.converter._should_convert(dcm_filepath):
+                    self.logger.info(f"Arquivo já convertido ignorado: {dcm_filepath}")
+                    self._release(dcm_filepath)
+                    continue
+
+                try:
+                    if self.converter._cache is not None:
+                        # Com a deduplicação ativa, consulta ao cache, conversão e
+                        # armazenamento acontecem sob o lock do conteúdo, para que
+                        # dois arquivos idênticos em andamento não sejam ambos convertidos
+                        self._reserve_memory(dcm_filepath)
+                        try:
+                            pdf_path = self.converter._process_dcm_file(dcm_filepath)
+                        finally:
+                            self._release(dcm_filepath, ['memory'])
+
+                        if pdf_path:
+                            store_queue.put((dcm_filepath, pdf_path, True), deadline)
+                        continue
+
+                    self._reserve_memory(dcm_filepath)
+                    try:
+                        pdf_path = self.converter._convert_dcm_to_pdf(dcm_filepath)
+                    finally:
+                        self._release(dcm_filepath, ['memory'])
+
+                    if pdf_path:
+                        if self._budget is not None:
+                            self._budget.charge(dcm_filepath, disk=os.path.getsize(pdf_path))
+                        store_queue.put((dcm_filepath, pdf_path, False), deadline)
+                except Exception as e:
+                    self._release(dcm_filepath)
+                    with lock:
+                        error_files.append(dcm_filepath)
+                    print(f"Erro ao processar {os.path.basename(dcm_filepath)}: {e}")
+        finally:
+            # O último conversor a terminar encerra o estágio de armazenamento
+            with lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                store_queue.put(_END)
+
+    def _store_stage(self, store_queue: DeadlineQueue, converted_pdfs: List[str],
+                     error_files: List[str], pdf_sources: dict, lock: threading.Lock):
+        """
+        Estágio de armazenamento: salva cada PDF gerado no banco de dados
+        """
+        while True:
+            item = store_queue.get()
+            if item is _END:
+                break
+
+            dcm_filepath, pdf_path, already_stored = item
+            try:
+                if not already_stored:
+                    self.converter._store_pdf(pdf_path, dcm_filepath)
+                converted_pdfs.append(pdf_path)
+                pdf_sources[pdf_path] = dcm_filepath
+                print(f"Convertido com sucesso: {os.path.basename(dcm_filepath)}")
+            except Exception as e:
+                self._release(dcm_filepath)
+                with lock:
+                    error_files.append(dcm_filepath)
+                print(f"Erro ao processar {os.path.basename(dcm_filepath)}: {e}")
+
+    def run(self, limit: Optional[int] = 10, download_workers: Optional[int] = None,
+            convert_workers: Optional[int] = None,
+            queue_size: Optional[int] = None, force: bool = False) -> Tuple[List[str], List[str]]:
+        """
+        Executa o pipeline completo até esgotar os arquivos a baixar
+
+        Args:
+            limit (int, opcional): Limite de arquivos a baixar. Padrão 10;
+                None processa todos os estudos pendentes.
+            download_workers (int, opcional): Downloads simultâneos.
+                Padrão: chave ``workers`` da seção ``[ssh]``.
+            convert_workers (int, opcional): Conversões simultâneas.
+                Padrão: chave ``workers`` da seção ``[dcm]``.
+            queue_size (int, opcional): Capacidade de cada fila entre estágios.
+                Padrão: chave ``queue_size`` da seção ``[pipeline]`` ou o
+                dobro do número de conversores.
+            force (bool, opcional): Converte todos os arquivos, ignorando o
+                índice incremental. Padrão False.
+
+        Returns:
+            Tuple[List[str], List[str]]: Lista de PDFs armazenados e lista de arquivos com erro
+
+        Raises:
+            DownloadError: Se o estágio de download falhar por completo
+        """
+        convert_workers = self.converter._resolve_workers(convert_workers)
+        if queue_size is None:
+            queue_size = self.config.get_int('pipeline', 'queue_size', 2 * convert_workers)
+        queue_size = max(1, int(queue_size))
+
+        convert_queue = DeadlineQueue(maxsize=queue_size)
+        store_queue = DeadlineQueue(maxsize=queue_size)
+
+        converted_pdfs = []
+        error_files = []
+        pdf_sources = {}
+        download_errors = []
+        remaining = [convert_workers]
+        lock = threading.Lock()
+
+        self.logger.info(
+            f"Iniciando pipeline: {convert_workers} conversor(es), filas de {queue_size} itens"
+        )
+
+        threads = [
+            threading.Thread(
+                target=self._download_stage,
+                args=(convert_queue, limit, download_workers, convert_workers, download_errors),
+                name='pipeline-download'
+            ),
+            threading.Thread(
+                target=self._store_stage,
+                args=(store_queue, converted_pdfs, error_files, pdf_sources, lock),
+                name='pipeline-store'
+            )
+        ]
+        threads += [
+            threading.Thread(
+                target=self._convert_stage,
+                args=(convert_queue, store_queue, error_files, remaining, lock),
+                name=f'pipeline-convert-{i}'
+            )
+            for i in range(convert_workers)
+        ]
+
+        start_run(self.config)
+        self._budget = ResourceBudget.from_config(self.config)
+        self._cleanup = self.config.get_bool('pipeline', 'cleanup', False)
+        self._priority = PriorityPolicy.from_config(self.config)
+        self.downloader._budget = self._budget
+        self.converter._on_stored = self._on_stored
+        self.converter._on_store_failed = self._on_store_failed
+
+        try:
+            with self.converter._incremental_index(force), self.converter._content_cache(), \
+                    self.converter._conversion_backend(), self.converter._batch_storage() as writer:
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+        finally:
+            self.downloader._budget = None
+            self.converter._on_stored = None
+            self.converter._on_store_failed = None
+            self._budget = None
+            self._priority = None
+
+        self.converter._apply_storage_failures(writer, converted_pdfs, error_files, pdf_sources)
+
+        # Resumo final, exportado também como métricas
+        report_run(
+            self.config, len(converted_pdfs) + len(error_files), len(converted_pdfs), len(error_files)
+        )
+
+        if download_errors:
+            raise download_errors[0]
+
+        return converted_pdfs, error_files
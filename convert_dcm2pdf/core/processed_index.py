@@ -0,0 +1,120 @@
+import os
+import time
+import sqlite3
+import logging
+import threading
+from typing import Optional
+
+
+class ProcessedFileIndex:
+    """
+    Índice persistente de arquivos DICOM já convertidos e armazenados
+
+    Cada arquivo é identificado pelo caminho, tamanho e data de modificação.
+    Um arquivo substituído ou alterado deixa de coincidir com o registro e
+    volta a ser convertido. O índice é gravado em um banco SQLite local e
+    pode ser usado por várias threads.
+    """
+    def __init__(self, index_path: str):
+        """
+        Abre (ou cria) o índice
+
+        Args:
+            index_path (str): Caminho do arquivo SQLite do índice
+        """
+        self.logger = logging.getLogger(__name__)
+        self.index_path = index_path
+
+        directory = os.path.dirname(os.path.abspath(index_path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(index_path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS processed_files (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                pdf_path TEXT,
+                processed_at REAL NOT NULL
+            )
+            """
+        )
+        self._connection.commit()
+
+    @staticmethod
+    def _key(path: str) -> str:
+        """
+        Normaliza o caminho usado como chave
+        """
+        return os.path.abspath(path)
+
+    def is_processed(self, path: str) -> bool:
+        """
+        Verifica se o arquivo, no estado atual, já foi convertido e armazenado
+
+        Args:
+            path (str): Caminho do arquivo DICOM
+
+        Returns:
+            bool: True se tamanho e data de modificação coincidem com o registro
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT size, mtime_ns FROM processed_files WHERE path = ?",
+                (self._key(path),)
+            ).fetchone()
+
+        return row is not None and row == (stat.st_size, stat.st_mtime_ns)
+
+    def mark_processed(self, path: str, pdf_path: Optional[str] = None):
+        """
+        Registra o arquivo como convertido e armazenado
+
+        Args:
+            path (str): Caminho do arquivo DICOM
+            pdf_path (str, opcional): Caminho do PDF gerado
+        """
+        stat = os.stat(path)
+
+        with self._lock:
+            self._connection.execute(
+                """
+                INSERT INTO processed_files (path, size, mtime_ns, pdf_path, processed_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(path) DO UPDATE SET
+                    size = excluded.size,
+                    mtime_ns = excluded.mtime_ns,
+                    pdf_path = excluded.pdf_path,
+                    processed_at = excluded.processed_at
+                """,
+                (self._key(path), stat.st_size, stat.st_mtime_ns, pdf_path, time.time())
+            )
+            self._connection.commit()
+
+    def forget(self, path: str):
+        """
+        Remove o registro de um arquivo, forçando nova conversão
+
+        Args:
+            path (str): Caminho do arquivo DICOM
+        """
+        with self._lock:
+            self._connection.execute(
+                "DELETE FROM processed_files WHERE path = ?", (self._key(path),)
+            )
+            self._connection.commit()
+
+    def close(self):
+        """
+        Fecha o índice
+        """
+        with self._lock:
+            self._connection.close()
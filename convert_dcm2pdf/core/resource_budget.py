@@ -0,0 +1,110 @@
+import logging
+import threading
+from typing import Dict, Hashable, List, Optional
+
+
+class ResourceBudget:
+    """
+    Orçamento de bytes em disco e em memória compartilhado pelos estágios de uma execução
+
+    Cada arquivo em processamento reserva bytes sob uma chave (o caminho
+    local do DICOM). ``acquire`` bloqueia até que a reserva caiba no
+    orçamento, o que faz os downloads esperarem enquanto conversões e
+    gravações não liberam espaço. Uma reserva maior que o próprio orçamento
+    é admitida quando nada mais está reservado, para não travar a execução.
+    Limites iguais a 0 não restringem o recurso correspondente.
+    """
+    def __init__(self, disk_bytes: int = 0, memory_bytes: int = 0):
+        """
+        Inicializa o orçamento
+
+        Args:
+            disk_bytes (int, opcional): Bytes em disco. 0 = sem limite.
+            memory_bytes (int, opcional): Bytes em memória. 0 = sem limite.
+        """
+        self.logger = logging.getLogger(__name__)
+        self.limits = {'disk': max(0, disk_bytes), 'memory': max(0, memory_bytes)}
+        self.in_use = {'disk': 0, 'memory': 0}
+        self._reservations: Dict[Hashable, Dict[str, int]] = {}
+        self._condition = threading.Condition()
+
+    @classmethod
+    def from_config(cls, config_manager) -> Optional['ResourceBudget']:
+        """
+        Cria o orçamento a partir de ``[pipeline] disk_budget`` e ``memory_budget``
+
+        Args:
+            config_manager (ConfigManager): Gerenciador de configurações
+
+        Returns:
+            Optional[ResourceBudget]: Orçamento ou None se nenhum limite foi configurado
+        """
+        disk_bytes = config_manager.get_int('pipeline', 'disk_budget', 0)
+        memory_bytes = config_manager.get_int('pipeline', 'memory_budget', 0)
+        if disk_bytes <= 0 and memory_bytes <= 0:
+            return None
+        return cls(disk_bytes, memory_bytes)
+
+    def _fits(self, resource: str, amount: int) -> bool:
+        limit = self.limits[resource]
+        if not limit or not amount:
+            return True
+        return self.in_use[resource] + amount <= limit or self.in_use[resource] == 0
+
+    def acquire(self, key: Hashable, disk: int = 0, memory: int = 0,
+                timeout: Optional[float] = None) -> bool:
+        """
+        Reserva bytes para ``key``, esperando até que caibam no orçamento
+
+        Args:
+            key (Hashable): Identificador do arquivo
+            disk (int, opcional): Bytes em disco
+            memory (int, opcional): Bytes em memória
+            timeout (float, opcional): Segundos máximos de espera. None espera indefinidamente.
+
+        Returns:
+            bool: True se reservado, False se o tempo de espera esgotou
+        """
+        with self._condition:
+            admitted = self._condition.wait_for(
+                lambda: self._fits('disk', disk) and self._fits('memory', memory), timeout
+            )
+            if admitted:
+                self._add(key, disk=disk, memory=memory)
+            return admitted
+
+    def charge(self, key: Hashable, disk: int = 0, memory: int = 0):
+        """
+        Contabiliza bytes já ocupados, sem esperar
+
+        Usado para arquivos que já existem, como o PDF recém-gerado.
+        """
+        with self._condition:
+            self._add(key, disk=disk, memory=memory)
+
+    def _add(self, key: Hashable, **amounts: int):
+        reservation = self._reservations.setdefault(key, {'disk': 0, 'memory': 0})
+        for resource, amount in amounts.items():
+            reservation[resource] += amount
+            self.in_use[resource] += amount
+
+    def release(self, key: Hashable, resources: Optional[List[str]] = None):
+        """
+        Libera as reservas de ``key``
+
+        Args:
+            key (Hashable): Identificador do arquivo
+            resources (List[str], opcional): ``disk`` e/ou ``memory``. Padrão: ambos.
+        """
+        with self._condition:
+            reservation = self._reservations.get(key)
+            if reservation is None:
+                return
+
+            for resource in resources or ('disk', 'memory'):
+                self.in_use[resource] -= reservation[resource]
+                reservation[resource] = 0
+
+            if not any(reservation.values()):
+                del self._reservations[key]
+            self._condition.notify_all()
@@ -1,3 +1,8 @@
 from .connect import PostgreSQLConnector
+from .batch_writer import PDFBatchWriter
+from .pdf_references import insert_pdf_reference
+from .work_queue import StudyWorkQueue
+from .conversion_jobs import ConversionJob, ConversionJobQueue
 
-__all__ = ['PostgreSQLConnector']
\ No newline at end of file
+__all__ = ['PostgreSQLConnector', 'PDFBatchWriter', 'insert_pdf_reference', 'StudyWorkQueue',
+           'ConversionJob', 'ConversionJobQueue']
\ No newline at end of file
@@ -0,0 +1,201 @@
+import time
+import logging
+import threading
+import psycopg2
+from psycopg2.extras import execute_values
+from typing import Any, Callable, List, Optional, Tuple
+from convert_dcm2pdf.database.connect import PostgreSQLConnector
+from convert_dcm2pdf.utils.metrics import metrics
+
+
+class PDFBatchWriter:
+    """
+    Acumula PDFs convertidos e os grava em ``pdf_storage`` em lotes
+
+    Cada lote é gravado com um único INSERT de múltiplas linhas e um único
+    commit. O lote é descarregado ao atingir ``max_rows`` linhas,
+    ``max_bytes`` bytes de conteúdo ou ``max_seconds`` segundos desde a
+    primeira linha pendente. Se o INSERT do lote falhar, as linhas são
+    regravadas uma a uma com savepoints, de forma que somente as linhas
+    inválidas são reportadas como falha.
+    """
+    # Colunas aceitas para o conteúdo: base64 (TEXT) ou binário (BYTEA)
+    CONTENT_COLUMNS = ('file_content', 'file_data')
+
+    def __init__(self, db_config: dict, column: str = 'file_content', max_rows: int = 100,
+                 max_bytes: int = 32 * 1024 * 1024, max_seconds: float = 5.0,
+                 on_failure: Optional[Callable[[Any, Exception], None]] = None,
+                 on_success: Optional[Callable[[Any], None]] = None):
+        """
+        Inicializa o gravador em lote
+
+        Args:
+            db_config (dict): Configurações de conexão com banco de dados
+            column (str, opcional): Coluna do conteúdo, ``file_content``
+                (base64) ou ``file_data`` (BYTEA). Padrão ``file_content``.
+            max_rows (int, opcional): Linhas por lote. Padrão 100.
+            max_bytes (int, opcional): Bytes de conteúdo por lote. Padrão 32 MiB.
+            max_seconds (float, opcional): Idade máxima do lote em segundos. Padrão 5.
+            on_failure (Callable, opcional): Chamado com (chave, erro) para cada
+                linha que não pôde ser gravada
+            on_success (Callable, opcional): Chamado com a chave de cada linha
+                confirmada no banco
+        """
+        self.logger = logging.getLogger(__name__)
+        if column not in self.CONTENT_COLUMNS:
+            raise ValueError(f"Coluna de conteúdo inválida: {column}")
+
+        self.db_config = db_config
+        self.insert_query = f"INSERT INTO pdf_storage (filename, {column}) VALUES %s"
+        self.row_query = f"INSERT INTO pdf_storage (filename, {column}) VALUES (%s, %s)"
+        self.max_rows = max(1, max_rows)
+        self.max_bytes = max(1, max_bytes)
+        self.max_seconds = max_seconds
+        self.on_failure = on_failure
+        self.on_success = on_success
+
+        self.failures: List[Tuple[Any, Exception]] = []
+        self._rows: List[Tuple[Any, tuple]] = []
+        self._bytes = 0
+        self._first_added_at = None
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+
+        self._timer = None
+        if self.max_seconds and self.max_seconds > 0:
+            self._timer = threading.Thread(target=self._flush_on_timeout, daemon=True,
+                                           name='pdf-batch-writer')
+            self._timer.start()
+
+    def add(self, filename: str, file_content, key: Any = None):
+        """
+        Adiciona um PDF ao lote, descarregando-o se algum limite foi atingido
+
+        Args:
+            filename (str): Nome do arquivo PDF
+            file_content (str | bytes): Conteúdo a ser gravado na coluna configurada
+            key (Any, opcional): Identificador usado nos relatórios de falha.
+                Padrão: ``filename``.
+        """
+        with self._lock:
+            if not self._rows:
+                self._first_added_at = time.monotonic()
+
+            self._rows.append((filename if key is None else key, (filename, file_content)))
+            self._bytes += len(file_content)
+
+            if len(self._rows) >= self.max_rows or self._bytes >= self.max_bytes:
+                self._flush_locked()
+
+    def flush(self) -> List[Tuple[Any, Exception]]:
+        """
+        Grava imediatamente as linhas pendentes
+
+        Returns:
+            List[Tuple[Any, Exception]]: Falhas ocorridas neste descarregamento
+        """
+        with self._lock:
+            return self._flush_locked()
+
+    def _flush_on_timeout(self):
+        """
+        Descarrega periodicamente lotes mais antigos que ``max_seconds``
+        """
+        while not self._closed.wait(min(self.max_seconds, 1.0)):
+            with self._lock:
+                if self._rows and time.monotonic() - self._first_added_at >= self.max_seconds:
+                    self._flush_locked()
+
+    def _flush_locked(self) -> List[Tuple[Any, Exception]]:
+        """
+        Grava as linhas pendentes; deve ser chamado com o lock adquirido
+        """
+        rows, self._rows = self._rows, []
+        batch_bytes, self._bytes = self._bytes, 0
+        self._first_added_at = None
+
+        if not rows:
+            return []
+
+        start = time.perf_counter()
+
+        failures = []
+        try:
+            with PostgreSQLConnector(self.db_config, pooled=True) as connector:
+                try:
+                    execute_values(
+                        connector.cursor,
+                        self.insert_query,
+                        [values for _, values in rows],
+                        page_size=len(rows)
+                    )
+                    connector.connection.commit()
+                    self.logger.info(f"Lote de {len(rows)} PDFs gravado no banco de dados")
+                except (Exception, psycopg2.Error) as error:
+                    connector.connection.rollback()
+                    self.logger.warning(f"Falha no lote de {len(rows)} PDFs, gravando linha a linha: {error}")
+                    failures = self._insert_rows(connector, rows)
+        except (Exception, psycopg2.Error) as error:
+            # Sem conexão nenhuma linha foi gravada
+            self.logger.error(f"Erro ao gravar lote de PDFs: {error}")
+            failures = [(key, error) for key, _ in rows]
+
+        metrics.observe(
+            'store_batch', time.perf_counter() - start, batch_bytes, error=len(failures) == len(rows)
+        )
+
+        for key, error in failures:
+            self.failures.append((key, error))
+            if self.on_failure:
+                self.on_failure(key, error)
+
+        if self.on_success:
+            failed_keys = {key for key, _ in failures}
+            for key, _ in rows:
+                if key not in failed_keys:
+                    self.on_success(key)
+
+        return failures
+
+    def _insert_rows(self, connector: PostgreSQLConnector, rows) -> List[Tuple[Any, Exception]]:
+        """
+        Grava as linhas individualmente, isolando cada uma em um savepoint
+
+        Returns:
+            List[Tuple[Any, Exception]]: Linhas que falharam e seus erros
+        """
+        failures = []
+        cursor = connector.cursor
+
+        for key, values in rows:
+            cursor.execute("SAVEPOINT pdf_row")
+            try:
+                cursor.execute(self.row_query, values)
+                cursor.execute("RELEASE SAVEPOINT pdf_row")
+            except (Exception, psycopg2.Error) as error:
+                cursor.execute("ROLLBACK TO SAVEPOINT pdf_row")
+                self.logger.error(f"Erro ao inserir PDF {key} no banco de dados: {error}")
+                failures.append((key, error))
+
+        connector.connection.commit()
+        return failures
+
+    def close(self) -> List[Tuple[Any, Exception]]:
+        """
+        Descarrega as linhas pendentes e encerra o descarregamento periódico
+
+        Returns:
+            List[Tuple[Any, Exception]]: Todas as falhas registradas pelo gravador
+        """
+        self._closed.set()
+        if self._timer:
+            self._timer.join()
+        self.flush()
+        return self.failures
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
@@ -1,119 +1,446 @@
 import configparser
 import os
+import time
+import uuid
+import threading
 import psycopg2
+import psycopg2.pool
 import logging
 
+
+class _ConnectionPool:
+    """
+    Pool de conexões thread-safe com verificação de saúde
+
+    Envolve o ``ThreadedConnectionPool`` do psycopg2, bloqueando quando todas
+    as conexões estão em uso em vez de falhar, e descartando conexões
+    quebradas antes de entregá-las.
+    """
+    def __init__(self, params, min_size, max_size, health_check_interval=30.0):
+        """
+        Inicializa o pool
+
+        :param params: Parâmetros de conexão do psycopg2
+        :param min_size: Número mínimo de conexões mantidas abertas
+        :param max_size: Número máximo de conexões simultâneas
+        :param health_check_interval: Segundos de ociosidade a partir dos quais
+            a conexão é testada com ``SELECT 1`` antes de ser entregue
+        """
+        self.logger = logging.getLogger(__name__)
+        self.min_size = min_size
+        self.max_size = max_size
+        self.health_check_interval = health_check_interval
+        self._pool = psycopg2.pool.ThreadedConnectionPool(min_size, max_size, **params)
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._last_used = {}
+
+    def _is_healthy(self, connection):
+        """
+        Verifica se a conexão pode ser utilizada
+
+        :param connection: Conexão psycopg2
+        :return: True se a conexão está aberta e respondendo
+        """
+        if connection.closed:
+            return False
+
+        idle_for = time.monotonic() - self._last_used.get(id(connection), 0)
+        if idle_for < self.health_check_interval:
+            return True
+
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            connection.rollback()
+            return True
+        except (Exception, psycopg2.Error) as error:
+            self.logger.warning(f"Conexão do pool descartada na verificação de saúde: {error}")
+            return False
+
+    def getconn(self, timeout=None):
+        """
+        Empresta uma conexão saudável do pool, aguardando se necessário
+
+        :param timeout: Tempo máximo de espera em segundos (None aguarda indefinidamente)
+        :return: Conexão psycopg2
+        """
+        if not self._slots.acquire(timeout=timeout):
+            raise psycopg2.pool.PoolError("Tempo esgotado aguardando conexão do pool")
+
+        try:
+            while True:
+                connection = self._pool.getconn()
+                if self._is_healthy(connection):
+                    return connection
+                self._last_used.pop(id(connection), None)
+                self._pool.putconn(connection, close=True)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def putconn(self, connection, close=False):
+        """
+        Devolve uma conexão ao pool
+
+        :param connection: Conexão emprestada por ``getconn``
+        :param close: Se True, fecha a conexão em vez de reaproveitá-la
+        """
+        try:
+            close = close or bool(connection.closed)
+            if close:
+                self._last_used.pop(id(connection), None)
+            else:
+                self._last_used[id(connection)] = time.monotonic()
+            self._pool.putconn(connection, close=close)
+        finally:
+            self._slots.release()
+
+    def closeall(self):
+        """
+        Fecha todas as conexões do pool
+        """
+        self._pool.closeall()
+        self._last_used.clear()
+
+
 class PostgreSQLConnector:
-    def __init__(self, config_path='config/config.ini'):
+    # Pools compartilhados pelo processo, indexados pelos parâmetros de conexão
+    _pools = {}
+    _pools_lock = threading.Lock()
+
+    def __init__(self, config_path='config/config.ini', pooled=False):
         """
         Inicializa o conector PostgreSQL com configurações do arquivo de configuração
-        
-        :param config_path: Caminho para o arquivo de configuração
+
+        :param config_path: Caminho para o arquivo de configuração ou dicionário
+            de configurações (como o retornado por ``ConfigManager.get_database_config``)
+        :param pooled: Se True, empresta conexões do pool compartilhado do processo
+            em vez de abrir uma conexão nova
         """
         # Configura logging
-        logging.basicConfig(level=logging.INFO, 
+        logging.basicConfig(level=logging.INFO,
                             format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
         self.logger = logging.getLogger(__name__)
 
-        # Lê configurações
-        self.config = configparser.ConfigParser()
-        
-        # Verifica se o arquivo de configuração existe
-        if not os.path.exists(config_path):
-            self.logger.error(f"Arquivo de configuração não encontrado: {config_path}")
-            raise FileNotFoundError(f"Arquivo de configuração não encontrado: {config_path}")
-        
-        self.config.read(config_path)
-        
-        # Parâmetros de conexão
-        self.host = self.config['postgresql']['host']
-        self.user = self.config['postgresql']['user']
-        self.password = self.config['postgresql']['password']
-        self.database = self.config['postgresql']['database']
-        
         # Conexão
         self.connection = None
         self.cursor = None
+        self.pooled = pooled
+
+        if isinstance(config_path, dict):
+            db_config = config_path
+        else:
+            # Verifica se o arquivo de configuração existe
+            if not os.path.exists(config_path):
+                self.logger.error(f"Arquivo de configuração não encontrado: {config_path}")
+                raise FileNotFoundError(f"Arquivo de configuração não encontrado: {config_path}")
+
+            # Lê configurações
+            self.config = configparser.ConfigParser()
+            self.config.read(config_path)
+            db_config = dict(self.config['postgresql'])
+
+        # Parâmetros de conexão
+        self.host = db_config['host']
+        self.user = db_config['user']
+        self.password = db_config['password']
+        self.database = db_config['database']
+
+        # Parâmetros do pool
+        self.pool_min_size = int(db_config.get('pool_min_size', 1))
+        self.pool_max_size = int(db_config.get('pool_max_size', 10))
+        self.pool_health_check_interval = float(db_config.get('pool_health_check_interval', 30))
+
+        # Linhas buscadas por vez nas consultas em streaming
+        self.stream_itersize = int(db_config.get('stream_itersize', 2000))
+
+    def _connection_params(self):
+        """
+        Parâmetros de conexão repassados ao psycopg2
+        """
+        return {
+            'host': self.host,
+            'user': self.user,
+            'password': self.password,
+            'database': self.database
+        }
+
+    def _get_pool(self):
+        """
+        Obtém (ou cria) o pool compartilhado para estes parâmetros de conexão
+
+        :return: Pool de conexões do processo
+        """
+        key = (self.host, self.user, self.database)
+        with PostgreSQLConnector._pools_lock:
+            pool = PostgreSQLConnector._pools.get(key)
+            if pool is None:
+                pool = _ConnectionPool(
+                    self._connection_params(),
+                    self.pool_min_size,
+                    self.pool_max_size,
+                    self.pool_health_check_interval
+                )
+                PostgreSQLConnector._pools[key] = pool
+                self.logger.info(
+                    f"Pool de conexões criado (min={self.pool_min_size}, max={self.pool_max_size})"
+                )
+            return pool
+
+    @classmethod
+    def close_all_pools(cls):
+        """
+        Fecha todos os pools de conexões do processo
+        """
+        with cls._pools_lock:
+            for pool in cls._pools.values():
+                pool.closeall()
+            cls._pools.clear()
 
     def connect(self):
         """
         Estabelece conexão com o banco de dados PostgreSQL
-        
+
         :return: Conexão psycopg2
         """
         try:
-            self.connection = psycopg2.connect(
-                host=self.host,
-                user=self.user,
-                password=self.password,
-                database=self.database
-            )
+            if self.pooled:
+                self.connection = self._get_pool().getconn()
+            else:
+                self.connection = psycopg2.connect(**self._connection_params())
+                self.logger.info("Conexão com o banco de dados estabelecida com sucesso")
             self.cursor = self.connection.cursor()
-            self.logger.info("Conexão com o banco de dados estabelecida com sucesso")
             return self.connection
         except (Exception, psycopg2.Error) as error:
             self.logger.error(f"Erro ao conectar ao banco de dados PostgreSQL: {error}")
             raise
 
+    def _release_connection(self, discard=False):
+        """
+        Libera a conexão atual, devolvendo-a ao pool quando aplicável
+
+        :param discard: Se True, a conexão é fechada em vez de reaproveitada
+        """
+        connection, self.connection = self.connection, None
+        cursor, self.cursor = self.cursor, None
+
+        if cursor and not cursor.closed:
+            cursor.close()
+        if connection is None:
+            return
+
+        if self.pooled:
+            self._get_pool().putconn(connection, close=discard)
+        else:
+            connection.close()
+            self.logger.info("Conexão com o banco de dados fechada")
+
+    def _run(self, operation):
+        """
+        Executa uma operação de banco, reconectando uma vez se a conexão caiu
+
+        :param operation: Função que recebe o cursor e executa a operação
+        :return: Retorno da operação
+        """
+        if not self.connection:
+            self.connect()
+
+        try:
+            return operation(self.cursor)
+        except (psycopg2.OperationalError, psycopg2.InterfaceError) as error:
+            if not self.connection.closed:
+                raise
+            self.logger.warning(f"Conexão perdida, reconectando: {error}")
+            self._release_connection(discard=True)
+            self.connect()
+            return operation(self.cursor)
+
     def execute_query(self, query, params=None):
         """
         Executa uma consulta SQL
-        
+
         :param query: Consulta SQL a ser executada
         :param params: Parâmetros para a consulta (opcional)
         :return: Resultados da consulta
         """
-        try:
-            if not self.connection:
-                self.connect()
-            
+        def operation(cursor):
             if params:
-                self.cursor.execute(query, params)
+                cursor.execute(query, params)
             else:
-                self.cursor.execute(query)
-            
-            return self.cursor.fetchall()
+                cursor.execute(query)
+            return cursor.fetchall()
+
+        try:
+            return self._run(operation)
         except (Exception, psycopg2.Error) as error:
             self.logger.error(f"Erro ao executar consulta: {error}")
             raise
 
+    def iter_query_chunks(self, query, params=None, itersize=None):
+        """
+        Executa uma consulta com cursor no servidor, entregando as linhas em blocos
+
+        Apenas ``itersize`` linhas ficam em memória por vez, independentemente
+        do tamanho do resultado. O cursor vive na transação corrente da
+        conexão, que deve permanecer aberta até o fim da iteração.
+
+        :param query: Consulta SQL a ser executada
+        :param params: Parâmetros para a consulta (opcional)
+        :param itersize: Linhas por bloco (padrão: ``stream_itersize`` da configuração)
+        :return: Gerador de listas de linhas
+        """
+        itersize = itersize or self.stream_itersize
+
+        if not self.connection:
+            self.connect()
+
+        cursor = self.connection.cursor(name=f"stream_{uuid.uuid4().hex}")
+        cursor.itersize = itersize
+
+        try:
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(itersize)
+                if not rows:
+                    break
+                yield rows
+        except (Exception, psycopg2.Error) as error:
+            self.logger.error(f"Erro ao executar consulta em streaming: {error}")
+            raise
+        finally:
+            if not cursor.closed and not self.connection.closed:
+                cursor.close()
+
+    def stream_query(self, query, params=None, itersize=None):
+        """
+        Executa uma consulta com cursor no servidor, entregando uma linha por vez
+
+        :param query: Consulta SQL a ser executada
+        :param params: Parâmetros para a consulta (opcional)
+        :param itersize: Linhas buscadas do servidor por vez
+        :return: Gerador de linhas
+        """
+        for rows in self.iter_query_chunks(query, params, itersize):
+            yield from rows
+
+    def fetch_all(self, query, params=None):
+        """
+        Executa uma consulta SQL e retorna todas as linhas
+
+        :param query: Consulta SQL a ser executada
+        :param params: Parâmetros para a consulta (opcional)
+        :return: Lista de linhas
+        """
+        return self.execute_query(query, params)
+
     def execute_insert(self, query, params=None):
         """
         Executa uma inserção no banco de dados
-        
+
         :param query: Consulta de inserção SQL
         :param params: Parâmetros para a inserção
         """
-        try:
-            if not self.connection:
-                self.connect()
-            
+        def operation(cursor):
             if params:
-                self.cursor.execute(query, params)
+                cursor.execute(query, params)
             else:
-                self.cursor.execute(query)
-            
+                cursor.execute(query)
             self.connection.commit()
+
+        try:
+            self._run(operation)
             self.logger.info("Inserção realizada com sucesso")
         except (Exception, psycopg2.Error) as error:
-            if self.connection:
+            if self.connection and not self.connection.closed:
                 self.connection.rollback()
             self.logger.error(f"Erro ao realizar inserção: {error}")
             raise
 
+    def execute(self, query, params=None):
+        """
+        Executa um comando SQL sem retorno (DDL, UPDATE, DELETE) e confirma a transação
+
+        :param query: Comando SQL
+        :param params: Parâmetros do comando (opcional)
+        :return: Número de linhas afetadas
+        """
+        def operation(cursor):
+            cursor.execute(query, params)
+            self.connection.commit()
+            return cursor.rowcount
+
+        try:
+            return self._run(operation)
+        except (Exception, psycopg2.Error) as error:
+            if self.connection and not self.connection.closed:
+                self.connection.rollback()
+            self.logger.error(f"Erro ao executar comando: {error}")
+            raise
+
+    def write_large_object(self, fileobj, chunk_size=1024 * 1024):
+        """
+        Copia um arquivo para um novo large object, em blocos
+
+        A operação participa da transação corrente; quem chama é responsável
+        pelo commit ou rollback.
+
+        :param fileobj: Arquivo aberto em modo binário
+        :param chunk_size: Tamanho dos blocos copiados
+        :return: OID do large object criado
+        """
+        if not self.connection:
+            self.connect()
+
+        lobject = self.connection.lobject(0, 'wb')
+        try:
+            for chunk in iter(lambda: fileobj.read(chunk_size), b''):
+                lobject.write(chunk)
+            return lobject.oid
+        finally:
+            lobject.close()
+
+    def copy_from_stream(self, query, fileobj, chunk_size=1024 * 1024):
+        """
+        Executa um ``COPY ... FROM STDIN`` lendo os dados de um objeto de leitura, em blocos
+
+        A operação participa da transação corrente; quem chama é responsável
+        pelo commit ou rollback. Como o objeto de leitura é consumido, a
+        operação não é repetida em caso de queda da conexão.
+
+        :param query: Comando COPY
+        :param fileobj: Objeto com método ``read(size)``
+        :param chunk_size: Tamanho dos blocos lidos
+        """
+        if not self.connection:
+            self.connect()
+
+        self.cursor.copy_expert(query, fileobj, size=chunk_size)
+
     def close(self):
         """
         Fecha a conexão e o cursor do banco de dados
+
+        Conexões emprestadas do pool são devolvidas a ele em vez de fechadas.
         """
         try:
-            if self.cursor:
-                self.cursor.close()
-            if self.connection:
-                self.connection.close()
-                self.logger.info("Conexão com o banco de dados fechada")
+            self._release_connection()
         except (Exception, psycopg2.Error) as error:
             self.logger.error(f"Erro ao fechar conexão: {error}")
 
+    def __enter__(self):
+        """
+        Abre a conexão ao entrar no bloco ``with``
+        """
+        self.connect()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """
+        Fecha (ou devolve ao pool) a conexão ao sair do bloco ``with``
+        """
+        self.close()
+        return False
+
     def __del__(self):
         """
         Destrutor para garantir que a conexão seja fechada
@@ -121,4 +448,4 @@ class PostgreSQLConnector:
         self.close()
 
 # Exporta a classe para ser importada
-__all__ = ['PostgreSQLConnector']
\ No newline at end of file
+__all__ = ['PostgreSQLConnector']
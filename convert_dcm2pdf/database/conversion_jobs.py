@@ -0,0 +1,436 @@
+import os
+import socket
+import logging
+import psycopg2
+import psycopg2.extras
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+from convert_dcm2pdf.database.connect import PostgreSQLConnector
+from convert_dcm2pdf.utils.priority import PriorityPolicy
+
+
+class ConversionJob(NamedTuple):
+    """
+    Arquivo de ``dicom_files`` arrendado por um worker
+    """
+    id: int
+    filename: str
+    filepath: str
+    attempts: int
+
+
+class ConversionJobQueue:
+    """
+    Fila distribuída de conversões sobre ``dicom_files`` e ``conversion_log``
+
+    Cada worker arrenda lotes de arquivos pendentes com
+    ``FOR UPDATE SKIP LOCKED``: o arquivo fica com ``status = 'leased'``,
+    o identificador do worker e o fim do arrendamento. Enquanto está vivo,
+    o worker envia batimentos periódicos (``heartbeat``) que renovam seus
+    arrendamentos. Arrendamentos vencidos, de workers que pararam de
+    responder, voltam para a fila na próxima reivindicação de qualquer
+    worker. O resultado de cada tentativa é registrado em ``conversion_log``.
+
+    Com uma política de prioridade, os arquivos são arrendados pelo prazo
+    mais próximo, calculado a partir de ``modality``, ``study_date`` e
+    ``created_at``; sem ela, na ordem de ``id``.
+    """
+    SCHEMA = [
+        """
+        ALTER TABLE dicom_files ADD COLUMN IF NOT EXISTS lease_owner VARCHAR(255)
+        """,
+        """
+        ALTER TABLE dicom_files ADD COLUMN IF NOT EXISTS lease_expires_at TIMESTAMP
+        """,
+        """
+        ALTER TABLE dicom_files ADD COLUMN IF NOT EXISTS attempts INTEGER NOT NULL DEFAULT 0
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_dicom_files_pending
+        ON dicom_files (id) WHERE status = 'pending'
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_dicom_files_leased
+        ON dicom_files (lease_expires_at) WHERE status = 'leased'
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS conversion_workers (
+            worker_id VARCHAR(255) PRIMARY KEY,
+            hostname VARCHAR(255),
+            status VARCHAR(20) NOT NULL DEFAULT 'running',
+            jobs_done INTEGER NOT NULL DEFAULT 0,
+            jobs_failed INTEGER NOT NULL DEFAULT 0,
+            started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_heartbeat TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    ]
+
+    def __init__(self, db_config: dict, worker_id: Optional[str] = None, lease_timeout: int = 300,
+                 max_attempts: int = 3, priority: Optional[PriorityPolicy] = None):
+        """
+        Inicializa a fila
+
+        Args:
+            db_config (dict): Configurações de conexão com banco de dados
+            worker_id (str, opcional): Identificador deste worker. Padrão
+                ``<hostname>:<pid>``.
+            lease_timeout (int, opcional): Segundos de validade de um
+                arrendamento sem batimento. Padrão 300.
+            max_attempts (int, opcional): Tentativas antes de marcar o arquivo
+                como ``failed``. Padrão 3.
+            priority (PriorityPolicy, opcional): Política de prioridade dos
+                arquivos. Padrão: ordem de ``id``.
+        """
+        self.logger = logging.getLogger(__name__)
+        self.db_config = db_config
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.lease_timeout = max(1, lease_timeout)
+        self.max_attempts = max(1, max_attempts)
+        self.priority = priority.with_columns('modality', 'study_date') if priority else None
+
+    @classmethod
+    def from_config(cls, config_manager, db_config: dict) -> 'ConversionJobQueue':
+        """
+        Cria a fila a partir da seção ``[distributed]``
+
+        Args:
+            config_manager (ConfigManager): Gerenciador de configurações
+            db_config (dict): Configurações de conexão com banco de dados
+
+        Returns:
+            ConversionJobQueue: Fila configurada
+        """
+        return cls(
+            db_config,
+            worker_id=config_manager.get('distributed', 'worker_id', None),
+            lease_timeout=config_manager.get_int('distributed', 'lease_timeout', 300),
+            max_attempts=config_manager.get_int('distributed', 'max_attempts', 3),
+            priority=PriorityPolicy.from_config(config_manager)
+        )
+
+    def ensure_schema(self):
+        """
+        Cria as colunas, índices e tabelas da fila se ainda não existirem
+        """
+        with PostgreSQLConnector(self.db_config, pooled=True) as connector:
+            for query in self.SCHEMA:
+                connector.execute(query)
+
+    def _transaction(self, operation):
+        """
+        Executa uma operação em uma transação, confirmando ao final
+
+        Args:
+            operation (Callable): Função que recebe o cursor
+
+        Returns:
+            Any: Retorno da operação
+        """
+        with PostgreSQLConnector(self.db_config, pooled=True) as connector:
+            try:
+                result = operation(connector.cursor)
+                connector.connection.commit()
+                return result
+            except (Exception, psycopg2.Error):
+                connector.connection.rollback()
+                raise
+
+    def enqueue(self, files: Iterable[Tuple[str, str]]) -> int:
+        """
+        Adiciona arquivos pendentes à fila
+
+        Args:
+            files (Iterable[Tuple[str, str]]): Tuplas (filename, filepath)
+
+        Returns:
+            int: Número de arquivos adicionados
+        """
+        rows = list(files)
+        if not rows:
+            return 0
+
+        def operation(cursor):
+            psycopg2.extras.execute_values(
+                cursor, "INSERT INTO dicom_files (filename, filepath) VALUES %s", rows
+            )
+
+        self._transaction(operation)
+        return len(rows)
+
+    def register(self):
+        """
+        Registra o worker em ``conversion_workers``
+        """
+        def operation(cursor):
+            cursor.execute(
+                """
+                INSERT INTO conversion_workers (worker_id, hostname, status)
+                VALUES (%s, %s, 'running')
+                ON CONFLICT (worker_id) DO UPDATE
+                SET status = 'running',
+                    started_at = CURRENT_TIMESTAMP,
+                    last_heartbeat = CURRENT_TIMESTAMP
+                """,
+                (self.worker_id, socket.gethostname())
+            )
+
+        self._transaction(operation)
+        self.logger.info(f"Worker {self.worker_id} registrado")
+
+    def heartbeat(self) -> int:
+        """
+        Sinaliza que o worker está vivo e renova seus arrendamentos
+
+        Returns:
+            int: Número de arrendamentos renovados
+        """
+        def operation(cursor):
+            cursor.execute(
+                """
+                UPDATE conversion_workers
+                SET last_heartbeat = CURRENT_TIMESTAMP, status = 'running'
+                WHERE worker_id = %s
+                """,
+                (self.worker_id,)
+            )
+            cursor.execute(
+                """
+                UPDATE dicom_files
+                SET lease_expires_at = CURRENT_TIMESTAMP + make_interval(secs => %s)
+                WHERE status = 'leased' AND lease_owner = %s
+                """,
+                (self.lease_timeout, self.worker_id)
+            )
+            return cursor.rowcount
+
+        return self._transaction(operation)
+
+    def reclaim_expired(self) -> int:
+        """
+        Devolve à fila arquivos cujo arrendamento venceu
+
+        O worker que os detinha parou de enviar batimentos. Cada arquivo
+        devolvido é registrado em ``conversion_log``; os que esgotaram as
+        tentativas são marcados como ``failed``.
+
+        Returns:
+            int: Número de arquivos devolvidos
+        """
+        def operation(cursor):
+            cursor.execute(
+                """
+                WITH expired AS (
+                    SELECT id, lease_owner
+                    FROM dicom_files
+                    WHERE status = 'leased' AND lease_expires_at < CURRENT_TIMESTAMP
+                    FOR UPDATE SKIP LOCKED
+                ), reclaimed AS (
+                    UPDATE dicom_files AS f
+                    SET status = CASE WHEN f.attempts >= %s THEN 'failed' ELSE 'pending' END,
+                        lease_owner = NULL,
+                        lease_expires_at = NULL,
+                        updated_at = CURRENT_TIMESTAMP
+                    FROM expired
+                    WHERE f.id = expired.id
+                    RETURNING f.id, expired.lease_owner
+                )
+                INSERT INTO conversion_log (dicom_file_id, conversion_status, error_message)
+                SELECT id, 'lease_expired', 'Arrendamento de ' || lease_owner || ' expirou'
+                FROM reclaimed
+                """,
+                (self.max_attempts,)
+            )
+            reclaimed = cursor.rowcount
+            cursor.execute(
+                """
+                UPDATE conversion_workers
+                SET status = 'dead'
+                WHERE status = 'running'
+                  AND last_heartbeat < CURRENT_TIMESTAMP - make_interval(secs => %s)
+                """,
+                (self.lease_timeout,)
+            )
+            return reclaimed
+
+        reclaimed = self._transaction(operation)
+        if reclaimed:
+            self.logger.warning(f"{reclaimed} arquivos de workers inativos devolvidos à fila")
+        return reclaimed
+
+    def _lease_pending(self, limit: int) -> List[ConversionJob]:
+        """
+        Arrenda até ``limit`` arquivos pendentes
+        """
+        if self.priority is None:
+            order_by, order_params = 'id', ()
+        else:
+            order_by, order_params = self.priority.deadline_sql('created_at')
+            order_by += ', id'
+
+        def operation(cursor):
+            cursor.execute(
+                f"""
+                UPDATE dicom_files
+                SET status = 'leased',
+                    lease_owner = %s,
+                    lease_expires_at = CURRENT_TIMESTAMP + make_interval(secs => %s),
+                    attempts = attempts + 1,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE id IN (
+                    SELECT id
+                    FROM dicom_files
+                    WHERE status = 'pending'
+                    ORDER BY {order_by}
+                    LIMIT %s
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING id, filename, filepath, attempts
+                """,
+                (self.worker_id, self.lease_timeout) + order_params + (limit,)
+            )
+            return [ConversionJob(*row) for row in cursor.fetchall()]
+
+        return self._transaction(operation)
+
+    def lease(self, limit: int) -> List[ConversionJob]:
+        """
+        Arrenda um lote de arquivos, devolvendo antes à fila os arrendamentos vencidos
+
+        Args:
+            limit (int): Número máximo de arquivos
+
+        Returns:
+            List[ConversionJob]: Arquivos arrendados
+        """
+        if limit <= 0:
+            return []
+
+        self.reclaim_expired()
+        jobs = self._lease_pending(limit)
+        if jobs:
+            self.logger.info(f"{len(jobs)} arquivos arrendados por {self.worker_id}")
+        return jobs
+
+    def complete(self, job: ConversionJob, pdf_filepath: str) -> bool:
+        """
+        Marca um arquivo como convertido e registra o PDF em ``conversion_log``
+
+        Args:
+            job (ConversionJob): Arquivo arrendado
+            pdf_filepath (str): Caminho do PDF gerado
+
+        Returns:
+            bool: False se o arrendamento já havia sido perdido para outro worker
+        """
+        def operation(cursor):
+            cursor.execute(
+                """
+                UPDATE dicom_files
+                SET status = 'done', lease_owner = NULL, lease_expires_at = NULL,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE id = %s AND lease_owner = %s
+                """,
+                (job.id, self.worker_id)
+            )
+            if cursor.rowcount == 0:
+                # Outro worker reassumiu o arquivo e registra o próprio resultado
+                return False
+
+            cursor.execute(
+                """
+                INSERT INTO conversion_log (dicom_file_id, pdf_filepath, conversion_status)
+                VALUES (%s, %s, 'success')
+                """,
+                (job.id, pdf_filepath)
+            )
+            cursor.execute(
+                "UPDATE conversion_workers SET jobs_done = jobs_done + 1 WHERE worker_id = %s",
+                (self.worker_id,)
+            )
+            return True
+
+        owned = self._transaction(operation)
+        if not owned:
+            self.logger.warning(f"Arrendamento de {job.filename} expirou antes da conclusão")
+        return owned
+
+    def fail(self, job: ConversionJob, error: str) -> bool:
+        """
+        Registra a falha de um arquivo, devolvendo-o à fila enquanto houver tentativas
+
+        Args:
+            job (ConversionJob): Arquivo arrendado
+            error (str): Mensagem de erro
+
+        Returns:
+            bool: False se o arrendamento já havia sido perdido para outro worker
+        """
+        def operation(cursor):
+            cursor.execute(
+                """
+                UPDATE dicom_files
+                SET status = CASE WHEN attempts >= %s THEN 'failed' ELSE 'pending' END,
+                    lease_owner = NULL, lease_expires_at = NULL,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE id = %s AND lease_owner = %s
+                """,
+                (self.max_attempts, job.id, self.worker_id)
+            )
+            if cursor.rowcount == 0:
+                return False
+
+            cursor.execute(
+                """
+                INSERT INTO conversion_log (dicom_file_id, conversion_status, error_message)
+                VALUES (%s, 'error', %s)
+                """,
+                (job.id, error)
+            )
+            cursor.execute(
+                "UPDATE conversion_workers SET jobs_failed = jobs_failed + 1 WHERE worker_id = %s",
+                (self.worker_id,)
+            )
+            return True
+
+        owned = self._transaction(operation)
+        if not owned:
+            self.logger.warning(f"Arrendamento de {job.filename} expirou antes do registro da falha")
+        return owned
+
+    def release(self, jobs: Iterable[ConversionJob]):
+        """
+        Devolve à fila arquivos arrendados que não chegaram a ser processados,
+        sem contar a tentativa
+
+        Args:
+            jobs (Iterable[ConversionJob]): Arquivos arrendados
+        """
+        job_ids = [job.id for job in jobs]
+        if not job_ids:
+            return
+
+        def operation(cursor):
+            cursor.execute(
+                """
+                UPDATE dicom_files
+                SET status = 'pending', lease_owner = NULL, lease_expires_at = NULL,
+                    attempts = GREATEST(attempts - 1, 0), updated_at = CURRENT_TIMESTAMP
+                WHERE id = ANY(%s) AND lease_owner = %s
+                """,
+                (job_ids, self.worker_id)
+            )
+
+        self._transaction(operation)
+
+    def unregister(self):
+        """
+        Marca o worker como encerrado
+        """
+        def operation(cursor):
+            cursor.execute(
+                "UPDATE conversion_workers SET status = 'stopped' WHERE worker_id = %s",
+                (self.worker_id,)
+            )
+
+        self._transaction(operation)
+        self.logger.info(f"Worker {self.worker_id} encerrado")
@@ -0,0 +1,34 @@
+import logging
+from convert_dcm2pdf.database.connect import PostgreSQLConnector
+from convert_dcm2pdf.utils.exceptions import DatabaseError
+
+logger = logging.getLogger(__name__)
+
+
+def insert_pdf_reference(db_config: dict, filename: str, source_sha256: str, stored_filename: str):
+    """
+    Registra um PDF duplicado como referência a um PDF já armazenado
+
+    Em vez de gravar outra cópia do conteúdo em ``pdf_storage``, cria uma
+    linha em ``pdf_references`` apontando para o arquivo já gravado com o
+    mesmo DICOM de origem.
+
+    Args:
+        db_config (dict): Configurações de conexão com banco de dados
+        filename (str): Nome do PDF que seria gerado para o arquivo duplicado
+        source_sha256 (str): SHA-256 do DICOM de origem
+        stored_filename (str): Nome do PDF já armazenado em ``pdf_storage``
+
+    Raises:
+        DatabaseError: Se a inserção falhar
+    """
+    try:
+        with PostgreSQLConnector(db_config, pooled=True) as connector:
+            query = """
+            INSERT INTO pdf_references (filename, source_sha256, stored_filename)
+            VALUES (%s, %s, %s)
+            """
+            connector.execute_insert(query, (filename, source_sha256, stored_filename))
+    except Exception as e:
+        logger.error(f"Erro ao registrar referência do PDF {filename}: {e}")
+        raise DatabaseError(f"Falha ao registrar referência de {filename}: {e}")
@@ -0,0 +1,129 @@
+import base64
+import logging
+import binascii
+from typing import BinaryIO, Iterator
+from convert_dcm2pdf.database.connect import PostgreSQLConnector
+from convert_dcm2pdf.utils.exceptions import DatabaseError
+
+logger = logging.getLogger(__name__)
+
+# Tamanho padrão dos blocos lidos do PDF
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+# Colunas de conteúdo e a codificação usada para cada uma no COPY
+_COLUMN_ENCODINGS = {'file_content': 'base64', 'file_data': 'hex'}
+
+
+def _escape_copy_text(value: str) -> bytes:
+    """
+    Escapa um valor para o formato texto do COPY
+    """
+    for char, escaped in (('\\', '\\\\'), ('\t', '\\t'), ('\n', '\\n'), ('\r', '\\r')):
+        value = value.replace(char, escaped)
+    return value.encode('utf-8')
+
+
+def iter_encoded_chunks(fileobj: BinaryIO, encoding: str, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Lê um arquivo em blocos e os codifica um a um
+
+    Em base64, os blocos lidos têm tamanho múltiplo de 3, de forma que a
+    concatenação dos blocos codificados é igual à codificação do arquivo
+    inteiro.
+
+    Args:
+        fileobj (BinaryIO): Arquivo aberto em modo binário
+        encoding (str): ``base64`` ou ``hex``
+        chunk_size (int, opcional): Tamanho aproximado dos blocos lidos
+
+    Yields:
+        bytes: Blocos codificados
+    """
+    if encoding == 'base64':
+        chunk_size = max(3, chunk_size - chunk_size % 3)
+        encode = base64.b64encode
+    else:
+        encode = binascii.hexlify
+
+    for chunk in iter(lambda: fileobj.read(chunk_size), b''):
+        yield encode(chunk)
+
+
+class CopyRowReader:
+    """
+    Objeto de leitura que entrega ao ``COPY FROM STDIN`` uma linha montada
+    sob demanda a partir de blocos
+
+    Só o bloco corrente fica em memória, qualquer que seja o tamanho da linha.
+    """
+    def __init__(self, chunks: Iterator[bytes]):
+        self._chunks = chunks
+        self._buffer = b''
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+
+        if size < 0:
+            data, self._buffer = self._buffer, b''
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+def _copy_row_chunks(filename: str, fileobj: BinaryIO, column: str, chunk_size: int) -> Iterator[bytes]:
+    """
+    Monta, em blocos, a linha ``filename<TAB>conteúdo`` no formato texto do COPY
+    """
+    encoding = _COLUMN_ENCODINGS[column]
+    yield _escape_copy_text(filename) + b'\t'
+
+    # bytea em hexadecimal: \x seguido dos dígitos, com a barra escapada para o COPY
+    if encoding == 'hex':
+        yield b'\\\\x'
+
+    yield from iter_encoded_chunks(fileobj, encoding, chunk_size)
+    yield b'\n'
+
+
+def stream_pdf_to_database(db_config: dict, filename: str, pdf_path: str,
+                           column: str = 'file_content', chunk_size: int = STREAM_CHUNK_SIZE):
+    """
+    Grava um PDF em ``pdf_storage`` com ``COPY FROM STDIN``, lendo o arquivo em blocos
+
+    O conteúdo nunca é carregado inteiro em memória: cada bloco é lido,
+    codificado (base64 para ``file_content``, hexadecimal para a coluna
+    BYTEA ``file_data``) e enviado ao servidor antes do próximo.
+
+    Args:
+        db_config (dict): Configurações de conexão com banco de dados
+        filename (str): Nome do arquivo PDF
+        pdf_path (str): Caminho do arquivo PDF
+        column (str, opcional): ``file_content`` ou ``file_data``
+        chunk_size (int, opcional): Tamanho dos blocos lidos. Padrão 1 MiB.
+
+    Raises:
+        DatabaseError: Se a gravação falhar
+    """
+    if column not in _COLUMN_ENCODINGS:
+        raise ValueError(f"Coluna de conteúdo inválida: {column}")
+
+    try:
+        with PostgreSQLConnector(db_config, pooled=True) as connector:
+            try:
+                with open(pdf_path, 'rb') as pdf_file:
+                    reader = CopyRowReader(_copy_row_chunks(filename, pdf_file, column, chunk_size))
+                    connector.copy_from_stream(
+                        f"COPY pdf_storage (filename, {column}) FROM STDIN", reader, chunk_size
+                    )
+                connector.connection.commit()
+                logger.info(f"PDF {filename} gravado em blocos via COPY")
+            except Exception:
+                connector.connection.rollback()
+                raise
+    except Exception as e:
+        logger.error(f"Erro ao inserir PDF no banco de dados: {e}")
+        raise DatabaseError(f"Falha ao salvar {filename}: {e}")
@@ -0,0 +1,418 @@
+import os
+import time
+import socket
+import logging
+import psycopg2
+import psycopg2.extras
+from typing import Iterable, List, Optional, Tuple
+from convert_dcm2pdf.database.connect import PostgreSQLConnector
+from convert_dcm2pdf.utils.priority import PRIORITY_URGENT, PriorityPolicy
+
+
+class StudyWorkQueue:
+    """
+    Fila de trabalho de estudos a baixar, mantida no PostgreSQL
+
+    Os estudos de ``public.study`` são copiados para
+    ``study_download_queue`` em páginas ordenadas por ``accession_no``
+    (paginação por chave), a partir da última chave registrada em
+    ``study_queue_cursor``; a tabela de origem nunca é relida do início.
+    Cada processo reivindica lotes com ``FOR UPDATE SKIP LOCKED``, de
+    forma que vários downloaders, em máquinas diferentes, consomem a fila
+    ao mesmo tempo sem receber o mesmo estudo.
+
+    Com uma política de prioridade (seção ``[priority]``), cada estudo
+    recebe um prazo ao entrar na fila e os lotes são reivindicados pelo
+    prazo mais próximo. Estudos urgentes ainda não copiados são trazidos
+    de ``public.study`` periodicamente (``urgent_refill_interval``), sem
+    esperar o cursor chegar até eles.
+    """
+    SCHEMA = [
+        """
+        CREATE TABLE IF NOT EXISTS study_download_queue (
+            accession_no VARCHAR(64) PRIMARY KEY,
+            filepath VARCHAR(512) NOT NULL,
+            status VARCHAR(20) NOT NULL DEFAULT 'pending',
+            claimed_by VARCHAR(255),
+            claimed_at TIMESTAMP,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            error_message TEXT,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_study_queue_pending
+        ON study_download_queue (accession_no) WHERE status = 'pending'
+        """,
+        """
+        ALTER TABLE study_download_queue ADD COLUMN IF NOT EXISTS priority SMALLINT
+        """,
+        """
+        ALTER TABLE study_download_queue ADD COLUMN IF NOT EXISTS deadline TIMESTAMP
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_study_queue_deadline
+        ON study_download_queue (deadline, accession_no) WHERE status = 'pending'
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_study_queue_claimed
+        ON study_download_queue (claimed_at) WHERE status = 'claimed'
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS study_queue_cursor (
+            name VARCHAR(64) PRIMARY KEY,
+            last_accession_no VARCHAR(64)
+        )
+        """
+    ]
+
+    CURSOR_NAME = 'public.study'
+
+    def __init__(self, db_config: dict, worker_id: Optional[str] = None, refill_size: int = 1000,
+                 max_attempts: int = 3, claim_timeout: int = 3600, priority: Optional[PriorityPolicy] = None,
+                 urgent_refill_interval: float = 60.0, stale_sweep_interval: float = 60.0):
+        """
+        Inicializa a fila
+
+        Args:
+            db_config (dict): Configurações de conexão com banco de dados
+            worker_id (str, opcional): Identificador deste processo nas
+                reivindicações. Padrão ``<hostname>:<pid>``.
+            refill_size (int, opcional): Estudos copiados de ``public.study``
+                por página. Padrão 1000.
+            max_attempts (int, opcional): Tentativas antes de marcar o estudo
+                como ``failed``. Padrão 3.
+            claim_timeout (int, opcional): Segundos após os quais uma
+                reivindicação não concluída volta para a fila. Padrão 3600.
+            priority (PriorityPolicy, opcional): Política de prioridade dos
+                estudos. Padrão: ordem de ``accession_no``.
+            urgent_refill_interval (float, opcional): Segundos mínimos entre
+                buscas de estudos urgentes em ``public.study``. Padrão 60.
+            stale_sweep_interval (float, opcional): Segundos mínimos entre
+                buscas de reivindicações expiradas. Padrão 60.
+        """
+        self.logger = logging.getLogger(__name__)
+        self.db_config = db_config
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.refill_size = max(1, refill_size)
+        self.max_attempts = max(1, max_attempts)
+        self.claim_timeout = claim_timeout
+        self.priority = priority
+        self.urgent_refill_interval = max(0.0, urgent_refill_interval)
+        self._next_urgent_refill = 0.0
+        self.stale_sweep_interval = max(0.0, stale_sweep_interval)
+        self._next_stale_sweep = 0.0
+
+    @classmethod
+    def from_config(cls, config_manager, db_config: dict) -> Optional['StudyWorkQueue']:
+        """
+        Cria a fila a partir da seção ``[queue]`` se ela estiver ativa
+
+        Args:
+            config_manager (ConfigManager): Gerenciador de configurações
+            db_config (dict): Configurações de conexão com banco de dados
+
+        Returns:
+            Optional[StudyWorkQueue]: Fila configurada ou None se desativada
+        """
+        if not config_manager.get_bool('queue', 'enabled', False):
+            return None
+
+        return cls(
+            db_config,
+            worker_id=config_manager.get('queue', 'worker_id', None),
+            refill_size=config_manager.get_int('queue', 'refill_size', 1000),
+            max_attempts=config_manager.get_int('queue', 'max_attempts', 3),
+            claim_timeout=config_manager.get_int('queue', 'claim_timeout', 3600),
+            priority=PriorityPolicy.from_config(config_manager),
+            urgent_refill_interval=config_manager.get_float('queue', 'urgent_refill_interval', 60.0),
+            stale_sweep_interval=config_manager.get_float('queue', 'stale_sweep_interval', 60.0)
+        )
+
+    def ensure_schema(self):
+        """
+        Cria as tabelas da fila se ainda não existirem
+        """
+        with PostgreSQLConnector(self.db_config, pooled=True) as connector:
+            for query in self.SCHEMA:
+                connector.execute(query)
+
+    def _transaction(self, operation):
+        """
+        Executa uma operação em uma transação, confirmando ao final
+
+        Args:
+            operation (Callable): Função que recebe o cursor
+
+        Returns:
+            Any: Retorno da operação
+        """
+        with PostgreSQLConnector(self.db_config, pooled=True) as connector:
+            try:
+                result = operation(connector.cursor)
+                connector.connection.commit()
+                return result
+            except (Exception, psycopg2.Error):
+                connector.connection.rollback()
+                raise
+
+    def _class_sql(self) -> Tuple[str, tuple]:
+        """
+        Expressão da classe de prioridade dos estudos de ``public.study``
+        """
+        if self.priority is None:
+            return 'NULL::SMALLINT', ()
+        return self.priority.class_sql()
+
+    def _insert(self, cursor, rows: List[Tuple[str, str, Optional[int]]]):
+        """
+        Enfileira tuplas (accession_no, filepath, classe), calculando o prazo de cada estudo
+        """
+        if self.priority is None:
+            values = [(accession_no, filepath, None, None) for accession_no, filepath, _ in rows]
+        else:
+            values = [
+                (accession_no, filepath, priority_class, self.priority.sla(priority_class))
+                for accession_no, filepath, priority_class in rows
+            ]
+
+        psycopg2.extras.execute_values(
+            cursor,
+            """
+            INSERT INTO study_download_queue (accession_no, filepath, priority, deadline) VALUES %s
+            ON CONFLICT (accession_no) DO NOTHING
+            """,
+            values,
+            template="(%s, %s, %s, CURRENT_TIMESTAMP + make_interval(secs => %s))"
+        )
+
+    def refill_urgent(self) -> int:
+        """
+        Copia para a fila estudos urgentes de ``public.study`` que ainda não estão nela
+
+        Estudos urgentes novos ficam após o cursor de ``refill``; sem esta
+        cópia eles só seriam enfileirados depois de todo o backlog anterior.
+        A busca é restrita pelas colunas de data e de classe (ver
+        ``PriorityPolicy.urgent_sql``), que devem ser indexadas em
+        ``public.study``.
+
+        Returns:
+            int: Número de estudos urgentes enfileirados
+        """
+        urgent = self.priority.urgent_sql() if self.priority is not None else None
+        if urgent is None:
+            return 0
+
+        def operation(cursor):
+            urgent_condition, urgent_params = urgent
+            class_expression, class_params = self.priority.class_sql()
+            cursor.execute(
+                f"""
+                SELECT accession_no, filepath, {PRIORITY_URGENT}
+                FROM public.study AS s
+                WHERE filepath IS NOT NULL
+                  AND accession_no IS NOT NULL
+                  AND {urgent_condition}
+                  AND ({class_expression}) = {PRIORITY_URGENT}
+                  AND NOT EXISTS (
+                      SELECT 1 FROM study_download_queue AS q WHERE q.accession_no = s.accession_no
+                  )
+                LIMIT %s
+                """,
+                urgent_params + class_params + (self.refill_size,)
+            )
+            rows = cursor.fetchall()
+            if rows:
+                self._insert(cursor, rows)
+            return len(rows)
+
+        enqueued = self._transaction(operation)
+        if enqueued:
+            self.logger.info(f"{enqueued} estudos urgentes adicionados à fila de download")
+        return enqueued
+
+    def refill(self) -> int:
+        """
+        Copia a próxima página de estudos de ``public.study`` para a fila
+
+        O cursor é bloqueado durante a cópia, de forma que dois processos
+        nunca copiam a mesma página.
+
+        Returns:
+            int: Número de estudos enfileirados
+        """
+        def operation(cursor):
+            cursor.execute(
+                "INSERT INTO study_queue_cursor (name) VALUES (%s) ON CONFLICT (name) DO NOTHING",
+                (self.CURSOR_NAME,)
+            )
+            cursor.execute(
+                "SELECT last_accession_no FROM study_queue_cursor WHERE name = %s FOR UPDATE",
+                (self.CURSOR_NAME,)
+            )
+            last_key = cursor.fetchone()[0]
+
+            class_expression, class_params = self._class_sql()
+            cursor.execute(
+                f"""
+                SELECT accession_no, filepath, {class_expression}
+                FROM public.study
+                WHERE filepath IS NOT NULL
+                  AND accession_no IS NOT NULL
+                  AND (%s::VARCHAR IS NULL OR accession_no > %s)
+                ORDER BY accession_no
+                LIMIT %s
+                """,
+                class_params + (last_key, last_key, self.refill_size)
+            )
+            page = cursor.fetchall()
+            if not page:
+                return 0
+
+            self._insert(cursor, page)
+            cursor.execute(
+                "UPDATE study_queue_cursor SET last_accession_no = %s WHERE name = %s",
+                (page[-1][0], self.CURSOR_NAME)
+            )
+            return len(page)
+
+        enqueued = self._transaction(operation)
+        if enqueued:
+            self.logger.info(f"{enqueued} estudos adicionados à fila de download")
+        return enqueued
+
+    def release_stale(self) -> int:
+        """
+        Devolve à fila estudos reivindicados há mais de ``claim_timeout`` segundos
+
+        Estudos que já usaram ``max_attempts`` tentativas são marcados como
+        ``failed``: um estudo que derruba o processo que o baixa não é
+        reivindicado indefinidamente. A busca usa o índice parcial das
+        reivindicações e, em ``claim``, roda no máximo uma vez a cada
+        ``stale_sweep_interval`` segundos.
+
+        Returns:
+            int: Número de estudos devolvidos ou marcados como falha
+        """
+        def operation(cursor):
+            cursor.execute(
+                """
+                UPDATE study_download_queue
+                SET status = CASE WHEN attempts >= %s THEN 'failed' ELSE 'pending' END,
+                    claimed_by = NULL,
+                    error_message = CASE WHEN attempts >= %s
+                        THEN 'Reivindicação expirada após a última tentativa' ELSE error_message END,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE status = 'claimed'
+                  AND claimed_at < CURRENT_TIMESTAMP - make_interval(secs => %s)
+                """,
+                (self.max_attempts, self.max_attempts, self.claim_timeout)
+            )
+            return cursor.rowcount
+
+        released = self._transaction(operation)
+        if released:
+            self.logger.warning(f"{released} reivindicações expiradas devolvidas à fila")
+        return released
+
+    def _claim_pending(self, limit: int) -> List[Tuple[str, str]]:
+        """
+        Reivindica até ``limit`` estudos pendentes
+        """
+        def operation(cursor):
+            cursor.execute(
+                """
+                UPDATE study_download_queue
+                SET status = 'claimed',
+                    claimed_by = %s,
+                    claimed_at = CURRENT_TIMESTAMP,
+                    attempts = attempts + 1,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE accession_no IN (
+                    SELECT accession_no
+                    FROM study_download_queue
+                    WHERE status = 'pending'
+                    ORDER BY deadline, accession_no
+                    LIMIT %s
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING filepath, accession_no
+                """,
+                (self.worker_id, limit)
+            )
+            return cursor.fetchall()
+
+        return self._transaction(operation)
+
+    def claim(self, limit: int) -> List[Tuple[str, str]]:
+        """
+        Reivindica um lote de estudos para download, reabastecendo a fila se preciso
+
+        Args:
+            limit (int): Número máximo de estudos
+
+        Returns:
+            List[Tuple[str, str]]: Lista de tuplas (filepath, accession_no)
+        """
+        now = time.monotonic()
+        if now >= self._next_stale_sweep:
+            self._next_stale_sweep = now + self.stale_sweep_interval
+            self.release_stale()
+
+        if now >= self._next_urgent_refill:
+            self._next_urgent_refill = now + self.urgent_refill_interval
+            self.refill_urgent()
+
+        claimed = self._claim_pending(limit)
+
+        while len(claimed) < limit and self.refill():
+            claimed += self._claim_pending(limit - len(claimed))
+
+        self.logger.info(f"{len(claimed)} estudos reivindicados por {self.worker_id}")
+        return claimed
+
+    def complete(self, accession_nos: Iterable[str]):
+        """
+        Marca estudos como concluídos
+
+        Args:
+            accession_nos (Iterable[str]): Números de acesso concluídos
+        """
+        accession_nos = list(accession_nos)
+        if not accession_nos:
+            return
+
+        def operation(cursor):
+            cursor.execute(
+                """
+                UPDATE study_download_queue
+                SET status = 'done', error_message = NULL, updated_at = CURRENT_TIMESTAMP
+                WHERE accession_no = ANY(%s) AND claimed_by = %s
+                """,
+                (accession_nos, self.worker_id)
+            )
+
+        self._transaction(operation)
+
+    def fail(self, accession_no: str, error: str):
+        """
+        Registra falha de um estudo, devolvendo-o à fila enquanto houver tentativas
+
+        Args:
+            accession_no (str): Número de acesso do estudo
+            error (str): Mensagem de erro
+        """
+        def operation(cursor):
+            cursor.execute(
+                """
+                UPDATE study_download_queue
+                SET status = CASE WHEN attempts >= %s THEN 'failed' ELSE 'pending' END,
+                    claimed_by = NULL,
+                    error_message = %s,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE accession_no = %s AND claimed_by = %s
+                """,
+                (self.max_attempts, error, accession_no, self.worker_id)
+            )
+
+        self._transaction(operation)
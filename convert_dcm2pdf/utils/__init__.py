@@ -3,7 +3,9 @@ from .exceptions import (
     DicomConverterError,
     ConfigurationError,
     DownloadError,
+    IncompleteDownloadError,
     ConversionError,
+    UnsupportedConversionError,
     DatabaseError
 )
 
@@ -12,6 +14,8 @@ __all__ = [
     'DicomConverterError',
     'ConfigurationError',
     'DownloadError',
+    'IncompleteDownloadError',
     'ConversionError',
+    'UnsupportedConversionError',
     'DatabaseError'
 ]
\ No newline at end of file
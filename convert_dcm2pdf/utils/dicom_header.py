@@ -0,0 +1,331 @@
+import struct
+from typing import Any, BinaryIO, Dict, NamedTuple, Optional, Tuple
+from convert_dcm2pdf.utils.exceptions import ConversionError, UnsupportedConversionError
+
+# SOP Class UID de documentos PDF encapsulados
+ENCAPSULATED_PDF_SOP_CLASS = '1.2.840.10008.5.1.4.1.1.104.1'
+
+# Transfer syntaxes
+IMPLICIT_VR_LITTLE_ENDIAN = '1.2.840.10008.1.2'
+EXPLICIT_VR_BIG_ENDIAN = '1.2.840.10008.1.2.2'
+DEFLATED_EXPLICIT_VR_LITTLE_ENDIAN = '1.2.840.10008.1.2.1.99'
+
+# Tags usadas na leitura
+TAG_MEDIA_STORAGE_SOP_CLASS = (0x0002, 0x0002)
+TAG_TRANSFER_SYNTAX = (0x0002, 0x0010)
+TAG_SOP_CLASS = (0x0008, 0x0016)
+TAG_STUDY_DATE = (0x0008, 0x0020)
+TAG_ACCESSION_NUMBER = (0x0008, 0x0050)
+TAG_MODALITY = (0x0008, 0x0060)
+TAG_PATIENT_ID = (0x0010, 0x0020)
+TAG_STUDY_INSTANCE_UID = (0x0020, 0x000D)
+TAG_NUMBER_OF_FRAMES = (0x0028, 0x0008)
+TAG_ENCAPSULATED_DOCUMENT = (0x0042, 0x0011)
+TAG_ITEM_DELIMITATION = (0xFFFE, 0xE00D)
+TAG_SEQUENCE_DELIMITATION = (0xFFFE, 0xE0DD)
+
+UNDEFINED_LENGTH = 0xFFFFFFFF
+
+# Campos lidos por read_header_fields e a tag de cada um
+HEADER_FIELD_TAGS = {
+    'sop_class_uid': TAG_SOP_CLASS,
+    'transfer_syntax_uid': TAG_TRANSFER_SYNTAX,
+    'modality': TAG_MODALITY,
+    'patient_id': TAG_PATIENT_ID,
+    'study_uid': TAG_STUDY_INSTANCE_UID,
+    'accession_no': TAG_ACCESSION_NUMBER,
+    'study_date': TAG_STUDY_DATE,
+    'frames': TAG_NUMBER_OF_FRAMES,
+}
+
+# VRs explícitos com campo de tamanho de 4 bytes
+LONG_VRS = {b'OB', b'OD', b'OF', b'OL', b'OV', b'OW', b'SQ', b'SV', b'UC', b'UN', b'UR', b'UT', b'UV'}
+
+# Tamanho dos blocos copiados ao extrair o documento
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+class DicomHeader(NamedTuple):
+    """
+    Informações do cabeçalho (file meta) de um arquivo DICOM
+    """
+    sop_class_uid: Optional[str]
+    transfer_syntax_uid: Optional[str]
+    dataset_offset: int
+
+    @property
+    def is_encapsulated_pdf(self) -> bool:
+        return self.sop_class_uid == ENCAPSULATED_PDF_SOP_CLASS
+
+
+def _read_exact(file: BinaryIO, size: int) -> bytes:
+    data = file.read(size)
+    if len(data) != size:
+        raise ConversionError("Arquivo DICOM truncado")
+    return data
+
+
+def _read_element_header(file: BinaryIO, explicit: bool, endian: str) -> Optional[Tuple[Tuple[int, int], Optional[bytes], int]]:
+    """
+    Lê tag, VR e tamanho de um elemento, ou None no fim do arquivo
+    """
+    raw_tag = file.read(4)
+    if not raw_tag:
+        return None
+    if len(raw_tag) != 4:
+        raise ConversionError("Arquivo DICOM truncado")
+
+    tag = struct.unpack(endian + 'HH', raw_tag)
+
+    # Itens e delimitadores nunca têm VR
+    if tag[0] == 0xFFFE or not explicit:
+        return tag, None, struct.unpack(endian + 'I', _read_exact(file, 4))[0]
+
+    vr = _read_exact(file, 2)
+    if vr in LONG_VRS:
+        _read_exact(file, 2)
+        return tag, vr, struct.unpack(endian + 'I', _read_exact(file, 4))[0]
+    return tag, vr, struct.unpack(endian + 'H', _read_exact(file, 2))[0]
+
+
+def _skip_undefined_length(file: BinaryIO, explicit: bool, endian: str):
+    """
+    Pula o conteúdo de uma sequência ou item de tamanho indefinido
+    """
+    while True:
+        header = _read_element_header(file, explicit, endian)
+        if header is None:
+            raise ConversionError("Arquivo DICOM truncado")
+
+        tag, _, length = header
+        if tag in (TAG_ITEM_DELIMITATION, TAG_SEQUENCE_DELIMITATION):
+            return
+        if length == UNDEFINED_LENGTH:
+            _skip_undefined_length(file, explicit, endian)
+        else:
+            file.seek(length, 1)
+
+
+def read_header(file: BinaryIO) -> DicomHeader:
+    """
+    Lê apenas o preâmbulo e o grupo file meta (0002) de um arquivo DICOM
+
+    Args:
+        file (BinaryIO): Arquivo aberto em modo binário, no início
+
+    Returns:
+        DicomHeader: SOP class, transfer syntax e posição do dataset
+
+    Raises:
+        UnsupportedConversionError: Se o arquivo não tem cabeçalho DICOM Part 10
+    """
+    preamble = file.read(132)
+    if len(preamble) != 132 or preamble[128:] != b'DICM':
+        raise UnsupportedConversionError("Arquivo sem cabeçalho DICOM Part 10")
+
+    values = {}
+    while True:
+        offset = file.tell()
+        raw_group = file.read(2)
+        if len(raw_group) != 2 or struct.unpack('<H', raw_group)[0] != 0x0002:
+            break
+
+        file.seek(offset)
+        tag, _, length = _read_element_header(file, True, '<')
+        if tag in (TAG_MEDIA_STORAGE_SOP_CLASS, TAG_TRANSFER_SYNTAX):
+            values[tag] = _read_exact(file, length).rstrip(b'\x00 ').decode('ascii')
+        else:
+            file.seek(length, 1)
+
+    file.seek(offset)
+    return DicomHeader(
+        values.get(TAG_MEDIA_STORAGE_SOP_CLASS),
+        values.get(TAG_TRANSFER_SYNTAX),
+        offset
+    )
+
+
+def locate_encapsulated_document(file: BinaryIO, header: DicomHeader) -> Tuple[int, int]:
+    """
+    Localiza o valor de Encapsulated Document (0042,0011) sem carregá-lo
+
+    Os elementos anteriores são pulados com ``seek``; nenhum valor além das
+    tags e tamanhos é lido.
+
+    Args:
+        file (BinaryIO): Arquivo aberto em modo binário
+        header (DicomHeader): Cabeçalho lido por ``read_header``
+
+    Returns:
+        Tuple[int, int]: Posição e tamanho do documento no arquivo
+    """
+    transfer_syntax = header.transfer_syntax_uid or IMPLICIT_VR_LITTLE_ENDIAN
+    if transfer_syntax == DEFLATED_EXPLICIT_VR_LITTLE_ENDIAN:
+        raise UnsupportedConversionError("Transfer syntax comprimida não suportada")
+
+    explicit = transfer_syntax != IMPLICIT_VR_LITTLE_ENDIAN
+    endian = '>' if transfer_syntax == EXPLICIT_VR_BIG_ENDIAN else '<'
+
+    file.seek(header.dataset_offset)
+    while True:
+        element = _read_element_header(file, explicit, endian)
+        if element is None:
+            raise UnsupportedConversionError("Documento encapsulado não encontrado")
+
+        tag, _, length = element
+        if tag == TAG_ENCAPSULATED_DOCUMENT:
+            if length == UNDEFINED_LENGTH:
+                raise UnsupportedConversionError("Documento encapsulado com tamanho indefinido")
+            return file.tell(), length
+        if tag > TAG_ENCAPSULATED_DOCUMENT:
+            raise UnsupportedConversionError("Documento encapsulado não encontrado")
+
+        if length == UNDEFINED_LENGTH:
+            _skip_undefined_length(file, explicit, endian)
+        else:
+            file.seek(length, 1)
+
+
+def read_dataset_elements(dcm_filepath: str, tags) -> Tuple[DicomHeader, Dict[Tuple[int, int], str]]:
+    """
+    Lê o cabeçalho e os valores textuais de algumas tags do início do dataset
+
+    Os elementos são percorridos em ordem e a leitura para assim que passa
+    da maior tag pedida, sem carregar imagens ou documentos.
+
+    Args:
+        dcm_filepath (str): Caminho do arquivo DICOM
+        tags (Iterable[Tuple[int, int]]): Tags de primeiro nível a ler
+
+    Returns:
+        Tuple[DicomHeader, Dict[Tuple[int, int], str]]: Cabeçalho e valores
+        encontrados, sem preenchimento
+
+    Raises:
+        UnsupportedConversionError: Se o arquivo não tem cabeçalho DICOM Part 10
+            ou usa transfer syntax comprimida
+    """
+    tags = set(tags)
+    last_tag = max(tags)
+
+    with open(dcm_filepath, 'rb') as file:
+        header = read_header(file)
+        transfer_syntax = header.transfer_syntax_uid or IMPLICIT_VR_LITTLE_ENDIAN
+        if transfer_syntax == DEFLATED_EXPLICIT_VR_LITTLE_ENDIAN:
+            raise UnsupportedConversionError("Transfer syntax comprimida não suportada")
+
+        explicit = transfer_syntax != IMPLICIT_VR_LITTLE_ENDIAN
+        endian = '>' if transfer_syntax == EXPLICIT_VR_BIG_ENDIAN else '<'
+
+        values = {}
+        while True:
+            element = _read_element_header(file, explicit, endian)
+            if element is None:
+                break
+
+            tag, _, length = element
+            if tag > last_tag:
+                break
+            if tag in tags and length != UNDEFINED_LENGTH:
+                value = _read_exact(file, length).rstrip(b'\x00 ').decode('ascii', 'replace')
+                if value:
+                    values[tag] = value
+            elif length == UNDEFINED_LENGTH:
+                _skip_undefined_length(file, explicit, endian)
+            else:
+                file.seek(length, 1)
+
+    return header, values
+
+
+def read_study_attributes(dcm_filepath: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Lê Modality (0008,0060) e Study Date (0008,0020) de um arquivo DICOM
+
+    Args:
+        dcm_filepath (str): Caminho do arquivo DICOM
+
+    Returns:
+        Tuple[Optional[str], Optional[str]]: Modalidade e data do estudo
+        (``AAAAMMDD``), None quando ausentes
+
+    Raises:
+        UnsupportedConversionError: Se o arquivo não tem cabeçalho DICOM Part 10
+            ou usa transfer syntax comprimida
+    """
+    _, values = read_dataset_elements(dcm_filepath, (TAG_STUDY_DATE, TAG_MODALITY))
+    return values.get(TAG_MODALITY), values.get(TAG_STUDY_DATE)
+
+
+def read_header_fields(dcm_filepath: str) -> Dict[str, Any]:
+    """
+    Lê os campos de cabeçalho usados para filtrar e ordenar arquivos
+
+    Args:
+        dcm_filepath (str): Caminho do arquivo DICOM
+
+    Returns:
+        Dict[str, Any]: ``sop_class_uid``, ``transfer_syntax_uid``,
+        ``modality``, ``patient_id``, ``study_uid``, ``accession_no``,
+        ``study_date`` e ``frames`` (None quando ausentes)
+
+    Raises:
+        UnsupportedConversionError: Se o arquivo não tem cabeçalho DICOM Part 10
+            ou usa transfer syntax comprimida
+    """
+    header, values = read_dataset_elements(dcm_filepath, HEADER_FIELD_TAGS.values())
+    fields = {name: values.get(tag) for name, tag in HEADER_FIELD_TAGS.items()}
+
+    fields['sop_class_uid'] = header.sop_class_uid or fields['sop_class_uid']
+    fields['transfer_syntax_uid'] = header.transfer_syntax_uid or IMPLICIT_VR_LITTLE_ENDIAN
+    try:
+        fields['frames'] = int(fields['frames']) if fields['frames'] else None
+    except ValueError:
+        fields['frames'] = None
+    return fields
+
+
+def extract_encapsulated_pdf(dcm_filepath: str, output: BinaryIO,
+                             chunk_size: int = COPY_CHUNK_SIZE) -> int:
+    """
+    Copia o PDF encapsulado de um DICOM para ``output`` em blocos
+
+    O byte nulo de preenchimento que a norma acrescenta a documentos de
+    tamanho ímpar é removido.
+
+    Args:
+        dcm_filepath (str): Caminho do arquivo DICOM
+        output (BinaryIO): Destino do PDF (arquivo ou objeto com ``write``)
+        chunk_size (int, opcional): Tamanho dos blocos copiados
+
+    Returns:
+        int: Número de bytes escritos
+
+    Raises:
+        UnsupportedConversionError: Se o arquivo não é um PDF encapsulado
+    """
+    with open(dcm_filepath, 'rb') as file:
+        header = read_header(file)
+        if not header.is_encapsulated_pdf:
+            raise UnsupportedConversionError(f"SOP class {header.sop_class_uid} não é PDF encapsulado")
+
+        _, length = locate_encapsulated_document(file, header)
+
+        # O último byte é lido à parte para descartar o preenchimento
+        remaining = length - 1 if length else 0
+        written = 0
+        while remaining:
+            chunk = file.read(min(chunk_size, remaining))
+            if not chunk:
+                raise ConversionError(f"Documento encapsulado truncado em {dcm_filepath}")
+            output.write(chunk)
+            written += len(chunk)
+            remaining -= len(chunk)
+
+        if length:
+            last = _read_exact(file, 1)
+            if last != b'\x00':
+                output.write(last)
+                written += 1
+
+    return written
@@ -16,12 +16,25 @@ class DownloadError(DicomConverterError):
     """
     pass
 
+class IncompleteDownloadError(DownloadError):
+    """
+    Exceção para transferências interrompidas ou que não conferem com o
+    arquivo remoto; o download pode ser retomado
+    """
+    pass
+
 class ConversionError(DicomConverterError):
     """
     Exceção para erros durante a conversão de arquivos DICOM
     """
     pass
 
+class UnsupportedConversionError(ConversionError):
+    """
+    Exceção para arquivos que um backend de conversão não sabe tratar
+    """
+    pass
+
 class DatabaseError(DicomConverterError):
     """
     Exceção para erros relacionados a operações de banco de dados
@@ -33,6 +46,8 @@ __all__ = [
     'DicomConverterError',
     'ConfigurationError',
     'DownloadError', 
+    'IncompleteDownloadError',
     'ConversionError',
+    'UnsupportedConversionError',
     'DatabaseError'
 ]
\ No newline at end of file
@@ -0,0 +1,286 @@
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+import logging
+from typing import Dict, List, Optional, Tuple
+from convert_dcm2pdf.utils.exceptions import ConfigurationError
+from convert_dcm2pdf.utils.paths import iter_entries
+
+logger = logging.getLogger(__name__)
+
+# Backends aceitos em [watch] backend
+WATCH_BACKEND_AUTO = 'auto'
+WATCH_BACKEND_INOTIFY = 'inotify'
+WATCH_BACKEND_POLLING = 'polling'
+
+# Constantes de <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+# Arquivo terminou de ser gravado, ou chegou por rename (ex.: .dcm.part -> .dcm);
+# IN_CREATE só interessa para subdiretórios novos do layout particionado
+_WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE_SELF
+
+# struct inotify_event: wd, mask, cookie, len, seguido do nome
+_EVENT_HEADER = struct.Struct('iIII')
+_READ_SIZE = 64 * 1024
+
+
+class PollingWatcher:
+    """
+    Observa um diretório comparando varreduras periódicas
+
+    Usado onde inotify não está disponível (outros sistemas, sistemas de
+    arquivos de rede). Arquivos cujo tamanho ou data de modificação mudou
+    desde a varredura anterior são reportados; os já presentes na criação
+    do observador não são.
+    """
+    def __init__(self, directory: str, suffix: str = '', interval: float = 5.0):
+        """
+        Args:
+            directory (str): Diretório observado, com seus subdiretórios
+            suffix (str, opcional): Extensão dos arquivos reportados
+            interval (float, opcional): Segundos entre varreduras. Padrão 5.
+        """
+        self.directory = directory
+        self.suffix = suffix
+        self.interval = interval
+        self._states = self._scan_states()
+        self._next_scan = time.monotonic() + interval
+
+    def _scan_states(self) -> Dict[str, Tuple[int, int]]:
+        states = {}
+        for entry in iter_entries(self.directory, self.suffix):
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            states[entry.path] = (stat.st_size, stat.st_mtime_ns)
+        return states
+
+    def read(self, timeout: float) -> List[str]:
+        """
+        Aguarda até ``timeout`` segundos por arquivos novos ou alterados
+
+        Returns:
+            List[str]: Caminhos dos arquivos novos ou alterados
+        """
+        remaining = self._next_scan - time.monotonic()
+        if remaining > 0:
+            time.sleep(min(timeout, remaining))
+            if time.monotonic() < self._next_scan:
+                return []
+
+        self._next_scan = time.monotonic() + self.interval
+        states = self._scan_states()
+        changed = [path for path, state in states.items() if self._states.get(path) != state]
+        self._states = states
+        return changed
+
+    def close(self):
+        self._states = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class InotifyWatcher:
+    """
+    Observa um diretório com inotify (Linux), via ``ctypes``
+
+    Reporta arquivos fechados após escrita e arquivos renomeados para
+    dentro do diretório. Subdiretórios criados depois (layout particionado)
+    passam a ser observados automaticamente. Se a fila do kernel
+    transbordar, o diretório inteiro é reportado de novo; quem consome
+    descarta os arquivos já processados.
+    """
+    def __init__(self, directory: str, suffix: str = ''):
+        """
+        Args:
+            directory (str): Diretório observado, com seus subdiretórios
+            suffix (str, opcional): Extensão dos arquivos reportados
+
+        Raises:
+            OSError: Se inotify não estiver disponível
+        """
+        self.directory = directory
+        self.suffix = suffix
+
+        libc_name = ctypes.util.find_library('c') or 'libc.so.6'
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._libc.inotify_init1.argtypes = [ctypes.c_int]
+        self._libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+
+        fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, f"inotify_init1: {os.strerror(error)}")
+        self._fd = fd
+        self._watches: Dict[int, str] = {}
+
+        try:
+            self._add_tree(directory)
+        except OSError:
+            self.close()
+            raise
+
+    def _add_watch(self, path: str):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), _WATCH_MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, f"inotify_add_watch: {os.strerror(error)}", path)
+        self._watches[wd] = path
+
+    def _add_tree(self, directory: str) -> List[str]:
+        """
+        Observa um diretório e seus subdiretórios
+
+        Returns:
+            List[str]: Arquivos já presentes, gravados antes de a observação começar
+        """
+        found = []
+        pending = [directory]
+        while pending:
+            current = pending.pop()
+            self._add_watch(current)
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        if entry.name.startswith('.'):
+                            continue
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(entry.path)
+                        elif entry.name.endswith(self.suffix):
+                            found.append(entry.path)
+            except FileNotFoundError:
+                continue
+        return found
+
+    def _accepts(self, name: str) -> bool:
+        return not name.startswith('.') and name.endswith(self.suffix)
+
+    def _rescan(self) -> List[str]:
+        logger.warning(f"Fila de eventos de {self.directory} transbordou; varrendo o diretório")
+        return [entry.path for entry in iter_entries(self.directory, self.suffix)]
+
+    def read(self, timeout: float) -> List[str]:
+        """
+        Aguarda até ``timeout`` segundos por arquivos gravados
+
+        Returns:
+            List[str]: Caminhos dos arquivos gravados ou movidos para o diretório
+        """
+        ready, _, _ = select.select([self._fd], [], [], max(0.0, timeout))
+        if not ready:
+            return []
+
+        data = b''
+        while True:
+            try:
+                chunk = os.read(self._fd, _READ_SIZE)
+            except BlockingIOError:
+                break
+            except OSError as e:
+                if e.errno == errno.EINTR:
+                    continue
+                raise
+            if not chunk:
+                break
+            data += chunk
+
+        changed = []
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            raw_name = data[offset + _EVENT_HEADER.size:offset + _EVENT_HEADER.size + length]
+            offset += _EVENT_HEADER.size + length
+            name = os.fsdecode(raw_name.rstrip(b'\x00'))
+
+            if mask & IN_Q_OVERFLOW:
+                changed.extend(self._rescan())
+                continue
+            if mask & IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
+
+            parent = self._watches.get(wd)
+            if parent is None or not name:
+                continue
+            path = os.path.join(parent, name)
+
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO) and not name.startswith('.'):
+                    try:
+                        changed.extend(self._add_tree(path))
+                    except OSError as e:
+                        logger.warning(f"Não foi possível observar {path}: {e}")
+            elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO) and self._accepts(name):
+                changed.append(path)
+
+        return changed
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+            self._watches = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def create_watcher(directory: str, suffix: str = '', backend: str = WATCH_BACKEND_AUTO,
+                   poll_interval: float = 5.0):
+    """
+    Cria o observador de diretório configurado
+
+    Com ``auto``, inotify é usado no Linux e, se não estiver disponível
+    (ou falhar, como em alguns sistemas de arquivos de rede), a observação
+    cai para varreduras periódicas.
+
+    Args:
+        directory (str): Diretório observado
+        suffix (str, opcional): Extensão dos arquivos reportados
+        backend (str, opcional): ``auto``, ``inotify`` ou ``polling``. Padrão ``auto``.
+        poll_interval (float, opcional): Segundos entre varreduras do modo
+            ``polling``. Padrão 5.
+
+    Returns:
+        InotifyWatcher | PollingWatcher: Observador pronto para ``read``
+
+    Raises:
+        ConfigurationError: Se o backend for desconhecido
+        OSError: Se ``inotify`` for exigido e não estiver disponível
+    """
+    backend = (backend or WATCH_BACKEND_AUTO).strip().lower()
+    if backend not in (WATCH_BACKEND_AUTO, WATCH_BACKEND_INOTIFY, WATCH_BACKEND_POLLING):
+        raise ConfigurationError(f"Backend de observação desconhecido: {backend}")
+
+    if backend == WATCH_BACKEND_INOTIFY:
+        return InotifyWatcher(directory, suffix)
+
+    if backend == WATCH_BACKEND_AUTO and sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(directory, suffix)
+        except (OSError, AttributeError) as e:
+            logger.warning(f"inotify indisponível ({e}); usando varredura a cada {poll_interval}s")
+
+    return PollingWatcher(directory, suffix, poll_interval)
@@ -0,0 +1,332 @@
+import os
+import json
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Limites (em segundos) dos buckets dos histogramas de latência
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+# Prefixo das métricas exportadas
+METRIC_PREFIX = 'dcm2pdf'
+
+
+class Histogram:
+    """
+    Histograma cumulativo de latências, no formato do Prometheus
+    """
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """
+        Estima um quantil por interpolação linear dentro do bucket
+
+        Args:
+            q (float): Quantil entre 0 e 1
+
+        Returns:
+            float: Latência estimada em segundos (0 sem observações)
+        """
+        if not self.count:
+            return 0.0
+
+        rank = q * self.count
+        cumulative = 0
+        lower = 0.0
+        for i, count in enumerate(self.counts):
+            upper = self.buckets[i] if i < len(self.buckets) else self.max
+            if count and cumulative + count >= rank:
+                fraction = (rank - cumulative) / count
+                return min(lower + (upper - lower) * fraction, self.max)
+            cumulative += count
+            lower = upper
+        return self.max
+
+
+class _StageMetrics:
+    """
+    Métricas de um estágio: latência por arquivo, arquivos, bytes e erros
+    """
+    def __init__(self, buckets: Sequence[float]):
+        self.latency = Histogram(buckets)
+        self.files = 0
+        self.errors = 0
+        self.bytes = 0
+
+
+class MetricsRegistry:
+    """
+    Registro de métricas por estágio (download, conversão, leitura, armazenamento)
+
+    Os estágios instrumentados usam ``timer``; os valores podem ser
+    exportados no formato texto do Prometheus (arquivo ou endpoint HTTP)
+    e como resumo JSON ao fim da execução.
+    """
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self._buckets = buckets
+        self._lock = threading.Lock()
+        self._stages: Dict[str, _StageMetrics] = {}
+        self._started_at = time.time()
+        self._server = None
+
+    def reset(self):
+        """
+        Zera as métricas, marcando o início de uma nova execução
+        """
+        with self._lock:
+            self._stages = {}
+            self._started_at = time.time()
+
+    def _stage(self, stage: str) -> _StageMetrics:
+        if stage not in self._stages:
+            self._stages[stage] = _StageMetrics(self._buckets)
+        return self._stages[stage]
+
+    def observe(self, stage: str, seconds: float, nbytes: int = 0, error: bool = False):
+        """
+        Registra o processamento de um arquivo em um estágio
+
+        Args:
+            stage (str): Nome do estágio
+            seconds (float): Duração em segundos
+            nbytes (int, opcional): Bytes processados
+            error (bool, opcional): True se o processamento falhou
+        """
+        with self._lock:
+            metrics = self._stage(stage)
+            metrics.latency.observe(seconds)
+            if error:
+                metrics.errors += 1
+            else:
+                metrics.files += 1
+                metrics.bytes += nbytes
+
+    @contextmanager
+    def timer(self, stage: str, nbytes: int = 0) -> Iterator[Dict[str, int]]:
+        """
+        Mede a duração do bloco ``with`` como processamento de um arquivo
+
+        Exceções são contadas como erro do estágio e propagadas. Os bytes
+        podem ser informados na chamada ou, quando só são conhecidos ao
+        final, atribuídos a ``bytes`` no dicionário retornado.
+
+        Args:
+            stage (str): Nome do estágio
+            nbytes (int, opcional): Bytes processados
+
+        Yields:
+            Dict[str, int]: Dicionário com a chave ``bytes``
+        """
+        measurement = {'bytes': nbytes}
+        start = time.perf_counter()
+        try:
+            yield measurement
+        except BaseException:
+            self.observe(stage, time.perf_counter() - start, error=True)
+            raise
+        self.observe(stage, time.perf_counter() - start, measurement['bytes'])
+
+    def summary(self) -> dict:
+        """
+        Resumo das métricas por estágio
+
+        Returns:
+            dict: Duração da execução e, por estágio, arquivos, erros, bytes,
+            vazão e latências (média, p50, p95, p99 e máxima, em segundos)
+        """
+        with self._lock:
+            elapsed = max(time.time() - self._started_at, 1e-9)
+            stages = {}
+            for name, metrics in sorted(self._stages.items()):
+                latency = metrics.latency
+                stages[name] = {
+                    'files': metrics.files,
+                    'errors': metrics.errors,
+                    'bytes': metrics.bytes,
+                    'seconds_total': round(latency.sum, 6),
+                    'files_per_second': round(metrics.files / elapsed, 3),
+                    'bytes_per_second': round(metrics.bytes / elapsed, 1),
+                    'latency_mean': round(latency.sum / latency.count, 6) if latency.count else 0.0,
+                    'latency_p50': round(latency.quantile(0.50), 6),
+                    'latency_p95': round(latency.quantile(0.95), 6),
+                    'latency_p99': round(latency.quantile(0.99), 6),
+                    'latency_max': round(latency.max, 6),
+                }
+            return {'elapsed_seconds': round(elapsed, 3), 'stages': stages}
+
+    def render_prometheus(self) -> str:
+        """
+        Métricas no formato texto de exposição do Prometheus
+
+        Returns:
+            str: Texto com histogramas de latência e contadores por estágio
+        """
+        name = f'{METRIC_PREFIX}_stage_duration_seconds'
+        lines = [
+            f'# HELP {name} Duração do processamento de um arquivo por estágio',
+            f'# TYPE {name} histogram',
+        ]
+        counters = {
+            'files_total': ('Arquivos processados com sucesso por estágio', 'files'),
+            'errors_total': ('Falhas por estágio', 'errors'),
+            'bytes_total': ('Bytes processados por estágio', 'bytes'),
+        }
+
+        with self._lock:
+            stages = sorted(self._stages.items())
+            for stage, metrics in stages:
+                latency = metrics.latency
+                cumulative = 0
+                for bound, count in zip(latency.buckets, latency.counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{stage="{stage}",le="{bound:g}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {latency.count}')
+                lines.append(f'{name}_sum{{stage="{stage}"}} {latency.sum:.6f}')
+                lines.append(f'{name}_count{{stage="{stage}"}} {latency.count}')
+
+            for suffix, (description, attribute) in counters.items():
+                counter = f'{METRIC_PREFIX}_{suffix}'
+                lines.append(f'# HELP {counter} {description}')
+                lines.append(f'# TYPE {counter} counter')
+                for stage, metrics in stages:
+                    lines.append(f'{counter}{{stage="{stage}"}} {getattr(metrics, attribute)}')
+
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path: str):
+        """
+        Grava as métricas em arquivo (para o textfile collector do node_exporter)
+
+        O arquivo é substituído atomicamente, de forma que leitores nunca
+        veem uma versão parcial.
+        """
+        _write_atomic(path, self.render_prometheus())
+
+    def serve(self, port: int, host: str = '0.0.0.0'):
+        """
+        Expõe as métricas em ``http://<host>:<port>/metrics`` em uma thread de fundo
+
+        Chamadas repetidas não iniciam outro servidor.
+        """
+        if self._server is not None:
+            return
+
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = registry.render_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, name='metrics-http', daemon=True).start()
+        logger.info(f"Métricas disponíveis em http://{host}:{port}/metrics")
+
+
+def _write_atomic(path: str, content: str):
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    temporary = f'{path}.tmp'
+    with open(temporary, 'w', encoding='utf-8') as file:
+        file.write(content)
+    os.replace(temporary, path)
+
+
+# Registro padrão, compartilhado pelos módulos instrumentados
+metrics = MetricsRegistry()
+
+
+def start_run(config_manager, registry: MetricsRegistry = metrics):
+    """
+    Prepara as métricas para uma nova execução
+
+    Zera o registro e, se ``[metrics] port`` estiver configurado, inicia o
+    endpoint HTTP.
+    """
+    registry.reset()
+    port = config_manager.get_int('metrics', 'port', 0)
+    if port:
+        try:
+            registry.serve(port)
+        except OSError as e:
+            logger.warning(f"Não foi possível expor métricas na porta {port}: {e}")
+
+
+def report_run(config_manager, total: int, converted: int, failed: int,
+               registry: MetricsRegistry = metrics, skipped: int = 0) -> dict:
+    """
+    Encerra uma execução: exibe o resumo e exporta as métricas
+
+    O resumo é gravado em JSON em ``[metrics] summary_file`` e as métricas
+    no formato do Prometheus em ``[metrics] prometheus_file``, quando
+    configurados.
+
+    Args:
+        config_manager (ConfigManager): Gerenciador de configurações
+        total (int): Arquivos processados
+        converted (int): Arquivos convertidos com sucesso
+        failed (int): Arquivos com falha
+        registry (MetricsRegistry, opcional): Registro de métricas
+        skipped (int, opcional): Arquivos encontrados mas ignorados por já
+            terem sido convertidos. Padrão 0.
+
+    Returns:
+        dict: Resumo da execução
+    """
+    summary = registry.summary()
+    summary['files'] = {'total': total, 'converted': converted, 'failed': failed}
+
+    print(f"\nResumo:")
+    if skipped:
+        print(f"Total de arquivos encontrados: {total + skipped}")
+        print(f"Arquivos já convertidos ignorados: {skipped}")
+    print(f"Total de arquivos processados: {total}")
+    print(f"Convertidos com sucesso: {converted}")
+    print(f"Falhas na conversão: {failed}")
+    for stage, values in summary['stages'].items():
+        print(
+            f"  {stage}: {values['files']} arquivos, {values['errors']} erros, "
+            f"p50 {values['latency_p50']:.3f}s, p99 {values['latency_p99']:.3f}s"
+        )
+
+    logger.info(f"Resumo da execução: {json.dumps(summary)}")
+
+    summary_file = config_manager.get('metrics', 'summary_file', None)
+    prometheus_file = config_manager.get('metrics', 'prometheus_file', None)
+    try:
+        if summary_file:
+            _write_atomic(summary_file, json.dumps(summary, indent=2) + '\n')
+        if prometheus_file:
+            registry.write_prometheus(prometheus_file)
+    except OSError as e:
+        logger.warning(f"Não foi possível exportar métricas: {e}")
+
+    return summary
@@ -0,0 +1,110 @@
+import os
+import hashlib
+from typing import Iterator
+
+# Caracteres hexadecimais por nível de diretório: 256 subdiretórios por nível
+SHARD_WIDTH = 2
+
+# Níveis aceitos em [paths] shard_depth
+MAX_SHARD_DEPTH = 4
+
+
+def get_shard_depth(config_manager) -> int:
+    """
+    Níveis de diretórios de ``[paths] shard_depth``, entre 0 (plano) e ``MAX_SHARD_DEPTH``
+    """
+    depth = config_manager.get_int('paths', 'shard_depth', 0)
+    return max(0, min(depth, MAX_SHARD_DEPTH))
+
+
+def shard_path(directory: str, filename: str, depth: int = 0) -> str:
+    """
+    Caminho de um arquivo em um diretório particionado por prefixo de hash
+
+    Com ``depth`` níveis, o arquivo fica em ``directory/ab/cd/filename``,
+    em que ``abcd`` é o início do MD5 do nome sem extensão. O DICOM e o PDF
+    de um mesmo estudo caem, assim, no mesmo subdiretório relativo, e
+    nenhum diretório acumula mais que uma fração dos arquivos. Com
+    ``depth`` 0 o caminho é o mesmo do layout plano.
+
+    Args:
+        directory (str): Diretório raiz
+        filename (str): Nome do arquivo
+        depth (int, opcional): Níveis de subdiretórios. Padrão 0.
+
+    Returns:
+        str: Caminho do arquivo (os subdiretórios não são criados)
+    """
+    if depth <= 0:
+        return os.path.join(directory, filename)
+
+    stem = os.path.splitext(filename)[0]
+    digest = hashlib.md5(stem.encode('utf-8')).hexdigest()
+    shards = [digest[i * SHARD_WIDTH:(i + 1) * SHARD_WIDTH] for i in range(depth)]
+    return os.path.join(directory, *shards, filename)
+
+
+def ensure_parent(path: str) -> str:
+    """
+    Cria o diretório de um arquivo, se preciso, e retorna o próprio caminho
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    return path
+
+
+def iter_entries(directory: str, suffix: str = '') -> Iterator[os.DirEntry]:
+    """
+    Percorre os arquivos de um diretório e de seus subdiretórios sob demanda
+
+    Cada entrada é entregue assim que é lida por ``os.scandir``, sem montar
+    a listagem completa antes; quem consome pode começar a trabalhar
+    enquanto a varredura continua, e o ``stat`` em cache de cada entrada
+    evita uma nova consulta ao sistema de arquivos. Entradas ocultas
+    (iniciadas por ``.``), como os índices SQLite do diretório de download,
+    são ignoradas. Layouts plano e particionado são percorridos da mesma forma.
+
+    Args:
+        directory (str): Diretório raiz
+        suffix (str, opcional): Extensão dos arquivos entregues. Padrão: todos.
+
+    Yields:
+        os.DirEntry: Entrada de cada arquivo
+    """
+    pending = [directory]
+    while pending:
+        current = pending.pop()
+        try:
+            entries = os.scandir(current)
+        except FileNotFoundError:
+            continue
+
+        subdirectories = []
+        with entries:
+            for entry in entries:
+                if entry.name.startswith('.'):
+                    continue
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirectories.append(entry.path)
+                    elif entry.name.endswith(suffix) and entry.is_file():
+                        yield entry
+                except OSError:
+                    continue
+
+        # Ordem estável: subdiretórios em ordem alfabética
+        pending.extend(sorted(subdirectories, reverse=True))
+
+
+def iter_files(directory: str, suffix: str = '') -> Iterator[str]:
+    """
+    Caminhos dos arquivos entregues por ``iter_entries``
+
+    Args:
+        directory (str): Diretório raiz
+        suffix (str, opcional): Extensão dos arquivos entregues. Padrão: todos.
+
+    Yields:
+        str: Caminho de cada arquivo
+    """
+    for entry in iter_entries(directory, suffix):
+        yield entry.path
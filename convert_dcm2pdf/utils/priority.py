@@ -0,0 +1,309 @@
+import os
+import re
+import copy
+import math
+import time
+import queue
+import logging
+import datetime
+import itertools
+from typing import Any, Optional, Sequence, Tuple
+from convert_dcm2pdf.utils.dicom_header import read_study_attributes
+from convert_dcm2pdf.utils.exceptions import ConfigurationError, DicomConverterError
+
+logger = logging.getLogger(__name__)
+
+# Classes de prioridade, da mais urgente para a menos urgente
+PRIORITY_URGENT = 0
+PRIORITY_ROUTINE = 1
+PRIORITY_BACKFILL = 2
+PRIORITY_CLASSES = ('urgent', 'routine', 'backfill')
+
+# Prazo padrão de cada classe, em segundos a partir da chegada do estudo
+DEFAULT_SLAS = (900.0, 4 * 3600.0, 7 * 24 * 3600.0)
+
+# Nomes de colunas aceitos nas expressões SQL montadas a partir da configuração
+_IDENTIFIER = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)?$')
+
+
+def _column(value: str, key: str) -> str:
+    """
+    Valida um nome de coluna vindo da configuração antes de usá-lo em SQL
+    """
+    if not _IDENTIFIER.match(value):
+        raise ConfigurationError(f"Nome de coluna inválido em [priority] {key}: {value}")
+    return value
+
+
+def _parse_date(value: Any) -> Optional[datetime.date]:
+    """
+    Converte uma data do DICOM (``AAAAMMDD``) ou do banco em ``date``
+    """
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    if not value:
+        return None
+    try:
+        return datetime.datetime.strptime(str(value).strip().replace('-', '')[:8], '%Y%m%d').date()
+    except ValueError:
+        return None
+
+
+class PriorityPolicy:
+    """
+    Classes de prioridade e prazos (SLA) de estudos, da seção ``[priority]``
+
+    Cada estudo recebe uma classe a partir de seus metadados: a coluna de
+    prioridade, quando configurada e preenchida, prevalece; senão estudos
+    recentes de modalidades urgentes são ``urgent``, os demais estudos
+    recentes são ``routine`` e o restante é ``backfill``.
+
+    O prazo de um estudo é o momento de sua chegada mais o SLA da classe,
+    e o trabalho é atendido pelo prazo mais próximo (earliest deadline
+    first). Estudos urgentes passam à frente dos que chegaram antes, mas
+    um estudo de backfill nunca espera indefinidamente: assim que seu prazo
+    fica mais próximo que o dos urgentes que continuam chegando, ele é
+    atendido.
+    """
+    def __init__(self, urgent_modalities: Sequence[str] = (), urgent_days: int = 1, routine_days: int = 30,
+                 slas: Sequence[float] = DEFAULT_SLAS, priority_column: Optional[str] = None,
+                 modality_column: str = 'modality', date_column: str = 'study_date'):
+        """
+        Inicializa a política
+
+        Args:
+            urgent_modalities (Sequence[str], opcional): Modalidades urgentes
+            urgent_days (int, opcional): Idade máxima, em dias, de um estudo
+                urgente. Padrão 1.
+            routine_days (int, opcional): Idade máxima, em dias, de um estudo
+                de rotina. Padrão 30.
+            slas (Sequence[float], opcional): Prazo em segundos de cada classe
+                (urgent, routine, backfill)
+            priority_column (str, opcional): Coluna com a classe (0, 1 ou 2)
+                definida na origem
+            modality_column (str, opcional): Coluna da modalidade. Padrão ``modality``.
+            date_column (str, opcional): Coluna da data do estudo. Padrão ``study_date``.
+        """
+        self.urgent_modalities = frozenset(modality.upper() for modality in urgent_modalities)
+        self.urgent_days = urgent_days
+        self.routine_days = routine_days
+        self.slas = tuple(float(sla) for sla in slas)
+        self.priority_column = _column(priority_column, 'priority_column') if priority_column else None
+        self.modality_column = _column(modality_column, 'modality_column')
+        self.date_column = _column(date_column, 'date_column')
+
+    @classmethod
+    def from_config(cls, config_manager) -> Optional['PriorityPolicy']:
+        """
+        Cria a política a partir da seção ``[priority]`` se ela estiver ativa
+
+        Args:
+            config_manager (ConfigManager): Gerenciador de configurações
+
+        Returns:
+            Optional[PriorityPolicy]: Política configurada ou None se desativada
+        """
+        if not config_manager.get_bool('priority', 'enabled', False):
+            return None
+
+        return cls(
+            urgent_modalities=config_manager.get_list('priority', 'urgent_modalities'),
+            urgent_days=config_manager.get_int('priority', 'urgent_days', 1),
+            routine_days=config_manager.get_int('priority', 'routine_days', 30),
+            slas=[
+                config_manager.get_float('priority', f'{name}_sla', default)
+                for name, default in zip(PRIORITY_CLASSES, DEFAULT_SLAS)
+            ],
+            priority_column=config_manager.get('priority', 'priority_column', None) or None,
+            modality_column=config_manager.get('priority', 'modality_column', 'modality') or 'modality',
+            date_column=config_manager.get('priority', 'date_column', 'study_date') or 'study_date'
+        )
+
+    def with_columns(self, modality_column: str, date_column: str,
+                     priority_column: Optional[str] = None) -> 'PriorityPolicy':
+        """
+        Cópia da política para uma tabela com outros nomes de colunas
+
+        Returns:
+            PriorityPolicy: Mesmas regras e prazos, com as colunas informadas
+        """
+        policy = copy.copy(self)
+        policy.modality_column = _column(modality_column, 'modality_column')
+        policy.date_column = _column(date_column, 'date_column')
+        policy.priority_column = _column(priority_column, 'priority_column') if priority_column else None
+        return policy
+
+    def classify(self, modality: Optional[str] = None, study_date: Any = None, priority: Optional[int] = None,
+                 today: Optional[datetime.date] = None) -> int:
+        """
+        Classe de prioridade de um estudo
+
+        Args:
+            modality (str, opcional): Modalidade do estudo
+            study_date (Any, opcional): Data do estudo (``date`` ou ``AAAAMMDD``)
+            priority (int, opcional): Classe definida na origem, que prevalece
+            today (datetime.date, opcional): Data de referência. Padrão: hoje.
+
+        Returns:
+            int: ``PRIORITY_URGENT``, ``PRIORITY_ROUTINE`` ou ``PRIORITY_BACKFILL``
+        """
+        if priority is not None:
+            return min(max(int(priority), PRIORITY_URGENT), PRIORITY_BACKFILL)
+
+        date = _parse_date(study_date)
+        if date is None:
+            return PRIORITY_BACKFILL
+
+        age = ((today or datetime.date.today()) - date).days
+        if modality and modality.upper() in self.urgent_modalities and age <= self.urgent_days:
+            return PRIORITY_URGENT
+        if age <= self.routine_days:
+            return PRIORITY_ROUTINE
+        return PRIORITY_BACKFILL
+
+    def sla(self, priority_class: int) -> float:
+        """
+        Prazo, em segundos, de uma classe
+        """
+        return self.slas[priority_class]
+
+    def deadline(self, priority_class: int, arrival: Optional[float] = None) -> float:
+        """
+        Prazo de um estudo, em segundos desde a época
+
+        Args:
+            priority_class (int): Classe de prioridade
+            arrival (float, opcional): Chegada do estudo. Padrão: agora.
+        """
+        return (time.time() if arrival is None else arrival) + self.sla(priority_class)
+
+    def file_deadline(self, dcm_filepath: str) -> float:
+        """
+        Prazo de um arquivo DICOM local
+
+        A classe vem da modalidade e da data do estudo lidas do cabeçalho e
+        a chegada é a data de modificação do arquivo. Arquivos cujo
+        cabeçalho não pode ser lido são tratados como backfill.
+
+        Args:
+            dcm_filepath (str): Caminho do arquivo DICOM
+
+        Returns:
+            float: Prazo em segundos desde a época
+        """
+        try:
+            arrival = os.path.getmtime(dcm_filepath)
+        except OSError:
+            arrival = None
+
+        try:
+            priority_class = self.classify(*read_study_attributes(dcm_filepath))
+        except (OSError, DicomConverterError) as e:
+            logger.debug(f"Prioridade de {dcm_filepath} não determinada: {e}")
+            priority_class = PRIORITY_BACKFILL
+
+        return self.deadline(priority_class, arrival)
+
+    def class_sql(self) -> Tuple[str, tuple]:
+        """
+        Expressão SQL que calcula a classe de prioridade de cada linha
+
+        Returns:
+            Tuple[str, tuple]: Expressão ``CASE`` e seus parâmetros
+        """
+        study_date = f"CAST({self.date_column} AS DATE)"
+        conditions = []
+        params = []
+
+        if self.priority_column:
+            conditions.append(
+                f"WHEN {self.priority_column} IS NOT NULL "
+                f"THEN LEAST(GREATEST({self.priority_column}, {PRIORITY_URGENT}), {PRIORITY_BACKFILL})"
+            )
+        if self.urgent_modalities:
+            conditions.append(
+                f"WHEN UPPER({self.modality_column}) = ANY(%s) "
+                f"AND {study_date} >= CURRENT_DATE - %s THEN {PRIORITY_URGENT}"
+            )
+            params += [sorted(self.urgent_modalities), self.urgent_days]
+        conditions.append(f"WHEN {study_date} >= CURRENT_DATE - %s THEN {PRIORITY_ROUTINE}")
+        params.append(self.routine_days)
+
+        return f"CASE {' '.join(conditions)} ELSE {PRIORITY_BACKFILL} END", tuple(params)
+
+    def urgent_sql(self) -> Optional[Tuple[str, tuple]]:
+        """
+        Condição SQL que restringe a busca aos estudos que podem ser urgentes
+
+        Compara diretamente as colunas de data e de classe, sem passar pelo
+        ``CASE`` de ``class_sql``, para que índices nessas colunas sejam
+        usados. Pode incluir estudos de outras classes (por exemplo, com a
+        classe definida na origem); a classe exata continua vindo de
+        ``class_sql``.
+
+        Returns:
+            Optional[Tuple[str, tuple]]: Condição e seus parâmetros, ou None
+            se nenhum estudo pode ser urgente
+        """
+        conditions = []
+        params = []
+
+        if self.priority_column:
+            conditions.append(f"{self.priority_column} <= {PRIORITY_URGENT}")
+        if self.urgent_modalities:
+            conditions.append(
+                f"(CAST({self.date_column} AS DATE) >= CURRENT_DATE - %s "
+                f"AND UPPER({self.modality_column}) = ANY(%s))"
+            )
+            params += [self.urgent_days, sorted(self.urgent_modalities)]
+
+        if not conditions:
+            return None
+        return f"({' OR '.join(conditions)})", tuple(params)
+
+    def deadline_sql(self, arrival_expression: str) -> Tuple[str, tuple]:
+        """
+        Expressão SQL que calcula o prazo de cada linha
+
+        Args:
+            arrival_expression (str): Expressão com o momento de chegada
+                (por exemplo ``created_at``)
+
+        Returns:
+            Tuple[str, tuple]: Expressão e seus parâmetros
+        """
+        class_expression, params = self.class_sql()
+        expression = (
+            f"{arrival_expression} + make_interval(secs => CASE {class_expression} "
+            f"WHEN {PRIORITY_URGENT} THEN %s WHEN {PRIORITY_ROUTINE} THEN %s ELSE %s END)"
+        )
+        return expression, params + self.slas
+
+
+class DeadlineQueue:
+    """
+    Fila limitada entre estágios que entrega primeiro o item de prazo mais próximo
+
+    Itens com o mesmo prazo, inclusive os sem prazo, saem na ordem em que
+    entraram; sem prazos a fila se comporta como ``queue.Queue``.
+    """
+    def __init__(self, maxsize: int = 0):
+        self._queue = queue.PriorityQueue(maxsize)
+        self._sequence = itertools.count()
+
+    def put(self, item: Any, deadline: float = math.inf):
+        """
+        Adiciona um item, bloqueando enquanto a fila estiver cheia
+        """
+        self._queue.put((deadline, next(self._sequence), item))
+
+    def get(self) -> Any:
+        """
+        Remove e retorna o item de prazo mais próximo, bloqueando enquanto a fila estiver vazia
+        """
+        return self._queue.get()[2]
+
+    def qsize(self) -> int:
+        return self._queue.qsize()
@@ -1,23 +1,117 @@
 import sys
+import signal
 import logging
+import argparse
 from convert_dcm2pdf.core.dcm_downloader import DCMDownloader
 from convert_dcm2pdf.core.dcm_converter import DCMConverter
+from convert_dcm2pdf.core.pipeline import DCMPipeline
+from convert_dcm2pdf.core.distributed_worker import DistributedWorker
 from convert_dcm2pdf.utils.logging_config import setup_logging
 from convert_dcm2pdf.core.config_manager import ConfigManager
 
+def parse_args(argv=None):
+    """
+    Lê argumentos de linha de comando
+
+    Sem argumentos, o menu interativo é exibido.
+    """
+    parser = argparse.ArgumentParser(description="DICOM Converter")
+    parser.add_argument(
+        '--pipeline', action='store_true',
+        help="Executa download, conversão e armazenamento em um único fluxo, sem menu"
+    )
+    parser.add_argument(
+        '--worker', action='store_true',
+        help="Executa como worker distribuído, processando arquivos da fila dicom_files até ser interrompido"
+    )
+    parser.add_argument(
+        '--watch', action='store_true',
+        help="Converte os arquivos DICOM à medida que chegam ao diretório de download, até ser interrompido"
+    )
+    parser.add_argument(
+        '--exit-when-idle', action='store_true',
+        help="No modo worker, encerra quando a fila estiver vazia"
+    )
+    parser.add_argument(
+        '--limit', type=int, default=10,
+        help="Limite de arquivos a baixar no pipeline (padrão: 10; 0 = todos)"
+    )
+    parser.add_argument(
+        '--force', action='store_true',
+        help="Converte todos os arquivos, ignorando o índice de arquivos já processados"
+    )
+    return parser.parse_args(argv)
+
+def run_pipeline(config_manager, limit, force=False):
+    """
+    Executa o pipeline completo e retorna o código de saída do processo
+    """
+    pipeline = DCMPipeline(config_manager)
+    _, error_files = pipeline.run(limit=limit or None, force=force)
+    return 1 if error_files else 0
+
+def run_worker(config_manager, exit_when_idle=False):
+    """
+    Executa um worker distribuído e retorna o código de saída do processo
+
+    SIGINT e SIGTERM encerram o worker depois que os arquivos em andamento
+    terminam.
+    """
+    worker = DistributedWorker(config_manager)
+
+    def request_stop(signum, frame):
+        print("Encerrando worker após os arquivos em andamento...")
+        worker.stop()
+
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+
+    _, failed = worker.run(exit_when_idle=exit_when_idle)
+    return 1 if failed else 0
+
+def run_watch(config_manager):
+    """
+    Executa o modo de observação e retorna o código de saída do processo
+
+    SIGINT e SIGTERM encerram a observação depois que as conversões em
+    andamento terminam.
+    """
+    converter = DCMConverter(config_manager)
+
+    def request_stop(signum, frame):
+        print("Encerrando observação após as conversões em andamento...")
+        converter.stop_watching()
+
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+
+    _, failed = converter.watch()
+    return 1 if failed else 0
+
 def main():
     # Configurar logging
     setup_logging()
     logger = logging.getLogger(__name__)
+    args = parse_args()
 
     try:
         # Gerenciar configurações
         config_manager = ConfigManager()
 
+        if args.worker:
+            sys.exit(run_worker(config_manager, args.exit_when_idle))
+
+        if args.watch:
+            sys.exit(run_watch(config_manager))
+
+        if args.pipeline:
+            sys.exit(run_pipeline(config_manager, args.limit, args.force))
+
         while True:
             print("\nDICOM Converter")
             print("1 - Baixar arquivos DICOM")
             print("2 - Converter arquivos DICOM")
+            print("4 - Baixar e converter (pipeline)")
             print("3 - Sair")
             
             escolha = input("Escolha uma opção: ")
@@ -28,12 +122,15 @@ def main():
             
             elif escolha == '2':
                 converter = DCMConverter(config_manager)
-                converter.convert_all_dcm_files()
+                converter.convert_all_dcm_files(force=args.force)
             
             elif escolha == '3':
                 print("Encerrando...")
                 break
             
+            elif escolha == '4':
+                DCMPipeline(config_manager).run(limit=args.limit or None, force=args.force)
+            
             else:
                 print("Opção inválida!")
 
@@ -1,17 +1,25 @@
 import sys
 import logging
+import argparse
 from convert_dcm2pdf.core.config_manager import ConfigManager
 from convert_dcm2pdf.database.connect import PostgreSQLConnector
+from convert_dcm2pdf.database.work_queue import StudyWorkQueue
+from convert_dcm2pdf.database.conversion_jobs import ConversionJobQueue
 
 def create_pdf_storage_table(connector):
     """
     Cria tabela para armazenamento de PDFs
+
+    O conteúdo fica em ``file_content`` (base64, legado), ``file_data``
+    (BYTEA) ou em um large object referenciado por ``file_oid``.
     """
     create_table_query = """
     CREATE TABLE IF NOT EXISTS pdf_storage (
         id SERIAL PRIMARY KEY,
         filename VARCHAR(255) NOT NULL,
-        file_content TEXT NOT NULL,
+        file_content TEXT,
+        file_data BYTEA,
+        file_oid OID,
         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
         updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
         status VARCHAR(50) DEFAULT 'active'
@@ -20,43 +28,165 @@ def create_pdf_storage_table(connector):
     connector.execute(create_table_query)
     print("Tabela pdf_storage criada com sucesso.")
 
+def create_pdf_references_table(connector):
+    """
+    Cria tabela de referências para PDFs de DICOMs duplicados
+
+    Estudos com conteúdo idêntico a um já armazenado apontam para o PDF
+    existente em vez de gravar outra cópia.
+    """
+    create_table_query = """
+    CREATE TABLE IF NOT EXISTS pdf_references (
+        id SERIAL PRIMARY KEY,
+        filename VARCHAR(255) NOT NULL,
+        source_sha256 CHAR(64) NOT NULL,
+        stored_filename VARCHAR(255) NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """
+    connector.execute(create_table_query)
+    print("Tabela pdf_references criada com sucesso.")
+
+def create_work_queue_tables(connector):
+    """
+    Cria as tabelas da fila de trabalho de downloads
+    """
+    for query in StudyWorkQueue.SCHEMA:
+        connector.execute(query)
+    print("Tabelas da fila de trabalho criadas com sucesso.")
+
+def create_conversion_job_tables(connector):
+    """
+    Cria as colunas de arrendamento em ``dicom_files`` e a tabela de
+    workers distribuídos
+
+    Ignorado, sem interromper a migração, se ``dicom_files`` ainda não
+    existe (ver ``scripts/setup_database.py``).
+    """
+    if connector.execute_query("SELECT to_regclass('dicom_files')")[0][0] is None:
+        print("Tabela dicom_files não encontrada; tabelas dos workers distribuídos não criadas.")
+        return
+
+    for query in ConversionJobQueue.SCHEMA:
+        connector.execute(query)
+    print("Tabelas dos workers distribuídos criadas com sucesso.")
+
+def add_binary_columns(connector):
+    """
+    Adiciona as colunas de armazenamento binário em tabelas já existentes
+    """
+    alter_queries = [
+        "ALTER TABLE pdf_storage ADD COLUMN IF NOT EXISTS file_data BYTEA",
+        "ALTER TABLE pdf_storage ADD COLUMN IF NOT EXISTS file_oid OID",
+        "ALTER TABLE pdf_storage ALTER COLUMN file_content DROP NOT NULL"
+    ]
+
+    for query in alter_queries:
+        connector.execute(query)
+        print(f"Coluna ajustada: {query}")
+
 def add_index(connector):
     """
     Adiciona índices para melhorar performance
     """
     create_index_queries = [
         "CREATE INDEX IF NOT EXISTS idx_pdf_filename ON pdf_storage(filename)",
-        "CREATE INDEX IF NOT EXISTS idx_pdf_status ON pdf_storage(status)"
+        "CREATE INDEX IF NOT EXISTS idx_pdf_status ON pdf_storage(status)",
+        "CREATE INDEX IF NOT EXISTS idx_pdf_references_sha256 ON pdf_references(source_sha256)"
     ]
-    
+
     for query in create_index_queries:
         connector.execute(query)
         print(f"Índice criado: {query}")
 
+def convert_base64_to_bytea(connector, chunk_size=500):
+    """
+    Converte linhas com conteúdo base64 para a coluna BYTEA, em blocos
+
+    Cada bloco é decodificado no próprio servidor e confirmado em uma
+    transação separada, de forma que a migração pode ser interrompida e
+    retomada sem perder o que já foi convertido.
+
+    Args:
+        connector (PostgreSQLConnector): Conector conectado ao banco
+        chunk_size (int, opcional): Linhas convertidas por transação. Padrão 500.
+
+    Returns:
+        int: Total de linhas convertidas
+    """
+    convert_query = """
+    UPDATE pdf_storage
+    SET file_data = decode(file_content, 'base64'),
+        file_content = NULL,
+        updated_at = CURRENT_TIMESTAMP
+    WHERE id IN (
+        SELECT id FROM pdf_storage
+        WHERE file_content IS NOT NULL AND file_data IS NULL AND file_oid IS NULL
+        ORDER BY id
+        LIMIT %s
+        FOR UPDATE SKIP LOCKED
+    )
+    """
+    total = 0
+
+    while True:
+        converted = connector.execute(convert_query, (chunk_size,))
+        if not converted:
+            break
+        total += converted
+        print(f"Linhas convertidas para BYTEA: {total}")
+
+    return total
+
+def parse_args(argv=None):
+    """
+    Lê argumentos de linha de comando
+    """
+    parser = argparse.ArgumentParser(description="Migração do banco de dados")
+    parser.add_argument(
+        '--to-bytea', action='store_true',
+        help="Converte o conteúdo base64 existente para a coluna BYTEA"
+    )
+    parser.add_argument(
+        '--chunk-size', type=int, default=500,
+        help="Linhas convertidas por transação (padrão: 500)"
+    )
+    return parser.parse_args(argv)
+
 def main():
     # Configurar logging
     logging.basicConfig(level=logging.INFO)
-    
+    args = parse_args()
+
     try:
         # Carregar configurações
         config_manager = ConfigManager()
         db_config = config_manager.get_database_config()
-        
+
         # Conectar ao banco de dados
         with PostgreSQLConnector(db_config) as connector:
             print("Iniciando migração de banco de dados...")
-            
-            # Criar tabela
+
+            # Criar tabelas
             create_pdf_storage_table(connector)
-            
+            create_pdf_references_table(connector)
+            create_work_queue_tables(connector)
+            create_conversion_job_tables(connector)
+
+            # Colunas binárias em instalações antigas
+            add_binary_columns(connector)
+
             # Adicionar índices
             add_index(connector)
-            
+
+            if args.to_bytea:
+                convert_base64_to_bytea(connector, args.chunk_size)
+
             print("Migração concluída com sucesso.")
-    
+
     except Exception as e:
         logging.error(f"Erro durante migração: {e}")
         sys.exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,301 @@
+import os
+import sys
+import stat
+import asyncio
+import functools
+import pytest
+from unittest.mock import Mock, patch
+from convert_dcm2pdf.core.async_pipeline import (
+    AsyncDCMConverter, AsyncDCMDownloader, AsyncDCMPipeline, _NativeSession
+)
+from convert_dcm2pdf.core.config_manager import ConfigManager
+from convert_dcm2pdf.core.dcm_converter import DCMConverter
+from convert_dcm2pdf.core.dcm_downloader import DCMDownloader
+from convert_dcm2pdf.utils.exceptions import ConversionError
+
+# Conversor de teste: copia a entrada para a saída, ou falha para "falha.dcm"
+FAKE_CONVERTER = f"""#!{sys.executable}
+import sys, shutil
+_, _, source, target = sys.argv
+if source.endswith('falha.dcm'):
+    sys.stderr.write('arquivo inválido')
+    sys.exit(1)
+shutil.copyfile(source, target)
+"""
+
+_gather = asyncio.gather
+
+
+class TestAsyncPipeline:
+    @pytest.fixture
+    def config_manager(self, tmp_path):
+        executable = tmp_path / 'dcm2pdf'
+        executable.write_text(FAKE_CONVERTER)
+        executable.chmod(executable.stat().st_mode | stat.S_IEXEC)
+
+        values = {
+            ('dcm', 'executable_path'): str(executable),
+            ('paths', 'download_directory'): str(tmp_path / 'downloads'),
+            ('paths', 'pdf_directory'): str(tmp_path / 'pdfs'),
+        }
+        config_manager = Mock()
+        config_manager.get.side_effect = lambda section, key, default=None: values.get((section, key), default)
+        config_manager.get_int.side_effect = lambda section, key, default=0: default
+        config_manager.get_bool.side_effect = lambda section, key, default=False: default
+        config_manager.get_database_config.return_value = {}
+        return config_manager
+
+    def test_process_runs_converter_as_async_subprocess(self, config_manager, tmp_path):
+        """
+        Testa a conversão por subprocesso assíncrono seguida do armazenamento
+        """
+        converter = DCMConverter(config_manager)
+        dcm_path = tmp_path / 'downloads' / 'A1.dcm'
+        dcm_path.write_bytes(b'conteudo')
+
+        with patch.object(converter, '_store_pdf') as mock_store:
+            pdf_path = asyncio.run(
+                AsyncDCMConverter(config_manager, converter).process_dcm_file(str(dcm_path))
+            )
+
+        assert os.path.basename(pdf_path) == 'A1.pdf'
+        assert open(pdf_path, 'rb').read() == b'conteudo'
+        mock_store.assert_called_once_with(pdf_path, str(dcm_path))
+
+    def test_process_raises_on_converter_failure(self, config_manager, tmp_path):
+        """
+        Testa que a falha do executável vira ConversionError
+        """
+        converter = DCMConverter(config_manager)
+        dcm_path = tmp_path / 'downloads' / 'falha.dcm'
+        dcm_path.write_bytes(b'conteudo')
+
+        with patch.object(converter, '_store_pdf') as mock_store:
+            with pytest.raises(ConversionError):
+                asyncio.run(AsyncDCMConverter(config_manager, converter).process_dcm_file(str(dcm_path)))
+
+        mock_store.assert_not_called()
+
+    def test_convert_all_streams_files_through_bounded_workers(self, config_manager, tmp_path):
+        """
+        Testa que a conversão do diretório usa um número fixo de tarefas,
+        isola falhas e reporta as métricas da execução
+        """
+        downloads = tmp_path / 'downloads'
+        downloads.mkdir(exist_ok=True)
+        for name in ('a', 'b', 'c', 'd', 'e', 'falha'):
+            (downloads / f'{name}.dcm').write_bytes(b'conteudo')
+
+        converter = DCMConverter(config_manager)
+        async_converter = AsyncDCMConverter(config_manager, converter, concurrency=1, storage_concurrency=1)
+        workers = []
+
+        def gather(*aws, **kwargs):
+            workers.append(len(aws))
+            return _gather(*aws, **kwargs)
+
+        with patch.object(converter, '_store_pdf'), \
+                patch('convert_dcm2pdf.core.async_pipeline.start_run') as mock_start, \
+                patch('convert_dcm2pdf.core.async_pipeline.report_run') as mock_report, \
+                patch('convert_dcm2pdf.core.async_pipeline.asyncio.gather', side_effect=gather):
+            converted, errors = asyncio.run(async_converter.convert_all_dcm_files())
+
+        assert sorted(os.path.basename(pdf) for pdf in converted) == ['a.pdf', 'b.pdf', 'c.pdf', 'd.pdf', 'e.pdf']
+        assert [os.path.basename(dcm) for dcm in errors] == ['falha.dcm']
+        assert workers == [2]
+        mock_start.assert_called_once_with(config_manager)
+        mock_report.assert_called_once_with(config_manager, 6, 5, 1, skipped=0)
+
+    def test_pipeline_isolates_errors_and_limits_concurrency(self, config_manager):
+        """
+        Testa que o pipeline isola falhas e respeita o limite de conversões
+        """
+        converter = DCMConverter(config_manager)
+        active = []
+        peak = []
+
+        async def fake_downloads(self, limit=10):
+            for name in ('a', 'b', 'c', 'd', 'e'):
+                yield f'/downloads/{name}.dcm'
+
+        async def fake_process(self, dcm_filepath):
+            active.append(dcm_filepath)
+            peak.append(len(active))
+            await asyncio.sleep(0.01)
+            active.remove(dcm_filepath)
+            if dcm_filepath.endswith('b.dcm'):
+                raise ConversionError('falha simulada')
+            return dcm_filepath.replace('.dcm', '.pdf')
+
+        pipeline = AsyncDCMPipeline(config_manager, downloader=Mock(), converter=converter)
+        pipeline.downloader._resolve_workers.return_value = 1
+
+        with patch.object(AsyncDCMDownloader, 'iter_download_dcm_files', fake_downloads), \
+                patch.object(AsyncDCMConverter, 'process_dcm_file', fake_process):
+            converted, errors = asyncio.run(pipeline.run(limit=5, convert_concurrency=2))
+
+        assert sorted(converted) == ['/downloads/a.pdf', '/downloads/c.pdf', '/downloads/d.pdf', '/downloads/e.pdf']
+        assert errors == ['/downloads/b.dcm']
+        assert max(peak) <= 2
+
+    def test_pipeline_sizes_storage_from_real_database_config(self, config_manager, tmp_path):
+        """
+        Testa que o limite de gravações vem de [postgresql] pool_max_size
+        lido de um arquivo de configuração real
+        """
+        config_path = tmp_path / 'config.ini'
+        config_path.write_text("[postgresql]\nhost = localhost\npool_max_size = 3\n")
+        db_config = ConfigManager(str(config_path)).get_database_config()
+        assert db_config['pool_max_size'] == 3
+
+        config_manager.get_database_config.return_value = db_config
+        converter = DCMConverter(config_manager)
+        storage_limits = []
+
+        async def fake_downloads(self, limit=10):
+            yield '/downloads/a.dcm'
+
+        async def fake_process(self, dcm_filepath):
+            storage_limits.append(self.storage_concurrency)
+            return dcm_filepath.replace('.dcm', '.pdf')
+
+        pipeline = AsyncDCMPipeline(config_manager, downloader=Mock(), converter=converter)
+        pipeline.downloader._resolve_workers.return_value = 1
+
+        with patch.object(AsyncDCMDownloader, 'iter_download_dcm_files', fake_downloads), \
+                patch.object(AsyncDCMConverter, 'process_dcm_file', fake_process):
+            converted, errors = asyncio.run(pipeline.run(limit=1))
+
+        assert converted == ['/downloads/a.pdf']
+        assert errors == []
+        assert storage_limits == [3]
+
+
+class _FakeSFTP:
+    """
+    Cliente SFTP assíncrono simulado; ``failures`` quedas antes do primeiro get bem-sucedido
+    """
+    def __init__(self, content, failures):
+        self.content = content
+        self.failures = failures
+        self.closed = False
+
+    async def stat(self, path):
+        return Mock(size=len(self.content))
+
+    async def get(self, remote_path, local_path, **options):
+        if self.failures:
+            self.failures.pop()
+            raise ConnectionResetError('conexão perdida')
+        with open(local_path, 'wb') as local_file:
+            local_file.write(self.content)
+
+    def exit(self):
+        self.closed = True
+
+
+class _FakeConnection:
+    def __init__(self, sftp, sha256):
+        self.sftp = sftp
+        self.sha256 = sha256
+        self.closed = False
+
+    async def run(self, command, check=False):
+        return Mock(exit_status=0, stdout=f"{self.sha256}  {command.split()[-1]}\n")
+
+    async def start_sftp_client(self):
+        return self.sftp
+
+    def close(self):
+        self.closed = True
+
+    async def wait_closed(self):
+        pass
+
+
+class TestAsyncNativeDownload:
+    @pytest.fixture
+    def downloader(self, tmp_path):
+        downloader = Mock()
+        downloader._remote_path.side_effect = lambda path: f'/pacs/{path}'
+        downloader._local_path.side_effect = lambda accession_no: str(tmp_path / f'{accession_no}.dcm')
+        downloader._partial_offset.return_value = 0
+        downloader._retry_delay.return_value = 0
+        downloader._retries = 2
+        downloader._verify_checksum = True
+        downloader._remote_hash_command = None
+        downloader._remote_hash_candidates = functools.partial(DCMDownloader._remote_hash_candidates, downloader)
+        downloader._remote_hash_result = functools.partial(DCMDownloader._remote_hash_result, downloader)
+        return downloader
+
+    @staticmethod
+    def _session(*failures):
+        """
+        Sessão cujas conexões sucessivas caem ``failures[i]`` vezes cada
+        """
+        connections = []
+
+        async def connect():
+            drops = failures[len(connections)] if len(connections) < len(failures) else 0
+            connection = _FakeConnection(_FakeSFTP(b'DICM', [None] * drops), 'a' * 64)
+            connections.append(connection)
+            return connection
+
+        return _NativeSession(connect), connections
+
+    def test_fetch_verifies_remote_checksum(self, downloader):
+        """
+        Testa que, com verify_checksum, o hash calculado no servidor é conferido
+        """
+        session, _ = self._session()
+        async_downloader = AsyncDCMDownloader(Mock(), downloader)
+
+        local_filepath = asyncio.run(async_downloader._fetch_native(session, 'a/ACC1.dcm', 'ACC1'))
+
+        assert local_filepath.endswith('ACC1.dcm')
+        partial_filepath, final_filepath, remote_size, expected_sha256 = downloader._finish_download.call_args[0]
+        assert partial_filepath == local_filepath + '.part'
+        assert (remote_size, expected_sha256) == (4, 'a' * 64)
+        downloader._report_to_queue.assert_called_once_with('ACC1')
+
+    def test_fetch_reconnects_after_dropped_connection(self, downloader):
+        """
+        Testa que uma queda de conexão reabre a sessão e tenta novamente
+        """
+        session, connections = self._session(1)
+        async_downloader = AsyncDCMDownloader(Mock(), downloader)
+
+        local_filepath = asyncio.run(async_downloader._fetch_native(session, 'a/ACC1.dcm', 'ACC1'))
+
+        assert local_filepath.endswith('ACC1.dcm')
+        assert len(connections) == 2
+        assert connections[0].closed and connections[0].sftp.closed
+        downloader._finish_download.assert_called_once()
+
+    def test_fetch_gives_up_after_retries(self, downloader):
+        """
+        Testa que, esgotadas as tentativas, o erro é reportado e nada é retornado
+        """
+        session, connections = self._session(1, 1, 1)
+        async_downloader = AsyncDCMDownloader(Mock(), downloader)
+        result = asyncio.run(async_downloader._fetch_native(session, 'a/ACC1.dcm', 'ACC1'))
+
+        assert result is None
+        assert len(connections) == downloader._retries + 1
+        assert downloader._report_to_queue.call_args[0][0] == 'ACC1'
+        downloader._finish_download.assert_not_called()
+
+    def test_native_client_requires_known_hosts(self, downloader, tmp_path):
+        """
+        Testa que o cliente assíncrono só é usado com um known_hosts para
+        conferir a chave do servidor
+        """
+        known_hosts = tmp_path / 'known_hosts'
+        downloader._cache = None
+        downloader._known_hosts_path.return_value = str(known_hosts)
+        async_downloader = AsyncDCMDownloader(Mock(), downloader)
+
+        with patch('convert_dcm2pdf.core.async_pipeline.asyncssh', Mock()):
+            assert async_downloader._native_known_hosts() is None
+            known_hosts.write_text('pacs ssh-ed25519 AAAA\n')
+            assert async_downloader._native_known_hosts() == str(known_hosts)
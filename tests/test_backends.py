@@ -0,0 +1,142 @@
+import subprocess
+import pytest
+from unittest.mock import Mock, patch
+from convert_dcm2pdf.core import backends
+from convert_dcm2pdf.core.backends import (
+    ConverterBackend, EncapsulatedPDFBackend, ExternalExecutableBackend, FallbackBackend, InProcessBackend,
+    WorkerPoolBackend, create_backend
+)
+from convert_dcm2pdf.utils.exceptions import ConversionError, UnsupportedConversionError
+
+class TestBackends:
+    def test_external_backend_runs_without_shell(self):
+        """
+        Testa que o conversor externo recebe os argumentos como lista, sem shell
+        """
+        backend = ExternalExecutableBackend('/opt/dcmtk/dcm2pdf')
+
+        with patch('subprocess.run') as mock_run:
+            backend.convert('/data/a b.dcm', '/pdfs/a b.pdf')
+
+        args, kwargs = mock_run.call_args
+        assert args[0] == ['/opt/dcmtk/dcm2pdf', '-v', '/data/a b.dcm', '/pdfs/a b.pdf']
+        assert not kwargs.get('shell')
+
+    def test_external_backend_raises_conversion_error(self):
+        """
+        Testa que falhas do executável viram ConversionError
+        """
+        backend = ExternalExecutableBackend('/opt/dcmtk/dcm2pdf')
+        error = subprocess.CalledProcessError(1, 'dcm2pdf', stderr='arquivo inválido')
+
+        with patch('subprocess.run', side_effect=error):
+            with pytest.raises(ConversionError):
+                backend.convert('a.dcm', 'a.pdf')
+
+    def test_fallback_moves_on_unsupported(self):
+        """
+        Testa que o próximo backend é usado quando o anterior não trata o arquivo
+        """
+        first = Mock()
+        first.convert.side_effect = UnsupportedConversionError("sem suporte")
+        second = Mock()
+
+        FallbackBackend([first, second]).convert('a.dcm', 'a.pdf')
+
+        second.convert.assert_called_once_with('a.dcm', 'a.pdf')
+
+    def test_fallback_does_not_hide_conversion_errors(self):
+        """
+        Testa que erros reais de conversão não acionam o próximo backend
+        """
+        first = Mock()
+        first.convert.side_effect = ConversionError("arquivo corrompido")
+        second = Mock()
+
+        with pytest.raises(ConversionError):
+            FallbackBackend([first, second]).convert('a.dcm', 'a.pdf')
+
+        second.convert.assert_not_called()
+
+    def test_inprocess_without_pydicom_is_unsupported(self):
+        """
+        Testa que o backend em processo recusa arquivos sem pydicom instalado
+        """
+        with patch.object(backends, 'pydicom', None):
+            with pytest.raises(UnsupportedConversionError):
+                InProcessBackend().convert('a.dcm', 'a.pdf')
+
+    def test_backend_interface_requires_convert(self):
+        """
+        Testa que a interface de backend não pode ser instanciada sem ``convert``
+        """
+        with pytest.raises(TypeError):
+            ConverterBackend()
+
+    def test_monochrome1_is_inverted(self):
+        """
+        Testa que imagens MONOCHROME1 (zero é branco) são invertidas ao renderizar
+        """
+        numpy = pytest.importorskip('numpy')
+        pytest.importorskip('PIL')
+
+        frame = numpy.array([[0, 1000]], dtype=numpy.uint16)
+
+        assert list(InProcessBackend._to_image(frame).getdata()) == [0, 255]
+        image = InProcessBackend._to_image(frame, invert=True)
+        assert image.mode == 'L'
+        assert list(image.getdata()) == [255, 0]
+
+    @pytest.mark.parametrize('name,available,expected', [
+        ('external', True, ExternalExecutableBackend),
+        ('inprocess', True, InProcessBackend),
+        ('auto', True, FallbackBackend),
+        ('auto', False, ExternalExecutableBackend),
+    ])
+    def test_create_backend(self, name, available, expected):
+        """
+        Testa a seleção do backend pela configuração
+        """
+        config_manager = Mock()
+        config_manager.get.return_value = name
+        config_manager.get_bool.return_value = False
+
+        with patch.object(InProcessBackend, 'available', return_value=available):
+            backend = create_backend(config_manager, '/opt/dcmtk/dcm2pdf')
+
+        assert isinstance(backend, expected)
+
+    @pytest.mark.parametrize('available', [True, False])
+    def test_create_workers_backend_requires_pydicom(self, available):
+        """
+        Testa que, sem pydicom, o backend ``workers`` dá lugar ao executável externo
+        """
+        config_manager = Mock()
+        config_manager.get.side_effect = lambda section, key, default=None: (
+            'workers' if key == 'backend' else default
+        )
+        config_manager.get_int.side_effect = lambda section, key, default=0: default
+        config_manager.get_bool.return_value = False
+
+        with patch.object(InProcessBackend, 'available', return_value=available):
+            backend = create_backend(config_manager, '/opt/dcmtk/dcm2pdf')
+
+        if available:
+            assert isinstance(backend, FallbackBackend)
+            assert isinstance(backend.backends[0], WorkerPoolBackend)
+        else:
+            assert isinstance(backend, ExternalExecutableBackend)
+
+    def test_create_backend_tries_encapsulated_pdf_first(self):
+        """
+        Testa que o caminho rápido de PDF encapsulado precede o backend configurado
+        """
+        config_manager = Mock()
+        config_manager.get.return_value = 'external'
+        config_manager.get_bool.return_value = True
+
+        backend = create_backend(config_manager, '/opt/dcmtk/dcm2pdf')
+
+        assert isinstance(backend, FallbackBackend)
+        assert isinstance(backend.backends[0], EncapsulatedPDFBackend)
+        assert isinstance(backend.backends[1], ExternalExecutableBackend)
@@ -0,0 +1,72 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from convert_dcm2pdf.database.batch_writer import PDFBatchWriter
+
+class TestPDFBatchWriter:
+    @pytest.fixture
+    def connector(self):
+        """
+        Fixture que substitui o conector por um simulado
+        """
+        connector = MagicMock()
+        with patch('convert_dcm2pdf.database.batch_writer.PostgreSQLConnector') as connector_cls:
+            connector_cls.return_value.__enter__.return_value = connector
+            yield connector
+
+    def test_flush_by_row_count(self, connector):
+        """
+        Testa que o lote é gravado com um único INSERT ao atingir max_rows
+        """
+        with patch('convert_dcm2pdf.database.batch_writer.execute_values') as execute_values:
+            writer = PDFBatchWriter({}, max_rows=2, max_seconds=0)
+            writer.add('a.pdf', 'AAAA')
+            assert not execute_values.called
+
+            writer.add('b.pdf', 'BBBB')
+            execute_values.assert_called_once()
+            assert execute_values.call_args[0][2] == [('a.pdf', 'AAAA'), ('b.pdf', 'BBBB')]
+            assert connector.connection.commit.call_count == 1
+
+            writer.add('c.pdf', 'CCCC')
+            assert writer.close() == []
+            assert execute_values.call_count == 2
+
+    def test_flush_by_bytes(self, connector):
+        """
+        Testa que o lote é gravado ao atingir max_bytes
+        """
+        with patch('convert_dcm2pdf.database.batch_writer.execute_values') as execute_values:
+            writer = PDFBatchWriter({}, max_rows=100, max_bytes=6, max_seconds=0)
+            writer.add('a.pdf', 'AAAA')
+            writer.add('b.pdf', 'BBBB')
+            execute_values.assert_called_once()
+            writer.close()
+
+    def test_failed_batch_reports_only_bad_rows(self, connector):
+        """
+        Testa que uma linha inválida não descarta as demais linhas do lote
+        """
+        def execute(query, params=None):
+            if params and params[0] == 'ruim.pdf':
+                raise ValueError('linha inválida')
+
+        connector.cursor.execute.side_effect = execute
+        reported = []
+
+        with patch('convert_dcm2pdf.database.batch_writer.execute_values',
+                   side_effect=ValueError('lote inválido')):
+            writer = PDFBatchWriter({}, max_rows=10, max_seconds=0,
+                                    on_failure=lambda key, error: reported.append(key))
+            writer.add('a.pdf', 'AAAA', key='/pdfs/a.pdf')
+            writer.add('ruim.pdf', 'XXXX', key='/pdfs/ruim.pdf')
+            writer.add('c.pdf', 'CCCC', key='/pdfs/c.pdf')
+            failures = writer.close()
+
+        assert [key for key, _ in failures] == ['/pdfs/ruim.pdf']
+        assert reported == ['/pdfs/ruim.pdf']
+        inserted = [
+            call[0][1][0] for call in connector.cursor.execute.call_args_list
+            if len(call[0]) > 1
+        ]
+        assert inserted == ['a.pdf', 'ruim.pdf', 'c.pdf']
+        connector.connection.rollback.assert_called_once()
@@ -0,0 +1,82 @@
+import os
+import pytest
+from benchmarks.corpus import KIND_MULTIFRAME, KIND_REPORT, generate_corpus, parse_mix
+from benchmarks.run import compare_results, run_benchmark
+from convert_dcm2pdf.utils.dicom_header import extract_encapsulated_pdf, read_header
+
+class TestBenchmarks:
+    def test_corpus_is_reproducible(self, tmp_path):
+        """
+        Testa que a mesma semente gera o mesmo corpus
+        """
+        first = generate_corpus(str(tmp_path / 'a'), 6, seed=7, frames=2, rows=16, columns=16)
+        second = generate_corpus(str(tmp_path / 'b'), 6, seed=7, frames=2, rows=16, columns=16)
+
+        assert first == second
+        for filepath, _ in first:
+            assert (tmp_path / 'a' / filepath).read_bytes() == (tmp_path / 'b' / filepath).read_bytes()
+
+    def test_corpus_files_are_valid_dicom(self, tmp_path):
+        """
+        Testa que laudos são PDFs encapsulados e multiframes não
+        """
+        studies = generate_corpus(
+            str(tmp_path), 4, {KIND_REPORT: 1, KIND_MULTIFRAME: 1}, seed=1,
+            report_size=4096, frames=2, rows=16, columns=16
+        )
+
+        for filepath, _ in studies:
+            with open(tmp_path / filepath, 'rb') as dicom_file:
+                header = read_header(dicom_file)
+            assert header.is_encapsulated_pdf == filepath.startswith(KIND_REPORT)
+
+            if header.is_encapsulated_pdf:
+                pdf_path = str(tmp_path / 'out.pdf')
+                extract_encapsulated_pdf(str(tmp_path / filepath), pdf_path)
+                with open(pdf_path, 'rb') as pdf_file:
+                    assert pdf_file.read(5) == b'%PDF-'
+
+    def test_parse_mix_rejects_unknown_kind(self):
+        """
+        Testa a validação da mistura do corpus
+        """
+        assert parse_mix('report=3,multiframe=1') == {KIND_REPORT: 3.0, KIND_MULTIFRAME: 1.0}
+        with pytest.raises(ValueError):
+            parse_mix('ct=1')
+
+    @pytest.mark.skipif(os.name == 'nt', reason="O conversor falso usa um script de shell")
+    def test_run_benchmark(self, tmp_path):
+        """
+        Testa uma execução completa com SFTP, conversor e banco simulados
+        """
+        results = run_benchmark(
+            str(tmp_path), files=6, seed=3, report_size=2048, frames=2, rows=32, columns=32,
+            phases=['download', 'convert'], download_workers=2, convert_workers=2, isolate=False
+        )
+
+        assert results['corpus']['files'] == 6
+        for phase in ('download', 'convert'):
+            assert results['phases'][phase]['files'] == 6
+            assert results['phases'][phase]['errors'] == 0
+        assert set(results['phases']['convert']['stages']) >= {'convert', 'read_pdf', 'store'}
+        assert results['phases']['convert']['storage']['statements'] == 6
+        assert compare_results(results, results) == []
+
+    def test_compare_results_reports_regressions(self):
+        """
+        Testa a detecção de pioras de vazão, latência e memória
+        """
+        baseline = {'phases': {'convert': {
+            'files_per_second': 100.0, 'peak_rss_bytes': 1000,
+            'stages': {'convert': {'files_per_second': 100.0, 'latency_p50': 0.01, 'latency_p99': 0.05}},
+        }}}
+        current = {'phases': {'convert': {
+            'files_per_second': 80.0, 'peak_rss_bytes': 1050,
+            'stages': {'convert': {'files_per_second': 100.0, 'latency_p50': 0.0101, 'latency_p99': 0.2}},
+        }}}
+
+        regressions = compare_results(baseline, current, threshold=0.10)
+
+        assert len(regressions) == 2
+        assert regressions[0].startswith('convert files_per_second')
+        assert regressions[1].startswith('convert/convert latency_p99')
@@ -0,0 +1,96 @@
+import threading
+import pytest
+from unittest.mock import MagicMock, patch
+from convert_dcm2pdf.database.connect import PostgreSQLConnector
+
+DB_CONFIG = {
+    'host': 'localhost',
+    'database': 'test_db',
+    'user': 'test_user',
+    'password': 'test_pass',
+    'pool_min_size': '1',
+    'pool_max_size': '2',
+    'pool_health_check_interval': '0'
+}
+
+class TestPostgreSQLConnectorPool:
+    @pytest.fixture(autouse=True)
+    def fake_connect(self):
+        """
+        Fixture que substitui psycopg2.connect por conexões simuladas
+        """
+        created = []
+
+        def connect(**kwargs):
+            connection = MagicMock()
+            connection.closed = 0
+            connection.info.transaction_status = 0
+            created.append(connection)
+            return connection
+
+        with patch('psycopg2.connect', side_effect=connect):
+            yield created
+        PostgreSQLConnector.close_all_pools()
+
+    def test_connections_are_reused(self, fake_connect):
+        """
+        Testa que conexões devolvidas ao pool são reaproveitadas
+        """
+        for _ in range(5):
+            with PostgreSQLConnector(DB_CONFIG, pooled=True) as connector:
+                connector.fetch_all("SELECT 1")
+
+        assert len(fake_connect) == 1
+        assert not fake_connect[0].close.called
+
+    def test_broken_connection_is_replaced(self, fake_connect):
+        """
+        Testa que conexões fechadas são descartadas na verificação de saúde
+        """
+        with PostgreSQLConnector(DB_CONFIG, pooled=True) as connector:
+            first = connector.connection
+
+        first.closed = 1
+
+        with PostgreSQLConnector(DB_CONFIG, pooled=True) as connector:
+            assert connector.connection is not first
+
+    def test_pool_blocks_at_max_size(self, fake_connect):
+        """
+        Testa que o pool aguarda uma conexão livre ao atingir o tamanho máximo
+        """
+        holders = [PostgreSQLConnector(DB_CONFIG, pooled=True) for _ in range(2)]
+        for holder in holders:
+            holder.connect()
+
+        waiter = PostgreSQLConnector(DB_CONFIG, pooled=True)
+        thread = threading.Thread(target=waiter.connect)
+        thread.start()
+        thread.join(timeout=0.2)
+        assert thread.is_alive()
+
+        holders[0].close()
+        thread.join(timeout=2)
+        assert not thread.is_alive()
+        assert len(fake_connect) == 2
+
+        waiter.close()
+        holders[1].close()
+
+    def test_stream_query_uses_server_side_cursor(self, fake_connect):
+        """
+        Testa que o streaming usa cursor nomeado e entrega as linhas em blocos
+        """
+        with PostgreSQLConnector(DB_CONFIG, pooled=True) as connector:
+            named_cursor = MagicMock()
+            named_cursor.closed = False
+            named_cursor.fetchmany.side_effect = [[(1,), (2,)], [(3,)], []]
+            connector.connection.cursor.return_value = named_cursor
+
+            chunks = list(connector.iter_query_chunks("SELECT id FROM study", itersize=2))
+
+        assert chunks == [[(1,), (2,)], [(3,)]]
+        assert 'name' in fake_connect[0].cursor.call_args[1]
+        named_cursor.fetchmany.assert_called_with(2)
+        named_cursor.close.assert_called_once()
+
@@ -0,0 +1,142 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from convert_dcm2pdf.database.conversion_jobs import ConversionJob, ConversionJobQueue
+from convert_dcm2pdf.utils.priority import PriorityPolicy
+
+class TestConversionJobQueue:
+    @pytest.fixture
+    def job_queue(self):
+        """
+        Fixture que cria uma fila com identificador fixo
+        """
+        return ConversionJobQueue({}, worker_id='node-1:42', lease_timeout=120, max_attempts=2)
+
+    @pytest.fixture
+    def cursor(self, job_queue):
+        """
+        Fixture que executa as transações da fila em um cursor falso
+        """
+        cursor = MagicMock()
+        with patch.object(job_queue, '_transaction', side_effect=lambda operation: operation(cursor)):
+            yield cursor
+
+    def test_lease_uses_skip_locked(self, job_queue, cursor):
+        """
+        Testa que o arrendamento usa FOR UPDATE SKIP LOCKED, o identificador
+        do worker e a validade configurada
+        """
+        cursor.fetchall.return_value = [(7, 'ACC1.dcm', '2024/ACC1.dcm', 1)]
+
+        jobs = job_queue._lease_pending(5)
+
+        assert jobs == [ConversionJob(7, 'ACC1.dcm', '2024/ACC1.dcm', 1)]
+        query, params = cursor.execute.call_args[0]
+        assert 'FOR UPDATE SKIP LOCKED' in query
+        assert params == ('node-1:42', 120, 5)
+
+    def test_lease_reclaims_expired_first(self, job_queue):
+        """
+        Testa que arrendamentos vencidos voltam à fila antes de um novo arrendamento
+        """
+        calls = []
+        with patch.object(job_queue, 'reclaim_expired', side_effect=lambda: calls.append('reclaim')), \
+             patch.object(job_queue, '_lease_pending', side_effect=lambda limit: calls.append(limit) or []):
+            assert job_queue.lease(3) == []
+            assert job_queue.lease(0) == []
+
+        assert calls == ['reclaim', 3]
+
+    def test_reclaim_expired_logs_and_marks_dead_workers(self, job_queue, cursor):
+        """
+        Testa que a devolução registra cada arquivo em conversion_log e marca workers inativos
+        """
+        cursor.rowcount = 2
+
+        assert job_queue.reclaim_expired() == 2
+
+        (reclaim_query, reclaim_params), (dead_query, dead_params) = [
+            call[0] for call in cursor.execute.call_args_list
+        ]
+        assert 'FOR UPDATE SKIP LOCKED' in reclaim_query
+        assert 'lease_expired' in reclaim_query
+        assert reclaim_params == (2,)
+        assert "status = 'dead'" in dead_query
+        assert dead_params == (120,)
+
+    def test_heartbeat_renews_own_leases(self, job_queue, cursor):
+        """
+        Testa que o batimento renova apenas os arrendamentos do próprio worker
+        """
+        cursor.rowcount = 3
+
+        assert job_queue.heartbeat() == 3
+
+        query, params = cursor.execute.call_args_list[1][0]
+        assert 'lease_owner = %s' in query
+        assert params == (120, 'node-1:42')
+
+    def test_complete_records_success(self, job_queue, cursor):
+        """
+        Testa que a conclusão marca o arquivo e registra o PDF em conversion_log
+        """
+        cursor.rowcount = 1
+
+        assert job_queue.complete(ConversionJob(7, 'ACC1.dcm', '2024/ACC1.dcm', 1), '/pdfs/ACC1.pdf')
+
+        update, log = [call[0] for call in cursor.execute.call_args_list[:2]]
+        assert update[1] == (7, 'node-1:42')
+        assert 'conversion_log' in log[0]
+        assert log[1] == (7, '/pdfs/ACC1.pdf')
+
+    def test_complete_after_lost_lease_records_nothing(self, job_queue, cursor):
+        """
+        Testa que, com o arrendamento reassumido por outro worker, nem o log
+        nem o contador de concluídos são atualizados
+        """
+        cursor.rowcount = 0
+
+        assert not job_queue.complete(ConversionJob(7, 'ACC1.dcm', '2024/ACC1.dcm', 1), '/pdfs/ACC1.pdf')
+        assert cursor.execute.call_count == 1
+
+    def test_fail_records_error(self, job_queue, cursor):
+        """
+        Testa que a falha devolve o arquivo à fila enquanto houver tentativas e registra o erro
+        """
+        cursor.rowcount = 1
+        job_queue.fail(ConversionJob(7, 'ACC1.dcm', '2024/ACC1.dcm', 1), 'timeout')
+
+        update, log = [call[0] for call in cursor.execute.call_args_list[:2]]
+        assert "THEN 'failed' ELSE 'pending'" in update[0]
+        assert update[1] == (2, 7, 'node-1:42')
+        assert log[1] == (7, 'timeout')
+
+    def test_from_config(self):
+        """
+        Testa a leitura da seção [distributed]
+        """
+        config = MagicMock()
+        config.get.return_value = 'node-2'
+        config.get_bool.return_value = False
+        config.get_int.side_effect = lambda section, key, default=0: {'lease_timeout': 60}.get(key, default)
+
+        job_queue = ConversionJobQueue.from_config(config, {})
+
+        assert job_queue.worker_id == 'node-2'
+        assert job_queue.lease_timeout == 60
+        assert job_queue.max_attempts == 3
+
+    def test_lease_orders_by_deadline_with_priority(self, cursor):
+        """
+        Testa que, com política de prioridade, o arrendamento segue o prazo mais próximo
+        """
+        policy = PriorityPolicy(urgent_modalities=['CT'], slas=(60, 3600, 86400), modality_column='mod')
+        job_queue = ConversionJobQueue({}, worker_id='node-1:42', lease_timeout=120, priority=policy)
+        cursor.fetchall.return_value = []
+
+        with patch.object(job_queue, '_transaction', side_effect=lambda operation: operation(cursor)):
+            job_queue._lease_pending(5)
+
+        query, params = cursor.execute.call_args[0]
+        assert 'ORDER BY created_at + make_interval' in query
+        assert 'UPPER(modality)' in query
+        assert params == ('node-1:42', 120, ['CT'], 1, 30, 60.0, 3600.0, 86400.0, 5)
@@ -1,6 +1,11 @@
+import os
+import time
+import threading
 import pytest
 from unittest.mock import Mock, patch
+from convert_dcm2pdf.core.content_cache import ContentCache
 from convert_dcm2pdf.core.dcm_converter import DCMConverter
+from convert_dcm2pdf.utils.paths import shard_path
 
 class TestDCMConverter:
     @pytest.fixture
@@ -22,3 +27,303 @@ class TestDCMConverter:
         }
         return config_manager_mock
 
+    @pytest.fixture
+    def converter(self, tmp_path):
+        """
+        Fixture que cria um conversor usando diretórios temporários
+        """
+        config_manager_mock = Mock()
+        config_manager_mock.get.side_effect = [
+            '/path/to/dcmtk',
+            str(tmp_path / 'downloads'),
+            str(tmp_path / 'pdfs')
+        ]
+        config_manager_mock.get_int.side_effect = lambda section, key, default=0: default
+        config_manager_mock.get_bool.side_effect = lambda section, key, default=False: default
+        config_manager_mock.get_database_config.return_value = {}
+
+        converter = DCMConverter(config_manager_mock)
+        config_manager_mock.get.side_effect = lambda section, key, default=None: default
+        for name in ('a.dcm', 'b.dcm', 'c.dcm', 'ignorar.txt'):
+            (tmp_path / 'downloads' / name).write_bytes(b'DICM')
+        return converter
+
+    @staticmethod
+    def _fake_convert(dcm_filepath):
+        """
+        Conversão simulada: grava um PDF vazio ao lado do DICOM
+        """
+        pdf_path = dcm_filepath.replace('.dcm', '.pdf')
+        with open(pdf_path, 'wb') as pdf_file:
+            pdf_file.write(b'%PDF')
+        return pdf_path
+
+    @pytest.mark.parametrize('workers', [1, 4])
+    def test_convert_all_dcm_files_isolates_errors(self, converter, workers):
+        """
+        Testa que uma falha não interrompe as demais conversões, em modo
+        sequencial e paralelo
+        """
+        def fake_process(dcm_filepath):
+            if dcm_filepath.endswith('b.dcm'):
+                raise RuntimeError('falha simulada')
+            return dcm_filepath.replace('.dcm', '.pdf')
+
+        with patch.object(converter, '_process_dcm_file', side_effect=fake_process):
+            converted, errors = converter.convert_all_dcm_files(workers=workers)
+
+        assert sorted(os.path.basename(p) for p in converted) == ['a.pdf', 'c.pdf']
+        assert [os.path.basename(p) for p in errors] == ['b.dcm']
+
+    def test_resolve_workers_from_config(self, converter):
+        """
+        Testa leitura do número de workers da seção [dcm]
+        """
+        converter.config.get_int.side_effect = None
+        converter.config.get_int.return_value = 8
+
+        assert converter._resolve_workers() == 8
+        assert converter._resolve_workers(0) == 1
+        converter.config.get_int.assert_called_once_with('dcm', 'workers', 1)
+
+    def test_store_pdf_binary_mode(self, converter, tmp_path):
+        """
+        Testa que o modo binário grava os bytes do PDF sem base64
+        """
+        pdf_path = tmp_path / 'pdfs' / 'a.pdf'
+        pdf_path.write_bytes(b'%PDF-1.4 conteudo')
+        converter._storage_mode = 'binary'
+        converter._large_object_threshold = 1024
+
+        with patch.object(converter, '_save_pdf_binary_to_database') as save_binary, \
+             patch.object(converter, '_read_pdf_as_base64') as read_base64:
+            converter._store_pdf(str(pdf_path))
+
+        save_binary.assert_called_once_with('a.pdf', b'%PDF-1.4 conteudo')
+        assert not read_base64.called
+
+    def test_store_pdf_large_object_above_threshold(self, converter, tmp_path):
+        """
+        Testa que PDFs acima do limite são gravados como large object
+        """
+        pdf_path = tmp_path / 'pdfs' / 'grande.pdf'
+        pdf_path.write_bytes(b'x' * 2048)
+        converter._storage_mode = 'binary'
+        converter._large_object_threshold = 1024
+
+        with patch.object(converter, '_save_pdf_as_large_object') as save_lobject:
+            converter._store_pdf(str(pdf_path))
+
+        save_lobject.assert_called_once_with('grande.pdf', str(pdf_path))
+
+    def test_store_pdf_streams_above_threshold(self, converter, tmp_path):
+        """
+        Testa que PDFs acima do limite de streaming não são lidos inteiros em memória
+        """
+        pdf_path = tmp_path / 'pdfs' / 'medio.pdf'
+        pdf_path.write_bytes(b'x' * 2048)
+        converter._storage_mode = 'text'
+        converter._stream_threshold = 1024
+
+        with patch('convert_dcm2pdf.core.dcm_converter.stream_pdf_to_database') as stream, \
+             patch.object(converter, '_read_pdf_as_base64') as read_base64:
+            converter._store_pdf(str(pdf_path))
+
+        stream.assert_called_once()
+        assert stream.call_args[1]['column'] == 'file_content'
+        assert not read_base64.called
+
+    def test_incremental_run_skips_stored_files(self, converter, tmp_path):
+        """
+        Testa que o modo incremental ignora arquivos já armazenados e que
+        force converte todos novamente
+        """
+        converter.config.get_bool.side_effect = lambda section, key, default=False: key == 'incremental'
+        converter.config.get.side_effect = lambda section, key, default=None: (
+            str(tmp_path / 'index.sqlite3') if key == 'index_path' else default
+        )
+
+        with patch.object(converter, '_convert_dcm_to_pdf', side_effect=self._fake_convert), \
+             patch.object(converter, '_save_pdf_to_database'), \
+             patch.object(converter, '_read_pdf_as_base64', return_value=''):
+            converted, _ = converter.convert_all_dcm_files(workers=2)
+            assert len(converted) == 3
+
+            (tmp_path / 'downloads' / 'd.dcm').write_bytes(b'DICM')
+            converted, _ = converter.convert_all_dcm_files(workers=2)
+            assert [os.path.basename(p) for p in converted] == ['d.pdf']
+
+            converted, _ = converter.convert_all_dcm_files(workers=2, force=True)
+            assert len(converted) == 4
+
+    def test_batch_failure_notifies_store_failed_hook(self, converter):
+        """
+        Testa que PDFs rejeitados pelo lote são repassados ao observador de falhas
+        """
+        converter._on_store_failed = Mock()
+        converter._pdf_sources['/pdfs/a.pdf'] = '/downloads/a.dcm'
+
+        converter._on_batch_failed('/pdfs/a.pdf', RuntimeError('violação de restrição'))
+
+        converter._on_store_failed.assert_called_once_with('/downloads/a.dcm', '/pdfs/a.pdf')
+        assert converter._pdf_sources == {}
+
+    def test_duplicate_content_is_referenced_not_converted(self, converter, tmp_path):
+        """
+        Testa que DICOMs com conteúdo idêntico são convertidos uma única vez
+        e os demais apenas referenciam o PDF armazenado
+        """
+        converter.config.get_bool.side_effect = lambda section, key, default=False: section == 'dedup'
+        converter.config.get.side_effect = lambda section, key, default=None: (
+            str(tmp_path / 'cache.sqlite3') if key == 'cache_path' else default
+        )
+        (tmp_path / 'downloads' / 'c.dcm').write_bytes(b'DICM outro estudo')
+
+        with patch.object(converter, '_convert_dcm_to_pdf', side_effect=self._fake_convert) as convert, \
+             patch.object(converter, '_save_pdf_to_database'), \
+             patch.object(converter, '_read_pdf_as_base64', return_value=''), \
+             patch('convert_dcm2pdf.core.dcm_converter.insert_pdf_reference') as insert_reference:
+            converted, errors = converter.convert_all_dcm_files(workers=3)
+
+        assert errors == []
+        assert len(converted) == 3
+        assert convert.call_count == 2
+        insert_reference.assert_called_once()
+        _, filename, _, stored_filename = insert_reference.call_args[0]
+        assert {filename, stored_filename} == {'a.pdf', 'b.pdf'}
+
+    @pytest.mark.parametrize('workers', [1, 2])
+    def test_duplicate_in_pending_batch_is_referenced_not_converted(self, converter, tmp_path, workers):
+        """
+        Testa que, com a gravação em lote, um duplicado de um PDF ainda não
+        gravado descarrega o lote e referencia o PDF em vez de convertê-lo
+        """
+        converter.config.get_bool.side_effect = lambda section, key, default=False: section == 'dedup'
+        converter.config.get_int.side_effect = lambda section, key, default=0: {
+            'batch_size': 10, 'batch_max_seconds': 0
+        }.get(key, default)
+        converter.config.get.side_effect = lambda section, key, default=None: (
+            str(tmp_path / 'cache.sqlite3') if key == 'cache_path' else default
+        )
+        (tmp_path / 'downloads' / 'c.dcm').write_bytes(b'DICM outro estudo')
+        stored = []
+
+        with patch.object(converter, '_convert_dcm_to_pdf', side_effect=self._fake_convert) as convert, \
+             patch('convert_dcm2pdf.database.batch_writer.PostgreSQLConnector'), \
+             patch('convert_dcm2pdf.database.batch_writer.execute_values',
+                   side_effect=lambda cursor, query, rows, page_size: stored.extend(rows)), \
+             patch('convert_dcm2pdf.core.dcm_converter.insert_pdf_reference') as insert_reference:
+            converted, errors = converter.convert_all_dcm_files(workers=workers)
+
+        assert errors == []
+        assert len(converted) == 3
+        assert convert.call_count == 2
+        assert len(stored) == 2
+        insert_reference.assert_called_once()
+
+    def test_content_locks_are_dropped_after_use(self, tmp_path):
+        """
+        Testa que o lock de um conteúdo é descartado quando ninguém mais o usa
+        """
+        cache = ContentCache(str(tmp_path / 'cache.sqlite3'))
+        try:
+            with cache.content_lock('a' * 64):
+                assert list(cache._content_locks) == ['a' * 64]
+            assert cache._content_locks == {}
+        finally:
+            cache.close()
+
+    def test_rerun_with_dedup_skips_self_reference_and_force_reconverts(self, converter, tmp_path):
+        """
+        Testa que uma nova execução sobre arquivos já armazenados não grava
+        referências de um arquivo para ele mesmo e que force ignora o cache
+        """
+        converter.config.get_bool.side_effect = lambda section, key, default=False: section == 'dedup'
+        converter.config.get.side_effect = lambda section, key, default=None: (
+            str(tmp_path / 'cache.sqlite3') if key == 'cache_path' else default
+        )
+        (tmp_path / 'downloads' / 'b.dcm').write_bytes(b'DICM outro estudo')
+        (tmp_path / 'downloads' / 'c.dcm').write_bytes(b'DICM terceiro estudo')
+
+        with patch.object(converter, '_convert_dcm_to_pdf', side_effect=self._fake_convert) as convert, \
+             patch.object(converter, '_save_pdf_to_database'), \
+             patch.object(converter, '_read_pdf_as_base64', return_value=''), \
+             patch('convert_dcm2pdf.core.dcm_converter.insert_pdf_reference') as insert_reference:
+            converter.convert_all_dcm_files(workers=2)
+            assert convert.call_count == 3
+
+            converted, _ = converter.convert_all_dcm_files(workers=2)
+            assert len(converted) == 3
+            assert convert.call_count == 3
+            insert_reference.assert_not_called()
+
+            converter.convert_all_dcm_files(workers=2, force=True)
+            assert convert.call_count == 6
+
+    def test_sharded_layout_is_scanned_and_mirrored(self, converter, tmp_path):
+        """
+        Testa que DICOMs em subdiretórios particionados são encontrados e que
+        o PDF é gravado no subdiretório correspondente de pdf_directory
+        """
+        converter.config.get_int.side_effect = lambda section, key, default=0: (
+            1 if key == 'shard_depth' else default
+        )
+        sharded_dcm = shard_path(str(tmp_path / 'downloads'), 'ACC9.dcm', 1)
+        os.makedirs(os.path.dirname(sharded_dcm))
+        with open(sharded_dcm, 'wb') as dcm_file:
+            dcm_file.write(b'DICM')
+
+        backend = Mock()
+        backend.convert.side_effect = lambda dcm_path, pdf_path: open(pdf_path, 'wb').close()
+
+        with patch.object(converter, '_get_backend', return_value=backend), \
+             patch.object(converter, '_save_pdf_to_database'), \
+             patch.object(converter, '_read_pdf_as_base64', return_value=''):
+            converted, errors = converter.convert_all_dcm_files(workers=2)
+
+        assert errors == []
+        assert len(converted) == 4
+        assert shard_path(str(tmp_path / 'pdfs'), 'ACC9.pdf', 1) in converted
+        assert os.path.exists(shard_path(str(tmp_path / 'pdfs'), 'ACC9.pdf', 1))
+
+    def test_watch_converts_arrivals_and_survives_restarts(self, converter, tmp_path):
+        """
+        Testa que o modo de observação converte os arquivos presentes ao
+        iniciar e os que chegam depois, e que um reinício não os converte de novo
+        """
+        converter.config.get.side_effect = lambda section, key, default=None: (
+            str(tmp_path / 'index.sqlite3') if key == 'index_path'
+            else 'polling' if key == 'backend' else default
+        )
+        converter.config.get_float.side_effect = lambda section, key, default=0.0: 0.1
+        downloads = tmp_path / 'downloads'
+
+        def run_watch(stop_when, initial):
+            def fake_convert(dcm_filepath):
+                pdf_path = self._fake_convert(dcm_filepath)
+                if stop_when(os.path.basename(dcm_filepath)):
+                    converter.stop_watching()
+                return pdf_path
+
+            with patch.object(converter, '_convert_dcm_to_pdf', side_effect=fake_convert) as convert, \
+                 patch.object(converter, '_save_pdf_to_database'), \
+                 patch.object(converter, '_read_pdf_as_base64', return_value=''):
+                thread = threading.Thread(target=converter.watch, kwargs={'workers': 2})
+                thread.start()
+
+                # Chegada durante a observação: download em .part renomeado ao concluir
+                deadline = time.monotonic() + 5
+                while convert.call_count < initial and time.monotonic() < deadline:
+                    time.sleep(0.05)
+                (downloads / 'd.dcm.part').write_bytes(b'DICM')
+                os.replace(downloads / 'd.dcm.part', downloads / 'd.dcm')
+
+                thread.join(timeout=10)
+                assert not thread.is_alive()
+            return sorted(os.path.basename(call.args[0]) for call in convert.call_args_list)
+
+        assert run_watch(lambda name: name == 'd.dcm', initial=3) == ['a.dcm', 'b.dcm', 'c.dcm', 'd.dcm']
+
+        # Reinício: nada a converter até chegar um arquivo novo
+        os.remove(downloads / 'd.dcm')
+        assert run_watch(lambda name: True, initial=0) == ['d.dcm']
@@ -0,0 +1,120 @@
+import io
+import struct
+import pytest
+from convert_dcm2pdf.core.backends import EncapsulatedPDFBackend
+from convert_dcm2pdf.utils.dicom_header import (
+    ENCAPSULATED_PDF_SOP_CLASS, extract_encapsulated_pdf, read_header
+)
+from convert_dcm2pdf.utils.exceptions import UnsupportedConversionError
+
+PDF = b'%PDF-1.4\n1 0 obj\n<<>>\nendobj\n%%EOF'
+EXPLICIT_VR_LITTLE_ENDIAN = '1.2.840.10008.1.2.1'
+IMPLICIT_VR_LITTLE_ENDIAN = '1.2.840.10008.1.2'
+
+def _pad(value):
+    return value + b'\x00' if len(value) % 2 else value
+
+def _explicit(group, element, vr, value):
+    value = _pad(value)
+    if vr in (b'OB', b'SQ', b'UN'):
+        return struct.pack('<HH', group, element) + vr + b'\x00\x00' + struct.pack('<I', len(value)) + value
+    return struct.pack('<HH', group, element) + vr + struct.pack('<H', len(value)) + value
+
+def _implicit(group, element, value):
+    value = _pad(value)
+    return struct.pack('<HHI', group, element, len(value)) + value
+
+def _undefined_sequence(group, element):
+    """
+    Sequência de tamanho indefinido com um item também indefinido
+    """
+    item = (
+        struct.pack('<HHI', 0xFFFE, 0xE000, 0xFFFFFFFF)
+        + _explicit(0x0008, 0x0100, b'SH', b'CODE')
+        + struct.pack('<HHI', 0xFFFE, 0xE00D, 0)
+    )
+    return (
+        struct.pack('<HH', group, element) + b'SQ\x00\x00' + struct.pack('<I', 0xFFFFFFFF)
+        + item + struct.pack('<HHI', 0xFFFE, 0xE0DD, 0)
+    )
+
+def build_dicom(sop_class, transfer_syntax=EXPLICIT_VR_LITTLE_ENDIAN, document=PDF):
+    meta = (
+        _explicit(0x0002, 0x0001, b'OB', b'\x00\x01')
+        + _explicit(0x0002, 0x0002, b'UI', sop_class.encode())
+        + _explicit(0x0002, 0x0010, b'UI', transfer_syntax.encode())
+    )
+    meta = _explicit(0x0002, 0x0000, b'UL', struct.pack('<I', len(meta))) + meta
+
+    if transfer_syntax == IMPLICIT_VR_LITTLE_ENDIAN:
+        dataset = (
+            _implicit(0x0008, 0x0016, sop_class.encode())
+            + _implicit(0x0010, 0x0010, b'DOE^JOHN')
+            + _implicit(0x0042, 0x0011, document)
+        )
+    else:
+        dataset = (
+            _explicit(0x0008, 0x0016, b'UI', sop_class.encode())
+            + _undefined_sequence(0x0040, 0xA043)
+            + _explicit(0x0042, 0x0010, b'ST', b'Laudo')
+            + _explicit(0x0042, 0x0011, b'OB', document)
+            + _explicit(0x0042, 0x0012, b'LO', b'application/pdf')
+        )
+
+    return b'\x00' * 128 + b'DICM' + meta + dataset
+
+class TestDicomHeader:
+    def test_read_header(self):
+        """
+        Testa a leitura da SOP class e da transfer syntax pelo file meta
+        """
+        header = read_header(io.BytesIO(build_dicom(ENCAPSULATED_PDF_SOP_CLASS)))
+
+        assert header.sop_class_uid == ENCAPSULATED_PDF_SOP_CLASS
+        assert header.transfer_syntax_uid == EXPLICIT_VR_LITTLE_ENDIAN
+        assert header.is_encapsulated_pdf
+
+    def test_read_header_rejects_non_dicom(self):
+        """
+        Testa que arquivos sem preâmbulo DICOM são recusados
+        """
+        with pytest.raises(UnsupportedConversionError):
+            read_header(io.BytesIO(b'%PDF-1.4'))
+
+    @pytest.mark.parametrize('transfer_syntax', [EXPLICIT_VR_LITTLE_ENDIAN, IMPLICIT_VR_LITTLE_ENDIAN])
+    @pytest.mark.parametrize('document', [PDF, PDF + b'\n'])
+    def test_extract_encapsulated_pdf(self, tmp_path, transfer_syntax, document):
+        """
+        Testa a extração do PDF, removendo o preenchimento de tamanho ímpar
+        """
+        dcm_path = tmp_path / 'laudo.dcm'
+        dcm_path.write_bytes(build_dicom(ENCAPSULATED_PDF_SOP_CLASS, transfer_syntax, document))
+        output = io.BytesIO()
+
+        written = extract_encapsulated_pdf(str(dcm_path), output, chunk_size=7)
+
+        assert output.getvalue() == document
+        assert written == len(document)
+
+    def test_extract_rejects_other_sop_classes(self, tmp_path):
+        """
+        Testa que imagens não são tratadas pelo caminho rápido
+        """
+        dcm_path = tmp_path / 'imagem.dcm'
+        dcm_path.write_bytes(build_dicom('1.2.840.10008.5.1.4.1.1.2'))
+
+        with pytest.raises(UnsupportedConversionError):
+            extract_encapsulated_pdf(str(dcm_path), io.BytesIO())
+
+    def test_backend_removes_partial_output(self, tmp_path):
+        """
+        Testa que o backend não deixa PDF parcial quando recusa o arquivo
+        """
+        dcm_path = tmp_path / 'imagem.dcm'
+        dcm_path.write_bytes(build_dicom('1.2.840.10008.5.1.4.1.1.2'))
+        pdf_path = tmp_path / 'imagem.pdf'
+
+        with pytest.raises(UnsupportedConversionError):
+            EncapsulatedPDFBackend().convert(str(dcm_path), str(pdf_path))
+
+        assert not pdf_path.exists()
@@ -0,0 +1,121 @@
+import pytest
+from contextlib import nullcontext
+from unittest.mock import MagicMock, patch
+from convert_dcm2pdf.core.distributed_worker import DistributedWorker
+from convert_dcm2pdf.database.conversion_jobs import ConversionJob
+
+class TestDistributedWorker:
+    @pytest.fixture
+    def mock_config(self):
+        """
+        Fixture que cria uma configuração com valores padrão
+        """
+        config = MagicMock()
+        config.get_int.side_effect = lambda section, key, default=0: default
+        config.get_float.side_effect = lambda section, key, default=0.0: default
+        config.get_bool.side_effect = lambda section, key, default=False: default
+        return config
+
+    @pytest.fixture
+    def worker(self, mock_config, tmp_path):
+        """
+        Fixture que cria um worker com downloader, conversor e fila falsos
+        """
+        downloader = MagicMock()
+        downloader._channel_pool.return_value = nullcontext('pool')
+        downloader._download_with_retry.side_effect = (
+            lambda pool, filepath, accession_no: str(tmp_path / f'{accession_no}.dcm')
+        )
+
+        converter = MagicMock()
+        converter._resolve_workers.return_value = 2
+        converter._content_cache.return_value = nullcontext()
+        converter._conversion_backend.return_value = nullcontext()
+        converter._process_dcm_file.side_effect = lambda path: path.replace('.dcm', '.pdf')
+
+        job_queue = MagicMock()
+        job_queue.lease_timeout = 300
+        job_queue.worker_id = 'node-1:42'
+
+        with patch('convert_dcm2pdf.core.distributed_worker.start_run'), \
+             patch('convert_dcm2pdf.core.distributed_worker.report_run'):
+            yield DistributedWorker(mock_config, downloader, converter, job_queue)
+
+    def test_run_processes_leased_jobs_until_idle(self, worker):
+        """
+        Testa que os arquivos arrendados são convertidos e registrados na fila
+        """
+        jobs = [ConversionJob(1, 'ACC1.dcm', 'a/ACC1.dcm', 1), ConversionJob(2, 'ACC2.dcm', 'a/ACC2.dcm', 1)]
+        worker.queue.lease.side_effect = [jobs, []]
+
+        assert worker.run(exit_when_idle=True) == (2, 0)
+
+        worker.queue.register.assert_called_once()
+        worker.queue.unregister.assert_called_once()
+        assert sorted(call[0][0].id for call in worker.queue.complete.call_args_list) == [1, 2]
+        worker.downloader._download_with_retry.assert_any_call('pool', 'a/ACC1.dcm', 'ACC1')
+
+    def test_run_reports_failures(self, worker):
+        """
+        Testa que falhas são registradas na fila sem interromper o worker
+        """
+        job = ConversionJob(1, 'ACC1.dcm', 'a/ACC1.dcm', 1)
+        worker.queue.lease.side_effect = [[job], []]
+        worker.converter._process_dcm_file.side_effect = RuntimeError('dcm2pdf falhou')
+
+        assert worker.run(exit_when_idle=True) == (0, 1)
+
+        worker.queue.fail.assert_called_once_with(job, 'dcm2pdf falhou')
+        worker.queue.complete.assert_not_called()
+
+    def test_run_respects_max_jobs_and_free_slots(self, worker):
+        """
+        Testa que o worker nunca arrenda mais do que os espaços livres e o limite
+        """
+        worker.queue.lease.side_effect = lambda limit: [
+            ConversionJob(i, f'ACC{i}.dcm', f'a/ACC{i}.dcm', 1) for i in range(limit)
+        ]
+
+        assert worker.run(max_jobs=3) == (3, 0)
+
+        limits = [call[0][0] for call in worker.queue.lease.call_args_list]
+        assert all(limit <= 2 for limit in limits)
+        assert sum(limits) == 3
+
+    def test_lease_error_does_not_stop_worker(self, worker):
+        """
+        Testa que uma falha de banco ao arrendar é registrada e o worker continua
+        """
+        worker.poll_interval = 0.01
+        worker.queue.lease.side_effect = [Exception('conexão perdida'), []]
+
+        assert worker._lease(2) == []
+        assert worker._lease(2) == []
+
+    def test_stop_before_run(self, worker):
+        """
+        Testa que um worker parado não arrenda arquivos
+        """
+        worker.stop()
+
+        assert worker.run() == (0, 0)
+        worker.queue.lease.assert_not_called()
+        worker.queue.unregister.assert_called_once()
+
+    def test_cleanup_keeps_pdf_shared_by_duplicate(self, worker, tmp_path):
+        """
+        Testa que a limpeza apaga o DICOM baixado, mas não o PDF de outro
+        arquivo reaproveitado pela deduplicação
+        """
+        worker.cleanup = True
+        dcm_path = tmp_path / 'ACC2.dcm'
+        dcm_path.write_bytes(b'DICM')
+        shared_pdf = tmp_path / 'ACC1.pdf'
+        shared_pdf.write_bytes(b'%PDF')
+        worker.converter._pdf_path.side_effect = lambda path: path.replace('.dcm', '.pdf')
+        worker.converter._process_dcm_file.side_effect = lambda path: str(shared_pdf)
+
+        assert worker._process_job('pool', ConversionJob(2, 'ACC2.dcm', 'a/ACC2.dcm', 1)) == str(shared_pdf)
+
+        assert not dcm_path.exists()
+        assert shared_pdf.exists()
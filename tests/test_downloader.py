@@ -1,8 +1,9 @@
+import io
 import os
 import pytest
 from unittest.mock import Mock, patch
-from convert_dcm2pdf.core.dcm_downloader import DCMDownloader
-from convert_dcm2pdf.utils.exceptions import DownloadError
+from convert_dcm2pdf.core.dcm_downloader import PARTIAL_SUFFIX, DCMDownloader, _SFTPChannelPool
+from convert_dcm2pdf.utils.exceptions import DownloadError, IncompleteDownloadError
 
 class TestDCMDownloader:
     @pytest.fixture
@@ -17,6 +18,8 @@ class TestDCMDownloader:
             'password',   # ssh password
             './downloads'  # download directory
         ]
+        config_mock.get_int.side_effect = lambda section, key, default=0: default
+        config_mock.get_float.side_effect = lambda section, key, default=0.0: default
         config_mock.get_database_config.return_value = {
             'host': 'localhost',
             'database': 'test_db',
@@ -67,4 +70,294 @@ class TestDCMDownloader:
         
         with pytest.raises(DownloadError):
             downloader = DCMDownloader(mock_config_manager)
-            downloader._connect_ssh()
\ No newline at end of file
+            downloader._connect_ssh()
+    @pytest.mark.parametrize('workers', [1, 3])
+    def test_download_dcm_files_concurrent(self, mock_config_manager, tmp_path, workers):
+        """
+        Testa download concorrente com canais SFTP independentes e
+        isolamento de erros por arquivo
+        """
+        remote_files = [('a.dcm', 'ACC001'), ('faltando.dcm', 'ACC002'), ('c.dcm', 'ACC003')]
+        opened_channels = []
+
+        def fake_get(remote_path, local_path):
+            if 'faltando' in remote_path:
+                raise IOError('arquivo não encontrado')
+            with open(local_path, 'wb') as f:
+                f.write(b'DICM')
+
+        def fake_stat(remote_path):
+            if 'faltando' in remote_path:
+                raise IOError('arquivo não encontrado')
+            return Mock(st_size=4)
+
+        def open_sftp():
+            sftp = Mock()
+            sftp.get.side_effect = fake_get
+            sftp.stat.side_effect = fake_stat
+            opened_channels.append(sftp)
+            return sftp
+
+        ssh = Mock()
+        ssh.open_sftp.side_effect = open_sftp
+
+        mock_config_manager.get_bool.side_effect = lambda section, key, default=False: default
+        downloader = DCMDownloader(mock_config_manager)
+        downloader.download_directory = str(tmp_path)
+
+        with patch.object(downloader, '_connect_ssh', return_value=ssh), \
+             patch.object(downloader, '_get_dcm_files_to_download', return_value=remote_files):
+            downloaded_files = downloader.download_dcm_files(limit=3, workers=workers)
+
+        assert downloaded_files == [
+            os.path.join(str(tmp_path), 'ACC001.dcm'),
+            os.path.join(str(tmp_path), 'ACC003.dcm')
+        ]
+        assert 1 <= len(opened_channels) <= workers
+        assert all(sftp.close.called for sftp in opened_channels)
+        ssh.close.assert_called_once()
+
+
+class _RemoteFile(io.BytesIO):
+    """
+    Arquivo remoto simulado, com a interface de leitura do paramiko
+    """
+    prefetch_calls = []
+
+    def prefetch(self, file_size=None, max_concurrent_requests=None):
+        self.prefetch_calls.append((self.tell(), file_size, max_concurrent_requests))
+
+
+class _FakeSFTP:
+    """
+    Canal SFTP simulado cujo ``get`` pode cair depois de alguns bytes
+    """
+    def __init__(self, files, drop_after=None):
+        self.files = files
+        self.drop_after = drop_after
+        self.get_calls = 0
+        self.closed = False
+
+    def stat(self, path):
+        return Mock(st_size=len(self.files[path]))
+
+    def get(self, remote_path, local_path):
+        self.get_calls += 1
+        content = self.files[remote_path]
+        with open(local_path, 'wb') as f:
+            if self.drop_after is not None:
+                f.write(content[:self.drop_after])
+                raise EOFError('conexão encerrada')
+            f.write(content)
+
+    def open(self, path, mode='rb'):
+        self.opened = _RemoteFile(self.files[path])
+        self.opened.prefetch_calls = []
+        return self.opened
+
+    def close(self):
+        self.closed = True
+
+
+class TestResumableDownload:
+    CONTENT = bytes(range(256)) * 64
+
+    @pytest.fixture
+    def downloader(self, tmp_path):
+        config_mock = Mock()
+        config_mock.get.side_effect = lambda section, key, default=None: default
+        config_mock.get_int.side_effect = lambda section, key, default=0: default
+        config_mock.get_float.side_effect = lambda section, key, default=0.0: default
+        config_mock.get_bool.side_effect = lambda section, key, default=False: default
+        config_mock.get_database_config.return_value = {}
+
+        downloader = DCMDownloader(config_mock)
+        downloader.download_directory = str(tmp_path)
+        downloader._remote_path = lambda remote_filepath: remote_filepath
+        return downloader
+
+    def test_download_replaces_partial_file_atomically(self, downloader, tmp_path):
+        """
+        Testa que o arquivo só recebe o nome final depois de completo
+        """
+        sftp = _FakeSFTP({'a.dcm': self.CONTENT})
+
+        local_filepath = downloader._download_file(sftp, 'a.dcm', 'ACC001')
+
+        assert open(local_filepath, 'rb').read() == self.CONTENT
+        assert not os.path.exists(local_filepath + PARTIAL_SUFFIX)
+
+    def test_download_resumes_from_partial_file(self, downloader, tmp_path):
+        """
+        Testa que um arquivo parcial é completado a partir do último byte
+        """
+        partial = tmp_path / ('ACC001.dcm' + PARTIAL_SUFFIX)
+        partial.write_bytes(self.CONTENT[:5000])
+        sftp = _FakeSFTP({'a.dcm': self.CONTENT})
+
+        local_filepath = downloader._download_file(sftp, 'a.dcm', 'ACC001')
+
+        assert sftp.get_calls == 0
+        assert open(local_filepath, 'rb').read() == self.CONTENT
+
+    def test_retry_resumes_after_connection_drop(self, downloader, tmp_path):
+        """
+        Testa a nova tentativa com backoff após uma queda no meio da transferência
+        """
+        dropping = _FakeSFTP({'a.dcm': self.CONTENT}, drop_after=3000)
+        healthy = _FakeSFTP({'a.dcm': self.CONTENT})
+        ssh = Mock()
+        ssh.open_sftp.side_effect = [dropping, healthy]
+        pool = _SFTPChannelPool(ssh)
+
+        with patch('convert_dcm2pdf.core.dcm_downloader.time.sleep') as sleep:
+            local_filepath = downloader._download_with_retry(pool, 'a.dcm', 'ACC001')
+
+        assert open(local_filepath, 'rb').read() == self.CONTENT
+        assert dropping.closed
+        assert healthy.get_calls == 0
+        sleep.assert_called_once()
+        assert 0.5 <= sleep.call_args[0][0] <= 1.0
+
+    def test_retry_gives_up_after_configured_attempts(self, downloader):
+        """
+        Testa que o erro é propagado depois de esgotadas as tentativas
+        """
+        downloader._retries = 2
+        ssh = Mock()
+        ssh.open_sftp.side_effect = lambda: _FakeSFTP({'a.dcm': self.CONTENT}, drop_after=0)
+        pool = _SFTPChannelPool(ssh)
+
+        with patch('convert_dcm2pdf.core.dcm_downloader.time.sleep') as sleep, \
+             pytest.raises(EOFError):
+            downloader._download_with_retry(pool, 'a.dcm', 'ACC001')
+
+        assert sleep.call_count == 2
+
+    def test_checksum_mismatch_discards_partial_file(self, downloader, tmp_path):
+        """
+        Testa que um hash divergente descarta o arquivo parcial
+        """
+        sftp = _FakeSFTP({'a.dcm': self.CONTENT})
+
+        with pytest.raises(IncompleteDownloadError):
+            downloader._download_file(sftp, 'a.dcm', 'ACC001', expected_sha256='0' * 64)
+
+        assert not os.listdir(tmp_path)
+
+    def test_pool_reconnects_dropped_session(self):
+        """
+        Testa que o pool reabre a conexão SSH quando ela cai
+        """
+        dead = Mock()
+        dead.get_transport.return_value.is_active.return_value = False
+        fresh = Mock()
+        pool = _SFTPChannelPool(dead, connect=lambda: fresh)
+
+        with pool.channel() as sftp:
+            assert sftp is fresh.open_sftp.return_value
+
+        dead.close.assert_called_once()
+        assert pool.ssh is fresh
+
+    def test_tuned_transfer_pipelines_reads(self, downloader):
+        """
+        Testa o tamanho dos pedidos e a concorrência do prefetch configurados
+        """
+        downloader._request_size = 65536
+        downloader._max_concurrent_requests = 16
+        sftp = _FakeSFTP({'a.dcm': self.CONTENT})
+
+        local_filepath = downloader._download_file(sftp, 'a.dcm', 'ACC001')
+
+        assert sftp.get_calls == 0
+        assert sftp.opened.MAX_REQUEST_SIZE == 65536
+        assert sftp.opened.prefetch_calls == [(0, len(self.CONTENT), 16)]
+        assert open(local_filepath, 'rb').read() == self.CONTENT
+
+    def test_pool_opens_channels_with_window(self):
+        """
+        Testa que a janela e o tamanho de pacote são aplicados aos canais
+        """
+        ssh = Mock()
+        pool = _SFTPChannelPool(ssh, window_size=16 * 1024 * 1024, max_packet_size=262144)
+
+        with patch('paramiko.SFTPClient.from_transport') as from_transport:
+            with pool.channel() as sftp:
+                assert sftp is from_transport.return_value
+
+        from_transport.assert_called_once_with(
+            ssh.get_transport.return_value, window_size=16 * 1024 * 1024, max_packet_size=262144
+        )
+        ssh.open_sftp.assert_not_called()
+
+    @pytest.mark.parametrize('compress', [True, False])
+    def test_connect_ssh_compression(self, downloader, compress):
+        """
+        Testa que a compressão SSH segue a configuração
+        """
+        downloader.config.get_bool.side_effect = (
+            lambda section, key, default=False: compress if key == 'compress' else default
+        )
+        downloader._load_transfer_settings()
+
+        with patch('paramiko.SSHClient') as ssh_client:
+            downloader._connect_ssh()
+
+        assert ssh_client.return_value.connect.call_args.kwargs['compress'] is compress
+
+    @pytest.mark.parametrize('remote_age,resumed', [(-60, False), (60, True)])
+    def test_resume_requires_unchanged_remote_file(self, downloader, tmp_path, remote_age, resumed):
+        """
+        Testa que um parcial só é retomado se o arquivo remoto não foi
+        modificado depois da última gravação do parcial
+        """
+        partial = tmp_path / ('ACC001.dcm' + PARTIAL_SUFFIX)
+        partial.write_bytes(self.CONTENT[:5000])
+        sftp = _FakeSFTP({'a.dcm': self.CONTENT})
+        sftp.stat = lambda path: Mock(
+            st_size=len(self.CONTENT), st_mtime=os.path.getmtime(partial) - remote_age
+        )
+
+        local_filepath = downloader._download_file(sftp, 'a.dcm', 'ACC001')
+
+        assert sftp.get_calls == (0 if resumed else 1)
+        assert open(local_filepath, 'rb').read() == self.CONTENT
+
+    def test_remote_hash_falls_back_to_available_command(self, downloader):
+        """
+        Testa que, sem sha256sum no servidor, o próximo comando é usado e memorizado
+        """
+        def exec_command(command):
+            stdout = Mock()
+            found = command.startswith('shasum')
+            stdout.read.return_value = f"{'ab' * 32}  /pacs/a.dcm\n".encode() if found else b''
+            stdout.channel.recv_exit_status.return_value = 0 if found else 127
+            return None, stdout, None
+
+        ssh = Mock()
+        ssh.exec_command.side_effect = exec_command
+        pool = _SFTPChannelPool(ssh)
+
+        assert downloader._remote_sha256(pool, '/pacs/a.dcm') == 'ab' * 32
+        assert downloader._remote_sha256(pool, '/pacs/b.dcm') == 'ab' * 32
+
+        commands = [call[0][0] for call in ssh.exec_command.call_args_list]
+        assert commands == ['sha256sum -- /pacs/a.dcm', 'shasum -a 256 /pacs/a.dcm', 'shasum -a 256 /pacs/b.dcm']
+
+    def test_dedup_skips_remote_hash_without_same_size_candidate(self, downloader):
+        """
+        Testa que arquivos de tamanho nunca visto são baixados sem hash remoto
+        """
+        downloader._cache = Mock()
+        downloader._cache.has_size.return_value = False
+        ssh = Mock()
+        ssh.open_sftp.return_value = _FakeSFTP({'a.dcm': self.CONTENT})
+        pool = _SFTPChannelPool(ssh)
+
+        local_filepath = downloader._download_deduplicated(pool, 'a.dcm', 'ACC001')
+
+        assert open(local_filepath, 'rb').read() == self.CONTENT
+        downloader._cache.has_size.assert_called_once_with(len(self.CONTENT))
+        downloader._cache.hash_file.assert_called_once_with(local_filepath)
+        ssh.exec_command.assert_not_called()
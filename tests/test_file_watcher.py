@@ -0,0 +1,87 @@
+import os
+import sys
+import time
+import pytest
+from convert_dcm2pdf.utils.exceptions import ConfigurationError
+from convert_dcm2pdf.utils.file_watcher import InotifyWatcher, PollingWatcher, create_watcher
+
+def _read_until(watcher, expected, timeout=5.0):
+    """
+    Lê eventos até reunir os caminhos esperados ou o prazo acabar
+    """
+    found = set()
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline and not expected <= found:
+        found.update(watcher.read(0.2))
+    return found
+
+def _download(directory, name):
+    """
+    Simula o downloader: grava em .part e renomeia ao concluir
+    """
+    partial = os.path.join(directory, name + '.part')
+    with open(partial, 'wb') as file:
+        file.write(b'DICM')
+    os.replace(partial, os.path.join(directory, name))
+    return os.path.join(directory, name)
+
+class TestPollingWatcher:
+    def test_reports_new_and_changed_files_only(self, tmp_path):
+        """
+        Testa que arquivos já presentes não são reportados, e novos ou
+        alterados são, inclusive em subdiretórios
+        """
+        (tmp_path / 'antigo.dcm').write_bytes(b'DICM')
+        watcher = PollingWatcher(str(tmp_path), '.dcm', interval=0.05)
+
+        (tmp_path / 'ab').mkdir()
+        novo = _download(str(tmp_path / 'ab'), 'novo.dcm')
+        (tmp_path / 'parcial.dcm.part').write_bytes(b'DI')
+        (tmp_path / '.oculto.dcm').write_bytes(b'DICM')
+
+        assert _read_until(watcher, {novo}) == {novo}
+        assert watcher.read(0.1) == []
+
+        with open(novo, 'ab') as file:
+            file.write(b'mais')
+        assert _read_until(watcher, {novo}) == {novo}
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason="inotify é exclusivo do Linux")
+class TestInotifyWatcher:
+    def test_reports_closed_and_renamed_files(self, tmp_path):
+        """
+        Testa que arquivos fechados após escrita e renomeados a partir de
+        .part são reportados, e que .part e ocultos não são
+        """
+        with InotifyWatcher(str(tmp_path), '.dcm') as watcher:
+            baixado = _download(str(tmp_path), 'baixado.dcm')
+            copiado = str(tmp_path / 'copiado.dcm')
+            with open(copiado, 'wb') as file:
+                file.write(b'DICM')
+            (tmp_path / '.oculto.dcm').write_bytes(b'DICM')
+
+            found = _read_until(watcher, {baixado, copiado})
+
+        assert found == {baixado, copiado}
+
+    def test_watches_new_shard_directories(self, tmp_path):
+        """
+        Testa que subdiretórios criados depois do início passam a ser observados
+        """
+        with InotifyWatcher(str(tmp_path), '.dcm') as watcher:
+            shard = tmp_path / 'ab' / 'cd'
+            shard.mkdir(parents=True)
+            _read_until(watcher, set(), timeout=0.3)
+            arquivo = _download(str(shard), 'estudo.dcm')
+
+            assert arquivo in _read_until(watcher, {arquivo})
+
+class TestCreateWatcher:
+    def test_polling_backend(self, tmp_path):
+        watcher = create_watcher(str(tmp_path), '.dcm', 'polling', poll_interval=1)
+        assert isinstance(watcher, PollingWatcher)
+        assert watcher.interval == 1
+
+    def test_unknown_backend(self, tmp_path):
+        with pytest.raises(ConfigurationError):
+            create_watcher(str(tmp_path), '.dcm', 'fsevents')
@@ -0,0 +1,125 @@
+import os
+import random
+import pytest
+from unittest.mock import MagicMock, patch
+from benchmarks.corpus import MULTIFRAME_SOP_CLASS, build_multiframe, build_report
+from convert_dcm2pdf.core.header_index import DicomHeaderIndex, open_header_index
+from convert_dcm2pdf.utils.dicom_header import ENCAPSULATED_PDF_SOP_CLASS, read_header_fields
+
+def write(path, content):
+    path.write_bytes(content)
+    return str(path)
+
+class TestDicomHeaderIndex:
+    @pytest.fixture
+    def directory(self, tmp_path):
+        """
+        Fixture com um laudo, uma imagem multiframe e um arquivo inválido
+        """
+        rng = random.Random(0)
+        directory = tmp_path / 'downloads'
+        directory.mkdir()
+        write(directory / 'ACC1.dcm', build_report(rng, '2.25.1', 2048))
+        write(directory / 'ACC2.dcm', build_multiframe(rng, '2.25.2', 3, 8, 8))
+        write(directory / 'broken.dcm', b'not dicom')
+        write(directory / 'notes.txt', b'ignored')
+        return directory
+
+    @pytest.fixture
+    def index(self, tmp_path):
+        index = DicomHeaderIndex(str(tmp_path / 'state' / 'headers.sqlite3'))
+        yield index
+        index.close()
+
+    def test_read_header_fields(self, directory):
+        """
+        Testa a leitura dos campos indexados direto do cabeçalho
+        """
+        fields = read_header_fields(str(directory / 'ACC2.dcm'))
+
+        assert fields['sop_class_uid'] == MULTIFRAME_SOP_CLASS
+        assert fields['modality'] == 'OT'
+        assert fields['frames'] == 3
+        assert fields['transfer_syntax_uid'] == '1.2.840.10008.1.2.1'
+
+    def test_refresh_indexes_each_file_once(self, index, directory):
+        """
+        Testa que uma nova varredura sem mudanças não lê nenhum arquivo
+        """
+        assert index.refresh(str(directory)) == (3, 0)
+
+        with patch('convert_dcm2pdf.core.header_index.read_header_fields') as read_fields:
+            assert index.refresh(str(directory)) == (0, 0)
+        read_fields.assert_not_called()
+
+        record = index.get(str(directory / 'ACC1.dcm'))
+        assert record.sop_class_uid == ENCAPSULATED_PDF_SOP_CLASS
+        assert record.modality == 'DOC'
+        assert record.error is None
+        assert index.get(str(directory / 'broken.dcm')).error
+        assert index.get(str(directory / 'notes.txt')) is None
+
+    def test_refresh_is_incremental(self, index, directory):
+        """
+        Testa que apenas arquivos novos ou alterados são relidos e os removidos saem do índice
+        """
+        index.refresh(str(directory))
+        rng = random.Random(1)
+        changed = write(directory / 'ACC1.dcm', build_multiframe(rng, '2.25.3', 1, 4, 4))
+        os.utime(changed, ns=(1, 1))
+        write(directory / 'ACC3.dcm', build_report(rng, '2.25.4', 1024))
+        os.remove(directory / 'broken.dcm')
+
+        assert index.refresh(str(directory)) == (2, 1)
+        assert index.get(changed).sop_class_uid == MULTIFRAME_SOP_CLASS
+        assert index.get(str(directory / 'broken.dcm')) is None
+
+    def test_records_filters(self, index, directory):
+        """
+        Testa os filtros por modalidade e SOP class sem abrir os arquivos
+        """
+        index.refresh(str(directory))
+
+        by_modality = [os.path.basename(r.path) for r in index.records(str(directory), modalities=['ot'])]
+        by_class = [
+            os.path.basename(r.path)
+            for r in index.records(str(directory), sop_classes=[ENCAPSULATED_PDF_SOP_CLASS])
+        ]
+        everything = [os.path.basename(r.path) for r in index.records(str(directory))]
+
+        assert by_modality == ['ACC2.dcm']
+        assert by_class == ['ACC1.dcm']
+        assert everything == ['ACC1.dcm', 'ACC2.dcm', 'broken.dcm']
+
+    def test_refresh_walks_shard_directories(self, index, directory):
+        """
+        Testa que arquivos em subdiretórios (layout particionado) também são indexados
+        """
+        sub = directory / 'ab' / 'cd'
+        sub.mkdir(parents=True)
+        write(sub / 'ACC9.dcm', build_report(random.Random(2), '2.25.9', 512))
+
+        assert index.refresh(str(directory)) == (4, 0)
+        assert [os.path.basename(r.path) for r in index.records(str(sub))] == ['ACC9.dcm']
+        assert len(list(index.records(str(directory)))) == 4
+        assert index.refresh(str(directory)) == (0, 0)
+
+    def test_update_single_file(self, index, directory):
+        """
+        Testa a indexação de um arquivo recém-chegado
+        """
+        path = str(directory / 'ACC2.dcm')
+
+        assert index.update(path).frames == 3
+        with patch('convert_dcm2pdf.core.header_index.read_header_fields') as read_fields:
+            assert index.update(path).frames == 3
+        read_fields.assert_not_called()
+        assert index.update(str(directory / 'missing.dcm')) is None
+
+    def test_open_header_index_disabled(self, tmp_path):
+        """
+        Testa que o índice não é aberto com [dcm] header_index desativado
+        """
+        config = MagicMock()
+        config.get_bool.return_value = False
+        assert open_header_index(config, str(tmp_path)) is None
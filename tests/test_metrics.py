@@ -0,0 +1,84 @@
+import json
+import pytest
+from unittest.mock import Mock
+from convert_dcm2pdf.utils.metrics import Histogram, MetricsRegistry, report_run
+
+class TestMetrics:
+    def test_timer_counts_files_bytes_and_errors(self):
+        """
+        Testa que o timer registra sucesso com bytes e falhas como erro
+        """
+        registry = MetricsRegistry()
+
+        with registry.timer('convert', 100):
+            pass
+        with registry.timer('convert') as measurement:
+            measurement['bytes'] = 50
+        with pytest.raises(RuntimeError):
+            with registry.timer('convert', 999):
+                raise RuntimeError('falha')
+
+        stage = registry.summary()['stages']['convert']
+        assert stage['files'] == 2
+        assert stage['errors'] == 1
+        assert stage['bytes'] == 150
+
+    def test_histogram_quantiles(self):
+        """
+        Testa a estimativa de quantis pelos buckets
+        """
+        histogram = Histogram(buckets=(1.0, 2.0, 4.0))
+        for value in [0.5] * 50 + [1.5] * 49 + [3.0]:
+            histogram.observe(value)
+
+        assert histogram.quantile(0.5) <= 1.0
+        assert 1.0 < histogram.quantile(0.99) <= 2.0
+        assert histogram.quantile(1.0) == 3.0
+
+    def test_render_prometheus(self):
+        """
+        Testa o formato texto do Prometheus
+        """
+        registry = MetricsRegistry(buckets=(0.1, 1.0))
+        registry.observe('download', 0.05, 10)
+        registry.observe('download', 5.0, error=True)
+
+        text = registry.render_prometheus()
+
+        assert 'dcm2pdf_stage_duration_seconds_bucket{stage="download",le="0.1"} 1' in text
+        assert 'dcm2pdf_stage_duration_seconds_bucket{stage="download",le="+Inf"} 2' in text
+        assert 'dcm2pdf_errors_total{stage="download"} 1' in text
+        assert 'dcm2pdf_bytes_total{stage="download"} 10' in text
+
+    def test_report_run_exports_files(self, tmp_path):
+        """
+        Testa a gravação do resumo JSON e do arquivo do Prometheus
+        """
+        registry = MetricsRegistry()
+        registry.observe('store', 0.2, 1024)
+        paths = {
+            'summary_file': str(tmp_path / 'summary.json'),
+            'prometheus_file': str(tmp_path / 'metrics.prom'),
+        }
+        config_manager = Mock()
+        config_manager.get.side_effect = lambda section, key, default=None: paths.get(key, default)
+
+        summary = report_run(config_manager, 3, 2, 1, registry)
+
+        assert json.loads((tmp_path / 'summary.json').read_text()) == summary
+        assert summary['files'] == {'total': 3, 'converted': 2, 'failed': 1}
+        assert 'dcm2pdf_files_total{stage="store"} 1' in (tmp_path / 'metrics.prom').read_text()
+
+    def test_report_run_prints_found_total_with_skipped(self, capsys):
+        """
+        Testa que o resumo informa o total encontrado incluindo os ignorados
+        """
+        config_manager = Mock()
+        config_manager.get.side_effect = lambda section, key, default=None: default
+
+        report_run(config_manager, 3, 2, 1, MetricsRegistry(), skipped=4)
+
+        output = capsys.readouterr().out
+        assert "Total de arquivos encontrados: 7" in output
+        assert "Arquivos já convertidos ignorados: 4" in output
+        assert output.index("Resumo:") < output.index("Total de arquivos encontrados")
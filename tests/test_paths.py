@@ -0,0 +1,80 @@
+import os
+import pytest
+from unittest.mock import Mock, patch
+from convert_dcm2pdf.utils.paths import MAX_SHARD_DEPTH, get_shard_depth, iter_entries, iter_files, shard_path
+
+class TestShardPath:
+    def test_depth_zero_is_flat(self, tmp_path):
+        """
+        Testa que sem particionamento o caminho é o do layout plano
+        """
+        assert shard_path(str(tmp_path), 'ACC1.dcm') == os.path.join(str(tmp_path), 'ACC1.dcm')
+
+    def test_shards_are_deterministic_per_study(self, tmp_path):
+        """
+        Testa que o DICOM e o PDF de um estudo caem no mesmo subdiretório relativo
+        """
+        dcm_path = shard_path(str(tmp_path / 'downloads'), 'ACC1.dcm', 2)
+        pdf_path = shard_path(str(tmp_path / 'pdfs'), 'ACC1.pdf', 2)
+
+        assert dcm_path == shard_path(str(tmp_path / 'downloads'), 'ACC1.dcm', 2)
+        dcm_shards = os.path.relpath(os.path.dirname(dcm_path), str(tmp_path / 'downloads'))
+        pdf_shards = os.path.relpath(os.path.dirname(pdf_path), str(tmp_path / 'pdfs'))
+        assert dcm_shards == pdf_shards
+        assert [len(part) for part in dcm_shards.split(os.sep)] == [2, 2]
+
+    def test_files_spread_across_shards(self, tmp_path):
+        """
+        Testa que estudos diferentes se distribuem entre os subdiretórios
+        """
+        shards = {os.path.dirname(shard_path(str(tmp_path), f'ACC{i}.dcm', 1)) for i in range(200)}
+        assert len(shards) > 100
+
+    def test_shard_depth_is_clamped(self):
+        """
+        Testa os limites de [paths] shard_depth
+        """
+        config_manager = Mock()
+        config_manager.get_int.return_value = 10
+        assert get_shard_depth(config_manager) == MAX_SHARD_DEPTH
+
+        config_manager.get_int.return_value = -1
+        assert get_shard_depth(config_manager) == 0
+
+class TestIterFiles:
+    def test_walks_subdirectories_and_skips_hidden(self, tmp_path):
+        """
+        Testa que a varredura desce nos subdiretórios, filtra pela extensão
+        e ignora entradas ocultas
+        """
+        for relative in ('a.dcm', 'b.txt', 'ab/c.dcm', 'ab/cd/d.dcm', '.index/e.dcm', '.f.dcm'):
+            path = tmp_path / relative
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(b'DICM')
+
+        found = sorted(os.path.relpath(p, str(tmp_path)) for p in iter_files(str(tmp_path), '.dcm'))
+        assert found == ['a.dcm', os.path.join('ab', 'c.dcm'), os.path.join('ab', 'cd', 'd.dcm')]
+
+    def test_is_lazy(self, tmp_path):
+        """
+        Testa que o primeiro arquivo é entregue antes de os subdiretórios
+        serem lidos
+        """
+        (tmp_path / 'a.dcm').write_bytes(b'DICM')
+        for shard in ('00', '01', '02'):
+            (tmp_path / shard).mkdir()
+            (tmp_path / shard / f'{shard}.dcm').write_bytes(b'DICM')
+
+        with patch('convert_dcm2pdf.utils.paths.os.scandir', side_effect=os.scandir) as scandir:
+            files = iter_files(str(tmp_path), '.dcm')
+            assert os.path.basename(next(files)) == 'a.dcm'
+            assert scandir.call_count == 1
+
+            assert [os.path.basename(p) for p in files] == ['00.dcm', '01.dcm', '02.dcm']
+            assert scandir.call_count == 4
+
+    def test_missing_directory_yields_nothing(self, tmp_path):
+        """
+        Testa que um diretório inexistente não gera erro
+        """
+        assert list(iter_entries(str(tmp_path / 'inexistente'))) == []
@@ -0,0 +1,72 @@
+import io
+import base64
+import pytest
+from unittest.mock import MagicMock, patch
+from convert_dcm2pdf.database.pdf_stream import (
+    CopyRowReader, _copy_row_chunks, iter_encoded_chunks, stream_pdf_to_database
+)
+from convert_dcm2pdf.utils.exceptions import DatabaseError
+
+CONTENT = bytes(range(256)) * 40 + b'fim'
+
+class TestPDFStream:
+    @pytest.mark.parametrize('chunk_size', [1, 7, 1024, 1 << 20])
+    def test_base64_chunks_match_whole_encoding(self, chunk_size):
+        """
+        Testa que a codificação em blocos é igual à do arquivo inteiro
+        """
+        chunks = iter_encoded_chunks(io.BytesIO(CONTENT), 'base64', chunk_size)
+
+        assert b''.join(chunks) == base64.b64encode(CONTENT)
+
+    @pytest.mark.parametrize('column,expected', [
+        ('file_content', base64.b64encode(CONTENT)),
+        ('file_data', b'\\\\x' + CONTENT.hex().encode()),
+    ])
+    def test_copy_row(self, column, expected):
+        """
+        Testa a linha montada para o COPY, com o nome escapado
+        """
+        chunks = _copy_row_chunks('laudo\t1.pdf', io.BytesIO(CONTENT), column, 100)
+        reader = CopyRowReader(chunks)
+
+        parts = iter(lambda: reader.read(64), b'')
+        assert all(len(part) <= 64 for part in parts)
+
+        reader = CopyRowReader(_copy_row_chunks('laudo\t1.pdf', io.BytesIO(CONTENT), column, 100))
+        assert reader.read() == b'laudo\\t1.pdf\t' + expected + b'\n'
+
+    def test_stream_pdf_to_database(self, tmp_path):
+        """
+        Testa que o PDF é enviado por COPY e confirmado
+        """
+        pdf_path = tmp_path / 'a.pdf'
+        pdf_path.write_bytes(CONTENT)
+        sent = []
+
+        with patch('convert_dcm2pdf.database.pdf_stream.PostgreSQLConnector') as connector_class:
+            connector = connector_class.return_value.__enter__.return_value
+            connector.copy_from_stream.side_effect = lambda query, reader, size: sent.append(
+                (query, b''.join(iter(lambda: reader.read(size), b'')))
+            )
+            stream_pdf_to_database({}, 'a.pdf', str(pdf_path), 'file_data', chunk_size=512)
+
+        query, data = sent[0]
+        assert query == 'COPY pdf_storage (filename, file_data) FROM STDIN'
+        assert data == b'a.pdf\t\\\\x' + CONTENT.hex().encode() + b'\n'
+        connector.connection.commit.assert_called_once()
+
+    def test_stream_failure_rolls_back(self, tmp_path):
+        """
+        Testa que falhas no COPY desfazem a transação e viram DatabaseError
+        """
+        pdf_path = tmp_path / 'a.pdf'
+        pdf_path.write_bytes(CONTENT)
+
+        with patch('convert_dcm2pdf.database.pdf_stream.PostgreSQLConnector') as connector_class:
+            connector = connector_class.return_value.__enter__.return_value
+            connector.copy_from_stream.side_effect = Exception('conexão perdida')
+            with pytest.raises(DatabaseError):
+                stream_pdf_to_database({}, 'a.pdf', str(pdf_path))
+
+        connector.connection.rollback.assert_called_once()
@@ -0,0 +1,141 @@
+import threading
+import pytest
+from unittest.mock import MagicMock, Mock, patch
+from convert_dcm2pdf.core.pipeline import DCMPipeline
+from convert_dcm2pdf.core.resource_budget import ResourceBudget
+
+class TestDCMPipeline:
+    @pytest.fixture
+    def pipeline(self):
+        """
+        Fixture que cria um pipeline com downloader e conversor simulados
+        """
+        config_mock = Mock()
+        config_mock.get.side_effect = lambda section, key, default=None: default
+        config_mock.get_int.side_effect = lambda section, key, default=0: default
+        config_mock.get_bool.side_effect = lambda section, key, default=False: default
+
+        downloader = Mock()
+        converter = MagicMock()
+        converter._batch_storage.return_value.__enter__.return_value = None
+        converter._cache = None
+        converter._resolve_workers.side_effect = lambda workers=None: workers or 1
+        return DCMPipeline(config_mock, downloader=downloader, converter=converter)
+
+    def test_run_streams_files_between_stages(self, pipeline):
+        """
+        Testa que a conversão começa antes do fim dos downloads e que
+        falhas ficam isoladas por arquivo
+        """
+        first_converted = threading.Event()
+        downloads_after_first_conversion = []
+
+        def iter_downloads(limit, workers):
+            yield '/tmp/a.dcm'
+            first_converted.wait(timeout=5)
+            for name in ('/tmp/b.dcm', '/tmp/c.dcm'):
+                downloads_after_first_conversion.append(name)
+                yield name
+
+        def convert(dcm_filepath):
+            if dcm_filepath == '/tmp/b.dcm':
+                raise RuntimeError('falha simulada')
+            first_converted.set()
+            return dcm_filepath.replace('.dcm', '.pdf')
+
+        pipeline.downloader.iter_download_dcm_files.side_effect = iter_downloads
+        pipeline.converter._convert_dcm_to_pdf.side_effect = convert
+
+        converted, errors = pipeline.run(limit=3, convert_workers=2, queue_size=1)
+
+        assert sorted(converted) == ['/tmp/a.pdf', '/tmp/c.pdf']
+        assert errors == ['/tmp/b.dcm']
+        assert downloads_after_first_conversion == ['/tmp/b.dcm', '/tmp/c.dcm']
+        assert pipeline.converter._store_pdf.call_count == 2
+
+    def test_run_raises_download_failure(self, pipeline):
+        """
+        Testa que falha no estágio de download é propagada após o encerramento
+        """
+        pipeline.downloader.iter_download_dcm_files.side_effect = RuntimeError('SSH indisponível')
+
+        with pytest.raises(RuntimeError):
+            pipeline.run(convert_workers=2)
+
+    def test_run_cleans_up_stored_intermediates(self, pipeline, tmp_path):
+        """
+        Testa que DICOM e PDF são apagados assim que o PDF é armazenado
+        """
+        dcm_path = tmp_path / 'a.dcm'
+        dcm_path.write_bytes(b'DICM')
+        pdf_path = tmp_path / 'a.pdf'
+
+        def convert(dcm_filepath):
+            pdf_path.write_bytes(b'%PDF')
+            return str(pdf_path)
+
+        pipeline.config.get_bool.side_effect = lambda section, key, default=False: key == 'cleanup'
+        pipeline.config.get_int.side_effect = lambda section, key, default=0: (
+            1024 if key == 'disk_budget' else default
+        )
+        pipeline.downloader.iter_download_dcm_files.side_effect = lambda limit, workers: iter([str(dcm_path)])
+        pipeline.converter._convert_dcm_to_pdf.side_effect = convert
+        pipeline.converter._store_pdf.side_effect = (
+            lambda pdf, dcm: pipeline.converter._on_stored(dcm, pdf)
+        )
+
+        converted, errors = pipeline.run(limit=1)
+
+        assert converted == [str(pdf_path)]
+        assert errors == []
+        assert not dcm_path.exists()
+        assert not pdf_path.exists()
+
+    def test_run_releases_budget_of_rejected_batch_rows(self, pipeline, tmp_path):
+        """
+        Testa que um PDF rejeitado pelo lote libera sua reserva no orçamento
+        e mantém os arquivos em disco, mesmo com a limpeza ativa
+        """
+        dcm_path = tmp_path / 'a.dcm'
+        dcm_path.write_bytes(b'DICM')
+        pdf_path = tmp_path / 'a.pdf'
+        budget = ResourceBudget(disk_bytes=1024)
+        budget.acquire(str(dcm_path), disk=4)
+
+        def convert(dcm_filepath):
+            pdf_path.write_bytes(b'%PDF')
+            return str(pdf_path)
+
+        pipeline.config.get_bool.side_effect = lambda section, key, default=False: key == 'cleanup'
+        pipeline.downloader.iter_download_dcm_files.side_effect = lambda limit, workers: iter([str(dcm_path)])
+        pipeline.converter._convert_dcm_to_pdf.side_effect = convert
+        # Lote: o PDF é aceito por _store_pdf e rejeitado no descarregamento
+        pipeline.converter._store_pdf.side_effect = (
+            lambda pdf, dcm: pipeline.converter._on_store_failed(dcm, pdf)
+        )
+
+        with patch.object(ResourceBudget, 'from_config', return_value=budget):
+            pipeline.run(limit=1)
+
+        assert budget.in_use == {'disk': 0, 'memory': 0}
+        assert dcm_path.exists()
+        assert pdf_path.exists()
+
+    def test_run_converts_under_content_lock_with_dedup(self, pipeline):
+        """
+        Testa que, com a deduplicação ativa, a conversão passa pelo caminho
+        com lock do conversor e o estágio de armazenamento não grava de novo
+        """
+        pipeline.converter._cache = Mock()
+        pipeline.downloader.iter_download_dcm_files.side_effect = (
+            lambda limit, workers: iter(['/tmp/a.dcm', '/tmp/b.dcm'])
+        )
+        pipeline.converter._process_dcm_file.side_effect = lambda dcm: dcm.replace('.dcm', '.pdf')
+
+        converted, errors = pipeline.run(limit=2, convert_workers=2)
+
+        assert sorted(converted) == ['/tmp/a.pdf', '/tmp/b.pdf']
+        assert errors == []
+        assert pipeline.converter._process_dcm_file.call_count == 2
+        pipeline.converter._convert_dcm_to_pdf.assert_not_called()
+        pipeline.converter._store_pdf.assert_not_called()
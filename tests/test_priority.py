@@ -0,0 +1,140 @@
+import os
+import math
+import struct
+import datetime
+import threading
+import pytest
+from unittest.mock import MagicMock
+from convert_dcm2pdf.utils.dicom_header import read_study_attributes
+from convert_dcm2pdf.utils.exceptions import ConfigurationError
+from convert_dcm2pdf.utils.priority import (
+    PRIORITY_BACKFILL, PRIORITY_ROUTINE, PRIORITY_URGENT, DeadlineQueue, PriorityPolicy
+)
+
+TODAY = datetime.date(2024, 5, 10)
+
+def _element(group, element, vr, value):
+    if len(value) % 2:
+        value += b' '
+    return struct.pack('<HH', group, element) + vr + struct.pack('<H', len(value)) + value
+
+def write_study(path, modality, study_date):
+    """
+    Grava um DICOM mínimo com modalidade e data do estudo
+    """
+    meta = _element(0x0002, 0x0010, b'UI', b'1.2.840.10008.1.2.1\x00')
+    dataset = (
+        _element(0x0008, 0x0016, b'UI', b'1.2.3\x00')
+        + _element(0x0008, 0x0020, b'DA', study_date)
+        + _element(0x0008, 0x0060, b'CS', modality)
+        + _element(0x0010, 0x0010, b'PN', b'DOE^JOHN')
+    )
+    with open(path, 'wb') as file:
+        file.write(b'\x00' * 128 + b'DICM' + meta + dataset)
+    return str(path)
+
+class TestPriorityPolicy:
+    @pytest.fixture
+    def policy(self):
+        return PriorityPolicy(urgent_modalities=['CR', 'ct'], urgent_days=1, routine_days=30,
+                              slas=(60, 3600, 86400))
+
+    @pytest.mark.parametrize('modality, study_date, priority, expected', [
+        ('CT', '20240510', None, PRIORITY_URGENT),
+        ('cr', datetime.date(2024, 5, 9), None, PRIORITY_URGENT),
+        ('CT', '20240501', None, PRIORITY_ROUTINE),
+        ('MR', '2024-05-10', None, PRIORITY_ROUTINE),
+        ('CT', '20230101', None, PRIORITY_BACKFILL),
+        ('CT', None, None, PRIORITY_BACKFILL),
+        ('MR', '20230101', 0, PRIORITY_URGENT),
+        ('CT', '20240510', 7, PRIORITY_BACKFILL),
+    ])
+    def test_classify(self, policy, modality, study_date, priority, expected):
+        """
+        Testa as classes por modalidade, idade do estudo e prioridade explícita
+        """
+        assert policy.classify(modality, study_date, priority, today=TODAY) == expected
+
+    def test_backfill_is_not_starved(self, policy):
+        """
+        Testa que um backfill antigo vence urgentes que chegam depois do seu prazo
+        """
+        backfill = policy.deadline(PRIORITY_BACKFILL, arrival=0)
+        assert policy.deadline(PRIORITY_URGENT, arrival=10) < backfill
+        assert policy.deadline(PRIORITY_URGENT, arrival=86400) > backfill
+
+    def test_file_deadline_reads_header(self, policy, tmp_path):
+        """
+        Testa que o prazo de um arquivo usa o cabeçalho e a data de modificação
+        """
+        today = datetime.date.today().strftime('%Y%m%d').encode()
+        path = write_study(tmp_path / 'a.dcm', b'CT', today)
+        os.utime(path, (1000, 1000))
+
+        assert read_study_attributes(path) == ('CT', today.decode())
+        assert policy.file_deadline(path) == 1060
+
+    def test_file_deadline_unreadable_is_backfill(self, policy, tmp_path):
+        """
+        Testa que arquivos sem cabeçalho DICOM são tratados como backfill
+        """
+        path = tmp_path / 'b.dcm'
+        path.write_bytes(b'not dicom')
+        os.utime(path, (1000, 1000))
+
+        assert policy.file_deadline(str(path)) == 1000 + 86400
+
+    def test_class_sql(self, policy):
+        """
+        Testa a expressão SQL da classe e do prazo
+        """
+        expression, params = policy.class_sql()
+        assert 'UPPER(modality) = ANY(%s)' in expression
+        assert params == (['CR', 'CT'], 1, 30)
+
+        expression, params = policy.deadline_sql('created_at')
+        assert expression.startswith('created_at + make_interval')
+        assert params == (['CR', 'CT'], 1, 30, 60.0, 3600.0, 86400.0)
+
+    def test_rejects_invalid_column(self):
+        """
+        Testa que nomes de coluna inválidos na configuração são recusados
+        """
+        with pytest.raises(ConfigurationError):
+            PriorityPolicy(priority_column='priority; DROP TABLE study')
+
+    def test_from_config_disabled(self):
+        """
+        Testa que a política não é criada com [priority] desativada
+        """
+        config = MagicMock()
+        config.get_bool.return_value = False
+        assert PriorityPolicy.from_config(config) is None
+
+class TestDeadlineQueue:
+    def test_earliest_deadline_first_then_fifo(self):
+        """
+        Testa que o prazo mais próximo sai primeiro e empates saem na ordem de chegada
+        """
+        deadlines = DeadlineQueue()
+        deadlines.put('backfill', 300)
+        deadlines.put('first')
+        deadlines.put('urgent', 10)
+        deadlines.put('second')
+
+        assert [deadlines.get() for _ in range(4)] == ['urgent', 'backfill', 'first', 'second']
+
+    def test_put_blocks_when_full(self):
+        """
+        Testa que a fila continua limitada
+        """
+        deadlines = DeadlineQueue(maxsize=1)
+        deadlines.put('a', 1)
+        producer = threading.Thread(target=deadlines.put, args=('b', math.inf))
+        producer.start()
+        producer.join(0.05)
+        assert producer.is_alive()
+
+        assert deadlines.get() == 'a'
+        producer.join(1)
+        assert deadlines.get() == 'b'
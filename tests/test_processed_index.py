@@ -0,0 +1,37 @@
+import os
+from convert_dcm2pdf.core.processed_index import ProcessedFileIndex
+
+class TestProcessedFileIndex:
+    def test_mark_and_detect_changes(self, tmp_path):
+        """
+        Testa que arquivos registrados são reconhecidos até serem alterados
+        """
+        dcm_path = tmp_path / 'a.dcm'
+        dcm_path.write_bytes(b'DICM')
+        index = ProcessedFileIndex(str(tmp_path / 'index.sqlite3'))
+
+        assert not index.is_processed(str(dcm_path))
+        index.mark_processed(str(dcm_path), '/pdfs/a.pdf')
+        assert index.is_processed(str(dcm_path))
+
+        dcm_path.write_bytes(b'DICM alterado')
+        assert not index.is_processed(str(dcm_path))
+        index.close()
+
+    def test_index_persists_between_runs(self, tmp_path):
+        """
+        Testa que o índice sobrevive ao fechamento e reabertura
+        """
+        dcm_path = tmp_path / 'a.dcm'
+        dcm_path.write_bytes(b'DICM')
+        index_path = str(tmp_path / 'index.sqlite3')
+
+        index = ProcessedFileIndex(index_path)
+        index.mark_processed(str(dcm_path))
+        index.close()
+
+        index = ProcessedFileIndex(index_path)
+        assert index.is_processed(str(dcm_path))
+        index.forget(str(dcm_path))
+        assert not index.is_processed(str(dcm_path))
+        index.close()
@@ -0,0 +1,55 @@
+import threading
+from convert_dcm2pdf.core.resource_budget import ResourceBudget
+
+class TestResourceBudget:
+    def test_acquire_waits_for_release(self):
+        """
+        Testa que uma reserva acima do orçamento espera a liberação de outra
+        """
+        budget = ResourceBudget(disk_bytes=100)
+        assert budget.acquire('a.dcm', disk=80)
+
+        assert not budget.acquire('b.dcm', disk=40, timeout=0.05)
+
+        admitted = []
+        waiter = threading.Thread(target=lambda: admitted.append(budget.acquire('b.dcm', disk=40, timeout=5)))
+        waiter.start()
+        budget.release('a.dcm')
+        waiter.join()
+
+        assert admitted == [True]
+        assert budget.in_use['disk'] == 40
+
+    def test_oversized_request_is_admitted_alone(self):
+        """
+        Testa que um arquivo maior que o orçamento não trava a execução
+        """
+        budget = ResourceBudget(disk_bytes=100)
+
+        assert budget.acquire('grande.dcm', disk=500, timeout=0)
+        assert not budget.acquire('b.dcm', disk=1, timeout=0)
+
+    def test_release_by_resource(self):
+        """
+        Testa a liberação parcial (só memória) e a contabilização do PDF
+        """
+        budget = ResourceBudget(disk_bytes=1000, memory_bytes=1000)
+        budget.acquire('a.dcm', disk=100, memory=300)
+        budget.charge('a.dcm', disk=50)
+
+        budget.release('a.dcm', ['memory'])
+        assert budget.in_use == {'disk': 150, 'memory': 0}
+
+        budget.release('a.dcm')
+        budget.release('a.dcm')
+        assert budget.in_use == {'disk': 0, 'memory': 0}
+
+    def test_from_config_without_limits(self):
+        """
+        Testa que sem limites configurados nenhum orçamento é criado
+        """
+        class Config:
+            def get_int(self, section, key, default=0):
+                return default
+
+        assert ResourceBudget.from_config(Config()) is None
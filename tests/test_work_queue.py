@@ -0,0 +1,143 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from convert_dcm2pdf.database.work_queue import StudyWorkQueue
+from convert_dcm2pdf.utils.priority import PriorityPolicy
+
+class TestStudyWorkQueue:
+    @pytest.fixture
+    def work_queue(self):
+        """
+        Fixture que cria uma fila com identificador fixo
+        """
+        return StudyWorkQueue({}, worker_id='node-1:42', refill_size=2)
+
+    def test_claim_refills_when_queue_runs_short(self, work_queue):
+        """
+        Testa que a fila é reabastecida por páginas até atender o lote
+        """
+        pending = [[('a.dcm', 'ACC1')], [('b.dcm', 'ACC2'), ('c.dcm', 'ACC3')], []]
+
+        with patch.object(work_queue, 'release_stale', return_value=0), \
+             patch.object(work_queue, '_claim_pending', side_effect=pending) as claim_pending, \
+             patch.object(work_queue, 'refill', side_effect=[2, 0]) as refill:
+            claimed = work_queue.claim(4)
+
+        assert claimed == [('a.dcm', 'ACC1'), ('b.dcm', 'ACC2'), ('c.dcm', 'ACC3')]
+        assert [call[0][0] for call in claim_pending.call_args_list] == [4, 3]
+        assert refill.call_count == 2
+
+    def test_claim_uses_skip_locked(self, work_queue):
+        """
+        Testa que a reivindicação usa FOR UPDATE SKIP LOCKED e o identificador do processo
+        """
+        cursor = MagicMock()
+        cursor.fetchall.return_value = [('a.dcm', 'ACC1')]
+
+        with patch.object(work_queue, '_transaction', side_effect=lambda operation: operation(cursor)):
+            assert work_queue._claim_pending(5) == [('a.dcm', 'ACC1')]
+
+        query, params = cursor.execute.call_args[0]
+        assert 'FOR UPDATE SKIP LOCKED' in query
+        assert params == ('node-1:42', 5)
+
+    def test_from_config_disabled(self):
+        """
+        Testa que a fila não é criada com [queue] desativada
+        """
+        config = MagicMock()
+        config.get_bool.return_value = False
+        assert StudyWorkQueue.from_config(config, {}) is None
+
+    def test_claim_orders_by_deadline(self, work_queue):
+        """
+        Testa que os estudos pendentes são reivindicados pelo prazo mais próximo
+        """
+        cursor = MagicMock()
+        cursor.fetchall.return_value = []
+
+        with patch.object(work_queue, '_transaction', side_effect=lambda operation: operation(cursor)):
+            work_queue._claim_pending(5)
+
+        assert 'ORDER BY deadline, accession_no' in cursor.execute.call_args[0][0]
+
+    def test_refill_urgent_enqueues_with_urgent_deadline(self):
+        """
+        Testa que estudos urgentes são enfileirados fora da ordem do cursor, com o prazo da classe
+        """
+        policy = PriorityPolicy(urgent_modalities=['CT'], slas=(60, 3600, 86400))
+        work_queue = StudyWorkQueue({}, worker_id='node-1:42', priority=policy)
+        cursor = MagicMock()
+        cursor.fetchall.return_value = [('ACC9', 'a/ACC9.dcm', 0)]
+
+        with patch.object(work_queue, '_transaction', side_effect=lambda operation: operation(cursor)), \
+             patch('convert_dcm2pdf.database.work_queue.psycopg2.extras.execute_values') as execute_values:
+            assert work_queue.refill_urgent() == 1
+
+        query, params = cursor.execute.call_args[0]
+        assert 'NOT EXISTS' in query
+        assert 'CAST(study_date AS DATE) >= CURRENT_DATE - %s' in query
+        assert params[:2] == (1, ['CT'])
+        assert params[-1] == work_queue.refill_size
+        assert execute_values.call_args[0][2] == [('ACC9', 'a/ACC9.dcm', 0, 60.0)]
+
+    def test_refill_urgent_without_policy(self, work_queue):
+        """
+        Testa que, sem política de prioridade, nada é consultado
+        """
+        with patch.object(work_queue, '_transaction') as transaction:
+            assert work_queue.refill_urgent() == 0
+        transaction.assert_not_called()
+
+    def test_refill_urgent_skipped_when_nothing_can_be_urgent(self):
+        """
+        Testa que sem modalidades urgentes nem coluna de classe nada é consultado
+        """
+        work_queue = StudyWorkQueue({}, worker_id='node-1:42', priority=PriorityPolicy())
+        with patch.object(work_queue, '_transaction') as transaction:
+            assert work_queue.refill_urgent() == 0
+        transaction.assert_not_called()
+
+    def test_claim_refills_urgent_on_interval(self):
+        """
+        Testa que a busca de estudos urgentes roda no máximo uma vez por intervalo
+        """
+        policy = PriorityPolicy(urgent_modalities=['CT'])
+        work_queue = StudyWorkQueue({}, worker_id='node-1:42', priority=policy, urgent_refill_interval=60)
+
+        with patch.object(work_queue, 'release_stale', return_value=0), \
+             patch.object(work_queue, '_claim_pending', return_value=[('a.dcm', 'ACC1')]), \
+             patch.object(work_queue, 'refill_urgent', return_value=0) as refill_urgent, \
+             patch('convert_dcm2pdf.database.work_queue.time.monotonic', side_effect=[1000.0, 1030.0, 1061.0]):
+            for _ in range(3):
+                work_queue.claim(1)
+
+        assert refill_urgent.call_count == 2
+
+    def test_claim_sweeps_stale_claims_on_interval(self):
+        """
+        Testa que a busca de reivindicações expiradas roda no máximo uma vez por intervalo
+        """
+        work_queue = StudyWorkQueue({}, worker_id='node-1:42', stale_sweep_interval=60)
+
+        with patch.object(work_queue, 'release_stale', return_value=0) as release_stale, \
+             patch.object(work_queue, '_claim_pending', return_value=[('a.dcm', 'ACC1')]), \
+             patch('convert_dcm2pdf.database.work_queue.time.monotonic', side_effect=[1000.0, 1030.0, 1061.0]):
+            for _ in range(3):
+                work_queue.claim(1)
+
+        assert release_stale.call_count == 2
+        assert any("WHERE status = 'claimed'" in query for query in StudyWorkQueue.SCHEMA)
+
+    def test_release_stale_fails_exhausted_claims(self, work_queue):
+        """
+        Testa que reivindicações expiradas sem tentativas restantes viram falha
+        """
+        cursor = MagicMock()
+        cursor.rowcount = 2
+
+        with patch.object(work_queue, '_transaction', side_effect=lambda operation: operation(cursor)):
+            assert work_queue.release_stale() == 2
+
+        query, params = cursor.execute.call_args[0]
+        assert "CASE WHEN attempts >= %s THEN 'failed' ELSE 'pending' END" in query
+        assert params == (work_queue.max_attempts, work_queue.max_attempts, work_queue.claim_timeout)
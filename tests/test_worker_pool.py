@@ -0,0 +1,97 @@
+import io
+import sys
+import json
+import pytest
+from unittest.mock import Mock
+from convert_dcm2pdf.core.backends import WorkerPoolBackend
+from convert_dcm2pdf.core.batch_worker import serve
+from convert_dcm2pdf.utils.exceptions import ConversionError, UnsupportedConversionError
+
+# Conversor de teste: copia a entrada, responde com o pid e encerra em "crash"
+FAKE_WORKER = """
+import os, sys, json, shutil
+for line in sys.stdin:
+    job = json.loads(line)
+    if 'crash' in job['input']:
+        os._exit(1)
+    if 'garbage' in job['input']:
+        sys.stdout.write('resposta parcial\\n{"id": 99, "status": "ok"}\\n')
+        sys.stdout.flush()
+        continue
+    if 'unsupported' in job['input']:
+        reply = {'id': job['id'], 'status': 'unsupported', 'error': 'sem suporte'}
+    else:
+        shutil.copyfile(job['input'], job['output'])
+        with open(job['output'], 'a') as output:
+            output.write(str(os.getpid()))
+        reply = {'id': job['id'], 'status': 'ok'}
+    sys.stdout.write(json.dumps(reply) + '\\n')
+    sys.stdout.flush()
+"""
+
+class TestWorkerPool:
+    @pytest.fixture
+    def pool(self):
+        pool = WorkerPoolBackend([sys.executable, '-c', FAKE_WORKER], size=1, max_jobs=2, timeout=30)
+        yield pool
+        pool.close()
+
+    def _convert(self, pool, tmp_path, name):
+        dcm_path = tmp_path / f'{name}.dcm'
+        dcm_path.write_text('')
+        pdf_path = tmp_path / f'{name}.pdf'
+        pool.convert(str(dcm_path), str(pdf_path))
+        return pdf_path.read_text()
+
+    def test_worker_is_reused_and_restarted_after_max_jobs(self, pool, tmp_path):
+        """
+        Testa que o mesmo processo atende vários trabalhos até o limite
+        """
+        pids = [self._convert(pool, tmp_path, f'A{i}') for i in range(3)]
+
+        assert pids[0] == pids[1]
+        assert pids[2] != pids[0]
+
+    def test_worker_restarts_after_crash(self, pool, tmp_path):
+        """
+        Testa que uma queda do processo falha só o arquivo em andamento
+        """
+        with pytest.raises(ConversionError):
+            self._convert(pool, tmp_path, 'crash')
+
+        assert self._convert(pool, tmp_path, 'A1')
+
+    def test_worker_restarts_after_invalid_reply(self, pool, tmp_path):
+        """
+        Testa que uma resposta ilegível reinicia o processo, para que as
+        respostas seguintes não fiquem defasadas dos pedidos
+        """
+        with pytest.raises(ConversionError):
+            self._convert(pool, tmp_path, 'garbage')
+
+        first = self._convert(pool, tmp_path, 'A1')
+        second = self._convert(pool, tmp_path, 'A2')
+        assert first.isdigit() and first == second
+
+    def test_unsupported_reply(self, pool, tmp_path):
+        """
+        Testa que arquivos recusados pelo processo seguem para o próximo backend
+        """
+        with pytest.raises(UnsupportedConversionError):
+            self._convert(pool, tmp_path, 'unsupported')
+
+    def test_serve_protocol(self):
+        """
+        Testa as respostas do processo conversor padrão
+        """
+        backend = Mock()
+        backend.convert.side_effect = [None, UnsupportedConversionError('imagem'), ConversionError('falha')]
+        requests = io.StringIO(''.join(
+            json.dumps({'id': i, 'input': f'{i}.dcm', 'output': f'{i}.pdf'}) + '\n' for i in range(3)
+        ))
+        replies = io.StringIO()
+
+        serve(backend, requests, replies)
+
+        statuses = [json.loads(line)['status'] for line in replies.getvalue().splitlines()]
+        assert statuses == ['ok', 'unsupported', 'error']